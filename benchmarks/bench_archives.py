@@ -0,0 +1,169 @@
+"""
+Micro-benchmarks of the archive and file utilities that resolving spends its time in: zip_util.unzip/zip, tar_util.untar and file_util.copy/delete.
+Each is run on many small files and on a few huge files, and the archives as stored, deflated (zip), gzip and xz (tar).
+
+    python -m benchmarks.bench_archives --output baseline.json
+    python -m benchmarks.bench_archives --baseline baseline.json --threshold 0.2
+
+With --baseline, exits with 1 if the files/sec or MB/sec of any case has dropped by more than the threshold.
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+from typing import Any, Callable, Optional
+from dependency_resolver.resolver.utilities import file_util, tar_util, zip_util
+from . import common, synthetic
+
+# The shapes of content benchmarked: (number of files, bytes per file) at a scale of 1.
+SHAPES:dict[str, tuple[int, int]] = {
+    "many-small": (5000, 2 * 1024),
+    "few-huge": (2, 32 * 1024 * 1024),
+}
+
+# The archive kinds each extraction is benchmarked with.
+ZIP_KINDS:tuple[str, ...] = ("zip-stored", "zip")
+TAR_KINDS:tuple[str, ...] = ("tar", "tar.gz", "tar.xz")
+
+
+class Case:
+    """One benchmarked operation on one shape of content."""
+
+    def __init__(self, operation:str, shape:str, files:int, bytes:int, run:Callable[[], Any], before:Callable[[], Any]):
+        self.name:str = f"{operation}/{shape}"
+        self.operation:str = operation
+        self.shape:str = shape
+        self.files:int = files
+        self.bytes:int = bytes
+        self.run:Callable[[], Any] = run
+        self.before:Callable[[], Any] = before
+
+    def measure(self, repeat:int) -> dict[str, Any]:
+        timings:dict[str, Any] = common.timeRuns(self.run, repeat, self.before)
+        best:float = timings["min"]
+        result:dict[str, Any] = {
+            "case": self.name,
+            "operation": self.operation,
+            "shape": self.shape,
+            "files": self.files,
+            "bytes": self.bytes,
+            **timings,
+            "filesPerSecond": round(self.files / best, 1) if best > 0 else None,
+            "mbPerSecond": round(self.bytes / 1024 / 1024 / best, 2) if best > 0 else None,
+        }
+        print(f"  {self.name:<32} {result['filesPerSecond']:>12} files/s {result['mbPerSecond']:>10} MB/s", file=sys.stderr)
+        return result
+
+
+def createCases(workDir:str, shape:str, files:int, size:int, compressible:bool) -> list[Case]:
+    """Creates the content and archives for a shape, and the cases that use them."""
+    shapeDir:str = os.path.join(workDir, shape)
+    content:str = os.path.join(shapeDir, "content")
+    target:str = os.path.join(shapeDir, "target")
+    total:int = synthetic.createContent(content, files, size, compressible)
+
+    def emptyTarget():
+        shutil.rmtree(target, ignore_errors=True)
+
+    def copyToTarget():
+        emptyTarget()
+        shutil.copytree(content, target)
+
+    cases:list[Case] = []
+    for kind in ZIP_KINDS:
+        archive:str = synthetic.createArtifact(os.path.join(shapeDir, "archive"), kind, files, size, compressible)
+        stored:str = os.path.join(shapeDir, f"{kind}.zip")
+        os.replace(archive, stored)
+        cases.append(Case(f"unzip {kind}", shape, files, total, lambda stored=stored: zip_util.unzip(stored, target), emptyTarget))
+    for kind in TAR_KINDS:
+        archive = synthetic.createArtifact(os.path.join(shapeDir, "archive"), kind, files, size, compressible)
+        cases.append(Case(f"untar {kind}", shape, files, total, lambda archive=archive: tar_util.untar(archive, target), emptyTarget))
+    cases.append(Case("zip", shape, files, total, lambda: zip_util.zip(content, shapeDir, "zipped.zip"), lambda: None))
+    cases.append(Case("copy", shape, files, total, lambda: _check(file_util.copy(content, target), "copy"), emptyTarget))
+    cases.append(Case("delete", shape, files, total, lambda: file_util.delete(target), copyToTarget))
+    return cases
+
+
+def compare(results:list[dict[str, Any]], baseline:dict[str, Any], threshold:float) -> list[str]:
+    """
+    Compares results with a baseline.
+
+    Returns:
+        list[str]: a description of each case whose files/sec or MB/sec dropped by more than the threshold (a fraction, e.g. 0.2 for 20%).
+    """
+    previous:dict[str, dict[str, Any]] = {result["case"]: result for result in baseline.get("results", [])}
+    regressions:list[str] = []
+    for result in results:
+        before:Optional[dict[str, Any]] = previous.get(result["case"])
+        if before is None:
+            continue
+        for measure in ("filesPerSecond", "mbPerSecond"):
+            if before.get(measure) and result.get(measure) is not None:
+                change:float = result[measure] / before[measure] - 1
+                result.setdefault("change", {})[measure] = round(change, 4)
+                if change < -threshold:
+                    regressions.append(f"{result['case']}: {measure} dropped {-change:.0%} ({before[measure]} -> {result[measure]})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the archive and file utilities used to resolve dependencies.", formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument("--scale", type=float, help="Multiplies the number of files (many-small) and the size of the files (few-huge).", default=1.0)
+    parser.add_argument("--shape", choices=list(SHAPES), action="append", help="Only benchmark this shape of content (can be repeated).", required=False)
+    parser.add_argument("--operation", action="append", help="Only benchmark operations starting with this (e.g. untar) (can be repeated).", required=False)
+    parser.add_argument("--incompressible", action="store_true", help="Fill the files with random bytes rather than text.")
+    parser.add_argument("--repeat", "-r", type=int, help="How many times each case is run - the fastest run is used for the throughput.", default=3)
+    parser.add_argument("--workDir", "-w", help="Where to create the content and archives (a temporary directory, removed afterwards, if not set).", required=False)
+    parser.add_argument("--output", "-o", help="The file to write the JSON results to (stdout if not set).", required=False)
+    parser.add_argument("--baseline", "-b", help="A previous results file to compare with.", required=False)
+    parser.add_argument("--threshold", "-t", type=float, help="With --baseline, fail if a case's throughput drops by more than this fraction.", default=0.2)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)  # the utilities log every file they touch at debug level.
+
+    workDir:str = args.workDir or tempfile.mkdtemp(prefix="resolver-bench-archives-")
+    try:
+        results:list[dict[str, Any]] = []
+        for shape in args.shape or list(SHAPES):
+            files, size = SHAPES[shape]
+            if shape == "many-small":
+                files = max(1, int(files * args.scale))
+            else:
+                size = max(1, int(size * args.scale))
+            print(f"{shape}: {files} files of {size} bytes", file=sys.stderr)
+            for case in createCases(workDir, shape, files, size, not args.incompressible):
+                if not args.operation or any(case.operation.startswith(operation) for operation in args.operation):
+                    results.append(case.measure(args.repeat))
+    finally:
+        if not args.workDir:
+            shutil.rmtree(workDir, ignore_errors=True)
+
+    report:dict[str, Any] = {
+        "benchmark": "archives",
+        "environment": common.environment(),
+        "parameters": {key: value for key, value in vars(args).items() if key not in ("workDir", "output", "baseline")},
+        "results": results,
+    }
+    regressions:list[str] = []
+    if args.baseline:
+        with open(args.baseline) as baselineFile:
+            regressions = compare(results, json.load(baselineFile), args.threshold)
+        report["regressions"] = regressions
+    common.writeResults(report, args.output)
+
+    if regressions:
+        print(f"{len(regressions)} case(s) are more than {args.threshold:.0%} slower than the baseline:", file=sys.stderr)
+        for regression in regressions:
+            print(f"  {regression}", file=sys.stderr)
+        sys.exit(1)
+
+
+def _check(succeeded:bool, operation:str):
+    if not succeeded:
+        raise RuntimeError(f"{operation} failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Times update_cache, resolve_from_cache and resolve, cold (empty cache) and warm (everything already cached), against a local artifact server.
+Each command is run as it would be from the command-line, in its own process.
+
+    python -m benchmarks.bench_end_to_end --dependencies 100 --kind zip --files 50 --size 4096 --latency 0.02 --output results.json
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from typing import Any, Callable, Optional
+from . import common, synthetic
+from .server import ArtifactServer
+
+
+class EndToEnd:
+    """A synthetic project, served by a local artifact server, and the commands to fetch and resolve it."""
+
+    def __init__(self, workDir:str, server:ArtifactServer, configPath:str, jobs:Optional[int], resolveJobs:Optional[int], engine:Optional[str]):
+        self._workDir:str = workDir
+        self._server:ArtifactServer = server
+        self._configPath:str = configPath
+        self._options:list[str] = []
+        if jobs:
+            self._options += ["--jobs", str(jobs)]
+        if resolveJobs:
+            self._options += ["--resolveJobs", str(resolveJobs)]
+        if engine:
+            self._options += ["--engine", engine]
+
+    def emptyCache(self):
+        shutil.rmtree(self._cacheRoot(), ignore_errors=True)
+
+    def emptyTargets(self):
+        shutil.rmtree(os.path.join(os.path.dirname(self._configPath), "dependencies"), ignore_errors=True)
+
+    def emptyAll(self):
+        self.emptyCache()
+        self.emptyTargets()
+
+    def command(self, name:str, *extra:str) -> Callable[[], None]:
+        """Returns a function that runs a resolver command, failing if any dependency failed."""
+        def run():
+            arguments:list[str] = [sys.executable, "-m", "dependency_resolver.resolve", name, "--configPath", self._configPath, "--cacheRoot", self._cacheRoot(), *self._options, *extra]
+            environment:dict[str, str] = dict(os.environ, RESOLVER_RUNTIME_DIR=os.path.join(self._workDir, "runtime"), PYTHONPATH=common.ROOT)
+            finished = subprocess.run(arguments, cwd=common.ROOT, env=environment, capture_output=True, text=True)
+            if finished.returncode != 0 or " : Failed" in finished.stdout:
+                raise RuntimeError(f"{name} failed:\n{finished.stdout}\n{finished.stderr}")
+        return run
+
+    def measure(self, scenario:str, run:Callable[[], None], before:Callable[[], None], repeat:int) -> dict[str, Any]:
+        """Times a scenario, and counts what the artifact server sent during it."""
+        requests, bytesSent = self._server.requests, self._server.bytesSent
+        timings:dict[str, Any] = common.timeRuns(run, repeat, before)
+        print(f"  {scenario:<24} median {timings['median']:.3f}s", file=sys.stderr)
+        return {
+            "scenario": scenario,
+            **timings,
+            "requestsPerRun": (self._server.requests - requests) / repeat,
+            "bytesPerRun": (self._server.bytesSent - bytesSent) / repeat,
+        }
+
+    def _cacheRoot(self) -> str:
+        return os.path.join(self._workDir, "cache")
+
+
+def createArtifacts(artifactsDir:str, count:int, kind:str, files:int, size:int, compressible:bool) -> list[str]:
+    """Creates the artifacts for a synthetic project, returning their paths relative to the artifacts directory."""
+    artifacts:list[str] = []
+    for number in range(count):
+        path:str = synthetic.createArtifact(os.path.join(artifactsDir, f"group{number // 100:03d}", f"artifact{number:05d}"), kind, files, size, compressible, seed=number)
+        artifacts.append(os.path.relpath(path, artifactsDir))
+    return artifacts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time update_cache, resolve_from_cache and resolve, cold and warm, against a local artifact server.", formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument("--dependencies", "-n", type=int, help="The number of dependencies (each with its own artifact).", default=50)
+    parser.add_argument("--kind", "-k", choices=list(synthetic.ARCHIVE_ACTIONS), help="The kind of artifact.", default="zip")
+    parser.add_argument("--files", "-f", type=int, help="The number of files in each archive.", default=20)
+    parser.add_argument("--size", "-s", type=int, help="The size in bytes of each file (of the artifact itself for --kind file).", default=16 * 1024)
+    parser.add_argument("--incompressible", action="store_true", help="Fill the files with random bytes rather than text.")
+    parser.add_argument("--latency", type=float, help="Seconds the server waits before answering each request.", default=0.0)
+    parser.add_argument("--bandwidth", type=float, help="The maximum MB per second the server sends to each connection (unlimited if not set).", required=False)
+    parser.add_argument("--jobs", "-j", type=int, help="Passed to the resolver as --jobs.", required=False)
+    parser.add_argument("--resolveJobs", "-J", type=int, help="Passed to the resolver as --resolveJobs.", required=False)
+    parser.add_argument("--engine", "-e", choices=["threads", "asyncio"], help="Passed to the resolver as --engine.", required=False)
+    parser.add_argument("--repeat", "-r", type=int, help="How many times each scenario is run.", default=3)
+    parser.add_argument("--workDir", "-w", help="Where to create the artifacts, cache and targets (a temporary directory, removed afterwards, if not set).", required=False)
+    parser.add_argument("--output", "-o", help="The file to write the JSON results to (stdout if not set).", required=False)
+    args = parser.parse_args()
+
+    workDir:str = args.workDir or tempfile.mkdtemp(prefix="resolver-bench-")
+    try:
+        print(f"Creating {args.dependencies} {args.kind} artifacts in {workDir}...", file=sys.stderr)
+        artifactsDir:str = os.path.join(workDir, "artifacts")
+        artifacts:list[str] = createArtifacts(artifactsDir, args.dependencies, args.kind, args.files, args.size, not args.incompressible)
+        bandwidth:Optional[float] = args.bandwidth * 1024 * 1024 if args.bandwidth else None
+        with ArtifactServer(artifactsDir, latency=args.latency, bandwidth=bandwidth) as server:
+            configPath:str = os.path.join(workDir, "project", "dependencies.json")
+            synthetic.createConfig(configPath, server.url, artifacts)
+            project:EndToEnd = EndToEnd(workDir, server, configPath, args.jobs, args.resolveJobs, args.engine)
+
+            print("Running:", file=sys.stderr)
+            results:list[dict[str, Any]] = [
+                project.measure("update_cache cold", project.command("update_cache"), project.emptyAll, args.repeat),
+                project.measure("update_cache warm", project.command("update_cache"), lambda: None, args.repeat),
+                project.measure("update_cache force", project.command("update_cache", "--force"), lambda: None, args.repeat),
+                project.measure("resolve_from_cache", project.command("resolve_from_cache"), project.emptyTargets, args.repeat),
+                project.measure("resolve cold", project.command("resolve"), project.emptyAll, args.repeat),
+                project.measure("resolve warm", project.command("resolve"), project.emptyTargets, args.repeat),
+            ]
+
+        common.writeResults({
+            "benchmark": "end_to_end",
+            "environment": common.environment(),
+            "parameters": {key: value for key, value in vars(args).items() if key not in ("workDir", "output")},
+            "artifactBytes": sum(os.path.getsize(os.path.join(artifactsDir, artifact)) for artifact in artifacts),
+            "results": results,
+        }, args.output)
+    finally:
+        if not args.workDir:
+            shutil.rmtree(workDir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Helpers shared by the benchmarks: timing repeated runs, describing the machine and writing the results as JSON.
+"""
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Optional
+
+# The root of the repository - the benchmarks run the resolver from here.
+ROOT:str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def timeRuns(run:Callable[[], Any], repeat:int, before:Optional[Callable[[], Any]] = None) -> dict[str, Any]:
+    """
+    Times a function a number of times.
+
+    Args:
+        run (Callable[[], Any]): the function to time.
+        repeat (int): how many times to run it.
+        before (Optional[Callable[[], Any]]): called (untimed) before each run, e.g. to empty the cache for a cold run.
+
+    Returns:
+        dict[str, Any]: the seconds taken by each run, with their min, median and mean.
+    """
+    seconds:list[float] = []
+    for _ in range(repeat):
+        if before is not None:
+            before()
+        started:float = time.perf_counter()
+        run()
+        seconds.append(time.perf_counter() - started)
+    return {
+        "runs": [round(value, 6) for value in seconds],
+        "min": round(min(seconds), 6),
+        "median": round(statistics.median(seconds), 6),
+        "mean": round(statistics.mean(seconds), 6),
+    }
+
+
+def environment() -> dict[str, Any]:
+    """Describes what the benchmarks ran on, so results from different releases and machines can be told apart."""
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "commit": _gitCommit(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def writeResults(results:dict[str, Any], output:Optional[str]):
+    """Writes the results as JSON to a file, or to stdout if no file is given."""
+    text:str = json.dumps(results, indent=2)
+    if output:
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, "w") as outputFile:
+            outputFile.write(text + "\n")
+        print(f"Wrote the results to {output}", file=sys.stderr)
+    else:
+        print(text)
+
+
+def _gitCommit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
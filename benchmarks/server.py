@@ -0,0 +1,204 @@
+"""
+A local stand-in for an artifact server (e.g. a mirror or repository manager), serving the files in a directory over http.
+It can add latency and cap bandwidth to look like a remote server, and supports HEAD, Range requests and ETags.
+
+Run on its own:
+    python -m benchmarks.server --root /path/to/artifacts --latency 0.05 --bandwidth 10
+"""
+import argparse
+import hashlib
+import os
+import threading
+import time
+from email.utils import formatdate
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import unquote, urlsplit
+
+_CHUNK:int = 64 * 1024
+
+
+class ArtifactServer(ThreadingHTTPServer):
+    """Serves the files under a root directory. Use as a context manager to serve from a background thread."""
+
+    daemon_threads = True
+
+    def __init__(self, root:str, latency:float = 0.0, bandwidth:Optional[float] = None, ranges:bool = True, etags:bool = True, host:str = "127.0.0.1", port:int = 0):
+        """
+        Args:
+            root (str): the directory to serve.
+            latency (float): seconds to wait before answering each request (round trip time to the server).
+            bandwidth (Optional[float]): the maximum bytes per second sent to each connection. Unlimited if None.
+            ranges (bool): whether Range requests are answered with partial content.
+            etags (bool): whether responses carry an ETag (and If-None-Match is answered with Not Modified).
+            host (str): the address to listen on.
+            port (int): the port to listen on - 0 picks a free port.
+        """
+        super().__init__((host, port), _ArtifactHandler)
+        self.root:str = os.path.abspath(root)
+        self.latency:float = latency
+        self.bandwidth:Optional[float] = bandwidth
+        self.ranges:bool = ranges
+        self.etags:bool = etags
+        self.requests:int = 0
+        self.bytesSent:int = 0
+        self._lock:threading.Lock = threading.Lock()
+        self._thread:Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """The base url of the server."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, bytesSent:int):
+        """Counts a request and the bytes sent in answer."""
+        with self._lock:
+            self.requests += 1
+            self.bytesSent += bytesSent
+
+    def __enter__(self) -> "ArtifactServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="artifact-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exception):
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+
+class _ArtifactHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: ArtifactServer
+
+    def do_HEAD(self):
+        self._answer(body=False)
+
+    def do_GET(self):
+        self._answer(body=True)
+
+    def log_message(self, format, *args):
+        pass
+
+    def _answer(self, body:bool):
+        if self.server.latency > 0:
+            time.sleep(self.server.latency)
+
+        path:Optional[str] = self._resolvePath()
+        if path is None or not os.path.isfile(path):
+            self._sendEmpty(HTTPStatus.NOT_FOUND)
+            return
+
+        stat:os.stat_result = os.stat(path)
+        etag:str = '"' + hashlib.sha1(f"{path}:{stat.st_size}:{stat.st_mtime_ns}".encode()).hexdigest() + '"'
+        if self.server.etags and self.headers.get("If-None-Match") == etag:
+            self._sendEmpty(HTTPStatus.NOT_MODIFIED, etag)
+            return
+
+        start, end = 0, stat.st_size - 1
+        status:HTTPStatus = HTTPStatus.OK
+        requested:Optional[tuple[int, int]] = self._parseRange(stat.st_size) if self.server.ranges else None
+        if requested is not None:
+            start, end = requested
+            status = HTTPStatus.PARTIAL_CONTENT
+            if start > end:
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header("Content-Range", f"bytes */{stat.st_size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                self.server.count(0)
+                return
+
+        length:int = max(0, end - start + 1)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(length))
+        self.send_header("Last-Modified", formatdate(stat.st_mtime, usegmt=True))
+        if self.server.ranges:
+            self.send_header("Accept-Ranges", "bytes")
+        if status == HTTPStatus.PARTIAL_CONTENT:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{stat.st_size}")
+        if self.server.etags:
+            self.send_header("ETag", etag)
+        self.end_headers()
+
+        sent:int = 0
+        if body:
+            sent = self._sendFile(path, start, length)
+        self.server.count(sent)
+
+    def _resolvePath(self) -> Optional[str]:
+        """Maps the request path to a file under the root - None if it would escape the root."""
+        relative:str = unquote(urlsplit(self.path).path).lstrip("/")
+        path:str = os.path.abspath(os.path.join(self.server.root, relative))
+        return path if path.startswith(self.server.root + os.sep) else None
+
+    def _parseRange(self, size:int) -> Optional[tuple[int, int]]:
+        """Parses a single byte range (bytes=start-end, bytes=start- or bytes=-suffix). Anything else is ignored."""
+        header:Optional[str] = self.headers.get("Range")
+        if not header or not header.startswith("bytes=") or "," in header:
+            return None
+        first, _, last = header[len("bytes="):].strip().partition("-")
+        try:
+            if first == "":
+                return max(0, size - int(last)), size - 1
+            return int(first), min(int(last), size - 1) if last else size - 1
+        except ValueError:
+            return None
+
+    def _sendFile(self, path:str, start:int, length:int) -> int:
+        """Sends part of a file, no faster than the bandwidth cap. Returns the bytes sent."""
+        bandwidth:Optional[float] = self.server.bandwidth
+        began:float = time.perf_counter()
+        sent:int = 0
+        try:
+            with open(path, "rb") as artifact:
+                artifact.seek(start)
+                while sent < length:
+                    chunk:bytes = artifact.read(min(_CHUNK, length - sent))
+                    if not chunk:
+                        break
+                    self.wfile.write(chunk)
+                    sent += len(chunk)
+                    if bandwidth:
+                        ahead:float = sent / bandwidth - (time.perf_counter() - began)
+                        if ahead > 0:
+                            time.sleep(ahead)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client went away.
+        return sent
+
+    def _sendEmpty(self, status:HTTPStatus, etag:Optional[str] = None):
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+        self.server.count(0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a directory of artifacts over http, optionally slowed down to look like a remote server.", formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument("--root", "-r", help="The directory to serve.", required=True)
+    parser.add_argument("--port", "-p", type=int, help="The port to listen on.", default=8000)
+    parser.add_argument("--latency", type=float, help="Seconds to wait before answering each request.", default=0.0)
+    parser.add_argument("--bandwidth", type=float, help="The maximum MB per second sent to each connection (unlimited if not set).", required=False)
+    parser.add_argument("--noRanges", action="store_true", help="Ignore Range requests.")
+    parser.add_argument("--noEtags", action="store_true", help="Don't send ETags.")
+    args = parser.parse_args()
+
+    bandwidth:Optional[float] = args.bandwidth * 1024 * 1024 if args.bandwidth else None
+    with ArtifactServer(args.root, latency=args.latency, bandwidth=bandwidth, ranges=not args.noRanges, etags=not args.noEtags, port=args.port) as server:
+        print(f"Serving {server.root} at {server.url} - press Ctrl+C to stop.")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
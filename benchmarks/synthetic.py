@@ -0,0 +1,139 @@
+"""
+Generates synthetic artifacts (archives of a chosen size and file count) and configurations that depend on them, for the benchmarks.
+"""
+import io
+import json
+import os
+import random
+import tarfile
+import zipfile
+from typing import Any
+
+# The kinds of artifact that can be generated, and the resolve action that goes with each.
+ARCHIVE_ACTIONS:dict[str, str] = {
+    "file": "copy",
+    "zip": "unzip",
+    "zip-stored": "unzip",
+    "tar": "untar",
+    "tar.gz": "untar",
+    "tar.xz": "untar",
+}
+
+_EXTENSIONS:dict[str, str] = {"file": "bin", "zip": "zip", "zip-stored": "zip", "tar": "tar", "tar.gz": "tar.gz", "tar.xz": "tar.xz"}
+
+
+def createContent(directory:str, files:int, size:int, compressible:bool = True, seed:int = 0) -> int:
+    """
+    Creates a tree of files in a directory (up to 100 files per sub directory).
+
+    Args:
+        directory (str): the directory to create the files in.
+        files (int): the number of files.
+        size (int): the size of each file in bytes.
+        compressible (bool): text-like content that compresses well, or random bytes that don't.
+        seed (int): seeds the random content, so runs are repeatable.
+
+    Returns:
+        int: the total number of bytes written.
+    """
+    generator:random.Random = random.Random(seed)
+    words:bytes = _makeWords(generator)
+    for number in range(files):
+        subDirectory:str = os.path.join(directory, f"dir{number // 100:04d}")
+        os.makedirs(subDirectory, exist_ok=True)
+        with open(os.path.join(subDirectory, f"file{number:06d}.dat"), "wb") as content:
+            content.write(_makeBytes(generator, words, size, compressible))
+    return files * size
+
+
+def createArtifact(path:str, kind:str, files:int, size:int, compressible:bool = True, seed:int = 0) -> str:
+    """
+    Creates an artifact: a single file, or an archive containing a tree of files.
+
+    Args:
+        path (str): the path of the artifact, without its extension (which is added for the kind).
+        kind (str): one of ARCHIVE_ACTIONS - "file", "zip" (deflated), "zip-stored", "tar", "tar.gz" or "tar.xz".
+        files (int): the number of files in the archive (ignored for "file").
+        size (int): the size of each file in bytes (the size of the file for "file").
+        compressible (bool): text-like content that compresses well, or random bytes that don't.
+        seed (int): seeds the random content, so runs are repeatable.
+
+    Returns:
+        str: the path of the artifact.
+    """
+    artifactPath:str = f"{path}.{_EXTENSIONS[kind]}"
+    os.makedirs(os.path.dirname(artifactPath) or ".", exist_ok=True)
+    generator:random.Random = random.Random(seed)
+    words:bytes = _makeWords(generator)
+    if kind == "file":
+        with open(artifactPath, "wb") as artifact:
+            artifact.write(_makeBytes(generator, words, size, compressible))
+    elif kind in ("zip", "zip-stored"):
+        compression:int = zipfile.ZIP_STORED if kind == "zip-stored" else zipfile.ZIP_DEFLATED
+        with zipfile.ZipFile(artifactPath, "w", compression) as archive:
+            for number in range(files):
+                archive.writestr(f"dir{number // 100:04d}/file{number:06d}.dat", _makeBytes(generator, words, size, compressible))
+    else:
+        mode:str = {"tar": "w", "tar.gz": "w:gz", "tar.xz": "w:xz"}[kind]
+        with tarfile.open(artifactPath, mode) as archive:  # type: ignore - mode as a string is valid for tarfile.open
+            for number in range(files):
+                data:bytes = _makeBytes(generator, words, size, compressible)
+                info:tarfile.TarInfo = tarfile.TarInfo(f"dir{number // 100:04d}/file{number:06d}.dat")
+                info.size = len(data)
+                archive.addfile(info, io.BytesIO(data))
+    return artifactPath
+
+
+def createConfig(configPath:str, baseUrl:str, artifacts:list[str], project:str = "Benchmark") -> dict[str, Any]:
+    """
+    Writes a configuration with a dependency for each artifact, all fetched from one http source.
+
+    Args:
+        configPath (str): the path of the configuration file to write.
+        baseUrl (str): the url the artifacts are served from.
+        artifacts (list[str]): the artifact paths, relative to the served directory.
+        project (str): the name of the project (which is also the name of its cache).
+
+    Returns:
+        dict[str, Any]: the configuration.
+    """
+    dependencies:list[dict[str, Any]] = []
+    for number, artifact in enumerate(artifacts):
+        kind:str = _kindOf(artifact)
+        dependencies.append({
+            "name": f"dependency{number:05d}",
+            "source": "artifacts",
+            "source_path": artifact,
+            "target_dir": f"dependencies/dependency{number:05d}",
+            "resolve_action": ARCHIVE_ACTIONS[kind],
+        })
+    config:dict[str, Any] = {
+        "project": project,
+        "sources": [{"name": "artifacts", "protocol": "https", "base": baseUrl}],
+        "dependencies": dependencies,
+    }
+    os.makedirs(os.path.dirname(configPath) or ".", exist_ok=True)
+    with open(configPath, "w") as configFile:
+        json.dump(config, configFile, indent=2)
+    return config
+
+
+def _kindOf(artifact:str) -> str:
+    for kind, extension in sorted(_EXTENSIONS.items(), key=lambda item: len(item[1]), reverse=True):
+        if artifact.endswith(f".{extension}"):
+            return "zip" if kind == "zip-stored" else kind
+    return "file"
+
+
+def _makeWords(generator:random.Random) -> bytes:
+    """Makes 1MB of random words - compressible content is taken from it, so large files are quick to make."""
+    vocabulary:list[bytes] = [bytes(generator.choice(b"abcdefghijklmnopqrstuvwxyz") for _ in range(generator.randint(2, 9))) for _ in range(2000)]
+    return b" ".join(generator.choices(vocabulary, k=200 * 1024))[:1024 * 1024]
+
+
+def _makeBytes(generator:random.Random, words:bytes, size:int, compressible:bool) -> bytes:
+    if not compressible:
+        return generator.randbytes(size)
+    start:int = generator.randrange(len(words))
+    content:bytes = words[start:] + words * (size // len(words) + 1)
+    return content[:size]
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+
+# A thin client for a running `resolve.py serve` process: sends it the command-line arguments, prints what the command printed and exits with its exit code.
+# Only the standard library (and dotenv) is imported, so each call costs little more than starting the interpreter, e.g.
+#   python -m dependency_resolver.client resolve -c dependencies.json --only ui-*
+#   python -m dependency_resolver.client --socket /tmp/resolver.sock print_dependency_target -n mylib -c dependencies.json
+
+import json
+import os
+import socket
+import sys
+import dotenv
+from typing import Any, Optional
+
+# Load environment variables from the same .env file as constants (and so the server) does.
+dotenv.load_dotenv()
+
+# The same default as constants.SOCKET_PATH (without the cost of importing it).
+_DEFAULT_SOCKET:str = os.getenv("RESOLVER_SOCKET", f"{os.getenv('RESOLVER_RUNTIME_DIR', os.getenv('RESOLVER_HOME', os.getcwd()) + '/dependency-resolver-runtime')}/resolver.sock")
+
+
+def request(argv:list[str], socketPath:str = _DEFAULT_SOCKET, cwd:Optional[str] = None) -> dict[str, Any] :
+    """
+    Sends a command to a running server and waits for it to finish.
+
+    Args:
+        argv (list[str]): the command and its arguments, as they would be given to resolve.py.
+        socketPath (str): the Unix socket the server listens on.
+        cwd (Optional[str]): the directory relative paths in the arguments are relative to. Defaults to the current directory.
+
+    Returns:
+        dict[str, Any]: the response - the command's exitCode and everything it printed (output).
+
+    Raises:
+        OSError if the server can't be reached.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection :
+        connection.connect(socketPath)
+        connection.sendall(json.dumps({"argv": argv, "cwd": cwd or os.getcwd()}).encode() + b"\n")
+        with connection.makefile("rb") as responses :
+            return json.loads(responses.readline())
+
+
+def main() -> None :
+    """
+    The entry point for the client.
+    """
+    argv:list[str] = sys.argv[1:]
+    socketPath:str = _DEFAULT_SOCKET
+    if len(argv) >= 2 and argv[0] in ("--socket", "-s") :
+        socketPath, argv = argv[1], argv[2:]
+    try :
+        response:dict[str, Any] = request(argv, socketPath)
+    except OSError as error :
+        print(f"Unable to reach the resolver server on {socketPath} ({error}) - start it with: resolve.py serve", file=sys.stderr)
+        sys.exit(2)
+    sys.stdout.write(response.get("output", ""))
+    sys.exit(response.get("exitCode", 1))
+
+
+# the entry point
+if __name__ == "__main__" :
+    main()
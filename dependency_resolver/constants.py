@@ -1,5 +1,6 @@
 import os
 import dotenv
+from typing import Optional
 
 # Load environment variables from .env file
 dotenv.load_dotenv()
@@ -21,6 +22,72 @@ CACHE_DIR:str = os.getenv("RESOLVER_CACHE_DIR", f"{RUNTIME_DIR}/.resolverCache")
 CACHE_DEFAULT_NAME:str = "default"
 
 
+# Default number of sources fetched at the same time
+FETCH_JOBS:int = int(os.getenv("RESOLVER_FETCH_JOBS", "4"))
+
+
+# Default number of dependencies resolved at the same time
+RESOLVE_JOBS:int = int(os.getenv("RESOLVER_RESOLVE_JOBS", str(os.cpu_count() or 1)))
+
+
+# Default way sources are fetched: threads (a thread per fetch) or asyncio (all fetches in one event loop)
+FETCH_ENGINE:str = os.getenv("RESOLVER_FETCH_ENGINE", "threads")
+
+
+# Default maximum number of downloads from the same host at the same time (asyncio fetch engine)
+HOST_FETCH_LIMIT:int = int(os.getenv("RESOLVER_HOST_FETCH_LIMIT", "8"))
+
+
+# Default number of times a failed download is tried again (when it failed in a way worth retrying)
+FETCH_RETRIES:int = int(os.getenv("RESOLVER_FETCH_RETRIES", "3"))
+
+
+# Default most seconds to wait before the first retry of a download (doubles with each retry, and is jittered)
+FETCH_BACKOFF:float = float(os.getenv("RESOLVER_FETCH_BACKOFF", "0.5"))
+
+
+# Default seconds to wait to connect to a server, and to read from it
+CONNECT_TIMEOUT:float = float(os.getenv("RESOLVER_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT:float = float(os.getenv("RESOLVER_READ_TIMEOUT", "30"))
+
+
+# Default failures in a row before downloads from a host are failed fast (0 never), and for how many seconds
+BREAKER_THRESHOLD:int = int(os.getenv("RESOLVER_BREAKER_THRESHOLD", "5"))
+BREAKER_COOLDOWN:float = float(os.getenv("RESOLVER_BREAKER_COOLDOWN", "30"))
+
+
+# Default bytes per second all fetches may use in total, and from each host (e.g. "10M") - unlimited (or as configured) if not set
+BANDWIDTH_LIMIT:Optional[str] = os.getenv("RESOLVER_BANDWIDTH_LIMIT")
+HOST_BANDWIDTH_LIMIT:Optional[str] = os.getenv("RESOLVER_HOST_BANDWIDTH_LIMIT")
+
+
+# File the latency and failures of each source mirror are kept in between runs
+MIRROR_SCORES_FILE:str = os.getenv("RESOLVER_MIRROR_SCORES_FILE", f"{RUNTIME_DIR}/mirrors.json")
+
+
+# Default remote (second level, shared) cache server url - none if not set (or as configured) - and the token sent to it
+REMOTE_CACHE:Optional[str] = os.getenv("RESOLVER_REMOTE_CACHE")
+REMOTE_CACHE_TOKEN:Optional[str] = os.getenv("RESOLVER_REMOTE_CACHE_TOKEN")
+
+
+# Default directory the cache_server command keeps the sources pushed to it in
+REMOTE_CACHE_DIR:str = os.getenv("RESOLVER_REMOTE_CACHE_DIR", f"{RUNTIME_DIR}/remoteCache")
+
+
+# Configuration files bigger than this many bytes are streamed - their dependencies are read one at a time rather than held in memory
+CONFIG_STREAM_SIZE:int = int(os.getenv("RESOLVER_CONFIG_STREAM_SIZE", str(32 * 1024 * 1024)))
+
+
+# Default Unix socket the serve command listens on, and the client sends requests to
+SOCKET_PATH:str = os.getenv("RESOLVER_SOCKET", f"{RUNTIME_DIR}/resolver.sock")
+
+
+# Default file to write Prometheus metrics for each fetch/resolve run to (e.g. in the node_exporter textfile collector directory) - not written if not set
+METRICS_FILE:Optional[str] = os.getenv("RESOLVER_METRICS_FILE")
+
+
 # Logging constants
 LOG_DIR:str = os.getenv("RESOLVER_LOG_DIR", RUNTIME_DIR)
 LOG_TO_FILE:str = f"{LOG_DIR}/resolver.log"
+LOG_LEVEL:str = os.getenv("RESOLVER_LOG_LEVEL", "INFO")
+LOG_FORMAT:str = os.getenv("RESOLVER_LOG_FORMAT", "text")  # text, or json - one JSON object per line
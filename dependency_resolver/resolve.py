@@ -1,43 +1,126 @@
 #!/usr/bin/env python3
 
 import argparse
+import contextlib
+import copy
+import glob
+import hashlib
+import io
+import json
 import logging
+import os
+import signal
+import time
 import traceback
 
-from typing import Optional
+from typing import Any, Callable, Iterable, Optional
 
 from . import constants
-from .resolver.utilities import file_util, helpers, log_util
+from .resolver.utilities import alive_util, file_util, helpers, log_util, async_https_util, https_util, metrics_util, mirror_util, profile_util, retry_util, throttle_util, trace_util, watch_util
+from .resolver.configuration import configuration, expander
 from .resolver.configuration.configuration import Configuration
 from .resolver.project.project import Project
+from .resolver.project.workspace import Workspace
+from .resolver.cache import bundle
 from .resolver.cache.cache import Cache
+from .resolver.cache.lock import Lock
+from .resolver.cache.remote import RemoteCache
+from .resolver.cache.remoteServer import RemoteCacheServer
+from .resolver.report.plan import Plan
+from .resolver.report.report import Report
+from .resolver.scheduler.engine import FetchEngine
+from .resolver.server.server import ResolverServer
 
 _logger:logging.Logger = logging.getLogger(__name__)
 
+# While serving, the projects parsed so far - keyed by their configuration and cache root, with the files the configuration was loaded from (see Configuration.getFiles).
+_warmProjects:Optional[dict[tuple[str, str], tuple[dict[str, Optional[bytes]], Project]]] = None
+
 
 # Sets up the whole shebang
 def _init() :
-    log_util.setupRootLogging(constants.LOG_TO_FILE)
+    log_util.setupRootLogging(constants.LOG_TO_FILE, level=constants.LOG_LEVEL, logFormat=constants.LOG_FORMAT)
+    configuration.setStreamSize(constants.CONFIG_STREAM_SIZE)
 
 
 # Deals with all the command-line interface
 def _commandRunner() :
+    args:argparse.Namespace = _createParser().parse_args()
+    _runCommand(args)
+
+
+# Creates the parser for every command.
+def _createParser() -> argparse.ArgumentParser :
     parser = argparse.ArgumentParser(description="Fetch and resolve external dependencies for a project.", formatter_class=argparse.ArgumentDefaultsHelpFormatter)
-    subparsers = parser.add_subparsers()
+    parser.add_argument("--logLevel", type=str.upper, choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"], help='The level to log at (defaults to RESOLVER_LOG_LEVEL, or INFO). Sent to a serving process, it changes the level it logs at from then on.', required=False)
+    subparsers = parser.add_subparsers(dest="command")
     _printConfig(subparsers)
     _validateConfig(subparsers)
     _printDependencyTargetPath(subparsers)
     _updateSourceCache(subparsers)
     _resolveFromCacheDependencies(subparsers)
     _resolveDependencies(subparsers)
-    args:argparse.Namespace = parser.parse_args()
-    args.func(args)
+    _resolveWorkspace(subparsers)
+    _lockDependencies(subparsers)
+    _exportCache(subparsers)
+    _importCache(subparsers)
+    _serve(subparsers)
+    _cacheServer(subparsers)
+    return parser
+
+
+# Runs the chosen command, collecting metrics and recording a trace while it runs if asked to.
+def _runCommand(args:argparse.Namespace) :
+    if helpers.hasValue(getattr(args, "logLevel", None)) :
+        log_util.setLevel(args.logLevel)
+    metricsPath:Optional[str] = getattr(args, "metrics", None)
+    tracePath:Optional[str] = getattr(args, "trace", None)
+    if helpers.hasValue(metricsPath) :
+        metrics_util.enable()
+    if helpers.hasValue(tracePath) :
+        trace_util.start()
+
+    started:float = time.perf_counter()
+    try :
+        with trace_util.span(args.command, "command") :
+            _callCommand(args)
+    finally :  # still written if the command fails, so the errors are counted (and the trace shows what failed).
+        if helpers.hasValue(metricsPath) :
+            metrics_util.RUN_DURATION.set(time.perf_counter() - started, command=args.command)
+            metrics_util.RUN_FINISHED.set(time.time(), command=args.command)
+            metrics_util.writeTextfile(metricsPath)  # type: ignore - checked above
+        if helpers.hasValue(tracePath) :
+            trace_util.writeJson(tracePath)  # type: ignore - checked above
+            trace_util.stop()  # a serving process only records the requests that ask for a trace.
+            print(f"Wrote the trace to {tracePath} - open it in https://ui.perfetto.dev")
+
+
+# Calls the chosen command's function, under a profiler if asked to.
+def _callCommand(args:argparse.Namespace) :
+    if helpers.isEmpty(getattr(args, "profile", None)) :
+        args.func(args)
+        return
+
+    outputDir:str = file_util.buildPath(constants.RUNTIME_DIR, "profiles")
+    print(f"Profiling ({args.profile}) - the profile will be written to {outputDir}")
+    written:list[str] = profile_util.run(args.profile, lambda : args.func(args), outputDir, label=f"{args.command}-{_hashConfiguration(args)}")
+    print(f"Wrote the profile to {', '.join(written)}")
+
+
+# A short hash of the configuration file, so profiles of different configurations can be told apart.
+def _hashConfiguration(args:argparse.Namespace) -> str :
+    configPath:Optional[str] = getattr(args, "configPath", None)
+    if not file_util.isFile(configPath) :  # type: ignore - isFile checks for None
+        return "noconfig"
+    with open(configPath, "rb") as configFile :  # type: ignore - checked above
+        return hashlib.sha256(configFile.read()).hexdigest()[:12]
 
 
 # Print the configuration at the specified path.
 def _printConfig(subparsers) :
     runner = subparsers.add_parser("print_config", help="Print the target JSON configuration.", formatter_class=argparse.ArgumentDefaultsHelpFormatter)
     runner.add_argument("--configPath", "-c", help='The path to the configuration file', required=True)
+    _addProfileArguments(runner)
     runner.set_defaults(func=_printCommand)
 
 
@@ -49,6 +132,7 @@ def _printCommand(args:argparse.Namespace) :
 def _validateConfig(subparsers) :
     runner = subparsers.add_parser("validate_config", help="Validate (find any missing required attributes) in the target JSON configuration.", formatter_class=argparse.ArgumentDefaultsHelpFormatter)
     runner.add_argument("--configPath", "-c", help='The path to the configuration file', required=True)
+    _addProfileArguments(runner)
     runner.set_defaults(func=_validateCommand)
 
 
@@ -62,6 +146,7 @@ def _printDependencyTargetPath(subparsers) :
     runner.add_argument("--name", "-n", help='The name of the dependency', required=True)
     runner.add_argument("--configPath", "-c", help='The path to the configuration file', required=True)
     runner.add_argument("--cacheRoot", "-R", help='The root of the cache to use for the downloads.', default=constants.CACHE_DIR, required=False)
+    _addProfileArguments(runner)
     runner.set_defaults(func=_printDependencyTargetPathCommand)
 
 
@@ -76,17 +161,28 @@ def _updateSourceCache(subparsers) :
     runner.add_argument("--force", action="store_true", help='Force the update of any source for this project.')
     runner.add_argument("--configPath", "-c", help='The path to the configuration file', required=True)
     runner.add_argument("--cacheRoot", "-R", help='The root of the cache to use for the downloads.', default=constants.CACHE_DIR, required=False)
+    _addSelectionArguments(runner)
+    _addJobArguments(runner)
+    _addNetworkArguments(runner)
+    _addRemoteCacheArguments(runner)
+    _addLockArguments(runner)
+    _addDryRunArguments(runner)
+    _addReportArguments(runner)
+    _addProfileArguments(runner)
     runner.set_defaults(func=_updateSourceCacheCommand)
 
 
 def _updateSourceCacheCommand(args:argparse.Namespace) :
-    project:Project = _createProject(args)
+    project:Project = _createSelectedProject(args)
+    if args.dryRun :
+        _printPlan(args, project.planDependencies(fetch=True, resolve=False, alwaysFetch=args.force or args.clean, probeSizes=args.probeSizes))
+        return
 
     # delete the current log file.
     if args.clean :
         _clean(project=project)
 
-    project.fetchDependencies(alwaysFetch=args.force)
+    _runReported(args, project, lambda : project.fetchDependencies(alwaysFetch=args.force))
 
 
 # Update every dependencies source in the cache.
@@ -94,11 +190,17 @@ def _resolveFromCacheDependencies(subparsers) :
     runner = subparsers.add_parser("resolve_from_cache", help="Resolve all dependencies. Must have performed an update_cache to fetch the sources first.", formatter_class=argparse.ArgumentDefaultsHelpFormatter)
     runner.add_argument("--configPath", "-c", help='The path to the configuration file', required=True)
     runner.add_argument("--cacheRoot", "-R", help='The root of the cache to use for the downloads.', default=constants.CACHE_DIR, required=False)
+    _addSelectionArguments(runner)
+    _addJobArguments(runner)
+    _addNetworkArguments(runner)
+    _addReportArguments(runner)
+    _addProfileArguments(runner)
     runner.set_defaults(func=_resolveFromCacheDependenciesCommand)
 
 
 def _resolveFromCacheDependenciesCommand(args:argparse.Namespace) :
-    _createProject(args).resolveFetchedDependencies()
+    project:Project = _createSelectedProject(args)
+    _runReported(args, project, project.resolveFetchedDependencies)
 
 
 # Update every dependencies source in the cache.
@@ -108,11 +210,344 @@ def _resolveDependencies(subparsers) :
     runner.add_argument("--force", action="store_true", help='Always fetch of the source even if already previously fetched.')
     runner.add_argument("--configPath", "-c", help='The path to the configuration file', required=True)
     runner.add_argument("--cacheRoot", "-R", help='The root of the cache to use for the downloads.', default=constants.CACHE_DIR, required=False)
+    runner.add_argument("--watch", "-w", action="store_true", help='Keep running after resolving, and each time the configuration is saved fetch and resolve only the dependencies added or changed (removing the targets of those removed).')
+    runner.add_argument("--watchInterval", type=float, help='Seconds between checks of the configuration while watching, where inotify is not available.', default=1.0, required=False)
+    _addSelectionArguments(runner)
+    _addJobArguments(runner)
+    _addNetworkArguments(runner)
+    _addRemoteCacheArguments(runner)
+    _addLockArguments(runner)
+    _addDryRunArguments(runner)
+    _addReportArguments(runner)
+    _addProfileArguments(runner)
     runner.set_defaults(func=_resolveDependenciesCommand)
 
 
 def _resolveDependenciesCommand(args:argparse.Namespace) :
-    _createProject(args).resolveDependencies(alwaysFetch=args.force)
+    project:Project = _createSelectedProject(args)
+    if args.dryRun :
+        _printPlan(args, project.planDependencies(fetch=True, resolve=True, alwaysFetch=args.force or args.clean, probeSizes=args.probeSizes))
+        return
+    _runReported(args, project, lambda : project.resolveDependencies(alwaysFetch=args.force))
+    if args.watch :
+        _watchConfiguration(args, project)
+
+
+# Fetch and resolve the dependencies of many configurations in one run.
+def _resolveWorkspace(subparsers) :
+    runner = subparsers.add_parser("resolve_workspace", help="Fetch and resolve the dependencies of many configurations in one run, through one fetch pool and one resolve pool. A source needed by more than one configuration is fetched once.", formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    runner.add_argument("--force", action="store_true", help='Always fetch of the source even if already previously fetched.')
+    runner.add_argument("--configPaths", "-c", nargs="+", action="extend", metavar="PATH", help='The configuration files - paths or globs (e.g. "services/**/dependencies.json").', required=True)
+    runner.add_argument("--cacheRoot", "-R", help='The root of the cache to use for the downloads.', default=constants.CACHE_DIR, required=False)
+    _addSelectionArguments(runner)
+    _addJobArguments(runner)
+    _addNetworkArguments(runner)
+    _addRemoteCacheArguments(runner)
+    _addReportArguments(runner)
+    _addProfileArguments(runner)
+    runner.set_defaults(func=_resolveWorkspaceCommand)
+
+
+def _resolveWorkspaceCommand(args:argparse.Namespace) :
+    projects:list[Project] = []
+    for configPath in _expandConfigPaths(args.configPaths) :
+        projectArgs:argparse.Namespace = copy.copy(args)
+        projectArgs.configPath = configPath
+        projects.append(_selectProject(projectArgs))
+    limits:list[tuple[Optional[float], Optional[float]]] = [project.getBandwidthLimits() for project in projects]
+    _setupFetching(args, _lowest(limit for limit, _ in limits), _lowest(limit for _, limit in limits))  # the one run fetches for every project.
+
+    workspace:Workspace = Workspace(projects)
+    workspace.setJobs(fetchJobs=args.jobs, resolveJobs=args.resolveJobs)
+    workspace.setFetchEngine(FetchEngine.determine(args.engine))
+    try :
+        workspace.resolveDependencies(alwaysFetch=args.force)
+    finally :
+        mirror_util.save()  # what was learnt about the mirrors is kept, even if the run fails.
+    workspace.printSummary()
+    if helpers.hasValue(args.report) :
+        workspace.writeJson(args.report)
+        print(f"Wrote the report to {args.report}")
+
+
+# Returns the most restrictive of the bandwidth limits set (None if none are).
+def _lowest(limits:Iterable[Optional[float]]) -> Optional[float] :
+    return min((limit for limit in limits if limit), default=None)
+
+
+# Returns the configuration files matching the given paths/globs, each once and in order.
+def _expandConfigPaths(patterns:list[str]) -> list[str] :
+    configPaths:list[str] = []
+    for pattern in patterns :
+        matches:list[str] = sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else [pattern]
+        if not matches :
+            print(f"No configuration files match {pattern}")
+            exit(1)
+        configPaths.extend(os.path.abspath(match) for match in matches)
+    return list(dict.fromkeys(configPaths))
+
+
+# Stays resident, resolving the changes each time the configuration (or a file it includes, or its dependencies_file) is saved, until stopped.
+def _watchConfiguration(args:argparse.Namespace, project:Project) :
+    watcher:watch_util.FileWatcher = watch_util.FileWatcher([args.configPath, *project.getConfigurationFiles()], interval=args.watchInterval)
+    alive_util.setStopSignals(_stopOnSignal)
+    print(f"Watching {args.configPath} (and the files it includes) for changes ({'inotify' if watcher.isNotified() else 'polling'}) - stop with Ctrl-C or SIGTERM.")
+    try :
+        while True :
+            watcher.wait()
+            project = _resolveChanges(args, project)
+            watcher.setPaths([args.configPath, *project.getConfigurationFiles()])  # the includes (or dependencies_file) may have changed.
+    except KeyboardInterrupt :
+        print("Stopped watching.")
+    finally :
+        watcher.close()
+
+
+# Fetches and resolves what changed since the previous version of the project. Returns the project now resolved (the previous one if the configuration can't be used).
+def _resolveChanges(args:argparse.Namespace, previous:Project) -> Project :
+    try :
+        project:Project = _createSelectedProject(args)
+    except (SystemExit, Exception) as error :  # a half-finished edit - keep watching until it is fixed.
+        _logger.warning(f"Unable to load the changed configuration {args.configPath}: {error}")
+        print("Unable to load the changed configuration - waiting for the next change (run validate_config for details).")
+        return previous
+    _runReported(args, project, lambda : project.resolveChanges(previous))
+    return project
+
+
+# Serve requests for the other commands over a Unix socket, keeping the parsed projects, the cache and http connections warm in memory between them.
+def _serve(subparsers) :
+    runner = subparsers.add_parser("serve", help="Run as a long-lived server that answers the other commands over a Unix socket (send them with: python -m dependency_resolver.client <command> ...).", formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    runner.add_argument("--socket", "-s", help='The path of the Unix socket to listen on.', default=constants.SOCKET_PATH, required=False)
+    _addProfileArguments(runner)
+    runner.set_defaults(func=_serveCommand)
+
+
+def _serveCommand(args:argparse.Namespace) :
+    global _warmProjects
+    _warmProjects = {}
+    expander.setKeep(True)
+    server:ResolverServer = ResolverServer(args.socket, _answerRequest)
+    server.start()
+    alive_util.setStopSignals(_stopOnSignal)
+    print(f"Serving on {args.socket} - stop with Ctrl-C or SIGTERM.")
+    try :
+        server.serveForever()
+    except KeyboardInterrupt :
+        print("Stopped serving.")
+    finally :
+        _warmProjects = None
+        expander.setKeep(False)
+        https_util.closeSession()
+
+
+# Stops serving (or watching) when a stop signal arrives, cleaning up as the interrupt unwinds. Not a SystemExit, which only ends the request being answered.
+def _stopOnSignal(signum, frame) :
+    alive_util.setStopSignals(signal.SIG_IGN)  # further signals mustn't interrupt the clean up.
+    raise KeyboardInterrupt()
+
+
+# Runs a command sent to the server, as if it had been given on the command-line in the client's directory, and returns its exit code and everything it printed.
+def _answerRequest(request:dict[str, Any]) -> dict[str, Any] :
+    argv:Any = request.get("argv")
+    if not isinstance(argv, list) or not all(isinstance(arg, str) for arg in argv) :
+        return {"exitCode": 2, "output": "The request must give the command's arguments as a list of strings (argv).\n"}
+
+    output:io.StringIO = io.StringIO()
+    exitCode:int = 0
+    home:str = os.getcwd()
+    try :
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output) :
+            os.chdir(request.get("cwd") or home)
+            args:argparse.Namespace = _createParser().parse_args(argv)
+            if args.command in (None, "serve") or getattr(args, "watch", False) :
+                print("Send one of the other commands (without --watch) to the server, e.g. resolve -c dependencies.json")
+                exitCode = 2
+            else :
+                _runCommand(args)
+    except SystemExit as exited :  # commands (and argparse) exit when they fail - only the request ends.
+        if isinstance(exited.code, str) :
+            output.write(f"{exited.code}\n")
+        exitCode = exited.code if isinstance(exited.code, int) else (0 if exited.code is None else 1)
+    except Exception as error :
+        _logger.error(f"Request {argv} caught the exception: {traceback.format_exc()}")
+        output.write(f"{type(error).__name__}: {error}\n")
+        exitCode = 1
+    finally :
+        os.chdir(home)
+    return {"exitCode": exitCode, "output": output.getvalue()}
+
+
+# Fetch every source and record exactly what was fetched in a lockfile.
+def _lockDependencies(subparsers) :
+    runner = subparsers.add_parser("lock", help="Fetch the sources and write a lockfile recording exactly what was fetched for each dependency (url, size, sha256, and the ETag and final url of https sources). update_cache and resolve --locked then check against it.", formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    runner.add_argument("--force", action="store_true", help='Fetch the sources again, even if they are already cached - e.g. to lock the current version of a "latest" download.')
+    runner.add_argument("--configPath", "-c", help='The path to the configuration file', required=True)
+    runner.add_argument("--cacheRoot", "-R", help='The root of the cache to use for the downloads.', default=constants.CACHE_DIR, required=False)
+    runner.add_argument("--lockfile", "-L", help='The lockfile to write. Defaults to the configuration path, ending .lock.json.', required=False)
+    _addSelectionArguments(runner)
+    _addJobArguments(runner)
+    _addNetworkArguments(runner)
+    _addRemoteCacheArguments(runner)
+    _addReportArguments(runner)
+    _addProfileArguments(runner)
+    runner.set_defaults(func=_lockDependenciesCommand)
+
+
+def _lockDependenciesCommand(args:argparse.Namespace) :
+    project:Project = _createSelectedProject(args)
+    lockPath:str = _getLockPath(args)
+    lock:Lock = Lock.load(lockPath) if file_util.isFile(lockPath) else Lock(lockPath)
+    _runReported(args, project, lambda : project.lockDependencies(lock, alwaysFetch=args.force))
+
+
+# Pack the cached sources of a configuration into a bundle, to seed another cache with.
+def _exportCache(subparsers) :
+    runner = subparsers.add_parser("export_cache", help="Pack the cached sources a configuration needs into a single bundle (a tar stream with a manifest), to seed another machine's cache with import_cache. Run update_cache first.", formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    runner.add_argument("--configPath", "-c", help='The path to the configuration file', required=True)
+    runner.add_argument("--cacheRoot", "-R", help='The root of the cache to export from.', default=constants.CACHE_DIR, required=False)
+    runner.add_argument("--output", "-O", help='The bundle to write - gzipped if it ends in .gz or .tgz, stdout if "-".', required=True)
+    _addSelectionArguments(runner)
+    _addProfileArguments(runner)
+    runner.set_defaults(func=_exportCacheCommand)
+
+
+def _exportCacheCommand(args:argparse.Namespace) :
+    project:Project = _createProject(args)
+    project.selectDependencies(only=args.only, exclude=args.exclude)
+    project.exportCache(args.output)
+
+
+# Unpack a bundle written by export_cache into a cache.
+def _importCache(subparsers) :
+    runner = subparsers.add_parser("import_cache", help="Unpack a bundle written by export_cache into a cache, checking every file against its sha256.", formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    runner.add_argument("--input", "-I", help='The bundle to read (plain or gzipped), stdin if "-".', required=True)
+    runner.add_argument("--configPath", "-c", help='The configuration to import the cache of. If not given, the bundle is unpacked into the cache it was exported from (by name).', required=False)
+    runner.add_argument("--cacheRoot", "-R", help='The root of the cache to import into.', default=constants.CACHE_DIR, required=False)
+    _addProfileArguments(runner)
+    runner.set_defaults(func=_importCacheCommand)
+
+
+def _importCacheCommand(args:argparse.Namespace) :
+    if helpers.hasValue(args.configPath) :
+        _createProject(args).importCache(args.input)
+    else :
+        cachePath, files, size = bundle.importBundle(args.input, args.cacheRoot)
+        print(f"Imported {files} cached files ({size} bytes) from {args.input} into {cachePath}")
+
+
+# Serve a directory as a remote cache shared by many machines.
+def _cacheServer(subparsers) :
+    runner = subparsers.add_parser("cache_server", help="Run a remote cache server, that machines look for sources in before fetching them from their origin (and push the sources they fetch to).", formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    runner.add_argument("--root", help='The directory the cached sources are kept in.', default=constants.REMOTE_CACHE_DIR, required=False)
+    runner.add_argument("--host", help='The address to listen on (e.g. 0.0.0.0 for every interface).', default="127.0.0.1", required=False)
+    runner.add_argument("--port", type=int, help='The port to listen on.', default=8765, required=False)
+    _addProfileArguments(runner)
+    runner.set_defaults(func=_cacheServerCommand)
+
+
+def _cacheServerCommand(args:argparse.Namespace) :
+    server:RemoteCacheServer = RemoteCacheServer(args.root, host=args.host, port=args.port, token=constants.REMOTE_CACHE_TOKEN)
+    alive_util.setStopSignals(_stopOnSignal)
+    print(f"Serving the remote cache {args.root} on {server.getUrl()}{' (pushes need RESOLVER_REMOTE_CACHE_TOKEN)' if constants.REMOTE_CACHE_TOKEN else ''} - stop with Ctrl-C or SIGTERM.")
+    try :
+        server.serve_forever()
+    except KeyboardInterrupt :
+        print("Stopped serving.")
+    finally :
+        server.server_close()
+
+
+# Options to only work on a subset of the dependencies.
+def _addSelectionArguments(runner) :
+    runner.add_argument("--only", "-o", nargs="+", action="extend", metavar="PATTERN", help='Only work on the dependencies whose name or tags match one of these names/globs (e.g. "ui-*").', required=False)
+    runner.add_argument("--exclude", "-x", nargs="+", action="extend", metavar="PATTERN", help='Skip the dependencies whose name or tags match one of these names/globs.', required=False)
+
+
+# Options to control how much work is carried out at the same time.
+def _addJobArguments(runner) :
+    runner.add_argument("--jobs", "-j", type=int, help='The maximum number of sources fetched at the same time.', default=constants.FETCH_JOBS, required=False)
+    runner.add_argument("--resolveJobs", "-J", type=int, help='The maximum number of dependencies resolved at the same time.', default=constants.RESOLVE_JOBS, required=False)
+    runner.add_argument("--engine", "-e", choices=[engine.value for engine in FetchEngine], help='How sources are fetched: a thread per fetch, or all fetches in a single asyncio event loop (better for many small files - raise --jobs to keep more in flight).', default=constants.FETCH_ENGINE, required=False)
+    runner.add_argument("--hostLimit", type=int, help='The maximum number of downloads from the same host at the same time (asyncio engine).', default=constants.HOST_FETCH_LIMIT, required=False)
+
+
+# Options for how downloads wait for, and retry, servers that are slow or failing.
+def _addNetworkArguments(runner) :
+    runner.add_argument("--retries", type=int, help='How many times a download is tried again after no answer, or an overloaded server (e.g. a 503).', default=constants.FETCH_RETRIES, required=False)
+    runner.add_argument("--backoff", type=float, help='The most seconds to wait before the first retry - doubles with each retry, and a random part of it is waited.', default=constants.FETCH_BACKOFF, required=False)
+    runner.add_argument("--connectTimeout", type=float, help='Seconds to wait to connect to a server.', default=constants.CONNECT_TIMEOUT, required=False)
+    runner.add_argument("--readTimeout", type=float, help='Seconds to wait for a server to answer, or send the next part of a download.', default=constants.READ_TIMEOUT, required=False)
+    runner.add_argument("--breakerThreshold", type=int, help='Failures in a row before the remaining downloads from a host are failed at once (0 never).', default=constants.BREAKER_THRESHOLD, required=False)
+    runner.add_argument("--breakerCooldown", type=float, help='Seconds downloads from a failing host are failed at once, before it is tried again.', default=constants.BREAKER_COOLDOWN, required=False)
+    runner.add_argument("--bandwidthLimit", type=_size, metavar="BYTES", help='The most bytes per second all fetches may use together (e.g. 10M). Overrides the configuration\'s bandwidth_limit.', default=constants.BANDWIDTH_LIMIT, required=False)
+    runner.add_argument("--hostBandwidthLimit", type=_size, metavar="BYTES", help='The most bytes per second fetches may use from any one host (e.g. 2M). Overrides the configuration\'s host_bandwidth_limit.', default=constants.HOST_BANDWIDTH_LIMIT, required=False)
+
+
+# Options for a remote (second level) cache, shared with other machines.
+def _addRemoteCacheArguments(runner) :
+    runner.add_argument("--remoteCache", metavar="URL", help='The url of a remote cache server (see cache_server) to look for sources in before fetching them from their origin. Overrides the configuration\'s remote_cache. Its token is read from RESOLVER_REMOTE_CACHE_TOKEN.', default=constants.REMOTE_CACHE, required=False)
+    runner.add_argument("--remoteCacheReadOnly", action="store_true", help='Don\'t push sources fetched from their origin to the remote cache.')
+
+
+# Options to only report the work a command would do.
+def _addDryRunArguments(runner) :
+    runner.add_argument("--dryRun", "--dry-run", nargs="?", const="table", choices=["table", "json"], help='Don\'t fetch or resolve anything - print the work the command would do (as a table, or JSON): the cache hits, the sources that would be fetched (and why), the targets that would be resolved or redone, and the bytes that would be moved.', required=False)
+    runner.add_argument("--probeSizes", action="store_true", help='With --dryRun, ask https servers the size of the sources that would be fetched (a HEAD request each). Otherwise the dry run doesn\'t touch the network.')
+
+
+# Prints the work a command would do.
+def _printPlan(args:argparse.Namespace, plan:Plan) :
+    if args.dryRun == "json" :
+        print(json.dumps(plan.toDict(), indent=2))
+    else :
+        plan.printTable()
+
+
+# Options to check the sources against a lockfile.
+def _addLockArguments(runner) :
+    runner.add_argument("--locked", action="store_true", help='Check every source against the lockfile (see the lock command): cached sources that match it are used without asking their origin, fetched sources must match it, and the command fails if the lockfile doesn\'t cover a dependency.')
+    runner.add_argument("--lockfile", "-L", help='The lockfile to check against. Defaults to the configuration path, ending .lock.json.', required=False)
+
+
+# Returns the lockfile to use - the one given, or the one next to the configuration.
+def _getLockPath(args:argparse.Namespace) -> str :
+    return args.lockfile if helpers.hasValue(args.lockfile) else Lock.getDefaultPath(args.configPath)
+
+
+# Parses a bandwidth (bytes per second) given on the command-line.
+def _size(value:str) -> float :
+    size:Optional[float] = helpers.parseSize(value)
+    if size is None :
+        raise argparse.ArgumentTypeError(f"{value} is not a number of bytes, e.g. 1048576, 512K or 10M")
+    return size
+
+
+# Options to profile a command.
+def _addProfileArguments(runner) :
+    runner.add_argument("--profile", nargs="?", const=profile_util.CPROFILE, choices=profile_util.PROFILERS, help=f'Profile the command (CPU with cprofile, the default, or memory with tracemalloc) and write the results to {constants.RUNTIME_DIR}/profiles.', required=False)
+
+
+# Options for the timing report, trace and metrics of a fetch/resolve run.
+def _addReportArguments(runner) :
+    runner.add_argument("--report", metavar="PATH", help='Also write the timings, bytes moved and cache hits of every fetch and resolve to this JSON file.', required=False)
+    runner.add_argument("--trace", metavar="PATH", help='Record a trace of the run (configuration loading, every fetch, cache lookup and resolve) to this Chrome trace-event JSON file.', required=False)
+    runner.add_argument("--metrics", metavar="PATH", help='Write Prometheus metrics for the run (downloads, cache hits/misses/evictions, resolve times, errors) to this file - e.g. a .prom file in the node_exporter textfile collector directory.', default=constants.METRICS_FILE, required=False)
+
+
+# Runs the fetches/resolves of a command, timing each one, then prints a summary (and writes the report file if asked to).
+def _runReported(args:argparse.Namespace, project:Project, run:Callable[[], None]) :
+    report:Report = Report()
+    project.setReport(report)
+    try :
+        run()
+    finally :
+        mirror_util.save()  # what was learnt about the mirrors is kept, even if the run fails.
+    report.finish()
+    report.printSummary()
+    if helpers.hasValue(args.report) :
+        report.writeJson(args.report)
+        print(f"Wrote the report to {args.report}")
 
 
 # Cleans the log and cache
@@ -120,7 +555,7 @@ def _clean(project:Optional[Project]) :
     _resetLogFile()
     _logger.debug("Cleaned log file")
     if project is not None :
-        project.clean()
+        project.clean(instant=True)  # the old cache is deleted in the background while the sources are fetched again.
 
 
 # Empties the existing contents of the log file.
@@ -149,13 +584,57 @@ def _loadConfiguration(args:argparse.Namespace) -> Configuration :
     return config
 
 
-# Instantiate the Project with the specified configuration.
+# Instantiate the Project with the specified configuration. While serving, the project is kept and reused until one of the files its
+# configuration was loaded from (including those it includes, and any dependencies_file) changes.
 def _createProject(args:argparse.Namespace) -> Project :
+    if _warmProjects is not None and file_util.isFile(args.configPath) :
+        key:tuple[str, str] = (os.path.abspath(args.configPath), os.path.abspath(args.cacheRoot))
+        if key in _warmProjects and not expander.hasChanged(_warmProjects[key][0]) :
+            _logger.debug(f"Reusing the project parsed from {key[0]}")
+            return _warmProjects[key][1]
+        args.configPath, args.cacheRoot = key  # so the kept project doesn't depend on the directory of the request that created it.
+        project:Project = _newProject(args)
+        _warmProjects[key] = (project.getConfigurationFiles(), project)
+        return project
+    return _newProject(args)
+
+
+def _newProject(args:argparse.Namespace) -> Project :
     project:Project = Project(_loadConfiguration(args))
     project.setCache(_createCache(args.cacheRoot, project.getProjectName()))
     return project
 
 
+# Instantiate the Project, restrict it to the dependencies selected on the command-line and set how much it can do at once.
+def _createSelectedProject(args:argparse.Namespace) -> Project :
+    project:Project = _selectProject(args)
+    _setupFetching(args, *project.getBandwidthLimits())
+    return project
+
+
+# Instantiate the Project and set it up from the command-line - without touching the settings shared by every fetch in the process (see _setupFetching).
+def _selectProject(args:argparse.Namespace) -> Project :
+    project:Project = _createProject(args)
+    project.selectDependencies(only=args.only, exclude=args.exclude)
+    project.setJobs(fetchJobs=args.jobs, resolveJobs=args.resolveJobs)
+    project.setFetchEngine(FetchEngine.determine(args.engine))
+    remoteCacheUrl:Optional[str] = getattr(args, "remoteCache", None) or project.getRemoteCacheUrl()
+    project.setRemoteCache(RemoteCache(remoteCacheUrl, token=constants.REMOTE_CACHE_TOKEN, push=not getattr(args, "remoteCacheReadOnly", False)) if remoteCacheUrl else None)
+    project.setLock(Lock.load(_getLockPath(args)) if getattr(args, "locked", False) else None)
+    return project
+
+
+# Sets up what every fetch in the process shares: timeouts, retries, circuit breakers, bandwidth limits and the mirror scores.
+# The bandwidth limits on the command-line win over those configured.
+def _setupFetching(args:argparse.Namespace, bandwidthLimit:Optional[float], hostBandwidthLimit:Optional[float]) :
+    async_https_util.setHostLimit(args.hostLimit)
+    https_util.setTimeouts(connect=args.connectTimeout, read=args.readTimeout)
+    retry_util.setPolicy(retry_util.RetryPolicy(retries=args.retries, backoff=args.backoff))
+    retry_util.setBreakers(threshold=args.breakerThreshold, cooldown=args.breakerCooldown)
+    throttle_util.setLimits(globalRate=args.bandwidthLimit or bandwidthLimit, hostRate=args.hostBandwidthLimit or hostBandwidthLimit)
+    mirror_util.setScoresFile(constants.MIRROR_SCORES_FILE)
+
+
 # Instantiate the Cache. A cacheName can be used to specify a separate cache to use.
 def _createCache(cacheRoot:str, projectName:str) -> Cache :
     helpers.assertSet(_logger, "_createCache::cacheRoot not set", cacheRoot)
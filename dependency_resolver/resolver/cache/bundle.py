@@ -0,0 +1,195 @@
+import hashlib
+import io
+import json
+import logging
+import os
+import posixpath
+import sys
+import tarfile
+import tempfile
+from typing import IO, Any, Optional
+from ..utilities import file_util
+from ..errors.errors import BundleError
+
+_logger:logging.Logger = logging.getLogger(__name__)
+
+# The first member of every bundle - lists the cached files that follow it, with their size and sha256.
+MANIFEST:str = "manifest.json"
+
+# The version of the bundle layout, recorded in the manifest.
+FORMAT:int = 1
+
+# Where the cached files are kept inside a bundle.
+_ENTRIES:str = "cache"
+
+# The most bytes read from (or written to) a bundle at once.
+_CHUNK:int = 1024 * 1024
+
+
+# A bundle is a tar stream (optionally gzipped) of the sources a configuration needs, as they are laid out in its cache: a manifest, then
+# each cached file. Both ends only ever read it front to back, so it can be piped (e.g. over ssh, or from a USB stick) and a new cache is
+# seeded by one sequential copy rather than a download per source. Every file is checked against the manifest's sha256 as it is unpacked.
+
+
+def exportBundle(cachePath:str, cacheName:str, entries:dict[str, list[str]], output:str) -> tuple[int, int] :
+    """
+    Packs cached sources into a bundle.
+
+    Parameters:
+        cachePath - the directory of the cache the sources are in.
+        cacheName - the name of the cache - a bundle is unpacked into a cache of the same name, unless told otherwise.
+        entries - the cached sources (files or directories inside the cache) to pack, with the names of the dependencies that use each.
+        output - the bundle to write. Gzipped if it ends in .gz or .tgz, written to stdout if it is "-".
+
+    Returns:
+        tuple[int, int]: the number of files, and bytes, packed.
+    """
+    files:list[dict[str, Any]] = []
+    for entry, dependencies in entries.items() :
+        for path in _listFiles(entry) :
+            files.append({"path": _relativePath(path, cachePath), "size": file_util.getSize(path), "sha256": file_util.hashFile(path), "dependencies": dependencies})
+    manifest:bytes = json.dumps({"format": FORMAT, "cache": cacheName, "files": files}, indent=2).encode()
+
+    mode:str = "w|gz" if output.endswith((".gz", ".tgz")) else "w|"
+    if output == "-" :
+        _writeBundle(sys.stdout.buffer, mode, manifest, cachePath, files)
+    else :
+        file_util.mkdir(file_util.getParentDirectory(os.path.abspath(output)))
+        descriptor, temporary = tempfile.mkstemp(dir=file_util.getParentDirectory(os.path.abspath(output)), prefix=".bundle-")
+        try :
+            with os.fdopen(descriptor, "wb") as stream :
+                _writeBundle(stream, mode, manifest, cachePath, files)
+            os.replace(temporary, output)  # a bundle that is there is complete.
+        except BaseException :
+            file_util.delete(temporary)
+            raise
+    return len(files), sum(file["size"] for file in files)
+
+
+def importBundle(input:str, cacheRoot:str, cacheName:Optional[str] = None) -> tuple[str, int, int] :
+    """
+    Unpacks a bundle into a cache. Each file is streamed to a temporary file next to where it belongs, checked against the manifest,
+    then renamed into place - so the cache never holds a partial or damaged source. Files already in the cache are replaced.
+
+    Parameters:
+        input - the bundle to read (plain or gzipped), read from stdin if it is "-".
+        cacheRoot - the root of the cache to unpack into.
+        cacheName - the name of the cache to unpack into. Defaults to the name of the cache the bundle was exported from.
+
+    Returns:
+        tuple[str, int, int]: the directory of the cache unpacked into, and the number of files, and bytes, unpacked.
+
+    Raises:
+        BundleError if the bundle is not valid, is incomplete, or a file doesn't match its sha256.
+    """
+    try :
+        if input == "-" :
+            return _readBundle(sys.stdin.buffer, cacheRoot, cacheName)
+        with open(input, "rb") as stream :
+            return _readBundle(stream, cacheRoot, cacheName)
+    except (tarfile.TarError, EOFError, OSError) as error :
+        raise BundleError(f"Unable to read the bundle {input}: {error}") from error
+
+
+def _writeBundle(stream:IO[bytes], mode:str, manifest:bytes, cachePath:str, files:list[dict[str, Any]]) :
+    """Writes the manifest, then every file, to the tar stream."""
+    with tarfile.open(fileobj=stream, mode=mode, bufsize=_CHUNK) as bundle :  # type: ignore - mode is one of the tarfile stream modes
+        info:tarfile.TarInfo = tarfile.TarInfo(MANIFEST)
+        info.size = len(manifest)
+        bundle.addfile(info, io.BytesIO(manifest))
+        for file in files :
+            path:str = file_util.buildPath(cachePath, *file["path"].split("/"))
+            info = tarfile.TarInfo(f"{_ENTRIES}/{file['path']}")
+            info.size = file["size"]
+            info.mtime = int(os.path.getmtime(path))
+            info.mode = 0o644
+            with open(path, "rb") as source :
+                bundle.addfile(info, source)
+            _logger.debug("Packed %s (%s bytes)", file['path'], file['size'])
+
+
+def _readBundle(stream:IO[bytes], cacheRoot:str, cacheName:Optional[str]) -> tuple[str, int, int] :
+    """Reads the manifest, then unpacks every file that follows it."""
+    with tarfile.open(fileobj=stream, mode="r|*", bufsize=_CHUNK) as bundle :
+        member:Optional[tarfile.TarInfo] = bundle.next()
+        if member is None or member.name != MANIFEST or not member.isfile() :
+            raise BundleError(f"Not a cache bundle - it must start with {MANIFEST}.")
+        manifest:dict[str, Any] = _readManifest(bundle.extractfile(member))
+        cachePath:str = file_util.buildPath(cacheRoot, cacheName or manifest["cache"])
+        expected:dict[str, dict[str, Any]] = {f"{_ENTRIES}/{file['path']}": file for file in manifest["files"]}
+
+        files:int = 0
+        size:int = 0
+        while (member := bundle.next()) is not None :  # iterating would start again from the manifest.
+            file:Optional[dict[str, Any]] = expected.pop(member.name, None)
+            if file is None or not member.isfile() :
+                raise BundleError(f"The bundle holds {member.name}, which is not in its manifest.")
+            _unpack(bundle.extractfile(member), file, file_util.buildPath(cachePath, *file["path"].split("/")))
+            files += 1
+            size += file["size"]
+    if expected :
+        raise BundleError(f"The bundle is incomplete - {len(expected)} files in its manifest are missing, e.g. {next(iter(expected))}.")
+    return cachePath, files, size
+
+
+def _readManifest(stream:Optional[IO[bytes]]) -> dict[str, Any] :
+    """Parses and checks the manifest - the files it lists must stay inside the cache."""
+    try :
+        manifest:Any = json.loads(stream.read()) if stream is not None else None
+    except ValueError as error :
+        raise BundleError(f"The bundle's manifest is not valid JSON: {error}") from error
+    if not isinstance(manifest, dict) or manifest.get("format") != FORMAT or not isinstance(manifest.get("files"), list) or not manifest.get("cache") :
+        raise BundleError(f"The bundle's manifest is not a version {FORMAT} manifest.")
+    if not _isSafePath(manifest["cache"]) or "/" in manifest["cache"] :
+        raise BundleError(f"The bundle's cache name {manifest['cache']} is not valid.")
+    for file in manifest["files"] :
+        if not isinstance(file, dict) or not _isSafePath(file.get("path")) or not isinstance(file.get("size"), int) or not isinstance(file.get("sha256"), str) :
+            raise BundleError(f"The bundle's manifest lists an invalid file: {file}")
+    return manifest
+
+
+def _unpack(source:Optional[IO[bytes]], file:dict[str, Any], path:str) :
+    """Streams a file out of the bundle next to its path, hashing it as it goes, and moves it into place if it matches the manifest."""
+    if source is None :
+        raise BundleError(f"Unable to read {file['path']} from the bundle.")
+    file_util.mkdir(file_util.getParentDirectory(path))
+    descriptor, temporary = tempfile.mkstemp(dir=file_util.getParentDirectory(path), prefix=".bundle-")
+    digest = hashlib.sha256()
+    try :
+        with os.fdopen(descriptor, "wb") as target :
+            while piece := source.read(_CHUNK) :
+                digest.update(piece)
+                target.write(piece)
+        if digest.hexdigest() != file["sha256"] :
+            raise BundleError(f"{file['path']} in the bundle doesn't match its sha256 - the bundle is damaged.")
+        os.replace(temporary, path)
+    except BaseException :
+        file_util.delete(temporary)
+        raise
+    _logger.debug("Unpacked %s (%s bytes)", file['path'], file['size'])
+
+
+def _listFiles(entry:str) -> list[str] :
+    """Returns the files of a cached source - the source itself, or every file under it if it is a directory."""
+    if not file_util.isDir(entry) :
+        return [entry]
+    files:list[str] = []
+    for directory, directories, names in os.walk(entry) :
+        directories.sort()
+        for name in sorted(names) :
+            path:str = os.path.join(directory, name)
+            if os.path.isfile(path) and not os.path.islink(path) :
+                files.append(path)
+            else :
+                _logger.debug("Not packing %s - only regular files are bundled.", path)
+    return files
+
+
+def _relativePath(path:str, cachePath:str) -> str :
+    """Returns the path of a cached file relative to the cache, with / separators (as tar names are)."""
+    return os.path.relpath(path, cachePath).replace(os.sep, "/")
+
+
+def _isSafePath(path:Any) -> bool :
+    """Checks a path from a bundle is relative, and stays inside the directory it is unpacked in."""
+    return isinstance(path, str) and bool(path) and not posixpath.isabs(path) and "\\" not in path and ".." not in path.split("/") and posixpath.normpath(path) == path
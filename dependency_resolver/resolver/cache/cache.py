@@ -1,5 +1,12 @@
+import asyncio
+import glob
 import logging
-from ..utilities import file_util, helpers
+import os
+from typing import Optional
+from ..utilities import file_util, helpers, metrics_util, trace_util
+from . import bundle
+from .lock import Lock
+from .remote import RemoteCache
 from ..dependencies.dependency import Dependency
 from ..errors.errors import FetchError, ResolveError
 
@@ -12,6 +19,15 @@ class Cache() :
     #  This is a possible clash, but it needs to be something deterministic for a dependency.
     defaultDownloadName:str = "downloadedSource"
 
+    # The number of threads deleting the cache's sub directories at the same time when it is cleaned.
+    deleteWorkers:int = 4
+
+    # Why a source is fetched (see getFetchReason).
+    FETCH_MISSING:str = "missing"
+    FETCH_ALWAYS_UPDATE:str = "always update"
+    FETCH_FORCED:str = "forced"
+    FETCH_CHANGED:str = "not as locked"
+
 
     def __init__(self, cacheRoot:str, cacheName:str) :
         """
@@ -20,14 +36,52 @@ class Cache() :
                 cacheRoot - the home/root directory of the cache. All downloaded sources will be added somewhere in this directory.
                 cacheName - the name of the cache. This is used to separate different caches from each other. If not specified, defaults to "default".
         """
+        self._remote:Optional[RemoteCache] = None
+        self._lock:Optional[Lock] = None
         self.init(cacheRoot=cacheRoot, cacheName=cacheName)
 
 
-    def clean(self) :
-        """Empty the cache."""
+    def setRemote(self, remote:Optional[RemoteCache]) :
+        """
+        Sets a remote (second level) cache, shared with other machines. Sources missing from this cache are looked for there before
+        being fetched from their origin, and sources fetched from their origin are pushed to it.
+
+        Parameters:
+            remote - the remote cache, or None to only use this one.
+        """
+        self._remote = remote
+
+
+    def setLock(self, lock:Optional[Lock]) :
+        """
+        Sets the lock the sources must match (locked mode). Cached sources that match it are used without fetching, and sources that
+        are fetched must match it.
+
+        Parameters:
+            lock - the lock, or None to fetch as usual.
+        """
+        self._lock = lock
+
+
+    def clean(self, instant:bool = False) :
+        """
+        Empty the cache.
+
+        Parameters:
+            instant - move the cache aside and delete it in the background, so the (empty) cache can be used straight away.
+        """
         if file_util.exists(self._getCachePath()) :
             _logger.info(f"Cleaning cache: {self._getCachePath()}")
-            file_util.deleteContents(self._getCachePath())
+            if instant :
+                file_util.deleteInBackground(self._getCachePath(), workers=self.deleteWorkers, onDeleted=self._recordCleaned)  # counted as the files are deleted.
+                file_util.mkdir(self._getCachePath(), mode=0o755)
+            else :
+                self._recordCleaned(file_util.deleteContents(self._getCachePath(), workers=self.deleteWorkers))
+
+
+    def _recordCleaned(self, deleted:int) :
+        """Counts the files deleted cleaning the cache as evictions."""
+        metrics_util.CACHE_EVICTIONS.increment(deleted, cache=self._getCacheName(), reason="clean")
 
 
     def init(self, cacheRoot:str, cacheName:str) :
@@ -48,22 +102,81 @@ class Cache() :
 
         # make sure the cache directory exists
         file_util.mkdir(self._getCachePath(), mode=0o755)
+        self._reapCleanedCaches()
 
 
-    def fetchDependency(self, dependency:Dependency, alwaysFetch:bool = False) :
+    def fetchDependency(self, dependency:Dependency, alwaysFetch:bool = False) -> bool :
         """
         Fetches a dependency's source into the cache.
 
         Parameters:
             dependency - the dependency to fetch.
             alwaysFetch - will always fetch the dependency's source, even if it is already in the cache.
+
+        Returns:
+            bool: True if the source was fetched, False if it was already in the cache.
+        """
+        location:Optional[tuple[str, str]] = self._prepareFetch(dependency, alwaysFetch)
+        if location is not None :
+            targetDir, targetName = location
+            if alwaysFetch or not self._fetchRemote(dependency) :  # forcing a fetch goes to the origin.
+                dependency.fetchSource(targetDir, targetName)
+                self._verifyLock(dependency)
+                self._pushRemote(dependency)
+            else :
+                self._verifyLock(dependency)
+            _logger.debug("...successfully cached dependency %s: source %s::%s -> %s/%s.", dependency.getName(), dependency.getSource().getName(), dependency.getSourcePath(), targetDir, targetName)
+            return True
+        return False
+
+
+    async def fetchDependencyAsync(self, dependency:Dependency, alwaysFetch:bool = False) -> bool :
+        """
+        Fetches a dependency's source into the cache, without blocking the running event loop.
+        Work on the cache directory is offloaded to a thread.
+
+        Parameters:
+            dependency - the dependency to fetch.
+            alwaysFetch - will always fetch the dependency's source, even if it is already in the cache.
+
+        Returns:
+            bool: True if the source was fetched, False if it was already in the cache.
+        """
+        location:Optional[tuple[str, str]] = await asyncio.to_thread(self._prepareFetch, dependency, alwaysFetch)
+        if location is not None :
+            targetDir, targetName = location
+            if alwaysFetch or not await asyncio.to_thread(self._fetchRemote, dependency) :
+                await dependency.fetchSourceAsync(targetDir, targetName)
+                await asyncio.to_thread(self._verifyLock, dependency)
+                await asyncio.to_thread(self._pushRemote, dependency)
+            else :
+                await asyncio.to_thread(self._verifyLock, dependency)
+            _logger.debug("...successfully cached dependency %s: source %s::%s -> %s/%s.", dependency.getName(), dependency.getSource().getName(), dependency.getSourcePath(), targetDir, targetName)
+            return True
+        return False
+
+
+    def _prepareFetch(self, dependency:Dependency, alwaysFetch:bool) -> Optional[tuple[str, str]] :
+        """
+        Works out whether a dependency's source needs fetching and, if it does, makes room for it in the cache.
+
+        Parameters:
+            dependency - the dependency to fetch.
+            alwaysFetch - will always fetch the dependency's source, even if it is already in the cache.
+
+        Returns:
+            Optional[tuple[str, str]]: the directory and file name in the cache to fetch the source to, or None if it is already cached.
+
+        Raises:
+            FetchError if the location in the cache is not usable.
         """
-        _logger.debug(f"Downloading dependency {dependency.getName()}...")
+        _logger.debug("Downloading dependency %s...", dependency.getName())
 
-        if dependency.alwaysUpdate() or (alwaysFetch or not self._isCached(dependency)) :
+        if self.getFetchReason(dependency, alwaysFetch) is not None :
+            metrics_util.CACHE_MISSES.increment(cache=self._getCacheName())
             targetDir:str = self._generateCacheLocation(dependency)
             if targetDir and not file_util.exists(targetDir) :
-                _logger.debug(f"Trying to create cache location: {targetDir}")
+                _logger.debug("Trying to create cache location: %s", targetDir)
                 file_util.mkdir(targetDir, mode=0o755)
 
             targetName:str = self._generateCachedFileName(dependency)
@@ -71,14 +184,74 @@ class Cache() :
                 cacheDownloadPath:str = self._generateCacheDownloadPath(dependency)
                 if file_util.exists(cacheDownloadPath) :
                     file_util.delete(cacheDownloadPath)
-
-                dependency.fetchSource(targetDir, targetName)
-                _logger.debug(f"...successfully cached dependency {dependency.getName()}: source {dependency.getSource().getName()}::{dependency.getSourcePath()} -> {targetDir}/{targetName}.")
+                    metrics_util.CACHE_EVICTIONS.increment(cache=self._getCacheName(), reason="refetch")
+                return targetDir, targetName
             else :
-                _logger.debug(f"...failed to cache dependency {dependency.getName()} - the cache already has a file (not a directory) at the target download location in the cache ({targetDir}): source {dependency.getSource().getName()}::{dependency.getSourcePath()} -> {targetDir}/{targetName}.")
+                _logger.debug("...failed to cache dependency %s - the cache already has a file (not a directory) at the target download location in the cache (%s): source %s::%s -> %s/%s.", dependency.getName(), targetDir, dependency.getSource().getName(), dependency.getSourcePath(), targetDir, targetName)
                 raise FetchError(f"Failed to cache dependency {dependency.getName()} - the cache already has a file (not a directory) at the target download location in the cache ({targetDir}).")
         else :
-            _logger.debug(f"...dependency {dependency.getName()} already in cache.")
+            _logger.debug("...dependency %s already in cache.", dependency.getName())
+            metrics_util.CACHE_HITS.increment(cache=self._getCacheName())
+            return None
+
+
+    def getFetchReason(self, dependency:Dependency, alwaysFetch:bool = False) -> Optional[str] :
+        """
+        Works out whether a dependency's source needs fetching (without fetching it): it isn't cached, or is always updated. With a lock,
+        a cached source that matches its lock never needs fetching (or checking with its origin), and one that doesn't always does.
+
+        Args:
+            dependency (Dependency): the dependency.
+            alwaysFetch (bool, optional): the source is always fetched, even if it is already in the cache. Defaults to False.
+
+        Returns:
+            Optional[str]: why the source needs fetching (one of the FETCH_ reasons), or None if the cached source is used.
+        """
+        if alwaysFetch :
+            return Cache.FETCH_FORCED
+        if self._lock is not None :
+            if self._lock.matches(dependency, self._generateCacheDownloadPath(dependency)) :
+                return None
+            return Cache.FETCH_CHANGED if self._isCached(dependency) else Cache.FETCH_MISSING
+        if not self._isCached(dependency) :
+            return Cache.FETCH_MISSING
+        return Cache.FETCH_ALWAYS_UPDATE if dependency.alwaysUpdate() else None
+
+
+    def _verifyLock(self, dependency:Dependency) :
+        """
+        Checks a source just fetched is the one locked for the dependency (if there is a lock).
+
+        Raises:
+            LockError if it isn't.
+        """
+        if self._lock is not None :
+            with trace_util.span("lock check", "cache", dependency=dependency.getName()) :
+                self._lock.verify(dependency, self._generateCacheDownloadPath(dependency))
+
+
+    def _fetchRemote(self, dependency:Dependency) -> bool :
+        """
+        Downloads a dependency's source from the remote cache (if there is one, and it has the source) into this cache.
+        Sources that are always updated are always fetched from their origin.
+
+        Returns:
+            bool: True if the source was downloaded from the remote cache.
+        """
+        if self._remote is None or dependency.alwaysUpdate() :
+            return False
+        with trace_util.span("remote cache lookup", "cache", dependency=dependency.getName()) :
+            if self._remote.fetch(RemoteCache.getKey(dependency), self._generateCacheDownloadPath(dependency)) :
+                _logger.debug("...fetched dependency %s from the remote cache %s.", dependency.getName(), self._remote.getUrl())
+                return True
+        return False
+
+
+    def _pushRemote(self, dependency:Dependency) :
+        """Pushes a dependency's source, just fetched from its origin, to the remote cache (if there is one)."""
+        if self._remote is not None and not dependency.alwaysUpdate() :
+            with trace_util.span("remote cache push", "cache", dependency=dependency.getName()) :
+                self._remote.push(RemoteCache.getKey(dependency), self._generateCacheDownloadPath(dependency))
 
 
     def resolveDependency(self, dependency:Dependency, targetHomeDir:str, onlyMissing:bool = False) :
@@ -90,15 +263,88 @@ class Cache() :
             targetHome - Each dependency is relative the configuration that defines it. This is the path to that directory.
             onlyMissing - only resolve missing dependencies. Non filesystem copies (for example unzipping) resolve actions are always completed.
         """
-        _logger.debug(f"Resolving dependency {dependency.getName()}...")
+        _logger.debug("Resolving dependency %s...", dependency.getName())
         if self._isCached(dependency) :
             dependency.resolve(self._generateCacheDownloadPath(dependency), targetHomeDir)
-            _logger.debug(f"...successfully resolved dependency {dependency.getName()}.")
+            _logger.debug("...successfully resolved dependency %s.", dependency.getName())
         else :
-            _logger.debug(f"...dependency {dependency.getName()} not in cache.")
+            _logger.debug("...dependency %s not in cache.", dependency.getName())
             raise ResolveError(f"Failed to resolve dependency {dependency.getName()} - the source has not been fetched to the cache.")
 
 
+    def getCacheDownloadPath(self, dependency:Dependency) -> str :
+        """
+        Returns the full path to the file in the cache that the dependency's source is fetched to.
+        Dependencies with the same cache download path share the same fetched source.
+
+        Args:
+            dependency (Dependency): the dependency.
+
+        Returns:
+            str: the full path to the file in the cache where the dependency's source is downloaded to.
+        """
+        return self._generateCacheDownloadPath(dependency)
+
+
+    def shareSource(self, dependency:Dependency, fetched:str) :
+        """
+        Puts a source fetched into another cache (e.g. another project's, in a workspace) in place for the dependency, as if it had been
+        fetched into this one. The files are hard linked where possible, so they take no more space.
+
+        Args:
+            dependency (Dependency): the dependency.
+            fetched (str): the source, as fetched into the other cache.
+
+        Raises:
+            FetchError if the source can't be put in place.
+        """
+        target:str = self._generateCacheDownloadPath(dependency)
+        if os.path.abspath(target) == os.path.abspath(fetched) or (file_util.isFile(target) and os.path.samefile(target, fetched)) :
+            return  # already in place.
+        file_util.mkdir(file_util.getParentDirectory(target), mode=0o755)
+        file_util.delete(target)
+        if not file_util.link(fetched, target) :
+            raise FetchError(f"Failed to share the source of {dependency.getName()} - unable to link {fetched} to {target}.")
+
+
+    def exportBundle(self, dependencies:list[Dependency], output:str) -> tuple[int, int] :
+        """
+        Packs the cached sources of the dependencies into a bundle, that importBundle seeds another cache with.
+        Sources shared by several dependencies are packed once; sources that haven't been fetched are skipped (with a warning).
+
+        Args:
+            dependencies (list[Dependency]): the dependencies to pack the sources of.
+            output (str): the bundle to write (gzipped if it ends in .gz or .tgz, stdout if "-").
+
+        Returns:
+            tuple[int, int]: the number of files, and bytes, packed.
+        """
+        entries:dict[str, list[str]] = {}
+        for dependency in dependencies :
+            if self._isCached(dependency) :
+                entries.setdefault(self._generateCacheDownloadPath(dependency), []).append(dependency.getName())
+            else :
+                _logger.warning(f"Not bundling {dependency.getName()} - its source has not been fetched to the cache {self._getCachePath()}.")
+        return bundle.exportBundle(self._getCachePath(), self._getCacheName(), entries, output)
+
+
+    def importBundle(self, input:str) -> tuple[int, int] :
+        """
+        Unpacks a bundle (see exportBundle) into this cache, checking every file against the sha256 the bundle records for it.
+
+        Args:
+            input (str): the bundle to read (stdin if "-").
+
+        Returns:
+            tuple[int, int]: the number of files, and bytes, unpacked.
+
+        Raises:
+            BundleError if the bundle is damaged or incomplete.
+        """
+        _, files, size = bundle.importBundle(input, self._getCacheRoot(), self._getCacheName())
+        return files, size
+
+
     def _generateCacheLocation(self, dependency:Dependency) -> str :
         """
         Generates the path to the directory (inside the cache) that the source of the dependency is fetched to.
@@ -216,6 +462,14 @@ class Cache() :
         return self._cachePath
 
 
+    def _reapCleanedCaches(self) :
+        """Deletes (in the background) any copies of this cache left behind by instant cleans that didn't finish, e.g. because the process was killed."""
+        leftovers:list[str] = glob.glob(file_util.buildPath(self._getCacheRoot(), f".{glob.escape(self._getCacheName())}{file_util.DELETING_SUFFIX}*"))
+        if leftovers :
+            _logger.debug(f"Deleting {len(leftovers)} cleaned copies of the cache left behind: {leftovers}")
+            file_util.reapInBackground(leftovers, workers=self.deleteWorkers)
+
+
     def _isCached(self, dependency:Dependency) -> bool :
         """
         Checks if the dependency's source is already cached.
@@ -226,4 +480,5 @@ class Cache() :
         Returns:
             bool: True if the dependency's source is already cached, False otherwise.
         """
-        return file_util.exists(self._generateCacheDownloadPath(dependency))
+        with trace_util.span("cache lookup", "cache", dependency=dependency.getName()) :
+            return file_util.exists(self._generateCacheDownloadPath(dependency))
@@ -0,0 +1,177 @@
+import json
+import logging
+import os
+import stat
+import tempfile
+from typing import Any, Optional
+from ..configuration.attributes import ConfigAttributes
+from ..dependencies.dependency import Dependency
+from ..errors.errors import LockError
+from ..utilities import file_util, https_util
+
+_logger:logging.Logger = logging.getLogger(__name__)
+
+# The version of the lockfile layout.
+FORMAT:int = 1
+
+# The sha256 of each file already hashed, with the size, modified time and inode it had - so a serving process checking the same unchanged
+# cached sources against their locks on every run hashes each only once.
+_digests:dict[str, tuple[tuple[int, int, int], str]] = {}
+
+
+# Records exactly what was fetched for each dependency - where from, its size and sha256 and, for https sources, the ETag the server gave
+# it and the url any redirects ended at - so a source that changes upstream (e.g. a "latest" download) is noticed rather than silently used.
+# A cached source that matches its lock needs no fetch (or revalidation) at all, even if the dependency is always updated.
+class Lock :
+
+    def __init__(self, path:str, entries:Optional[dict[str, dict[str, Any]]] = None) :
+        """
+        Parameters:
+            path - the lockfile.
+            entries - what is locked for each dependency, by name.
+        """
+        self._path:str = path
+        self._entries:dict[str, dict[str, Any]] = entries if entries is not None else {}
+
+
+    @staticmethod
+    def load(path:str) -> "Lock" :
+        """
+        Reads a lockfile.
+
+        Parameters:
+            path - the lockfile.
+
+        Raises:
+            LockError if the lockfile is missing or not valid.
+        """
+        try :
+            lockfile:Any = json.loads(file_util.readFile(path))
+        except (file_util.FileError, ValueError) as error :
+            raise LockError(f"Unable to read the lockfile {path} (create it with the lock command): {error}") from error
+        if not isinstance(lockfile, dict) or lockfile.get("format") != FORMAT or not isinstance(lockfile.get("dependencies"), dict) :
+            raise LockError(f"The lockfile {path} is not a version {FORMAT} lockfile.")
+        return Lock(path, lockfile["dependencies"])
+
+
+    @staticmethod
+    def getDefaultPath(configurationPath:str) -> str :
+        """Returns the lockfile kept next to a configuration, e.g. dependencies.lock.json for dependencies.json."""
+        return f"{os.path.splitext(configurationPath)[0]}.lock.json"
+
+
+    def getPath(self) -> str :
+        """Returns the lockfile."""
+        return self._path
+
+
+    def record(self, dependency:Dependency, path:str) :
+        """
+        Locks a dependency to its fetched source. Https sources downloaded while responses were being recorded (see https_util.recordResponses)
+        are locked to the ETag and final url they were served with; one already cached keeps those it was locked with, if it is unchanged.
+
+        Parameters:
+            dependency - the dependency.
+            path - the fetched source (a file or directory) in the cache.
+        """
+        entry:dict[str, Any] = {"url": dependency.getAbsoluteSourcePath(), "protocol": dependency.getSource().getProtocolName(), "size": file_util.getTreeSize(path), "sha256": _hash(path)}
+        if entry["protocol"] == ConfigAttributes.PROTOCOL_HTTPS :
+            response:Optional[tuple[str, Optional[str]]] = https_util.getResponse(path)
+            previous:dict[str, Any] = self._entries.get(dependency.getName(), {})
+            if response is not None :
+                entry["final_url"], entry["etag"] = response
+            elif previous.get("sha256") == entry["sha256"] and "final_url" in previous :
+                entry["final_url"], entry["etag"] = previous["final_url"], previous.get("etag")
+            else :
+                _logger.debug(f"Not locking the ETag of {entry['url']} - it wasn't downloaded this time.")
+        self._entries[dependency.getName()] = entry
+
+
+    def retain(self, names:set[str]) :
+        """Forgets the dependencies not named, e.g. those removed from the configuration."""
+        self._entries = {name: entry for name, entry in self._entries.items() if name in names}
+
+
+    def write(self) :
+        """Writes the lockfile (to a temporary file, renamed into place - so it is never half written)."""
+        content:str = json.dumps({"format": FORMAT, "dependencies": dict(sorted(self._entries.items()))}, indent=2) + "\n"
+        directory:str = file_util.getParentDirectory(os.path.abspath(self._path))
+        descriptor, temporary = tempfile.mkstemp(dir=directory, prefix=".lock-")
+        try :
+            with os.fdopen(descriptor, "w") as lockfile :
+                os.fchmod(lockfile.fileno(), self._getMode())  # mkstemp's file is only readable by its owner.
+                lockfile.write(content)
+            os.replace(temporary, self._path)
+        except BaseException :
+            os.unlink(temporary)
+            raise
+
+
+    def _getMode(self) -> int :
+        """Returns the permissions to write the lockfile with: those it already has, or those a new file gets (given the umask)."""
+        try :
+            return stat.S_IMODE(os.stat(self._path).st_mode)
+        except OSError :
+            umask:int = os.umask(0)  # only read by setting it - put straight back.
+            os.umask(umask)
+            return 0o666 & ~umask
+
+
+    def findStale(self, dependencies:list[Dependency]) -> list[str] :
+        """
+        Returns a description of each dependency the lockfile doesn't cover: not locked at all, or locked to a different source.
+
+        Parameters:
+            dependencies - the dependencies to check.
+        """
+        stale:list[str] = []
+        for dependency in dependencies :
+            entry:Optional[dict[str, Any]] = self._entries.get(dependency.getName())
+            if entry is None :
+                stale.append(f"{dependency.getName()} (not locked)")
+            elif entry.get("url") != dependency.getAbsoluteSourcePath() :
+                stale.append(f"{dependency.getName()} (locked to {entry.get('url')})")
+        return stale
+
+
+    def matches(self, dependency:Dependency, path:str) -> bool :
+        """
+        Checks a fetched source is the one locked for the dependency: the same size and sha256.
+
+        Parameters:
+            dependency - the dependency.
+            path - the fetched source (a file or directory) in the cache.
+        """
+        entry:Optional[dict[str, Any]] = self._entries.get(dependency.getName())
+        if entry is None or not file_util.exists(path) or file_util.getTreeSize(path) != entry.get("size") :
+            return False
+        return _hash(path) == entry.get("sha256")
+
+
+    def verify(self, dependency:Dependency, path:str) :
+        """
+        Checks a source just fetched is the one locked for the dependency.
+
+        Parameters:
+            dependency - the dependency.
+            path - the fetched source (a file or directory) in the cache.
+
+        Raises:
+            LockError if it isn't - the source has changed since it was locked.
+        """
+        if not self.matches(dependency, path) :
+            raise LockError(f"The source of {dependency.getName()} ({dependency.getAbsoluteSourcePath()}) has changed since it was locked in {self._path} - run the lock command to accept the change")
+
+
+def _hash(path:str) -> str :
+    """Returns the sha256 of a fetched source (see file_util.hashTree) - for a file, hashed only if it has changed since it was last hashed."""
+    if not file_util.isFile(path) :
+        return file_util.hashTree(path)
+    status:os.stat_result = os.stat(path)
+    signature:tuple[int, int, int] = (status.st_size, status.st_mtime_ns, status.st_ino)
+    known:Optional[tuple[tuple[int, int, int], str]] = _digests.get(path)
+    if known is not None and known[0] == signature :
+        return known[1]
+    digest:str = file_util.hashFile(path)
+    _digests[path] = (signature, digest)
+    return digest
@@ -0,0 +1,112 @@
+import hashlib
+import logging
+import re
+from typing import Optional
+from urllib.parse import urlsplit
+from ..dependencies.dependency import Dependency
+from ..utilities import file_util, https_util, metrics_util, retry_util
+
+_logger:logging.Logger = logging.getLogger(__name__)
+
+# A sha256, as hex - the names of keys and objects in a remote cache.
+_DIGEST:re.Pattern = re.compile(r"[0-9a-f]{64}")
+
+
+# A second level cache, shared by many machines over http (see RemoteCacheServer), consulted when a source isn't in the local cache.
+# It holds each fetched source once, named by the sha256 of its content (an object), and maps the key of each source (the sha256 of where it
+# is fetched from) to the content it was fetched as. What is downloaded is checked against its sha256, so a damaged copy is never used.
+# The remote cache only ever speeds things up: if it is unreachable or failing the source is fetched from its origin as usual.
+class RemoteCache :
+
+    def __init__(self, url:str, token:Optional[str] = None, push:bool = True) :
+        """
+        Parameters:
+            url - the base url of the remote cache server.
+            token - sent as a bearer token with every request (the server can require it to push).
+            push - push sources fetched from their origin to the remote cache, so other machines can use them.
+        """
+        self._url:str = url.rstrip("/")
+        self._headers:dict[str, str] = {"Authorization": f"Bearer {token}"} if token else {}
+        self._push:bool = push
+        self._host:str = urlsplit(self._url).netloc
+        self._breaker:retry_util.CircuitBreaker = retry_util.getBreaker(self._host)
+
+
+    def getUrl(self) -> str :
+        """Returns the base url of the remote cache server."""
+        return self._url
+
+
+    @staticmethod
+    def getKey(dependency:Dependency) -> str :
+        """
+        Returns the key a dependency's source is held under: the sha256 of where the source is fetched from.
+
+        Parameters:
+            dependency - the dependency.
+        """
+        return hashlib.sha256(dependency.getAbsoluteSourcePath().encode()).hexdigest()
+
+
+    def fetch(self, key:str, target:str) -> bool :
+        """
+        Downloads a source from the remote cache, if it has it.
+
+        Parameters:
+            key - the source's key (see getKey).
+            target - the path to download the source to.
+
+        Returns:
+            bool: True if the source was downloaded (and its content checked), False if the remote cache doesn't have it or can't be used.
+        """
+        if not self._breaker.allow() :
+            return False
+        try :
+            with self._breaker.releasing(https_util.HttpError) :
+                digest:str = https_util.getText(f"{self._url}/keys/{key}", headers=self._headers).strip()
+            self._breaker.recordSuccess()
+            if not _DIGEST.fullmatch(digest) :
+                _logger.warning(f"The remote cache {self._url} answered for {key} with an invalid sha256 - ignoring it.")
+                return False
+            https_util.download(f"{self._url}/objects/{digest}", target)
+        except https_util.HttpError as error :
+            https_util.recordAnswer(self._breaker, error.status)
+            if error.status == 404 :
+                _logger.debug(f"The remote cache {self._url} doesn't have {key}.")
+                metrics_util.REMOTE_CACHE_MISSES.increment(host=self._host)
+            else :
+                _logger.warning(f"Unable to use the remote cache {self._url} for {key} - fetching from the origin: {error}")
+            return False
+
+        if file_util.hashFile(target) != digest :
+            _logger.warning(f"The copy of {key} downloaded from the remote cache {self._url} doesn't match its sha256 - fetching from the origin.")
+            file_util.delete(target)
+            return False
+        metrics_util.REMOTE_CACHE_HITS.increment(host=self._host)
+        return True
+
+
+    def push(self, key:str, path:str) :
+        """
+        Pushes a source fetched from its origin to the remote cache. Failing to push is logged, never raised - the fetch itself worked.
+
+        Parameters:
+            key - the source's key (see getKey).
+            path - the fetched source. Only files are pushed (e.g. not a directory fetched from the filesystem).
+        """
+        if not self._push or not file_util.isFile(path) or not self._breaker.allow() :
+            return
+        try :
+            with self._breaker.releasing(https_util.HttpError) :
+                digest:str = file_util.hashFile(path)
+                with open(path, "rb") as body :
+                    https_util.upload(f"{self._url}/objects/{digest}", body, headers=self._headers)
+                https_util.upload(f"{self._url}/keys/{key}", digest.encode(), headers=self._headers)
+            self._breaker.recordSuccess()
+            metrics_util.REMOTE_CACHE_PUSHES.increment(host=self._host)
+            _logger.debug(f"Pushed {path} to the remote cache {self._url} as {digest}.")
+        except https_util.HttpError as error :
+            https_util.recordAnswer(self._breaker, error.status)
+            _logger.warning(f"Unable to push {path} to the remote cache {self._url}: {error}")
+        except OSError as error :
+            _logger.warning(f"Unable to read {path} to push it to the remote cache {self._url}: {error}")
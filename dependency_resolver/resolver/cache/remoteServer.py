@@ -0,0 +1,186 @@
+import hmac
+import logging
+import os
+import re
+import shutil
+import tempfile
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from ..utilities import file_util
+
+_logger:logging.Logger = logging.getLogger(__name__)
+
+# The requests the server answers: /objects/<sha256 of the content> and /keys/<sha256 of where a source is fetched from>.
+_PATH:re.Pattern = re.compile(r"/(objects|keys)/([0-9a-f]{64})")
+
+# The most bytes read from (or written to) a connection at once.
+_CHUNK:int = 1024 * 1024
+
+# The largest key accepted: a sha256 in hex, with room for a line ending.
+_MAX_KEY:int = 128
+
+
+# A reference implementation of the server behind a RemoteCache - a directory shared over http.
+#   GET/HEAD /objects/<sha256>  - a source, by the sha256 of its content.
+#   PUT /objects/<sha256>       - stores a source. Rejected (400) unless the content matches the sha256.
+#   GET /keys/<key>             - the sha256 of the content of the source with that key.
+#   PUT /keys/<key>             - records the sha256 of a source's content. Rejected (409) unless that object is already stored.
+# If a token is given, pushes (PUTs) must send it as a bearer token. Everything is written to a temporary file then renamed into place,
+# so readers never see a partial file.
+class RemoteCacheServer(ThreadingHTTPServer) :
+
+    daemon_threads = True
+
+    def __init__(self, root:str, host:str = "127.0.0.1", port:int = 0, token:Optional[str] = None) :
+        """
+        Parameters:
+            root - the directory the cached sources are kept in.
+            host - the address to listen on.
+            port - the port to listen on (0 picks a free port).
+            token - the bearer token pushes must send. Anyone that can reach the server can push if not set.
+        """
+        super().__init__((host, port), _RemoteCacheHandler)
+        self.root:str = os.path.abspath(root)
+        self.token:Optional[str] = token
+        for kind in ("objects", "keys") :
+            file_util.mkdir(file_util.buildPath(self.root, kind), mode=0o755)
+
+
+    def getUrl(self) -> str :
+        """Returns the base url of the server."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+    def getPath(self, kind:str, name:str) -> str :
+        """Returns where an object or key is stored (spread over sub directories, so none grows too large)."""
+        return file_util.buildPath(self.root, kind, name[:2], name)
+
+
+class _RemoteCacheHandler(BaseHTTPRequestHandler) :
+    protocol_version = "HTTP/1.1"
+    server:RemoteCacheServer
+
+
+    def do_HEAD(self) :
+        self._get(body=False)
+
+
+    def do_GET(self) :
+        self._get(body=True)
+
+
+    def do_PUT(self) :
+        match:Optional[re.Match] = _PATH.fullmatch(self.path)
+        if match is None :
+            self._answer(HTTPStatus.NOT_FOUND, close=True)
+            return
+        if self.server.token and not hmac.compare_digest(self.headers.get("Authorization", ""), f"Bearer {self.server.token}") :
+            self._answer(HTTPStatus.UNAUTHORIZED, close=True)
+            return
+        if not self.headers.get("Content-Length", "").isdigit() :
+            self._answer(HTTPStatus.LENGTH_REQUIRED, close=True)
+            return
+        kind, name = match.groups()
+        length:int = int(self.headers["Content-Length"])
+        if kind == "objects" :
+            self._putObject(name, length)
+        else :
+            self._putKey(name, length)
+
+
+    def _get(self, body:bool) :
+        match:Optional[re.Match] = _PATH.fullmatch(self.path)
+        path:Optional[str] = self.server.getPath(*match.groups()) if match is not None else None
+        if path is None or not file_util.isFile(path) :
+            self._answer(HTTPStatus.NOT_FOUND)
+            return
+        with open(path, "rb") as stored :
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Length", str(os.fstat(stored.fileno()).st_size))
+            self.send_header("Content-Type", "application/octet-stream" if match.groups()[0] == "objects" else "text/plain")  # type: ignore - checked above
+            self.end_headers()
+            if body :
+                shutil.copyfileobj(stored, self.wfile, _CHUNK)
+
+
+    def _putObject(self, digest:str, length:int) :
+        """Stores a source, if its content matches its name."""
+        path:str = self.server.getPath("objects", digest)
+        if file_util.isFile(path) :  # already stored - the content is the same, as its name is its sha256.
+            self._discard(length)
+            self._answer(HTTPStatus.OK)
+            return
+        written:str = self._receive(path, length)
+        if file_util.hashFile(written) != digest :
+            os.unlink(written)
+            self._answer(HTTPStatus.BAD_REQUEST, "The content does not match its sha256.")
+            return
+        os.replace(written, path)
+        _logger.debug(f"Stored object {digest} ({length} bytes)")
+        self._answer(HTTPStatus.CREATED)
+
+
+    def _putKey(self, key:str, length:int) :
+        """Records the sha256 of a source's content, if that content is stored."""
+        if length > _MAX_KEY :  # not read at all - a key is only ever a sha256.
+            self._answer(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"A key is at most {_MAX_KEY} bytes.", close=True)
+            return
+        digest:str = self.rfile.read(length).decode(errors="replace").strip()
+        if not re.fullmatch(r"[0-9a-f]{64}", digest) or not file_util.isFile(self.server.getPath("objects", digest)) :
+            self._answer(HTTPStatus.CONFLICT, "The key must name the sha256 of a stored object.")
+            return
+        path:str = self.server.getPath("keys", key)
+        written:str = self._write(path, digest.encode())
+        os.replace(written, path)
+        self._answer(HTTPStatus.CREATED)
+
+
+    def _receive(self, path:str, length:int) -> str :
+        """Streams the request body into a temporary file next to the path, returning the temporary file."""
+        file_util.mkdir(file_util.getParentDirectory(path), mode=0o755)
+        descriptor, temporary = tempfile.mkstemp(dir=file_util.getParentDirectory(path), prefix=".upload-")
+        with os.fdopen(descriptor, "wb") as target :
+            remaining:int = length
+            while remaining > 0 :
+                piece:bytes = self.rfile.read(min(_CHUNK, remaining))
+                if not piece :
+                    break
+                target.write(piece)
+                remaining -= len(piece)
+        return temporary
+
+
+    def _write(self, path:str, content:bytes) -> str :
+        """Writes content to a temporary file next to the path, returning the temporary file."""
+        file_util.mkdir(file_util.getParentDirectory(path), mode=0o755)
+        descriptor, temporary = tempfile.mkstemp(dir=file_util.getParentDirectory(path), prefix=".upload-")
+        with os.fdopen(descriptor, "wb") as target :
+            target.write(content)
+        return temporary
+
+
+    def _discard(self, length:int) :
+        """Reads (and ignores) the request body, so the connection can be reused."""
+        while length > 0 :
+            piece:bytes = self.rfile.read(min(_CHUNK, length))
+            if not piece :
+                return
+            length -= len(piece)
+
+
+    def _answer(self, status:HTTPStatus, message:str = "", close:bool = False) :
+        """Sends a response with a short message. Closes the connection if the request body wasn't read."""
+        body:bytes = message.encode()
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        if close :
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        self.end_headers()
+        self.wfile.write(body)
+
+
+    def log_message(self, format, *args) :
+        _logger.debug(f"{self.address_string()} {format % args}")
@@ -7,16 +7,23 @@ class ConfigAttributes(StrEnum) :
     # top level
     PROJECT_NAME:str = "project"
     VERSION:str = "version"
+    INCLUDE:str = "include"
+    VARIABLES:str = "variables"
 
     # config
     TARGET_ROOT:str = "target_root"
     CACHE_ROOT:str = "cache_root"
+    REMOTE_CACHE:str = "remote_cache"
+    BANDWIDTH_LIMIT:str = "bandwidth_limit"
+    HOST_BANDWIDTH_LIMIT:str = "host_bandwidth_limit"
 
     # sources
     SOURCES:str = "sources"
     SOURCE_NAME:str = "name"
     SOURCE_BASE:str = "base"
     SOURCE_DESCRIPTION:str = "description"
+    SOURCE_MIRRORS:str = "mirrors"
+    SOURCE_DEFAULTS:str = "defaults"
 
     SOURCE_PROTOCOL:str = "protocol"
     PROTOCOL_HTTPS:str = "https"
@@ -28,6 +35,7 @@ class ConfigAttributes(StrEnum) :
 
     # dependencies
     DEPENDENCIES:str = "dependencies"
+    DEPENDENCIES_FILE:str = "dependencies_file"
     DEPENDENCY_NAME:str = "name"
     DEPENDENCY_DESCRIPTION:str = "description"
     DEPENDENCY_TARGET_DIR:str = "target_dir"
@@ -36,6 +44,12 @@ class ConfigAttributes(StrEnum) :
     DEPENDENCY_SOURCE_PATH:str = "source_path"
     DEPENDENCY_TARGET_RELATIVE_ROOT:str = "target_relative_root"
     DEPENDENCY_ALWAYS_UPDATE:str = "always_update"
+    DEPENDENCY_TAGS:str = "tags"
+    DEPENDENCY_AFTER:str = "after"
+    DEPENDENCY_TARGET_MODE:str = "target_mode"
+    DEPENDENCY_TARGET_DIR_MODE:str = "target_dir_mode"
+    DEPENDENCY_TARGET_OWNER:str = "target_owner"
+    DEPENDENCY_VARIABLES:str = "variables"
 
     RESOLVE_ACTION:str = "resolve_action"
     RESOLVE_COPY:str = "copy"
@@ -1,30 +1,147 @@
+import hashlib
+import json
 import logging
-from typing import Optional
+import os
+from typing import Any, Iterator, Optional
+from . import expander
 from .attributes import ConfigAttributes
-from ..utilities import helpers, json_util, file_util
+from ..utilities import helpers, file_util, graph_util, json_util, trace_util
 
 _logger:logging.Logger = logging.getLogger(__name__)
 
+# Configuration files bigger than this (in bytes) are streamed: their dependencies are read one at a time, each time they are needed, rather than held in memory.
+_streamSize:int = 32 * 1024 * 1024
+
+
+def setStreamSize(size:int) :
+    """
+    Sets how big (in bytes) a configuration file must be to be streamed.
+
+    Args:
+        size (int): the size above which configuration files are streamed.
+    """
+    global _streamSize
+    _streamSize = size
+
+
 class Configuration :
     def __init__(self, configurationPath:str) :
         helpers.assertSet(_logger, "Please specify path to configuration JSON file", configurationPath)
         self._configPath:str = configurationPath
+        self._errors:Optional[list[str]] = None
+        self._fingerprints:Optional[dict[str, tuple[Optional[str], str]]] = None
+        self._streamOffset:Optional[int] = None
+        self._released:bool = False
         self._loadConfiguration()
 
 
     def _loadConfiguration(self) :
         """
-        Loads the configuration from the specified path.
+        Loads the configuration from the specified path, expanded (see expander.load): includes merged in, source defaults given to their
+        dependencies and variables substituted.
+        A large configuration is streamed: everything but its dependencies is loaded, and the dependencies are read one at a time when needed
+        (see iterateDependencies), as are those in a JSON Lines dependencies_file.
         """
         if file_util.isFile(self._getConfigurationPath()) :
-            self._config:dict = json_util.parseFromFile(self._getConfigurationPath())
+            with trace_util.span("load configuration", "config", path=self._getConfigurationPath()) :
+                self._expansion:expander.Expansion = self._expand()
+            self._config:dict = self._expansion.getConfiguration()  # type: ignore - checked below
             helpers.assertSet(_logger, f"Unable to load the JSON representation in the path {self._getConfigurationPath()}", self.getConfiguration())  # make sure we managed to open the configuration
-            _logger.debug(f"Loaded configuration: {self.getConfiguration()}")
+            self._dependenciesFile:Optional[str] = self._findDependenciesFile()
+            self._files:dict[str, Optional[bytes]] = dict(self._expansion.getFiles())
+            if self._dependenciesFile is not None :
+                self._files[os.path.abspath(self._dependenciesFile)] = expander.digest(self._dependenciesFile)
+            _logger.debug("Loaded configuration: %s", self.getConfiguration())
+            if self.isStreamed() :
+                self._findAnyConfigErrors()  # fingerprints the streamed dependencies as they are now, in case the files change.
         else :
             _logger.debug(f"Cannot load configuration - file doesn't exist at {self._getConfigurationPath()}")
             exit(1)
 
 
+    def _expand(self) -> expander.Expansion :
+        """Loads and expands the configuration - streaming it if it is large."""
+        if os.path.getsize(self._getConfigurationPath()) <= _streamSize :
+            return expander.load(self._getConfigurationPath())
+        try :
+            head, self._streamOffset = json_util.parseHead(self._getConfigurationPath(), ConfigAttributes.DEPENDENCIES)
+        except ValueError as error :
+            _logger.error(f"Unable to decode JSON in file at {self._getConfigurationPath()} : {error}")
+            return expander.Expansion(None, [])
+        _logger.debug(f"Streaming the dependencies of {self._getConfigurationPath()}")
+        return expander.loadHead(self._getConfigurationPath(), head)
+
+
+    def _findDependenciesFile(self) -> Optional[str] :
+        """Returns the JSON Lines file of (more) dependencies, if there is one - relative to the configuration file."""
+        path:Any = helpers.getKey(self.getConfiguration(), ConfigAttributes.DEPENDENCIES_FILE)
+        if not isinstance(path, str) or helpers.isEmpty(path) :
+            return None
+        return os.path.join(self.getConfigurationHome(), path)
+
+
+    def getFiles(self) -> dict[str, Optional[bytes]] :
+        """
+        Returns the files the configuration was loaded from - the configuration file, those it includes and any dependencies_file - with a
+        digest of each as it was loaded (see expander.hasChanged).
+        """
+        return self._files
+
+
+    def isStreamed(self) -> bool :
+        """
+        Returns True if some of the dependencies are streamed (from a large configuration file, or a dependencies_file) rather than held in memory.
+        """
+        return self._streamOffset is not None or self._dependenciesFile is not None
+
+
+    def iterateDependencies(self, errors:Optional[list[str]] = None) -> Iterator[Any] :
+        """
+        Returns each dependency in the configuration, expanded: those held in memory, then those streamed from a large configuration file,
+        then those in the dependencies_file. Streamed dependencies are read again each time, one at a time.
+
+        Args:
+            errors (Optional[list[str]]): a list to append any errors found expanding the streamed dependencies to.
+
+        Raises:
+            ValueError if a streamed dependency is not valid JSON.
+        """
+        dependencies:Any = helpers.getKey(self.getConfiguration(), ConfigAttributes.DEPENDENCIES)
+        if self._released :
+            dependencies = helpers.getKey(self._expand().getConfiguration(), ConfigAttributes.DEPENDENCIES)  # read again - see releaseDependencies.
+        if isinstance(dependencies, list) :
+            yield from dependencies
+        if self._streamOffset is not None :
+            for dependency in json_util.iterateArray(self._getConfigurationPath(), self._streamOffset) :
+                yield self._expansion.expandDependency(dependency, errors)
+        if self._dependenciesFile is not None :
+            for dependency in json_util.iterateLines(self._dependenciesFile) :
+                yield self._expansion.expandDependency(dependency, errors)
+
+
+    def releaseDependencies(self) :
+        """
+        Lets go of the dependencies held in memory, once they have been built (see Creator) - so a large configuration isn't held alongside
+        the dependencies built from it. They are validated and fingerprinted first, and are read from the files again if iterated after.
+        """
+        self._findAnyConfigErrors()
+        if ConfigAttributes.DEPENDENCIES in self._config :
+            self._expansion = self._expansion.withoutDependencies()
+            self._config = self._expansion.getConfiguration()  # type: ignore - only released once loaded
+            self._released = True
+
+
+    def getDependencyFingerprints(self) -> dict[str, tuple[Optional[str], str]] :
+        """
+        Returns the name of the source of each dependency (by name) as it was loaded, and a fingerprint of it - two versions of a dependency
+        have the same fingerprint only if they are configured the same. Used to find what changed between two loads without holding both
+        sets of dependencies.
+        """
+        if self._fingerprints is None :
+            self._findAnyConfigErrors()  # dependencies are fingerprinted while they are validated.
+        return self._fingerprints  # type: ignore - set by validating
+
+
     def _getConfigurationPath(self) -> str :
         """
         Returns the path to the configuration file.
@@ -47,7 +164,7 @@ class Configuration :
 
     def getConfiguration(self) -> dict :
         """
-        Returns the loaded configuration.
+        Returns the loaded configuration, expanded. It is shared with other loads of the same file, so must not be modified.
 
         Returns:
             dict: The loaded configuration dictionary.
@@ -57,9 +174,12 @@ class Configuration :
 
     def printConfiguration(self) :
         """
-        Prints the loaded configuration in a human-readable format.
+        Prints the loaded configuration in a human-readable format. Streamed dependencies are printed one at a time, after the rest.
         """
         print(self.getConfiguration())
+        if self.isStreamed() :
+            for dependency in self.iterateDependencies() :
+                print(dependency)
 
 
     def validateConfiguration(self) :
@@ -90,15 +210,22 @@ class Configuration :
     def _findAnyConfigErrors(self) -> list[str] :
         """
         Finds any errors (required attributes that are missing) in the configuration and returns a list of them.
+        The configuration doesn't change once loaded, so it is only validated once.
 
         Returns:
             list[str]: A list of error messages for any missing required attributes in the configuration.
         """
+        if self._errors is not None :
+            return self._errors
         config:dict = self.getConfiguration()
-        errors:list[str] = []
-        self._validateProjectName(config, errors)
-        self._validateSources(config, errors)
-        self._validateDependencies(config, errors)
+        errors:list[str] = list(self._expansion.getErrors())
+        with trace_util.span("validate configuration", "config", path=self._getConfigurationPath()) :
+            self._validateProjectName(config, errors)
+            self._validateBandwidthLimits(config, errors)
+            self._validateRemoteCache(config, errors)
+            self._validateSources(config, errors)
+            self._validateDependencies(config, errors)
+        self._errors = errors
         return errors
 
 
@@ -113,6 +240,33 @@ class Configuration :
         helpers.addIfNotNone(errors, self._doesKeyExist(config, ConfigAttributes.PROJECT_NAME, False))
 
 
+    def _validateBandwidthLimits(self, config:dict, errors:list[str]) :
+        """
+        Validates the (optional) bandwidth limits in the configuration.
+
+        Args:
+            config (dict): the configuration dictionary.
+            errors (list[str]): a list to append any error messages to.
+        """
+        for key in (ConfigAttributes.BANDWIDTH_LIMIT, ConfigAttributes.HOST_BANDWIDTH_LIMIT) :
+            value = config.get(key)
+            if value is not None and helpers.parseSize(value) is None :
+                errors.append(f"Attribute {key} must be a number of bytes per second, e.g. 1048576, \"512K\" or \"10M\".")
+
+
+    def _validateRemoteCache(self, config:dict, errors:list[str]) :
+        """
+        Validates the (optional) remote cache in the configuration.
+
+        Args:
+            config (dict): the configuration dictionary.
+            errors (list[str]): a list to append any error messages to.
+        """
+        value = config.get(ConfigAttributes.REMOTE_CACHE)
+        if value is not None and (not isinstance(value, str) or not value.startswith(("http://", "https://"))) :
+            errors.append(f"Attribute {ConfigAttributes.REMOTE_CACHE} must be the http(s) url of a remote cache server.")
+
+
     def _validateSources(self, config:dict, errors:list[str]) :
         """
         Validates the sources in the configuration.
@@ -126,8 +280,13 @@ class Configuration :
         if error :
             errors.append(error)
         else :
+            names:set = set()
             for source in config.get(key, []) :
                 self._validateSource(source, errors)
+                name = source.get(ConfigAttributes.SOURCE_NAME) if isinstance(source, dict) else None
+                if name in names :
+                    errors.append(f"Each of the {key} must have a different name - more than one is called {name}.")
+                names.add(name)
 
 
     def _validateSource(self, source:dict, errors:list[str]) :
@@ -140,24 +299,39 @@ class Configuration :
         """
         helpers.addIfNotNone(errors, self._doesKeyExist(source, ConfigAttributes.SOURCE_NAME))
         helpers.addIfNotNone(errors, self._doesKeyExist(source, ConfigAttributes.SOURCE_PROTOCOL))
+        helpers.addIfNotNone(errors, self._isListOfStrings(source, ConfigAttributes.SOURCE_MIRRORS))
 
 
     def _validateDependencies(self, config:dict, errors:list[str]) :
         """
-        Validates the dependencies in the configuration.
+        Validates the dependencies in the configuration (including any that are streamed), fingerprinting each one as it goes.
         Adds any sources errors to  a list of previous errors.
 
         Args:
             config (dict): the configuration dictionary.
             errors (list[str]): a list to append any error messages to.
         """
-        key:str = ConfigAttributes.DEPENDENCIES
-        error:Optional[str] = self._doesKeyExist(config, key, False)
-        if error :
-            errors.append(error)
-        else :
-            for dependency in config.get(key, []) :
+        self._fingerprints = {}
+        edges:dict[str, list[str]] = {}
+        try :
+            for dependency in self.iterateDependencies(errors) :
+                if not isinstance(dependency, dict) :
+                    errors.append(f"Each of the {ConfigAttributes.DEPENDENCIES} must be an object. In: {dependency}.")
+                    continue
                 self._validateDependency(dependency, errors)
+                name = dependency.get(ConfigAttributes.DEPENDENCY_NAME)
+                after = dependency.get(ConfigAttributes.DEPENDENCY_AFTER)
+                if name and isinstance(after, list) :
+                    edges[name] = after
+                if name in self._fingerprints :
+                    errors.append(f"Each of the {ConfigAttributes.DEPENDENCIES} must have a different name - more than one is called {name}.")
+                self._fingerprints[name] = (dependency.get(ConfigAttributes.DEPENDENCY_SOURCE_DEPENDENCY), hashlib.blake2b(json.dumps(dependency, sort_keys=True).encode(), digest_size=16).hexdigest())
+        except ValueError as error :
+            errors.append(f"Unable to read the {ConfigAttributes.DEPENDENCIES}: {error}")
+        if not self._fingerprints :
+            errors.append(f"Required attribute {ConfigAttributes.DEPENDENCIES} is not specified or is empty.")
+        else :
+            self._validateDependencyOrder(edges, set(self._fingerprints), errors)
 
 
     def _validateDependency(self, dependency:dict, errors:list[str]) :
@@ -172,6 +346,31 @@ class Configuration :
         helpers.addIfNotNone(errors, self._doesKeyExist(dependency, ConfigAttributes.DEPENDENCY_NAME))
         helpers.addIfNotNone(errors, self._doesKeyExist(dependency, ConfigAttributes.DEPENDENCY_TARGET_DIR))
         helpers.addIfNotNone(errors, self._doesKeyExist(dependency, ConfigAttributes.DEPENDENCY_SOURCE_DEPENDENCY))
+        helpers.addIfNotNone(errors, self._isListOfStrings(dependency, ConfigAttributes.DEPENDENCY_TAGS))
+        helpers.addIfNotNone(errors, self._isListOfStrings(dependency, ConfigAttributes.DEPENDENCY_AFTER))
+        helpers.addIfNotNone(errors, self._isMode(dependency, ConfigAttributes.DEPENDENCY_TARGET_MODE))
+        helpers.addIfNotNone(errors, self._isMode(dependency, ConfigAttributes.DEPENDENCY_TARGET_DIR_MODE))
+        helpers.addIfNotNone(errors, self._isOwner(dependency, ConfigAttributes.DEPENDENCY_TARGET_OWNER))
+
+
+    def _validateDependencyOrder(self, edges:dict[str, list[str]], names:set, errors:list[str]) :
+        """
+        Validates the ordering ('after' attributes) between the dependencies in the configuration.
+        Each name must refer to another dependency and the ordering must not contain a cycle.
+
+        Args:
+            edges (dict[str, list[str]]): the names each dependency must come after, by dependency name.
+            names (set): the names of all the dependencies.
+            errors (list[str]): a list to append any error messages to.
+        """
+        for name, after in edges.items() :
+            for before in after :
+                if before not in names :
+                    errors.append(f"Dependency {name} must come {ConfigAttributes.DEPENDENCY_AFTER} {before}, but there is no dependency with that name.")
+
+        cycle:Optional[list[str]] = graph_util.findCycle(edges)
+        if cycle is not None :
+            errors.append(f"The {ConfigAttributes.DEPENDENCY_AFTER} attributes of the dependencies form a cycle: {' -> '.join(cycle)}.")
 
 
     # Checks to see if a key has been specified in the config. Returns an error message if missing/empty.
@@ -192,3 +391,51 @@ class Configuration :
             if add_context :
                 error = f"{error} In: {config}."
             return error
+
+
+    def _isListOfStrings(self, config:dict, key:str) -> Optional[str] :
+        """
+        Checks that an optional attribute, if specified, is a list of strings.
+
+        Args:
+            config (dict): the configuration dictionary to check.
+            key (str): the key of the optional attribute.
+
+        Returns:
+            Optional[str]: An error message if the attribute is specified but is not a list of strings, otherwise None.
+        """
+        value = config.get(key)
+        if value is not None and (not isinstance(value, list) or not all(isinstance(item, str) for item in value)) :
+            return f"Attribute {key} must be a list of strings. In: {config}."
+
+
+    def _isMode(self, config:dict, key:str) -> Optional[str] :
+        """
+        Checks that an optional attribute, if specified, is a file mode as an octal string (e.g. "644" or "0o644").
+
+        Args:
+            config (dict): the configuration dictionary to check.
+            key (str): the key of the optional attribute.
+
+        Returns:
+            Optional[str]: An error message if the attribute is specified but is not an octal mode, otherwise None.
+        """
+        value = config.get(key)
+        if value is not None and helpers.parseMode(value) is None :
+            return f"Attribute {key} must be an octal file mode, e.g. \"644\" or \"0o755\". In: {config}."
+
+
+    def _isOwner(self, config:dict, key:str) -> Optional[str] :
+        """
+        Checks that an optional attribute, if specified, is an owner: "user", "user:group" or ":group".
+
+        Args:
+            config (dict): the configuration dictionary to check.
+            key (str): the key of the optional attribute.
+
+        Returns:
+            Optional[str]: An error message if the attribute is specified but is not an owner, otherwise None.
+        """
+        value = config.get(key)
+        if value is not None and (not isinstance(value, str) or value.count(":") > 1 or value.strip(":") == "") :
+            return f"Attribute {key} must be \"user\", \"user:group\" or \":group\". In: {config}."
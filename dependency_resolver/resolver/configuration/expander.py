@@ -0,0 +1,411 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from typing import Any, Optional
+from .attributes import ConfigAttributes
+from ..utilities import file_util
+
+_logger:logging.Logger = logging.getLogger(__name__)
+
+# A ${name} reference to a variable - $${name} is a literal ${name}.
+_REFERENCE:re.Pattern = re.compile(r"\$(\$?)\{([A-Za-z_][A-Za-z0-9_.-]*)\}")
+
+# Every included file parsed so far, with a digest of its content - so a file included by many configurations is only parsed once.
+# Digests rather than modification times, so a file saved twice within the resolution of the filesystem's clock is never mistaken for unchanged.
+_parsed:dict[str, tuple[Optional[bytes], Any]] = {}
+# Every configuration expanded so far: the files it was expanded from (with the digest of each), the expanded configuration and its errors.
+# Only kept (with the parse of the configuration file itself) when asked to - see setKeep.
+_expanded:dict[str, tuple[dict[str, Optional[bytes]], "Expansion"]] = {}
+_keep:bool = False
+_lock:threading.Lock = threading.Lock()
+
+
+def setKeep(keep:bool) :
+    """
+    Sets whether each configuration loaded is kept, expanded, until one of its files changes - so loading it again is cheap.
+    Worth it in a long-running process (e.g. serving). Otherwise the configuration is only held until its dependencies are built (see
+    Configuration.releaseDependencies), rather than alongside them for the life of the process.
+
+    Args:
+        keep (bool): True to keep the configurations loaded. Setting False forgets those kept so far.
+    """
+    global _keep
+    _keep = keep
+    if not keep :
+        forget()
+
+
+# A configuration, expanded: the files it includes are merged into it, each dependency is given the defaults of its source, and ${name}
+# references to variables are substituted. Dependencies read separately (e.g. streamed from a large file) can be expanded in the same way.
+class Expansion :
+
+    def __init__(self, config:Optional[dict], errors:list[str], variables:Optional[dict[str, str]] = None, defaults:Optional[dict[str, dict]] = None, files:Optional[dict[str, Optional[bytes]]] = None) :
+        """
+        Parameters:
+            config - the expanded configuration (None if it can't be parsed). Shared between loads, so must not be modified.
+            errors - any errors found expanding it.
+            variables - its variables, by name.
+            defaults - the dependency defaults of its sources, by source name.
+            files - the files it was expanded from, with a digest of each.
+        """
+        self._config:Optional[dict] = config
+        self._errors:list[str] = errors
+        self._variables:dict[str, str] = variables if variables is not None else {}
+        self._defaults:dict[str, dict] = defaults if defaults is not None else {}
+        self._files:dict[str, Optional[bytes]] = files if files is not None else {}
+
+
+    def getConfiguration(self) -> Optional[dict] :
+        """Returns the expanded configuration (None if it can't be parsed)."""
+        return self._config
+
+
+    def getErrors(self) -> list[str] :
+        """Returns the errors found expanding the configuration."""
+        return self._errors
+
+
+    def getFiles(self) -> dict[str, Optional[bytes]] :
+        """Returns the files the configuration was expanded from (the configuration file and those it includes), with a digest of each - see hasChanged."""
+        return self._files
+
+
+    def withoutDependencies(self) -> "Expansion" :
+        """
+        Returns the expansion without the dependencies in its configuration, keeping the variables and source defaults that expandDependency
+        needs. A copy, as the expansion may be kept (and shared) - see setKeep.
+        """
+        config:Optional[dict] = {name : value for name, value in self._config.items() if name != ConfigAttributes.DEPENDENCIES} if self._config is not None else None
+        return Expansion(config, self._errors, self._variables, self._defaults, self._files)
+
+
+    def expandDependency(self, dependency:Any, errors:Optional[list[str]] = None) -> Any :
+        """
+        Expands a dependency of the configuration that isn't part of the expanded configuration (e.g. streamed from a file).
+
+        Args:
+            dependency (Any): the dependency, as configured.
+            errors (Optional[list[str]]): a list to append any error messages to.
+
+        Returns:
+            Any: the expanded dependency.
+        """
+        return _expandDependency(dependency, self._defaults, self._variables, errors if errors is not None else [])
+
+
+def load(path:str) -> Expansion :
+    """
+    Loads a configuration, expanded. If configurations are kept (see setKeep), the expansion is kept until one of the files it was expanded
+    from changes, so loading the same configuration again is cheap.
+
+    Args:
+        path (str): the path to the configuration file.
+
+    Returns:
+        Expansion: the expanded configuration.
+    """
+    key:str = os.path.abspath(path)
+    with _lock :
+        cached = _expanded.get(key)
+    if cached is not None and not hasChanged(cached[0]) :
+        _logger.debug("Reusing the expanded configuration %s", key)
+        return cached[1]
+
+    digests:dict[str, Optional[bytes]] = {}
+    errors:list[str] = []
+    config:Any = _parse(key, digests, keep=_keep)
+    expansion:Expansion = _expand(_include(key, config, [], set(), digests, errors), errors, digests) if isinstance(config, dict) else Expansion(None, errors, files=digests)
+    if _keep :
+        with _lock :
+            _expanded[key] = (digests, expansion)
+    return expansion
+
+
+def loadHead(path:str, head:dict) -> Expansion :
+    """
+    Expands a configuration that has already been read - e.g. the top of a large configuration, whose dependencies are streamed separately
+    (see Expansion.expandDependency). The expansion isn't kept, but the files it includes are only parsed again if they change.
+
+    Args:
+        path (str): the path to the configuration file - includes are relative to it.
+        head (dict): the configuration read from it.
+
+    Returns:
+        Expansion: the expanded configuration.
+    """
+    key:str = os.path.abspath(path)
+    digests:dict[str, Optional[bytes]] = {key: digest(key)}
+    errors:list[str] = []
+    return _expand(_include(key, head, [], set(), digests, errors), errors, digests)
+
+
+def digest(path:str) -> Optional[bytes] :
+    """
+    Returns a digest of a file's content, read a piece at a time (so a large file isn't held in memory) - the same digest the files of an
+    expansion are recorded with (see Expansion.getFiles).
+
+    Args:
+        path (str): the path to the file.
+
+    Returns:
+        Optional[bytes]: the digest, or None if the file can't be read.
+    """
+    content = hashlib.blake2b(digest_size=16)
+    try :
+        with open(path, "rb") as openFile :
+            while piece := openFile.read(1024 * 1024) :
+                content.update(piece)
+    except OSError :
+        return None
+    return content.digest()
+
+
+def hasChanged(files:dict[str, Optional[bytes]]) -> bool :
+    """
+    Args:
+        files (dict[str, Optional[bytes]]): files, with the digest each had (see Expansion.getFiles).
+
+    Returns:
+        bool: True if any of the files has changed (or been created or removed) since.
+    """
+    return any(digest(file) != fileDigest for file, fileDigest in files.items())
+
+
+def forget() :
+    """Forgets every file parsed and configuration expanded so far."""
+    with _lock :
+        _parsed.clear()
+        _expanded.clear()
+
+
+def _include(path:str, config:dict, including:list[str], included:set[str], digests:dict[str, Optional[bytes]], errors:list[str]) -> dict :
+    """
+    Merges the files a configuration includes into it (recursively). Included files come first: their sources and dependencies
+    are listed before those of the file including them, and the including file's variables and other attributes win.
+    Each file is only merged once, where it is first included - a file included by two others (a diamond) doesn't list its sources and dependencies twice.
+
+    Args:
+        path (str): the absolute path to the configuration file.
+        config (dict): the configuration parsed from it.
+        including (list[str]): the files including this one, outermost first - to find files that include themselves.
+        included (set[str]): every file merged so far, across the whole expansion.
+        digests (dict[str, Optional[bytes]]): collects the digest of each file read.
+        errors (list[str]): a list to append any error messages to.
+
+    Returns:
+        dict: the merged configuration.
+    """
+    includes:Any = config.get(ConfigAttributes.INCLUDE)
+    if includes is None :
+        return config
+    if not isinstance(includes, list) or not all(isinstance(include, str) for include in includes) :
+        errors.append(f"Attribute {ConfigAttributes.INCLUDE} must be a list of paths (relative to {path}).")
+        return config
+
+    merged:dict = {}
+    for include in includes :
+        includePath:str = os.path.normpath(os.path.join(file_util.getParentDirectory(path), include))
+        if includePath in including or includePath == path :
+            errors.append(f"The configuration {includePath} includes itself: {' -> '.join(including + [path, includePath])}.")
+            continue
+        if includePath in included :
+            _logger.debug("Not merging %s again (included by %s) - it is already merged.", includePath, path)
+            continue
+        included.add(includePath)
+        parsed:Any = _parse(includePath, digests)
+        if isinstance(parsed, dict) :
+            merged = _merge(merged, _include(includePath, parsed, including + [path], included, digests, errors))
+        else :
+            errors.append(f"Unable to load the configuration {includePath} included by {path}.")
+    return _merge(merged, {name : value for name, value in config.items() if name != ConfigAttributes.INCLUDE})
+
+
+def _merge(base:dict, config:dict) -> dict :
+    """Merges a configuration over another: sources and dependencies are appended, variables and other attributes are overridden."""
+    merged:dict = {name : value for name, value in base.items() if name != ConfigAttributes.INCLUDE}
+    for name, value in config.items() :
+        if name in (ConfigAttributes.SOURCES, ConfigAttributes.DEPENDENCIES) and isinstance(value, list) and isinstance(merged.get(name), list) :
+            merged[name] = merged[name] + value
+        elif name == ConfigAttributes.VARIABLES and isinstance(value, dict) and isinstance(merged.get(name), dict) :
+            merged[name] = {**merged[name], **value}
+        else :
+            merged[name] = value
+    return merged
+
+
+def _expand(config:dict, errors:list[str], files:dict[str, Optional[bytes]]) -> Expansion :
+    """
+    Gives each dependency the defaults of its source and substitutes the variables throughout the configuration.
+    The variables, and the source defaults, are not part of the expanded configuration.
+
+    Args:
+        config (dict): the merged configuration.
+        errors (list[str]): a list to append any error messages to.
+        files (dict[str, Optional[bytes]]): the files it was merged from, with a digest of each.
+
+    Returns:
+        Expansion: the expanded configuration.
+    """
+    variables:dict[str, str] = _resolveVariables(config.get(ConfigAttributes.VARIABLES), "the configuration", {}, errors)
+    defaults:dict[str, dict] = {}
+    sources:Any = config.get(ConfigAttributes.SOURCES)
+    if isinstance(sources, list) :
+        for source in sources :
+            if isinstance(source, dict) and ConfigAttributes.SOURCE_DEFAULTS in source :
+                if isinstance(source[ConfigAttributes.SOURCE_DEFAULTS], dict) :
+                    defaults[source.get(ConfigAttributes.SOURCE_NAME)] = source[ConfigAttributes.SOURCE_DEFAULTS]
+                else :
+                    errors.append(f"Attribute {ConfigAttributes.SOURCE_DEFAULTS} of source {source.get(ConfigAttributes.SOURCE_NAME)} must be an object of dependency attributes.")
+
+    expanded:dict = {}
+    for name, value in config.items() :
+        if name == ConfigAttributes.VARIABLES :
+            continue
+        elif name == ConfigAttributes.SOURCES and isinstance(value, list) :
+            expanded[name] = [_expandSource(source, variables, errors) for source in value]
+        elif name == ConfigAttributes.DEPENDENCIES and isinstance(value, list) :
+            expanded[name] = [_expandDependency(dependency, defaults, variables, errors) for dependency in value]
+        else :
+            expanded[name] = _substitute(value, variables, f"attribute {name}", errors)
+    return Expansion(expanded, errors, variables, defaults, files)
+
+
+def _expandSource(source:Any, variables:dict[str, str], errors:list[str]) -> Any :
+    """Expands a source: the variables are substituted (its defaults have already been given to its dependencies)."""
+    if not isinstance(source, dict) :
+        return source
+    where:str = f"source {source.get(ConfigAttributes.SOURCE_NAME)}"
+    return _substitute({name : value for name, value in source.items() if name != ConfigAttributes.SOURCE_DEFAULTS}, variables, where, errors)
+
+
+def _expandDependency(dependency:Any, defaults:dict[str, dict], variables:dict[str, str], errors:list[str]) -> Any :
+    """
+    Expands a dependency: its source's defaults are given for the attributes it doesn't set, then the variables are substituted.
+    A dependency can set (or override) variables of its own, and its name is the variable ${name}.
+    """
+    if not isinstance(dependency, dict) :
+        return dependency
+    sourceDefaults:Optional[dict] = defaults.get(dependency.get(ConfigAttributes.DEPENDENCY_SOURCE_DEPENDENCY))
+    if not sourceDefaults and ConfigAttributes.DEPENDENCY_VARIABLES not in dependency and not _hasReference(dependency) :
+        return dependency  # nothing to expand - most dependencies of a large configuration that doesn't use defaults.
+    merged:dict = {**(sourceDefaults or {}), **dependency}
+    own:Any = merged.pop(ConfigAttributes.DEPENDENCY_VARIABLES, None)
+    where:str = f"dependency {merged.get(ConfigAttributes.DEPENDENCY_NAME)}"
+    scope:dict[str, str] = variables
+    name:Any = _substitute(merged.get(ConfigAttributes.DEPENDENCY_NAME), variables, where, errors)
+    if isinstance(name, str) :
+        scope = {**scope, ConfigAttributes.DEPENDENCY_NAME.value : name}
+    return _substitute(merged, _resolveVariables(own, where, scope, errors), where, errors)
+
+
+def _hasReference(value:Any) -> bool :
+    """Returns True if any string in a value (recursively through lists and objects) could hold a ${name} reference."""
+    if isinstance(value, str) :
+        return "$" in value
+    if isinstance(value, dict) :
+        value = value.values()
+    elif not isinstance(value, list) :
+        return False
+    return any(("$" in item) if isinstance(item, str) else _hasReference(item) for item in value)
+
+
+def _resolveVariables(variables:Any, where:str, inherited:dict[str, str], errors:list[str]) -> dict[str, str] :
+    """
+    Returns the inherited variables overridden by the given ones, with the references between them substituted.
+
+    Args:
+        variables (Any): the variables set (by name) - must be an object of strings (or numbers).
+        where (str): what set them, for error messages.
+        inherited (dict[str, str]): the variables already set.
+        errors (list[str]): a list to append any error messages to.
+    """
+    if variables is None :
+        return inherited
+    if not isinstance(variables, dict) or not all(isinstance(value, (str, int, float)) and not isinstance(value, bool) for value in variables.values()) :
+        errors.append(f"Attribute {ConfigAttributes.VARIABLES} of {where} must be an object of strings.")
+        return inherited
+
+    raw:dict[str, str] = {name : str(value) for name, value in variables.items()}
+    resolved:dict[str, str] = {name : value for name, value in inherited.items() if name not in raw}  # already substituted.
+
+    def resolve(name:str, resolving:list[str]) -> Optional[str] :
+        if name in resolved :
+            return resolved[name]
+        if name not in raw :
+            return None
+        if name in resolving :
+            errors.append(f"The variables of {where} refer to each other in a cycle: {' -> '.join(resolving + [name])}.")
+            return raw[name]
+        resolved[name] = _REFERENCE.sub(lambda match : _replace(match, lambda inner : resolve(inner, resolving + [name]), where, errors), raw[name])
+        return resolved[name]
+
+    for name in raw :
+        resolve(name, [])
+    return resolved
+
+
+def _substitute(value:Any, variables:dict[str, str], where:str, errors:list[str]) -> Any :
+    """Substitutes the variables in every string in a value (recursively through lists and objects)."""
+    if isinstance(value, str) :
+        return _REFERENCE.sub(lambda match : _replace(match, variables.get, where, errors), value) if "$" in value else value
+    if isinstance(value, list) :  # strings without a reference are checked here, as most are - it saves a call for each.
+        return [item if isinstance(item, str) and "$" not in item else _substitute(item, variables, where, errors) for item in value]
+    if isinstance(value, dict) :
+        return {name : item if isinstance(item, str) and "$" not in item else _substitute(item, variables, where, errors) for name, item in value.items()}
+    return value
+
+
+def _replace(match:re.Match, lookup, where:str, errors:list[str]) -> str :
+    """Returns what a ${name} reference is replaced by - the variable's value, or the reference itself if it is escaped ($${name}) or unknown."""
+    if match.group(1) :
+        return match.group(0)[1:]
+    value:Optional[str] = lookup(match.group(2))
+    if value is None :
+        errors.append(f"Unknown variable ${{{match.group(2)}}} in {where}.")
+        return match.group(0)
+    return value
+
+
+def _parse(path:str, digests:dict[str, Optional[bytes]], keep:bool = True) -> Any :
+    """
+    Parses a JSON file, reusing what was parsed before if its content hasn't changed since. Records the digest of its content in digests.
+    If keep is False, what is parsed isn't kept (or looked for) - the file is parsed each time.
+    """
+    content:Optional[bytes] = _read(path)
+    digest:Optional[bytes] = _digest(content)
+    digests[path] = digest
+    with _lock :
+        cached = _parsed.get(path) if keep else None
+    if cached is not None and cached[0] == digest :
+        return cached[1]
+
+    parsed:Any = None
+    if content is None :
+        _logger.error(f"Cannot open non-existent file at {path}")
+    else :
+        try :
+            _logger.debug(f"Parsing JSON file at {path}")
+            parsed = json.loads(content)
+        except ValueError as e :
+            _logger.error(f"Unable to decode JSON in file at {path} : {e}")
+    if keep :
+        with _lock :
+            _parsed[path] = (digest, parsed)
+    return parsed
+
+
+def _read(path:str) -> Optional[bytes] :
+    """Returns the content of a file, or None if it can't be read."""
+    try :
+        with open(path, "rb") as openFile :
+            return openFile.read()
+    except OSError :
+        return None
+
+
+def _digest(content:Optional[bytes]) -> Optional[bytes] :
+    """Returns a digest of a file's content (None for a file that can't be read)."""
+    return hashlib.blake2b(content, digest_size=16).digest() if content is not None else None
@@ -1,6 +1,10 @@
+import logging
 from typing import Optional
 from .dependency import Dependency
 
+_logger:logging.Logger = logging.getLogger(__name__)
+
+
 class Dependencies() :
 
     def __init__(self) :
@@ -40,3 +44,30 @@ class Dependencies() :
         for dependency in self.getDependencies() :
             if dependency.getName() == name :
                 return dependency
+
+
+    def select(self, only:Optional[list[str]] = None, exclude:Optional[list[str]] = None) -> "Dependencies" :
+        """
+        Returns the subset of these dependencies chosen by the given patterns. A pattern is a name, tag or glob (see Dependency.matches).
+        The original ordering of the dependencies is preserved.
+
+        Args:
+            only (Optional[list[str]]): If specified, only dependencies that match at least one of these patterns are selected.
+            exclude (Optional[list[str]]): Dependencies that match any of these patterns are not selected (applied after only).
+
+        Returns:
+            Dependencies: A new Dependencies instance containing the selected dependencies.
+        """
+        selected:Dependencies = Dependencies()
+        for dependency in self.getDependencies() :
+            if only and not any(dependency.matches(pattern) for pattern in only) :
+                continue
+            if exclude and any(dependency.matches(pattern) for pattern in exclude) :
+                continue
+            selected.addDependency(dependency)
+
+        for pattern in (only or []) + (exclude or []) :
+            if not any(dependency.matches(pattern) for dependency in self.getDependencies()) :
+                _logger.warning(f"The pattern '{pattern}' does not match the name or tags of any dependency.")
+
+        return selected
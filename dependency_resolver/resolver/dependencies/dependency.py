@@ -1,8 +1,13 @@
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import fnmatchcase
+from typing import Optional
 from .resolveAction import ResolveAction
 from ..utilities import helpers, file_util
 from ..sources.source import Source
 from ..configuration.attributes import ConfigAttributes
+from ..errors.errors import ResolveError
 
 _logger:logging.Logger = logging.getLogger(__name__)  # module name
 
@@ -10,7 +15,10 @@ _logger:logging.Logger = logging.getLogger(__name__)  # module name
 # An action may be defined to perform on the source file as part of resolving this dependency, for example unzip the source file.
 class Dependency :
 
-    def __init__(self, name:str, targetDir:str, targetName:str, targetRelativeRoot:bool, source:Source, sourcePath:str, resolveAction:ResolveAction, description:str, alwaysUpdate:bool) :
+    # The number of threads changing the mode and owner of what resolving a dependency put in place at the same time.
+    permissionWorkers:int = 4
+
+    def __init__(self, name:str, targetDir:str, targetName:str, targetRelativeRoot:bool, source:Source, sourcePath:str, resolveAction:ResolveAction, description:str, alwaysUpdate:bool, tags:Optional[list[str]] = None, after:Optional[list[str]] = None, mode:Optional[int] = None, dirMode:Optional[int] = None, user:Optional[str] = None, group:Optional[str] = None) :
         """
         Parameters:
             targetDir - the path to the target location for the dependency. This path is relative to the project location (the dir containing the dependencies json configuration)
@@ -21,6 +29,12 @@ class Dependency :
             resolveAction - Defines an action carried out when resolving this action.
             description - Can be used to describe the dependency.
             alwaysUpdate - If True, this dependency will always be fetched and resolved.
+            tags - Labels that can be used to select a group of dependencies (e.g. on the command-line). Optional.
+            after - The names of the dependencies that must be resolved before this one (e.g. they create the directory this one is resolved into). Optional.
+            mode - The permissions given to the resolved files (e.g. 0o644). Optional - left as resolved if not set.
+            dirMode - The permissions given to the resolved directories (e.g. 0o755). Optional - defaults to mode, searchable wherever it is readable (0o644 gives 0o755).
+            user - The user (name or uid) made the owner of the resolved target. Optional.
+            group - The group (name or gid) made the owner of the resolved target. Optional.
         """
         helpers.assertSet(_logger, f"The dependency have a {ConfigAttributes.DEPENDENCY_NAME} attribute in dependency: {ConfigAttributes.DEPENDENCY_TARGET_DIR}={targetDir}, {ConfigAttributes.DEPENDENCY_TARGET_NAME}={targetName}, {ConfigAttributes.DEPENDENCY_SOURCE_PATH}={sourcePath}.", source)
         helpers.assertSet(_logger, f"The {ConfigAttributes.DEPENDENCY_SOURCE_DEPENDENCY} attribute must be specified in dependency: {ConfigAttributes.DEPENDENCY_TARGET_DIR}={targetDir}, {ConfigAttributes.DEPENDENCY_TARGET_NAME}={targetName}, {ConfigAttributes.DEPENDENCY_SOURCE_PATH}={sourcePath}.", source)
@@ -34,6 +48,12 @@ class Dependency :
         self._resolveAction:ResolveAction = resolveAction
         self._description:str = description
         self._alwaysUpdate:bool = alwaysUpdate
+        self._tags:list[str] = tags if tags is not None else []
+        self._after:list[str] = after if after is not None else []
+        self._mode:Optional[int] = mode
+        self._dirMode:Optional[int] = dirMode
+        self._user:Optional[str] = user
+        self._group:Optional[str] = group
 
 
     def getName(self) :
@@ -89,6 +109,32 @@ class Dependency :
         return self._alwaysUpdate
 
 
+    def getTags(self) -> list[str] :
+        """Returns the tags given to this dependency."""
+        return self._tags
+
+
+    def getAfter(self) -> list[str] :
+        """Returns the names of the dependencies that must be resolved before this one."""
+        return self._after
+
+
+    def matches(self, pattern:str) -> bool :
+        """
+        Tests whether this dependency is selected by the given pattern.
+        A pattern matches if it matches the name of the dependency or any of its tags. Shell-style wildcards (*, ?, [seq]) are supported.
+
+        Parameters:
+            pattern - a name, tag or glob.
+
+        Returns:
+            bool: True if the pattern matches this dependency's name or one of its tags.
+        """
+        if fnmatchcase(self.getName(), pattern) :
+            return True
+        return any(fnmatchcase(tag, pattern) for tag in self.getTags())
+
+
     def fetchSource(self, targetDir:str, targetName:str) :
         """
         Fetches (downloads) the source of this dependency to a specified directory. The download is saved with the given name.
@@ -105,6 +151,22 @@ class Dependency :
         self.getSource().fetch(self.getSourcePath(), targetDir, targetName)
 
 
+    async def fetchSourceAsync(self, targetDir:str, targetName:str) :
+        """
+        Fetches (downloads) the source of this dependency to a specified directory, without blocking the running event loop.
+
+        Parameters:
+            targetDir  - fetch this dependency's source to the directory at this path.
+            targetName - the filename to give this fetched source in the target directory.
+
+        Raises:
+            FetchError if this fails to fetch successfully.
+        """
+        helpers.assertSet(_logger, f"Cannot fetch the source {self.getSource().getName()} - the target destination was not specified.", targetDir)
+        helpers.assertSet(_logger, f"Cannot fetch the source {self.getSource().getName()} - the target filename was not specified.", targetName)
+        await self.getSource().fetchAsync(self.getSourcePath(), targetDir, targetName)
+
+
     def resolve(self, sourcePath:str, targetHomeDir:str) :
         """
         Resolves this dependency. The source must have been fetched first.
@@ -120,10 +182,66 @@ class Dependency :
         helpers.assertSet(_logger, f"Cannot resolve the dependency {self.getName()} - the destination directory path wasn't set", targetHomeDir)
         targetDir:str = file_util.buildPath(targetHomeDir, self.getTargetDirectory())
         file_util.mkdir(targetDir, mode=0o744)  # just in case
-        self._getResolveAction().resolve(sourcePath, targetDir)
+        self.getResolveAction().resolve(sourcePath, targetDir)
+        self._applyPermissions(sourcePath, targetDir)
+
+
+    def _applyPermissions(self, sourcePath:str, targetDir:str) :
+        """
+        Gives what resolving put in place the configured mode and owner (if any): the copied file (or each file and directory copied), or each entry
+        the archive extracted - and the directories holding them. Nothing else in the target directory (e.g. another dependency's files) is changed.
 
+        Parameters:
+            sourcePath - the path to the fetched source.
+            targetDir - the directory the dependency was resolved into.
 
-    def _getResolveAction(self) -> ResolveAction :
+        Raises:
+            ResolveError if the mode or owner can't be changed.
+        """
+        if self._mode is None and self._dirMode is None and self._user is None and self._group is None :
+            return
+        resolved:list[str] = self.getResolveAction().listResolved(sourcePath, targetDir)
+        paths:list[str] = sorted(set(resolved) | {parent for path in resolved for parent in self._getParents(path, targetDir)})
+        if Dependency.permissionWorkers > 1 and len(paths) > 1 :
+            with ThreadPoolExecutor(min(Dependency.permissionWorkers, len(paths)), thread_name_prefix="permissions") as pool :
+                for _ in pool.map(self._applyPermissionsTo, paths) :  # raises the first failure
+                    pass
+        else :
+            for path in paths :
+                self._applyPermissionsTo(path)
+
+
+    def _applyPermissionsTo(self, path:str) :
+        """Gives a single resolved path (not what it holds, if it is a directory) the configured mode and owner."""
+        if not os.path.lexists(path) :
+            return
+        try :
+            if self._mode is not None or self._dirMode is not None :
+                file_util.chmod_recursive(path, self._mode, dirPermissions=self._getDirMode(), recursive=False)
+            if self._user is not None or self._group is not None :
+                file_util.chown_recursive(path, self._user, self._group, recursive=False)
+        except (OSError, LookupError) as exception :
+            raise ResolveError(f"Failed to set the mode or owner of {path} for dependency {self.getName()}: {exception}") from exception
+
+
+    def _getParents(self, path:str, targetDir:str) -> list[str] :
+        """Returns the directories between an extracted entry and the directory it was extracted into (which isn't included)."""
+        parents:list[str] = []
+        parent:str = os.path.dirname(path)
+        while file_util.isWithin(parent, targetDir) :
+            parents.append(parent)
+            parent = os.path.dirname(parent)
+        return parents
+
+
+    def _getDirMode(self) -> Optional[int] :
+        """Returns the permissions for resolved directories - the dir mode, or the file mode with execute (search) added wherever it allows reading."""
+        if self._dirMode is not None or self._mode is None :
+            return self._dirMode
+        return self._mode | ((self._mode & 0o444) >> 2)
+
+
+    def getResolveAction(self) -> ResolveAction :
         """
         Returns the resolve action for this dependency.
 
@@ -1,6 +1,8 @@
 import logging
+import os
+import time
 from enum import Enum
-from ..utilities import helpers, file_util, zip_util, tar_util
+from ..utilities import helpers, file_util, zip_util, tar_util, metrics_util, trace_util
 from ..configuration.attributes import ConfigAttributes
 from ..errors.errors import ResolveError
 
@@ -53,13 +55,47 @@ class ResolveAction(Enum) :
         """
         helpers.assertSet(_logger, "Cannot fetch - the source path was not specified.", sourcePath)
         helpers.assertSet(_logger, "Cannot fetch - the destination directory was not specified.", destinationDir)
-        match self :
-            case ResolveAction.COPY :
-                self._copy(sourcePath, destinationDir)
-            case ResolveAction.UNZIP:
-                self._unzip(sourcePath, destinationDir)
-            case ResolveAction.UNTAR:
-                self._untar(sourcePath, destinationDir)
+        started:float = time.perf_counter()
+        try :
+            with trace_util.span(self.value, "resolve", source=sourcePath, destination=destinationDir) :
+                match self :
+                    case ResolveAction.COPY :
+                        self._copy(sourcePath, destinationDir)
+                    case ResolveAction.UNZIP:
+                        self._unzip(sourcePath, destinationDir)
+                    case ResolveAction.UNTAR:
+                        self._untar(sourcePath, destinationDir)
+        except ResolveError :
+            metrics_util.ERRORS.increment(phase="resolve", type=self.value)
+            raise
+        metrics_util.RESOLVE_DURATION.observe(time.perf_counter() - started, action=self.value)
+
+
+    def listResolved(self, sourcePath:str, destinationDir:str) -> list[str] :
+        """
+        Lists what resolving the specified sourcePath file puts in place: the copy of it (each file and directory copied, for a directory), or each
+        entry the archive extracts. Entries that would land outside the destination dir are left out.
+
+        Parameters:
+            sourcePath - the absolute location of the source file
+            destinationDir - the absolute directory the source file is (or would be) resolved into.
+
+        Returns:
+            list[str]: the paths.
+
+        Raises:
+            ResolveError if the archive can't be read.
+        """
+        if self == ResolveAction.COPY and file_util.isDir(sourcePath) :  # its contents are copied into the destination dir.
+            return [os.path.join(destinationDir, os.path.relpath(os.path.join(directory, name), sourcePath)) for directory, directories, names in os.walk(sourcePath) for name in directories + names]
+        if self == ResolveAction.COPY :
+            return [file_util.buildPath(destinationDir, file_util.returnLastPartOfPath(sourcePath))]
+        try :
+            members:list[str] = zip_util.listMembers(sourcePath) if self == ResolveAction.UNZIP else tar_util.listMembers(sourcePath)
+        except (zip_util.ZipError, tar_util.TarError) as error :
+            raise ResolveError(f"Failed to list the entries of {sourcePath}") from error
+        paths:list[str] = [os.path.normpath(os.path.join(destinationDir, member)) for member in members]
+        return [path for path in paths if file_util.isWithin(path, destinationDir)]
 
 
     def _copy(self, sourcePath:str, destinationDir:str):
@@ -10,3 +10,19 @@ class FetchError(ProtocolError) :
 
 class ResolveError(ProjectError) :
     """Raised when resolving dependencies fails. Wraps underlying exceptions to make handling them easier for calling code."""
+
+
+class OrderError(ProjectError) :
+    """Raised when the dependencies cannot be ordered, for example their 'after' attributes form a cycle."""
+
+
+class ServerError(ProjectError) :
+    """Raised when the resolver cannot serve requests, for example another server is already listening on the socket."""
+
+
+class BundleError(ProjectError) :
+    """Raised when a cache bundle cannot be exported or imported, for example it is damaged or incomplete."""
+
+
+class LockError(ProjectError) :
+    """Raised when the lockfile cannot be used, for example it is missing or no longer matches the configuration."""
@@ -0,0 +1,88 @@
+import logging
+from typing import Any, Optional
+from ..configuration.attributes import ConfigAttributes
+from ..configuration.configuration import Configuration
+from ..utilities import helpers
+
+_logger:logging.Logger = logging.getLogger(__name__)
+
+
+# The differences between two versions of a project's configuration - the dependencies added, removed and changed (by name).
+# A dependency is changed if its own attributes changed, or the attributes of the source it is fetched from.
+class Changes :
+
+    # Top level attributes that change where every dependency is cached or resolved to.
+    _PROJECT_WIDE:tuple[str, ...] = (ConfigAttributes.PROJECT_NAME, ConfigAttributes.TARGET_ROOT, ConfigAttributes.CACHE_ROOT)
+
+
+    def __init__(self, previousConfiguration:Configuration, currentConfiguration:Configuration) :
+        """
+        Parameters:
+            previousConfiguration - the configuration before the change.
+            currentConfiguration - the configuration after the change.
+        """
+        previous:dict = previousConfiguration.getConfiguration()
+        current:dict = currentConfiguration.getConfiguration()
+        previousDependencies:dict[str, tuple[Optional[str], str]] = previousConfiguration.getDependencyFingerprints()  # compared by fingerprint, as they may be streamed.
+        currentDependencies:dict[str, tuple[Optional[str], str]] = currentConfiguration.getDependencyFingerprints()
+        previousSources:dict[str, dict] = self._byName(previous, ConfigAttributes.SOURCES, ConfigAttributes.SOURCE_NAME)
+        currentSources:dict[str, dict] = self._byName(current, ConfigAttributes.SOURCES, ConfigAttributes.SOURCE_NAME)
+        changedSources:set[str] = {name for name in currentSources if previousSources.get(name) != currentSources[name]}
+
+        self._everything:bool = any(helpers.getKey(previous, key) != helpers.getKey(current, key) for key in self._PROJECT_WIDE)
+        self._added:list[str] = [name for name in currentDependencies if name not in previousDependencies]
+        self._removed:list[str] = [name for name in previousDependencies if name not in currentDependencies]
+        self._changed:list[str] = []
+        self._refetched:list[str] = []
+        for name, (source, fingerprint) in currentDependencies.items() :
+            if name not in previousDependencies :
+                continue
+            sourceChanged:bool = source in changedSources
+            if sourceChanged or previousDependencies[name][1] != fingerprint :
+                self._changed.append(name)
+            if sourceChanged :
+                self._refetched.append(name)  # cached under the same name, but what it was fetched from has changed.
+
+
+    def getAdded(self) -> list[str] :
+        """Returns the names of the dependencies that are new."""
+        return self._added
+
+
+    def getRemoved(self) -> list[str] :
+        """Returns the names of the dependencies that have gone."""
+        return self._removed
+
+
+    def getChanged(self) -> list[str] :
+        """Returns the names of the dependencies whose attributes (or source) changed."""
+        return self._changed
+
+
+    def getRefetched(self) -> list[str] :
+        """Returns the names of the changed dependencies that must be fetched again, as their source changed."""
+        return self._refetched
+
+
+    def isEverything(self) -> bool :
+        """Returns True if the change affects every dependency (e.g. the project name or target root changed)."""
+        return self._everything
+
+
+    def isEmpty(self) -> bool :
+        """Returns True if nothing that matters changed."""
+        return not (self._everything or self._added or self._removed or self._changed)
+
+
+    def describe(self) -> str :
+        """Returns a one line summary of the changes."""
+        if self._everything :
+            return "the project's name, target root or cache root changed - everything will be resolved again"
+        return f"{len(self._added)} added, {len(self._removed)} removed, {len(self._changed)} changed"
+
+
+    @staticmethod
+    def _byName(config:dict, listKey:str, nameKey:str) -> dict[str, dict] :
+        """Returns the entries of a list in the configuration (e.g. the dependencies), keyed by their names."""
+        entries:Any = helpers.getKey(config, listKey) or []
+        return {helpers.getKey(entry, nameKey) : entry for entry in entries if isinstance(entry, dict)}
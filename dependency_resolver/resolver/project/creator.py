@@ -1,4 +1,5 @@
 import logging
+from typing import Optional
 from ..utilities import helpers
 from ..configuration.configuration import Configuration
 from ..configuration.attributes import ConfigAttributes
@@ -46,7 +47,7 @@ class Creator :
         Create a Source object from the given source dictionary.
 
         Args:
-            source (dict): The source dictionary containing attributes like name, protocol, base, type, and description.
+            source (dict): The source dictionary containing attributes like name, protocol, base, type, description and mirrors.
 
         Returns:
             Source: An instance of Source created from the provided attributes.
@@ -56,12 +57,14 @@ class Creator :
         base:str = helpers.getKey(source, ConfigAttributes.SOURCE_BASE)
         type:SourceType = SourceType.determine(helpers.getKey(source, ConfigAttributes.SOURCE_TYPE))
         description:str = helpers.getKey(source, ConfigAttributes.SOURCE_DESCRIPTION)
-        return Source(name, protocol, type=type, base=base, description=description)
+        mirrors:list[str] = helpers.getKey(source, ConfigAttributes.SOURCE_MIRRORS)
+        return Source(name, protocol, type=type, base=base, description=description, mirrors=mirrors)
 
 
     def createDependencies(self, sources:Sources) -> Dependencies :
         """
         Create the Dependencies as defined in the configuration.
+        Each Dependency is created as its configuration is read, so dependencies streamed from a large configuration are never all held as dictionaries.
 
         Args:
             sources (Sources): An instance of Sources containing all the sources defined in the configuration.
@@ -71,10 +74,8 @@ class Creator :
         """
         dependencies:Dependencies = self._createDependencies()
 
-        dependencyConfig:dict = helpers.getKey(self._getConfig(), ConfigAttributes.DEPENDENCIES)
-        if dependencyConfig is not None :
-            for dependency in dependencyConfig :
-                dependencies.addDependency(self._createDependency(dependency, sources))
+        for dependency in self._getConfiguration().iterateDependencies() :
+            dependencies.addDependency(self._createDependency(dependency, sources))
 
         return dependencies
 
@@ -89,7 +90,7 @@ class Creator :
         Create a Dependency object from the given dependency dictionary.
 
         Args:
-            dependency (dict): The dependency dictionary containing attributes like name, targetDir, targetName, targetRelativeRoot, source, sourcePath, resolveAction, description, and alwaysUpdate.
+            dependency (dict): The dependency dictionary containing attributes like name, targetDir, targetName, targetRelativeRoot, source, sourcePath, resolveAction, description, alwaysUpdate, tags, after and the target's mode and owner.
             sources (Sources): An instance of Sources to resolve the source dependency.
 
         Returns:
@@ -104,7 +105,12 @@ class Creator :
         action:ResolveAction = ResolveAction.determine(helpers.getKey(dependency, ConfigAttributes.RESOLVE_ACTION))
         description:str = helpers.getKey(dependency, ConfigAttributes.DEPENDENCY_DESCRIPTION)
         alwaysUpdate:bool = helpers.getKey(dependency, ConfigAttributes.DEPENDENCY_ALWAYS_UPDATE)
-        return Dependency(name=name, targetDir=targetDir, targetName=targetName, targetRelativeRoot=targetRelativeRoot, source=source, sourcePath=sourcePath, resolveAction=action, description=description, alwaysUpdate=alwaysUpdate)
+        tags:list[str] = helpers.getKey(dependency, ConfigAttributes.DEPENDENCY_TAGS)
+        after:list[str] = helpers.getKey(dependency, ConfigAttributes.DEPENDENCY_AFTER)
+        mode:Optional[int] = helpers.parseMode(helpers.getKey(dependency, ConfigAttributes.DEPENDENCY_TARGET_MODE))
+        dirMode:Optional[int] = helpers.parseMode(helpers.getKey(dependency, ConfigAttributes.DEPENDENCY_TARGET_DIR_MODE))
+        user, group = helpers.parseOwner(helpers.getKey(dependency, ConfigAttributes.DEPENDENCY_TARGET_OWNER))
+        return Dependency(name=name, targetDir=targetDir, targetName=targetName, targetRelativeRoot=targetRelativeRoot, source=source, sourcePath=sourcePath, resolveAction=action, description=description, alwaysUpdate=alwaysUpdate, tags=tags, after=after, mode=mode, dirMode=dirMode, user=user, group=group)
 
 
     def _getConfiguration(self) -> Configuration :
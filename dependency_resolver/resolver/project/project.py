@@ -1,14 +1,29 @@
+import contextlib
+import functools
 import logging
-from typing import Optional
+import os
+import time
+from typing import Any, Iterator, Optional
+from urllib.parse import urlsplit
+from .changes import Changes
 from .creator import Creator
-from ..utilities import helpers, file_util
-from ..errors.errors import FetchError, ResolveError
+from ..utilities import helpers, file_util, https_util, trace_util
+from ..errors.errors import LockError, OrderError, ResolveError
+from ..utilities.errors_util import ProjectError
 from ..configuration.configuration import Configuration
 from ..configuration.attributes import ConfigAttributes
 from ..sources.sources import Sources
 from ..dependencies.dependencies import Dependencies
 from ..dependencies.dependency import Dependency
+from ..dependencies.resolveAction import ResolveAction
 from ..cache.cache import Cache
+from ..cache.lock import Lock
+from ..cache.remote import RemoteCache
+from ..report.plan import Plan
+from ..report.report import Report
+from ..scheduler.engine import FetchEngine
+from ..scheduler.scheduler import Scheduler
+from ..scheduler.task import Task
 
 _logger:logging.Logger = logging.getLogger(__name__)
 
@@ -29,6 +44,10 @@ class Project :
             exit(1)
         self._config:Configuration = configuration
         self._creator:Creator = Creator(self._getConfiguration())
+        self._fetchJobs:int = 1
+        self._resolveJobs:int = 1
+        self._fetchEngine:FetchEngine = FetchEngine.THREADS
+        self._report:Optional[Report] = None
         self._parseConfig()
 
 
@@ -58,6 +77,92 @@ class Project :
             print(file_util.buildPath(self._determineTargetRoot(dependency), dependency.getTargetPath()))
 
 
+    def selectDependencies(self, only:Optional[list[str]] = None, exclude:Optional[list[str]] = None) :
+        """
+        Restricts this project to a subset of its dependencies. Subsequent fetches and resolves only work on the selected dependencies,
+        so only the sources they require are fetched. Replaces any earlier selection, so a (long-lived) project can be reused for different selections.
+
+        Parameters:
+            only - names, tags or globs of the dependencies to keep. If not specified, all dependencies are kept.
+            exclude - names, tags or globs of the dependencies to drop.
+        """
+        self._dependencies = self._allDependencies
+        if only or exclude :
+            self._dependencies = self._allDependencies.select(only=only, exclude=exclude)
+            _logger.debug(f"Selected {len(self._getDependencies().getDependencies())} dependencies (only = {only}, exclude = {exclude})")
+
+
+    def lockDependencies(self, lock:Lock, alwaysFetch:bool = False) :
+        """
+        Fetches the sources of the (selected) dependencies, then records exactly what was fetched for each in the lockfile.
+        Dependencies that are no longer in the configuration are dropped from the lockfile; those not selected are left as they were locked.
+
+        Parameters:
+            lock - the lock to record the sources in (and write).
+            alwaysFetch - fetch the sources even if they are already in the cache.
+        """
+        https_util.recordResponses(True)  # so https sources are locked to the response they were downloaded from.
+        try :
+            self.fetchDependencies(alwaysFetch=alwaysFetch)
+            locked:int = 0
+            for dependency in self._getDependencies().getDependencies() :
+                path:str = self._getCache().getCacheDownloadPath(dependency)
+                if file_util.exists(path) :
+                    lock.record(dependency, path)
+                    locked += 1
+                else :
+                    print(f"Not locking {dependency.getName()} - its source could not be fetched.")
+        finally :
+            https_util.recordResponses(False)
+        lock.retain({dependency.getName() for dependency in self._allDependencies.getDependencies()})
+        lock.write()
+        print(f"Locked {locked} dependencies in {lock.getPath()}")
+
+
+    def setLock(self, lock:Optional[Lock]) :
+        """
+        Sets the lock the (selected) dependencies' sources must match (see Cache.setLock). The cache must be set first.
+
+        Parameters:
+            lock - the lock, or None to fetch as usual.
+
+        Raises:
+            LockError if the lock doesn't cover every selected dependency, as it is now configured.
+        """
+        if lock is not None :
+            stale:list[str] = lock.findStale(self._getDependencies().getDependencies())
+            if stale :
+                raise LockError(f"The lockfile {lock.getPath()} is out of date - run the lock command: {', '.join(stale)}")
+        self._getCache().setLock(lock)
+
+
+    def exportCache(self, output:str) :
+        """
+        Packs the cached sources of the (selected) dependencies into a bundle, to seed the cache of another machine with (see importCache).
+        The sources must have been fetched first.
+
+        Parameters:
+            output - the bundle to write (gzipped if it ends in .gz or .tgz, stdout if "-").
+        """
+        files, size = self._getCache().exportBundle(self._getDependencies().getDependencies(), output)
+        if output != "-" :  # stdout is the bundle.
+            print(f"Exported {files} cached files ({size} bytes) to {output}")
+
+
+    def importCache(self, input:str) :
+        """
+        Unpacks a bundle written by exportCache into this project's cache, so its sources don't need fetching.
+
+        Parameters:
+            input - the bundle to read (stdin if "-").
+
+        Raises:
+            BundleError if the bundle is damaged or incomplete.
+        """
+        files, size = self._getCache().importBundle(input)
+        print(f"Imported {files} cached files ({size} bytes) from {input}")
+
+
     def _determineTargetRoot(self, dependency:Dependency) -> str :
         """
         Returns the root target of the dependency.
@@ -66,6 +171,38 @@ class Project :
         return self._getTargetRoot() if dependency.isTargetRelativeToRoot() else self._getConfiguration().getConfigurationHome()
 
 
+    def setJobs(self, fetchJobs:int, resolveJobs:int) :
+        """
+        Sets how many fetches and resolves can run at the same time.
+
+        Parameters:
+            fetchJobs - the maximum number of sources fetched at the same time.
+            resolveJobs - the maximum number of dependencies resolved at the same time.
+        """
+        self._fetchJobs = fetchJobs
+        self._resolveJobs = resolveJobs
+
+
+    def setFetchEngine(self, engine:FetchEngine) :
+        """
+        Sets how sources are fetched - on a pool of threads or as coroutines in a single event loop.
+
+        Parameters:
+            engine - the fetch engine to use.
+        """
+        self._fetchEngine = engine
+
+
+    def setReport(self, report:Optional[Report]) :
+        """
+        Sets a report to record the time taken (and bytes moved) by each fetch and resolve in.
+
+        Parameters:
+            report - the report to record into, or None to stop recording.
+        """
+        self._report = report
+
+
     def fetchDependencies(self, alwaysFetch:bool = False) :
         """
         Fetch the sources of all the dependencies.
@@ -76,25 +213,8 @@ class Project :
         helpers.assertSet(_logger, "fetchDependencies:::Cache has not been configured - use setCache to set the cache for this project", self._getCache())
 
         _logger.debug(f"Fetching all dependencies (force download = {alwaysFetch})")
-
-        # A map of dependencies already downloaded this fetch
-        alreadyDownloaded:list[str] = []
-
         print(f"Fetching {len(self._getDependencies().getDependencies())} dependencies:")
-        count:int = 0
-        for dependency in self._getDependencies().getDependencies() :
-            count += 1
-            if not self._hasBeenDownloaded(alreadyDownloaded, dependency) :
-                print(f"{count}-{dependency.getName()} : Fetching...")
-                try :
-                    self._fetchDependency(dependency, alwaysFetch)
-                    self._addDownloaded(alreadyDownloaded, dependency)
-                    print(f"{count}-{dependency.getName()} : Fetched.")
-                except FetchError as error:
-                    print(f"{count}-{dependency.getName()} : Failed :: {error}.")
-            else :
-                print(f"{count}-{dependency.getName()} : Already fetched.")
-
+        self._schedule(fetch=True, resolve=False, alwaysFetch=alwaysFetch)
         _logger.debug("...fetched dependencies.")
 
 
@@ -108,9 +228,26 @@ class Project :
         Raises:
             FetchError if an error is encountered during the fetch
         """
-        _logger.debug(f"Fetching dependency {dependency.getName()} (force download = {alwaysFetch})")
-        self._getCache().fetchDependency(dependency, alwaysFetch)
-        _logger.debug(f"...fetched dependency {dependency.getName()}.")
+        _logger.debug("Fetching dependency %s (force download = %s)", dependency.getName(), alwaysFetch)
+        with self._measure(dependency, Report.FETCH) as measurement :
+            measurement["cacheHit"] = not self._getCache().fetchDependency(dependency, alwaysFetch)
+        _logger.debug("...fetched dependency %s.", dependency.getName())
+
+
+    async def _fetchDependencyAsync(self, dependency:Dependency, alwaysFetch:bool = False) :
+        """
+        Fetch the source of specified dependency, without blocking the running event loop.
+
+        Parameters:
+            alwaysFetch - Fetch the dependency source even if it is already in the cache.
+
+        Raises:
+            FetchError if an error is encountered during the fetch
+        """
+        _logger.debug("Fetching dependency %s (force download = %s, async)", dependency.getName(), alwaysFetch)
+        with self._measure(dependency, Report.FETCH) as measurement :
+            measurement["cacheHit"] = not await self._getCache().fetchDependencyAsync(dependency, alwaysFetch)
+        _logger.debug("...fetched dependency %s.", dependency.getName())
 
 
     def resolveFetchedDependencies(self, onlyMissing:bool = False) :
@@ -123,18 +260,8 @@ class Project :
         helpers.assertSet(_logger, "resolveFetchedDependencies:::Cache has not been configured - use setCache to set the cache for this project", self._getCache())
 
         _logger.debug(f"Resolving all dependencies (only missing = {onlyMissing})")
-
         print(f"Resolving {len(self._getDependencies().getDependencies())} dependencies:")
-        count:int = 0
-        for dependency in self._getDependencies().getDependencies() :
-            count += 1
-            print(f"{count}-{dependency.getName()} : Resolving...")
-            try :
-                self._resolveDependency(dependency, onlyMissing)
-                print(f"{count}-{dependency.getName()} : Resolved.")
-            except ResolveError as error:
-                print(f"{count}-{dependency.getName()} : Failed :: {error}.")
-
+        self._schedule(fetch=False, resolve=True, onlyMissing=onlyMissing)
         _logger.debug("...resolved dependencies.")
 
 
@@ -148,14 +275,17 @@ class Project :
         Raises:
             ResolveError if an error is encountered during the resolve action
         """
-        _logger.debug(f"Resolving dependency {dependency.getName()} (only missing = {onlyMissing})")
-        self._getCache().resolveDependency(dependency, self._determineTargetRoot(dependency), onlyMissing)
-        _logger.debug(f"...resolved dependency {dependency.getName()}.")
+        _logger.debug("Resolving dependency %s (only missing = %s)", dependency.getName(), onlyMissing)
+        with self._measure(dependency, Report.RESOLVE) :
+            self._getCache().resolveDependency(dependency, self._determineTargetRoot(dependency), onlyMissing)
+        _logger.debug("...resolved dependency %s.", dependency.getName())
 
 
     def resolveDependencies(self, alwaysFetch:bool = False, onlyMissing:bool = False) :
         """
         Resolve all dependencies. Fetch any sources prior to resolving them.
+        Each dependency is resolved as soon as its own source has been fetched (and the dependencies it must come after have been resolved),
+        so fetching and resolving overlap.
 
         Parameters:
             onlyMissing - Only resolve those sources that are missing at the target location. Note actions that are not file copies (e.g. unzipping) are always resolved.
@@ -163,18 +293,303 @@ class Project :
         helpers.assertSet(_logger, "resolveDependencies:::Cache has not been configured - use setCache to set the cache for this project", self._getCache())
 
         _logger.debug(f"Fetching and resolving dependencies (force download = {alwaysFetch})")
-        self.fetchDependencies(alwaysFetch)
-        self.resolveFetchedDependencies(onlyMissing)
+        print(f"Fetching and resolving {len(self._getDependencies().getDependencies())} dependencies:")
+        self._schedule(fetch=True, resolve=True, alwaysFetch=alwaysFetch, onlyMissing=onlyMissing)
         _logger.debug("...fetched and resolved dependencies.")
 
 
-    def clean(self) :
+    def resolveChanges(self, previous:"Project") -> Changes :
+        """
+        Brings the targets of a previously resolved version of this project up to date with this one, by only working on what changed:
+        the targets of removed dependencies (and the old targets of changed ones) are deleted, then the added and changed dependencies are fetched and resolved.
+        Only the selected dependencies (see selectDependencies) of each version are considered.
+
+        Parameters:
+            previous - the project as it was configured (and resolved) before the change.
+
+        Returns:
+            Changes: what changed between the two versions.
+        """
+        changes:Changes = Changes(previous._getConfiguration(), self._getConfiguration())
+        _logger.debug(f"Resolving the changes to {self.getProjectName()}: {changes.describe()}")
+        print(f"The configuration changed: {changes.describe()}.")
+        if changes.isEverything() :
+            self.resolveDependencies()
+            return changes
+
+        for name in changes.getRemoved() + changes.getChanged() :
+            dependency:Optional[Dependency] = previous._getDependencies().getDependency(name)
+            if dependency is not None :
+                previous._removeTarget(dependency, keep=self)
+
+        selected:Dependencies = self._getDependencies()
+        try :
+            for names, alwaysFetch in ((changes.getRefetched(), True), ([name for name in changes.getAdded() + changes.getChanged() if name not in changes.getRefetched()], False)) :
+                self._dependencies = Dependencies()
+                for name in names :
+                    dependency = selected.getDependency(name)
+                    if dependency is not None :
+                        self._dependencies.addDependency(dependency)
+                if self._dependencies.getDependencies() :
+                    self.resolveDependencies(alwaysFetch=alwaysFetch)
+        finally :
+            self._dependencies = selected
+        return changes
+
+
+    def _removeTarget(self, dependency:Dependency, keep:"Project") :
+        """
+        Deletes what resolving a dependency put in place: the copied file (or directory), or the entries an archive extracted - found by listing the
+        cached archive, so anything else in the directory it was extracted into is left alone (as are the directories left holding it).
+        Nothing is deleted that holds the configuration (or target root), or the target of another dependency of the project being kept.
+
+        Parameters:
+            dependency - the dependency (of this project) whose target is no longer wanted.
+            keep - the project whose targets must be left alone. A dependency of the same name is about to be resolved again, so its target isn't kept.
+        """
+        targets:Optional[list[str]] = self._getResolvedPaths(dependency)
+        if targets is None :
+            _logger.info("Leaving the target of %s (%s) - its archive is no longer cached, so what it extracted is unknown.", dependency.getName(), self._getResolvedPath(dependency))
+            return
+        protected:list[str] = [self._getConfiguration().getConfigurationHome(), self._getTargetRoot()]
+        for other in keep._getDependencies().getDependencies() :
+            if other.getName() != dependency.getName() :
+                protected.extend(keep._getResolvedPaths(other) or [keep._getResolvedPath(other)])  # all of an unlisted archive's directory is kept.
+
+        extracted:bool = dependency.getResolveAction() != ResolveAction.COPY
+        removed:bool = False
+        for target in targets :
+            if not os.path.lexists(target) or extracted and os.path.isdir(target) and not os.path.islink(target) :
+                continue  # an archive's directories are only removed once empty, below.
+            if any(os.path.abspath(path) == os.path.abspath(target) or file_util.isWithin(path, target) for path in protected) :
+                _logger.info(f"Leaving {target} (the target of {dependency.getName()}) - it is still needed.")
+                continue
+            _logger.debug("Removing %s (the target of %s)", target, dependency.getName())
+            file_util.delete(target)
+            removed = True
+        if extracted :
+            self._removeEmptyDirectories(dependency, targets, protected)
+        if removed :
+            print(f"Removed the target of {dependency.getName()} ({self._getResolvedPath(dependency)}).")
+
+
+    def _removeEmptyDirectories(self, dependency:Dependency, targets:list[str], protected:list[str]) :
+        """Removes the directories extracting an archive created (or used) that are left empty, deepest first - ending with the directory it was extracted into."""
+        targetDir:str = os.path.abspath(self._getResolvedPath(dependency))
+        directories:set[str] = {targetDir}
+        for target in targets :
+            parent:str = os.path.abspath(target)
+            while file_util.isWithin(parent, targetDir) :
+                directories.add(parent)
+                parent = os.path.dirname(parent)
+        protectedPaths:set[str] = {os.path.abspath(path) for path in protected}
+        for directory in sorted(directories, key=lambda path : path.count(os.sep), reverse=True) :
+            if directory not in protectedPaths and file_util.isDir(directory) and not os.path.islink(directory) and not os.listdir(directory) :
+                os.rmdir(directory)
+
+
+    def _getResolvedPath(self, dependency:Dependency) -> str :
+        """Returns the path resolving the dependency puts in place: the copy of its source, or the directory its archive is extracted into."""
+        targetDir:str = file_util.buildPath(self._determineTargetRoot(dependency), dependency.getTargetDirectory())
+        if dependency.getResolveAction() == ResolveAction.COPY :
+            return file_util.buildPath(targetDir, file_util.returnLastPartOfPath(self._getCache().getCacheDownloadPath(dependency)))
+        return targetDir
+
+
+    def _getResolvedPaths(self, dependency:Dependency) -> Optional[list[str]] :
+        """
+        Returns the paths resolving the dependency puts in place: the copy of its source, or each entry its archive extracts (listed from the cached archive).
+        Entries that would land outside the directory the archive is extracted into are left out.
+
+        Returns:
+            Optional[list[str]]: the paths, or None if the dependency is extracted from an archive that isn't cached (or can't be read).
+        """
+        targetDir:str = self._getResolvedPath(dependency)
+        if dependency.getResolveAction() == ResolveAction.COPY :
+            return [targetDir]
+        archive:str = self._getCache().getCacheDownloadPath(dependency)
+        if not file_util.isFile(archive) :
+            return None
+        try :
+            return dependency.getResolveAction().listResolved(archive, targetDir)
+        except ResolveError :
+            return None
+
+
+    def planDependencies(self, fetch:bool, resolve:bool, alwaysFetch:bool = False, probeSizes:bool = False) -> Plan :
+        """
+        Works out the work a run would do, without doing any of it (a dry run): which sources are cache hits and which would be fetched,
+        which targets would be resolved for the first time or redone, and the bytes that would be moved.
+
+        Parameters:
+            fetch - plan fetching the sources.
+            resolve - plan resolving the dependencies.
+            alwaysFetch - the run fetches the sources even if they are already in the cache.
+            probeSizes - ask https servers the size of the sources that would be fetched (a HEAD request each). Otherwise nothing touches the network,
+                         and only the size of filesystem sources is known.
+
+        Returns:
+            Plan: the work the run would do.
+        """
+        plan:Plan = Plan()
+        fetchedBy:dict[str, str] = {}  # dependencies cached to the same place share a single fetch.
+        for dependency in self._getDependencies().getDependencies() :
+            cachePath:str = self._getCache().getCacheDownloadPath(dependency)
+            reason:Optional[str] = self._getCache().getFetchReason(dependency, alwaysFetch)
+            size:Optional[int] = file_util.getTreeSize(cachePath) if reason is None else self._getExpectedSize(dependency, probeSizes)
+            action:Optional[str] = None
+            if fetch and cachePath in fetchedBy :
+                action, reason = Plan.SHARED, f"with {fetchedBy[cachePath]}"
+            elif fetch :
+                action = Plan.HIT if reason is None else Plan.FETCH
+                fetchedBy[cachePath] = dependency.getName()
+            resolution:Optional[str] = None
+            if resolve :
+                if not fetch and not file_util.exists(cachePath) :
+                    resolution = Plan.UNAVAILABLE
+                else :
+                    resolution = Plan.REDO if file_util.exists(self._getResolvedPath(dependency)) else Plan.NEW
+            plan.add(dependency.getName(), dependency.getSource().getName(), urlsplit(dependency.getAbsoluteSourcePath()).netloc or "filesystem",
+                     fetch=action, reason=reason if action is not None else None, fetchBytes=size if action is not None else None,
+                     resolve=resolution, resolveBytes=size if resolution is not None else None)
+        return plan
+
+
+    def _getExpectedSize(self, dependency:Dependency, probeSizes:bool) -> Optional[int] :
+        """Returns the size a dependency's source would be fetched as: the size of a filesystem source, or of an https source if probing (None if not known)."""
+        source:str = dependency.getAbsoluteSourcePath()
+        if dependency.getSource().getProtocolName() == ConfigAttributes.PROTOCOL_FS :
+            return file_util.getTreeSize(source) if file_util.exists(source) else None
+        if probeSizes :
+            try :
+                _, headers = https_util.head(source)
+                length:str = headers.get("Content-Length", "")
+                return int(length) if length.isdigit() else None
+            except https_util.HttpError as error :
+                _logger.warning(f"Unable to get the size of {source}: {error}")
+        return None
+
+
+    def _schedule(self, fetch:bool, resolve:bool, alwaysFetch:bool = False, onlyMissing:bool = False) :
+        """
+        Runs the fetches and/or resolves of all the dependencies through the Scheduler.
+
+        Parameters:
+            fetch - fetch the sources of the dependencies.
+            resolve - resolve the dependencies.
+            alwaysFetch - Fetch the dependency source even if it is already in the cache.
+            onlyMissing - Only resolve those sources that are missing at the target location.
+        """
+        try :
+            Scheduler(fetchJobs=self._fetchJobs, resolveJobs=self._resolveJobs, engine=self._fetchEngine).run(self._createTasks(fetch, resolve, alwaysFetch, onlyMissing))
+        except OrderError as error :
+            print(f"Unable to order the dependencies :: {error}")
+            _logger.error(f"Unable to order the dependencies: {error}")
+            exit(1)
+
+
+    @contextlib.contextmanager
+    def _measure(self, dependency:Dependency, phase:str) -> Iterator[dict[str, Any]] :
+        """
+        Measures the fetch or resolve of a dependency carried out in the with block, and records it in the report (if there is one) and the trace (if one is being recorded).
+        The block can add details to the yielded dictionary (e.g. cacheHit).
+
+        Parameters:
+            dependency - the dependency being fetched or resolved.
+            phase - Report.FETCH or Report.RESOLVE.
+        """
+        details:dict[str, Any] = {}
+        error:Optional[str] = None
+        started:float = time.perf_counter()
+        try :
+            with trace_util.span(dependency.getName(), phase) :
+                yield details
+        except ProjectError as failed :
+            error = str(failed)
+            raise
+        finally :
+            if self._report is not None :
+                seconds:float = time.perf_counter() - started
+                cacheHit:Optional[bool] = details.get("cacheHit")
+                transferred:int = 0
+                if error is None and not cacheHit :
+                    transferred = file_util.getSize(self._getCache().getCacheDownloadPath(dependency))  # what was transferred, or what was resolved from.
+                location:str = urlsplit(dependency.getAbsoluteSourcePath()).netloc or "filesystem"
+                action:Optional[str] = dependency.getResolveAction().value if phase == Report.RESOLVE else None
+                self._report.record(dependency.getName(), phase, seconds, transferred, source=dependency.getSource().getName(), location=location, action=action, cacheHit=cacheHit, error=error)
+
+
+    def _createTasks(self, fetch:bool, resolve:bool, alwaysFetch:bool, onlyMissing:bool) -> list[Task] :
+        """Creates a scheduler Task for each dependency. Dependencies that are cached to the same place share a single fetch."""
+        fetchDependency = self._fetchDependencyAsync if self._fetchEngine == FetchEngine.ASYNCIO else self._fetchDependency
+        tasks:list[Task] = []
+        for dependency in self._getDependencies().getDependencies() :
+            tasks.append(Task(name=dependency.getName(),
+                              fetch=functools.partial(fetchDependency, dependency, alwaysFetch) if fetch else None,
+                              fetchKey=self._getCache().getCacheDownloadPath(dependency),
+                              resolve=functools.partial(self._resolveDependency, dependency, onlyMissing) if resolve else None,
+                              after=dependency.getAfter()))
+        return tasks
+
+
+    def createWorkspaceTasks(self, alwaysFetch:bool, fetched:dict[str, str]) -> list[Task] :
+        """
+        Creates a scheduler Task to fetch and resolve each dependency as part of a workspace - many projects run through one Scheduler.
+        Tasks are named (and ordered) within this project, and a source is fetched once for the whole workspace: the first project to need it
+        fetches it into its own cache, and the others share what was fetched (see Cache.shareSource) before resolving.
+
+        Parameters:
+            alwaysFetch - Fetch the dependency source even if it is already in the cache.
+            fetched - the cache path each source (by its url) is fetched to by the workspace so far. Sources this project fetches are added.
+        """
+        helpers.assertSet(_logger, "createWorkspaceTasks:::Cache has not been configured - use setCache to set the cache for this project", self._getCache())
+        fetchDependency = self._fetchDependencyAsync if self._fetchEngine == FetchEngine.ASYNCIO else self._fetchDependency
+        tasks:list[Task] = []
+        for dependency in self._getDependencies().getDependencies() :
+            source:str = dependency.getAbsoluteSourcePath()
+            cachePath:str = self._getCache().getCacheDownloadPath(dependency)
+            fetchedTo:str = fetched.setdefault(source, cachePath)
+            if fetchedTo == cachePath :
+                resolve = functools.partial(self._resolveDependency, dependency)
+            else :
+                resolve = functools.partial(self._resolveSharedDependency, dependency, fetchedTo)
+            tasks.append(Task(name=self._getWorkspaceTaskName(dependency.getName()),
+                              fetch=functools.partial(fetchDependency, dependency, alwaysFetch),
+                              fetchKey=source,
+                              resolve=resolve,
+                              after=[self._getWorkspaceTaskName(name) for name in dependency.getAfter()]))
+        return tasks
+
+
+    def _getWorkspaceTaskName(self, name:str) -> str :
+        """Returns the name of the workspace task of a dependency - unique across the projects of the workspace."""
+        return f"{self.getProjectName()}/{name}"
+
+
+    def _resolveSharedDependency(self, dependency:Dependency, fetched:str) :
+        """
+        Resolve a dependency whose source was fetched into another project's cache, by first sharing it into this project's cache.
+
+        Parameters:
+            fetched - the source, as fetched into the other project's cache.
+
+        Raises:
+            FetchError if the source can't be shared, or ResolveError if an error is encountered during the resolve action
+        """
+        self._getCache().shareSource(dependency, fetched)
+        self._resolveDependency(dependency)
+
+
+    def clean(self, instant:bool = False) :
         """
         Cleans the cache and logs for this project.
         This will delete the cache and log files.
+
+        Parameters:
+            instant - move the cache aside and delete it in the background, rather than waiting for it to be deleted.
         """
         _logger.debug(f"Cleaning project {self.getProjectName()}")
-        self._getCache().clean()
+        self._getCache().clean(instant=instant)
         _logger.debug(f"...cleaned project {self.getProjectName()}")
 
 
@@ -183,8 +598,12 @@ class Project :
         config:dict = self._getConfiguration().getConfiguration()
         self._parseProjectName(config)
         self._parseTargetRoot(config)
+        self._parseBandwidthLimits(config)
+        self._remoteCacheUrl:Optional[str] = helpers.getKey(config, ConfigAttributes.REMOTE_CACHE)
         self._sources:Sources = self._creator.createSources()
-        self._dependencies:Dependencies = self._creator.createDependencies(self._getSources())
+        self._allDependencies:Dependencies = self._creator.createDependencies(self._getSources())
+        self._getConfiguration().releaseDependencies()  # built, so the configured dependencies needn't be held too.
+        self._dependencies:Dependencies = self._allDependencies
 
 
     def _parseProjectName(self, config:dict) :
@@ -198,6 +617,37 @@ class Project :
         self._targetRoot:str = helpers.getKey(config, ConfigAttributes.TARGET_ROOT)
 
 
+    def _parseBandwidthLimits(self, config:dict) :
+        """Parses the (optional) bandwidth limits for this project from the configuration."""
+        self._bandwidthLimit:Optional[float] = helpers.parseSize(helpers.getKey(config, ConfigAttributes.BANDWIDTH_LIMIT))
+        self._hostBandwidthLimit:Optional[float] = helpers.parseSize(helpers.getKey(config, ConfigAttributes.HOST_BANDWIDTH_LIMIT))
+
+
+    def getBandwidthLimits(self) -> tuple[Optional[float], Optional[float]] :
+        """Returns the bytes per second fetches may use in total, and from each host, as configured (None is unlimited)."""
+        return self._bandwidthLimit, self._hostBandwidthLimit
+
+
+    def getRemoteCacheUrl(self) -> Optional[str] :
+        """Returns the url of the remote cache server shared by this project's machines, as configured (None if there isn't one)."""
+        return self._remoteCacheUrl
+
+
+    def setRemoteCache(self, remote:Optional[RemoteCache]) :
+        """
+        Sets a remote cache to look for sources in before fetching them from their origin (see Cache.setRemote). The cache must be set first.
+
+        Parameters:
+            remote - the remote cache, or None to not use one.
+        """
+        self._getCache().setRemote(remote)
+
+
+    def getConfigurationFiles(self) -> dict[str, Optional[bytes]] :
+        """Returns the files the configuration was loaded from, with a digest of each as it was loaded (see Configuration.getFiles)."""
+        return self._getConfiguration().getFiles()
+
+
     def _getConfiguration(self) -> Configuration :
         """Returns the Configuration."""
         return self._config
@@ -223,12 +673,3 @@ class Project :
         helpers.assertSet(_logger, "_getCache:::Cache has not been configured - use setCache to set the cache for this project", self._cache)
         return self._cache
 
-
-    def _addDownloaded(self, alreadyDownloaded:list[str], dependency:Dependency) :
-        """Remember we have already downloaded this source target."""
-        alreadyDownloaded.append(dependency.getAbsoluteSourcePath())
-
-
-    def _hasBeenDownloaded(self, alreadyDownloaded:list[str], dependency:Dependency) :
-        """Checks to we if we have already downloaded this source target."""
-        return dependency.getAbsoluteSourcePath() in alreadyDownloaded
@@ -0,0 +1,137 @@
+import json
+import logging
+from typing import Any
+from .project import Project
+from ..errors.errors import OrderError
+from ..report.report import Report, formatBytes, printTable
+from ..scheduler.engine import FetchEngine
+from ..scheduler.scheduler import Scheduler
+from ..scheduler.task import Task, TaskStatus
+from ..utilities import file_util
+from ..utilities.errors_util import ProjectError
+
+_logger:logging.Logger = logging.getLogger(__name__)
+
+
+# Many projects (configurations) fetched and resolved in one run: their dependencies are merged into one plan, run through one fetch pool and
+# one resolve pool, and a source needed by more than one project is fetched once and shared. Each project still gets its own report.
+class Workspace :
+
+    def __init__(self, projects:list[Project]) :
+        """
+        Parameters:
+            projects - the projects of the workspace, each with its cache set. Their names must be unique.
+
+        Raises:
+            ProjectError if two projects have the same name.
+        """
+        names:list[str] = [project.getProjectName() for project in projects]
+        duplicates:list[str] = sorted({name for name in names if names.count(name) > 1})
+        if duplicates :
+            raise ProjectError(f"The projects of a workspace must have different names - more than one is called {', '.join(duplicates)}.")
+        self._projects:list[Project] = projects
+        self._fetchJobs:int = 1
+        self._resolveJobs:int = 1
+        self._fetchEngine:FetchEngine = FetchEngine.THREADS
+        self._reports:dict[str, Report] = {}
+        self._tasks:dict[str, list[Task]] = {}
+        self._outcomes:dict[str, dict[str, int]] = {}
+
+
+    def setJobs(self, fetchJobs:int, resolveJobs:int) :
+        """
+        Sets how many fetches and resolves (across every project) can run at the same time.
+
+        Parameters:
+            fetchJobs - the maximum number of sources fetched at the same time.
+            resolveJobs - the maximum number of dependencies resolved at the same time.
+        """
+        self._fetchJobs = fetchJobs
+        self._resolveJobs = resolveJobs
+
+
+    def setFetchEngine(self, engine:FetchEngine) :
+        """
+        Sets how sources are fetched - on a pool of threads or as coroutines in a single event loop.
+
+        Parameters:
+            engine - the fetch engine to use.
+        """
+        self._fetchEngine = engine
+        for project in self._projects :
+            project.setFetchEngine(engine)
+
+
+    def resolveDependencies(self, alwaysFetch:bool = False) :
+        """
+        Fetch and resolve the dependencies of every project. Each source is fetched once, however many projects (or dependencies) need it.
+
+        Parameters:
+            alwaysFetch - Fetch the dependency sources even if they are already in the cache.
+        """
+        fetched:dict[str, str] = {}  # the url of each source -> the cache path it is fetched to.
+        tasks:list[Task] = []
+        for project in self._projects :
+            self._reports[project.getProjectName()] = Report()
+            project.setReport(self._reports[project.getProjectName()])
+            self._tasks[project.getProjectName()] = project.createWorkspaceTasks(alwaysFetch, fetched)
+            tasks.extend(self._tasks[project.getProjectName()])
+
+        print(f"Fetching and resolving {len(tasks)} dependencies of {len(self._projects)} projects ({len(fetched)} sources):")
+        try :
+            Scheduler(fetchJobs=self._fetchJobs, resolveJobs=self._resolveJobs, engine=self._fetchEngine).run(tasks)
+        except OrderError as error :
+            print(f"Unable to order the dependencies :: {error}")
+            _logger.error(f"Unable to order the dependencies: {error}")
+            exit(1)
+        finally :
+            for name, report in self._reports.items() :
+                report.finish()
+                self._outcomes[name] = {
+                    "sharedFetches" : sum(1 for task in self._tasks[name] if task.getFetchStatus() == TaskStatus.SHARED),
+                    "failedDependencies" : sum(1 for task in self._tasks[name] if task.hasFailed()),  # including those failed by another project's fetch.
+                }
+
+
+    def getReports(self) -> dict[str, Report] :
+        """Returns the report of each project (by name) from the last run."""
+        return dict(self._reports)
+
+
+    def toDict(self) -> dict[str, Any] :
+        """
+        Returns the reports as a JSON serializable dictionary: each project's report, plus how many of its sources were fetched by another task
+        and how many of its dependencies failed.
+
+        Returns:
+            dict[str, Any]: the reports, by project name.
+        """
+        return {name : {**report.toDict(), **self._outcomes.get(name, {})} for name, report in self._reports.items()}
+
+
+    def writeJson(self, path:str) :
+        """
+        Writes the reports to a JSON file.
+
+        Args:
+            path (str): the path of the file to write (its directory is created if needed).
+        """
+        file_util.mkdir(file_util.getParentDirectory(path), mode=0o755)
+        with open(path, "w") as reportFile :
+            json.dump(self.toDict(), reportFile, indent=2)
+        _logger.debug(f"Wrote workspace report to {path}")
+
+
+    def printSummary(self) :
+        """Prints a summary table with a row for each project, then the totals."""
+        rows:list[list[str]] = [["Project", "Fetched", "Shared", "Cache hits", "Resolved", "Failed", "Bytes fetched", "Bytes resolved"]]
+        totals:list[int] = [0] * 7
+        for name, report in self.toDict().items() :
+            fetch:dict[str, Any] = report["phases"][Report.FETCH]
+            resolve:dict[str, Any] = report["phases"][Report.RESOLVE]
+            counts:list[int] = [fetch["count"] - fetch["cacheHits"] - fetch["failed"], report["sharedFetches"], fetch["cacheHits"], resolve["count"] - resolve["failed"], report["failedDependencies"], fetch["bytes"], resolve["bytes"]]
+            totals = [total + count for total, count in zip(totals, counts)]
+            rows.append([name] + [str(count) for count in counts[:5]] + [formatBytes(count) for count in counts[5:]])
+        rows.append(["Total"] + [str(count) for count in totals[:5]] + [formatBytes(count) for count in totals[5:]])
+        print(f"Summary of {len(self._projects)} projects:")
+        printTable(rows)
@@ -0,0 +1,100 @@
+import logging
+from typing import Any, Optional
+from .report import formatBytes, printTable
+
+_logger:logging.Logger = logging.getLogger(__name__)
+
+
+# The work a fetch/resolve run would do (a dry run): which sources are cache hits and which would be fetched (and why), which targets would be
+# resolved for the first time or redone, and how many bytes would be moved. Worked out from the cache and targets alone - nothing is fetched
+# or resolved.
+class Plan :
+    # What would happen to a dependency's source.
+    HIT:str = "hit"          # the cached source is used.
+    FETCH:str = "fetch"      # the source is fetched.
+    SHARED:str = "shared"    # another dependency fetches the same source.
+
+    # What would happen to a dependency's target.
+    NEW:str = "new"                  # resolved for the first time.
+    REDO:str = "redo"                # resolved again, replacing what is there.
+    UNAVAILABLE:str = "unavailable"  # can't be resolved - its source isn't cached (and isn't fetched).
+
+
+    def __init__(self) :
+        self._entries:list[dict[str, Any]] = []
+
+
+    def add(self, dependency:str, source:str, location:str, fetch:Optional[str] = None, reason:Optional[str] = None, fetchBytes:Optional[int] = None, resolve:Optional[str] = None, resolveBytes:Optional[int] = None) :
+        """
+        Adds what would be done for one dependency.
+
+        Args:
+            dependency (str): the name of the dependency.
+            source (str): the name of its source.
+            location (str): where its source is fetched from (the host, or filesystem).
+            fetch (Optional[str]): what would happen to its source (HIT, FETCH or SHARED), or None if nothing is fetched.
+            reason (Optional[str]): why the source would be fetched (or the dependency it is shared with).
+            fetchBytes (Optional[int]): the bytes that would be fetched, or None if not known.
+            resolve (Optional[str]): what would happen to its target (NEW, REDO or UNAVAILABLE), or None if nothing is resolved.
+            resolveBytes (Optional[int]): the bytes that would be resolved from (the size of the source), or None if not known.
+        """
+        self._entries.append({"dependency": dependency, "source": source, "location": location, "fetch": fetch, "reason": reason, "fetchBytes": fetchBytes, "resolve": resolve, "resolveBytes": resolveBytes})
+
+
+    def getEntries(self) -> list[dict[str, Any]] :
+        """Returns what would be done for each dependency, in the order they were added."""
+        return list(self._entries)
+
+
+    def toDict(self) -> dict[str, Any] :
+        """
+        Returns the plan as a JSON serializable dictionary: the totals, plus what would be done for each dependency.
+
+        Returns:
+            dict[str, Any]: the plan.
+        """
+        fetches:list[dict[str, Any]] = [entry for entry in self._entries if entry["fetch"] == Plan.FETCH]
+        resolves:list[dict[str, Any]] = [entry for entry in self._entries if entry["resolve"] in (Plan.NEW, Plan.REDO)]
+        return {
+            "fetch" : {
+                "count" : len(fetches),
+                "cacheHits" : sum(1 for entry in self._entries if entry["fetch"] == Plan.HIT),
+                "bytes" : sum(entry["fetchBytes"] or 0 for entry in fetches),
+                "unknownSizes" : sum(1 for entry in fetches if entry["fetchBytes"] is None),
+            },
+            "resolve" : {
+                "count" : len(resolves),
+                "new" : sum(1 for entry in resolves if entry["resolve"] == Plan.NEW),
+                "redo" : sum(1 for entry in resolves if entry["resolve"] == Plan.REDO),
+                "unavailable" : sum(1 for entry in self._entries if entry["resolve"] == Plan.UNAVAILABLE),
+                "bytes" : sum(entry["resolveBytes"] or 0 for entry in resolves),
+            },
+            "dependencies" : self.getEntries(),
+        }
+
+
+    def printTable(self) :
+        """Prints what would be done for each dependency, then the totals."""
+        plan:dict[str, Any] = self.toDict()
+        print("Dry run - nothing was fetched or resolved:")
+        if not self._entries :
+            print("  No dependencies selected.")
+            return
+        rows:list[list[str]] = [["Dependency", "Source", "Location", "Fetch", "Reason", "Bytes", "Resolve", "Bytes"]]
+        for entry in self._entries :
+            rows.append([entry["dependency"], entry["source"], entry["location"], entry["fetch"] or "-", entry["reason"] or "-", _formatSize(entry["fetchBytes"]) if entry["fetch"] == Plan.FETCH else "-",
+                         entry["resolve"] or "-", _formatSize(entry["resolveBytes"]) if entry["resolve"] in (Plan.NEW, Plan.REDO) else "-"])
+        printTable(rows)
+
+        fetch:dict[str, Any] = plan["fetch"]
+        unknown:str = f", {fetch['unknownSizes']} of unknown size" if fetch["unknownSizes"] else ""
+        print(f"Would fetch {fetch['count']} sources ({formatBytes(fetch['bytes'])}{unknown}) - {fetch['cacheHits']} cache hits.")
+        if any(entry["resolve"] is not None for entry in self._entries) :
+            resolve:dict[str, Any] = plan["resolve"]
+            unavailable:str = f", {resolve['unavailable']} can't be resolved (their sources aren't cached)" if resolve["unavailable"] else ""
+            print(f"Would resolve {resolve['count']} dependencies ({formatBytes(resolve['bytes'])}) - {resolve['new']} new, {resolve['redo']} redone{unavailable}.")
+
+
+def _formatSize(amount:Optional[int]) -> str :
+    """Formats a number of bytes that may not be known."""
+    return "?" if amount is None else formatBytes(amount)
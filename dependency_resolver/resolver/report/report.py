@@ -0,0 +1,181 @@
+import json
+import logging
+import threading
+import time
+from typing import Any, Optional
+from ..utilities import file_util
+
+_logger:logging.Logger = logging.getLogger(__name__)
+
+
+# Collects how long each fetch and resolve took (and how much it moved) during a run, so slow sources and slow archives can be found.
+# Measurements are recorded from the fetch and resolve workers, so recording is thread safe.
+class Report :
+    FETCH:str = "fetch"
+    RESOLVE:str = "resolve"
+
+    # How many of the slowest fetches/resolves to list in the printed summary.
+    slowestToPrint:int = 10
+
+
+    def __init__(self) :
+        self._measurements:list[dict[str, Any]] = []
+        self._lock:threading.Lock = threading.Lock()
+        self._started:float = time.perf_counter()
+        self._finished:Optional[float] = None
+
+
+    def finish(self) :
+        """Marks the end of the run - the wall time of the run is measured up to this point."""
+        self._finished = time.perf_counter()
+
+
+    def record(self, dependency:str, phase:str, seconds:float, transferred:int, source:str, location:str, action:Optional[str] = None, cacheHit:Optional[bool] = None, error:Optional[str] = None) :
+        """
+        Records one measured fetch or resolve.
+
+        Args:
+            dependency (str): the name of the dependency.
+            phase (str): Report.FETCH or Report.RESOLVE.
+            seconds (float): the wall time taken.
+            transferred (int): the number of bytes transferred (fetch) or resolved from (resolve).
+            source (str): the name of the dependency's source.
+            location (str): where the source is fetched from (e.g. the host of the URL, or 'filesystem').
+            action (Optional[str]): the resolve action, for a resolve.
+            cacheHit (Optional[bool]): for a fetch, True if the source was already cached (nothing was transferred).
+            error (Optional[str]): the error, if it failed.
+        """
+        measurement:dict[str, Any] = {
+            "dependency" : dependency,
+            "phase" : phase,
+            "seconds" : round(seconds, 6),
+            "bytes" : transferred,
+            "bytesPerSecond" : round(transferred / seconds) if seconds > 0 and not cacheHit and not error else None,
+            "source" : source,
+            "location" : location,
+            "action" : action,
+            "cacheHit" : cacheHit,
+            "status" : "failed" if error else "ok",
+            "error" : error,
+        }
+        with self._lock :
+            self._measurements.append(measurement)
+
+
+    def getMeasurements(self, phase:Optional[str] = None) -> list[dict[str, Any]] :
+        """
+        Returns the recorded measurements.
+
+        Args:
+            phase (Optional[str]): only return measurements of this phase. Defaults to all.
+
+        Returns:
+            list[dict[str, Any]]: the measurements, in the order they were recorded.
+        """
+        with self._lock :
+            return [measurement for measurement in self._measurements if phase is None or measurement["phase"] == phase]
+
+
+    def toDict(self) -> dict[str, Any] :
+        """
+        Returns the whole report as a JSON serializable dictionary: totals for each phase and location, plus every measurement.
+
+        Returns:
+            dict[str, Any]: the report.
+        """
+        return {
+            "wallSeconds" : round(self._getWallSeconds(), 6),
+            "phases" : {phase : self._summarise(self.getMeasurements(phase)) for phase in (Report.FETCH, Report.RESOLVE)},
+            "locations" : {location : self._summarise(measurements) for location, measurements in self._groupFetchesByLocation().items()},
+            "measurements" : self.getMeasurements(),
+        }
+
+
+    def writeJson(self, path:str) :
+        """
+        Writes the report to a JSON file.
+
+        Args:
+            path (str): the path of the file to write (its directory is created if needed).
+        """
+        file_util.mkdir(file_util.getParentDirectory(path), mode=0o755)
+        with open(path, "w") as reportFile :
+            json.dump(self.toDict(), reportFile, indent=2)
+        _logger.debug(f"Wrote report to {path}")
+
+
+    def printSummary(self) :
+        """Prints a summary table: the totals for each phase and location, then the slowest fetches and resolves."""
+        report:dict[str, Any] = self.toDict()
+        print(f"Summary (wall time {report['wallSeconds']:.2f}s):")
+        rows:list[list[str]] = [["Phase", "Count", "Cache hits", "Failed", "Time (s)", "Bytes", "Throughput"]]
+        for phase, totals in report["phases"].items() :
+            rows.append([phase, str(totals["count"]), str(totals["cacheHits"]), str(totals["failed"]), f"{totals['seconds']:.2f}", formatBytes(totals["bytes"]), formatRate(totals["bytesPerSecond"])])
+        printTable(rows)
+
+        if report["locations"] :
+            print("Fetches by location:")
+            rows = [["Location", "Count", "Cache hits", "Failed", "Time (s)", "Bytes", "Throughput"]]
+            for location, totals in sorted(report["locations"].items(), key=lambda item : item[1]["bytesPerSecond"] or 0) :
+                rows.append([location, str(totals["count"]), str(totals["cacheHits"]), str(totals["failed"]), f"{totals['seconds']:.2f}", formatBytes(totals["bytes"]), formatRate(totals["bytesPerSecond"])])
+            printTable(rows)
+
+        for phase in (Report.FETCH, Report.RESOLVE) :
+            slowest:list[dict[str, Any]] = sorted(self.getMeasurements(phase), key=lambda measurement : measurement["seconds"], reverse=True)[:self.slowestToPrint]
+            if slowest :
+                print(f"Slowest {phase} times:")
+                rows = [["Dependency", "Source", "Action", "Cache", "Status", "Time (s)", "Bytes", "Throughput"]]
+                for measurement in slowest :
+                    cache:str = "-" if measurement["cacheHit"] is None else ("hit" if measurement["cacheHit"] else "miss")
+                    rows.append([measurement["dependency"], measurement["source"], measurement["action"] or "-", cache, measurement["status"], f"{measurement['seconds']:.3f}", formatBytes(measurement["bytes"]), formatRate(measurement["bytesPerSecond"])])
+                printTable(rows)
+
+
+    def _getWallSeconds(self) -> float :
+        """Returns the wall time of the run so far (or until it finished)."""
+        return (self._finished if self._finished is not None else time.perf_counter()) - self._started
+
+
+    def _groupFetchesByLocation(self) -> dict[str, list[dict[str, Any]]] :
+        """Groups the fetch measurements by where they were fetched from."""
+        groups:dict[str, list[dict[str, Any]]] = {}
+        for measurement in self.getMeasurements(Report.FETCH) :
+            groups.setdefault(measurement["location"], []).append(measurement)
+        return groups
+
+
+    def _summarise(self, measurements:list[dict[str, Any]]) -> dict[str, Any] :
+        """Totals a list of measurements. Throughput only counts the measurements that moved data."""
+        transfers:list[dict[str, Any]] = [measurement for measurement in measurements if not measurement["cacheHit"] and measurement["status"] == "ok"]
+        transferred:int = sum(measurement["bytes"] for measurement in transfers)
+        transferSeconds:float = sum(measurement["seconds"] for measurement in transfers)
+        return {
+            "count" : len(measurements),
+            "cacheHits" : sum(1 for measurement in measurements if measurement["cacheHit"]),
+            "failed" : sum(1 for measurement in measurements if measurement["status"] == "failed"),
+            "seconds" : round(sum(measurement["seconds"] for measurement in measurements), 6),
+            "bytes" : transferred,
+            "bytesPerSecond" : round(transferred / transferSeconds) if transferSeconds > 0 else None,
+        }
+
+
+def formatBytes(amount:int) -> str :
+    """Formats a number of bytes for people to read."""
+    size:float = float(amount)
+    for unit in ("B", "KB", "MB", "GB") :
+        if size < 1024 :
+            return f"{size:.0f}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}TB"
+
+
+def formatRate(bytesPerSecond:Optional[int]) -> str :
+    """Formats a throughput for people to read."""
+    return "-" if bytesPerSecond is None else f"{formatBytes(bytesPerSecond)}/s"
+
+
+def printTable(rows:list[list[str]]) :
+    """Prints rows as left aligned columns. The first row is the heading."""
+    widths:list[int] = [max(len(row[column]) for row in rows) for column in range(len(rows[0]))]
+    for row in rows :
+        print("  " + "  ".join(value.ljust(width) for value, width in zip(row, widths)).rstrip())
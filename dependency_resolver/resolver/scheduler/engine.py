@@ -0,0 +1,115 @@
+import asyncio
+import inspect
+import logging
+import threading
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from enum import Enum
+from typing import Any, Callable, Optional
+from ..utilities import helpers, async_https_util
+
+_logger:logging.Logger = logging.getLogger(__name__)
+
+
+# How fetches are carried out by the Scheduler.
+class FetchEngine(Enum) :
+    THREADS = "threads"   # each fetch runs on a pool thread.
+    ASYNCIO = "asyncio"   # every fetch runs as a coroutine in a single event loop - many more fetches can be in flight for the same memory.
+
+    def __init__(self, value) :
+        self._value_ = value
+
+
+    @staticmethod
+    def determine(type:Optional[str]) :
+        """
+        Construct a FetchEngine enum from a string representation.
+        Defaults to FetchEngine.THREADS
+
+        Parameters:
+            type - the string representation of the engine.
+        """
+        if helpers.isEmpty(type) :
+            return FetchEngine.THREADS
+
+        match type.lower() :  # type: ignore - helpers.isEmpty checks for None
+            case "asyncio" | "async" :
+                return FetchEngine.ASYNCIO
+            case _ :
+                return FetchEngine.THREADS
+
+
+    def createExecutor(self, jobs:int) -> Executor :
+        """
+        Creates the executor that runs the fetches for this engine.
+
+        Parameters:
+            jobs - the maximum number of fetches in flight at the same time.
+        """
+        match self :
+            case FetchEngine.ASYNCIO :
+                return AsyncExecutor(maxInFlight=jobs, onShutdown=[async_https_util.close])
+            case _ :
+                return ThreadPoolExecutor(jobs, thread_name_prefix="fetch")
+
+
+# An executor that runs submitted work in an event loop on a single background thread.
+# If the submitted function returns an awaitable (e.g. it is a coroutine function) it is awaited in the loop, so thousands of fetches
+# can wait on the network at the same time without a thread each.
+class AsyncExecutor(Executor) :
+
+    def __init__(self, maxInFlight:int, onShutdown:Optional[list[Callable[[], Any]]] = None) :
+        """
+        Parameters:
+            maxInFlight - the maximum number of submitted functions running at the same time.
+            onShutdown - coroutine functions awaited in the loop when the executor shuts down (e.g. to close connection pools). Optional.
+        """
+        self._maxInFlight:int = max(1, maxInFlight)
+        self._onShutdown:list[Callable[[], Any]] = onShutdown if onShutdown is not None else []
+        self._loop:asyncio.AbstractEventLoop = asyncio.new_event_loop()
+        self._slots:Optional[asyncio.Semaphore] = None
+        self._thread:threading.Thread = threading.Thread(target=self._loop.run_forever, name="fetch-loop", daemon=True)
+        self._thread.start()
+        self._shutdown:bool = False
+
+
+    def submit(self, fn, /, *args, **kwargs) -> Future :
+        """Schedules the function to run in the event loop, returning a Future for its result."""
+        if self._shutdown :
+            raise RuntimeError("Cannot submit work after the executor has been shut down.")
+        return asyncio.run_coroutine_threadsafe(self._run(fn, *args, **kwargs), self._loop)
+
+
+    def shutdown(self, wait:bool = True, *, cancel_futures:bool = False) :
+        """Stops the event loop once any shutdown hooks have run. Work still running is cancelled."""
+        if self._shutdown :
+            return
+        self._shutdown = True
+        try :
+            asyncio.run_coroutine_threadsafe(self._close(), self._loop).result()
+        finally :
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            _logger.debug("Shut down the fetch event loop")
+
+
+    async def _run(self, fn, *args, **kwargs) :
+        """Runs a submitted function in the loop, limiting how many run at the same time."""
+        if self._slots is None :
+            self._slots = asyncio.Semaphore(self._maxInFlight)
+        async with self._slots :
+            result = fn(*args, **kwargs)
+            if inspect.isawaitable(result) :
+                result = await result
+            return result
+
+
+    async def _close(self) :
+        """Cancels anything still running, then runs the shutdown hooks."""
+        tasks:list[asyncio.Task] = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks :
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for hook in self._onShutdown :
+            await hook()
+        await self._loop.shutdown_default_executor()
@@ -0,0 +1,196 @@
+import logging
+import threading
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Optional
+from .engine import FetchEngine
+from .task import Task, TaskStatus
+from ..errors.errors import OrderError
+from ..utilities import graph_util
+from ..utilities.errors_util import ProjectError
+
+_logger:logging.Logger = logging.getLogger(__name__)
+
+
+# Runs the fetches and resolves of a set of tasks as a single graph.
+# Fetches run on one pool of workers (network bound) and resolves on another (disk/CPU bound), so a task's resolve can start as soon as its
+# own source is fetched (and the tasks it comes after have resolved) rather than waiting for every fetch to finish.
+class Scheduler :
+
+    def __init__(self, fetchJobs:int = 4, resolveJobs:int = 4, engine:FetchEngine = FetchEngine.THREADS) :
+        """
+        Parameters:
+            fetchJobs - the maximum number of fetches to run at the same time.
+            resolveJobs - the maximum number of resolves to run at the same time.
+            engine - how the fetches are run. With FetchEngine.ASYNCIO the fetch functions of the tasks should be coroutine functions.
+        """
+        self._fetchJobs:int = max(1, fetchJobs)
+        self._resolveJobs:int = max(1, resolveJobs)
+        self._engine:FetchEngine = engine
+        self._printLock:threading.Lock = threading.Lock()
+
+
+    def run(self, tasks:list[Task]) :
+        """
+        Runs the given tasks to completion. The outcome of each task is recorded on the task itself.
+        A task whose fetch fails, or that comes after a task that failed, is not resolved.
+
+        Parameters:
+            tasks - the tasks to run. The position of a task in this list is used to number it in the output.
+
+        Raises:
+            OrderError if the task names are not unique or the tasks cannot be ordered (there is a cycle).
+        """
+        self._validate(tasks)
+        self._tasks:dict[str, Task] = {task.getName() : task for task in tasks}
+        self._numbers:dict[str, int] = {task.getName() : number for number, task in enumerate(tasks, start=1)}
+        self._fetchWaiters:dict[str, list[Task]] = {}   # fetch key -> tasks waiting on that fetch
+        self._dependents:dict[str, list[Task]] = {}     # task name -> tasks that come after it
+        self._blockers:dict[str, int] = {}              # task name -> number of things its resolve is still waiting for
+        self._running:dict[Future, tuple[str, Any]] = {}
+
+        for task in tasks :
+            blockers:int = 1  # its own fetch (or the start of the run, if it doesn't fetch)
+            if task.getResolve() is not None :
+                for before in self._getAfter(task) :
+                    self._dependents.setdefault(before, []).append(task)
+                    blockers += 1
+            self._blockers[task.getName()] = blockers
+
+        _logger.debug(f"Scheduling {len(tasks)} tasks ({self._fetchJobs} {self._engine.value} fetch workers, {self._resolveJobs} resolve workers)")
+        fetchPool:Executor = self._engine.createExecutor(self._fetchJobs)
+        self._resolvePool:ThreadPoolExecutor = ThreadPoolExecutor(self._resolveJobs, thread_name_prefix="resolve")
+        with fetchPool, self._resolvePool :
+            try :
+                for task in tasks :
+                    if task.getFetch() is not None :
+                        self._submitFetch(fetchPool, task)
+                    else :
+                        self._unblock(task)
+
+                while self._running :
+                    done, _ = wait(self._running, return_when=FIRST_COMPLETED)
+                    for future in done :
+                        phase, subject = self._running.pop(future)
+                        if phase == "fetch" :
+                            self._fetched(subject, future)
+                        else :
+                            self._resolved(subject, future)
+            except BaseException :
+                # something unexpected (not a fetch/resolve error) - don't start anything else.
+                for future in self._running :
+                    future.cancel()
+                raise
+
+        _logger.debug("...finished scheduled tasks.")
+
+
+    def _validate(self, tasks:list[Task]) :
+        """
+        Makes sure the tasks can be scheduled.
+
+        Raises:
+            OrderError if the task names are not unique or the tasks' after attributes form a cycle.
+        """
+        names:set[str] = set()
+        for task in tasks :
+            if task.getName() in names :
+                raise OrderError(f"Cannot schedule more than one task named {task.getName()}.")
+            names.add(task.getName())
+
+        cycle:Optional[list[str]] = graph_util.findCycle({task.getName() : task.getAfter() for task in tasks if task.getResolve() is not None})
+        if cycle is not None :
+            raise OrderError(f"Cannot order the dependencies - they form a cycle: {' -> '.join(cycle)}.")
+
+
+    def _getAfter(self, task:Task) -> list[str] :
+        """Returns the names of the scheduled tasks that the given task must resolve after (unscheduled names are ignored)."""
+        return [name for name in dict.fromkeys(task.getAfter()) if name in self._tasks and name != task.getName()]
+
+
+    def _submitFetch(self, fetchPool:Executor, task:Task) :
+        """Submits the fetch for a task, unless another task is already fetching the same thing."""
+        key:str = task.getFetchKey()
+        if key in self._fetchWaiters :
+            self._fetchWaiters[key].append(task)
+        else :
+            self._fetchWaiters[key] = [task]
+            self._running[fetchPool.submit(self._call, task, "Fetching...", task.getFetch())] = ("fetch", key)
+
+
+    def _fetched(self, key:str, future:Future) :
+        """Handles a completed fetch - every task waiting on it can now resolve (or has failed)."""
+        error:Optional[str] = self._getError(future)
+        for number, task in enumerate(self._fetchWaiters[key]) :
+            if error is None :
+                task.setFetchStatus(TaskStatus.DONE if number == 0 else TaskStatus.SHARED)
+                self._print(task, "Fetched." if number == 0 else "Already fetched.")
+                self._unblock(task)
+            else :
+                task.setFetchStatus(TaskStatus.FAILED)
+                task.setError(error)
+                self._print(task, f"Failed :: {error}.")
+                self._skipDependents(task)
+
+
+    def _unblock(self, task:Task) :
+        """One of the things the task is waiting for has finished - resolve it if nothing else is outstanding."""
+        self._blockers[task.getName()] -= 1
+        if self._blockers[task.getName()] <= 0 and task.getResolve() is not None :
+            self._running[self._resolvePool.submit(self._call, task, "Resolving...", task.getResolve())] = ("resolve", task)
+
+
+    def _resolved(self, task:Task, future:Future) :
+        """Handles a completed resolve - tasks that come after it may now be able to resolve (or have failed)."""
+        error:Optional[str] = self._getError(future)
+        if error is None :
+            task.setResolveStatus(TaskStatus.DONE)
+            self._print(task, "Resolved.")
+            for dependent in self._dependents.get(task.getName(), []) :
+                self._unblock(dependent)
+        else :
+            task.setResolveStatus(TaskStatus.FAILED)
+            task.setError(error)
+            self._print(task, f"Failed :: {error}.")
+            self._skipDependents(task)
+
+
+    def _skipDependents(self, failed:Task) :
+        """Marks everything that (directly or indirectly) comes after a failed task as skipped."""
+        if failed.getResolveStatus() == TaskStatus.PENDING and failed.getResolve() is not None :
+            failed.setResolveStatus(TaskStatus.SKIPPED)
+
+        toSkip:list[Task] = list(self._dependents.get(failed.getName(), []))
+        while toSkip :
+            task:Task = toSkip.pop()
+            if task.getResolveStatus() == TaskStatus.PENDING :
+                task.setResolveStatus(TaskStatus.SKIPPED)
+                task.setError(f"{failed.getName()} failed")
+                self._print(task, f"Skipped :: it must be resolved after {failed.getName()}, which failed.")
+                toSkip.extend(self._dependents.get(task.getName(), []))
+
+
+    def _call(self, task:Task, message:str, function:Callable[[], Any]) -> Any :
+        """Runs on a worker - announces and runs one phase of a task. Returns whatever the function returns (e.g. a coroutine for the async engine)."""
+        self._print(task, message)
+        return function()
+
+
+    def _getError(self, future:Future) -> Optional[str] :
+        """
+        Returns the error message of a failed fetch/resolve, or None if it succeeded.
+
+        Raises:
+            Anything that is not a ProjectError is unexpected and re-raised.
+        """
+        error:Optional[BaseException] = future.exception()
+        if error is None :
+            return None
+        if isinstance(error, ProjectError) :
+            return str(error)
+        raise error
+
+
+    def _print(self, task:Task, message:str) :
+        """Prints the progress of a task. Workers print concurrently, so lines are printed whole."""
+        with self._printLock :
+            print(f"{self._numbers[task.getName()]}-{task.getName()} : {message}")
@@ -0,0 +1,95 @@
+from enum import Enum
+from typing import Any, Callable, Optional
+
+
+# The state of one phase (fetch or resolve) of a Task.
+class TaskStatus(Enum) :
+    PENDING = "pending"
+    DONE = "done"
+    SHARED = "shared"     # the fetch was carried out by another task with the same fetch key
+    FAILED = "failed"
+    SKIPPED = "skipped"   # never attempted, because something it was waiting on failed
+
+
+# A unit of work for the Scheduler - usually one dependency.
+# A task may fetch (e.g. download its source into the cache) and/or resolve (e.g. unzip the cached source to its target).
+# Its resolve starts as soon as its own fetch has finished and every task it must come after has resolved.
+class Task :
+
+    def __init__(self, name:str, fetch:Optional[Callable[[], Any]] = None, fetchKey:Optional[str] = None, resolve:Optional[Callable[[], Any]] = None, after:Optional[list[str]] = None) :
+        """
+        Parameters:
+            name - the unique name of this task.
+            fetch - called (on a fetch worker) to fetch this task's source. Optional.
+            fetchKey - tasks sharing a fetch key share a single fetch (e.g. the location the source is cached to). Defaults to the name of the task.
+            resolve - called (on a resolve worker) to resolve this task. Optional.
+            after - the names of the tasks that must resolve before this task resolves. Names of tasks that are not scheduled are ignored. Optional.
+        """
+        self._name:str = name
+        self._fetch:Optional[Callable[[], Any]] = fetch
+        self._fetchKey:str = fetchKey if fetchKey else name
+        self._resolve:Optional[Callable[[], Any]] = resolve
+        self._after:list[str] = after if after is not None else []
+        self._fetchStatus:TaskStatus = TaskStatus.PENDING
+        self._resolveStatus:TaskStatus = TaskStatus.PENDING
+        self._error:Optional[str] = None
+
+
+    def getName(self) -> str :
+        """Returns the name of this task."""
+        return self._name
+
+
+    def getFetch(self) -> Optional[Callable[[], Any]] :
+        """Returns the function that fetches this task's source, or None if this task does not fetch."""
+        return self._fetch
+
+
+    def getFetchKey(self) -> str :
+        """Returns the key identifying what this task fetches."""
+        return self._fetchKey
+
+
+    def getResolve(self) -> Optional[Callable[[], Any]] :
+        """Returns the function that resolves this task, or None if this task does not resolve."""
+        return self._resolve
+
+
+    def getAfter(self) -> list[str] :
+        """Returns the names of the tasks that must resolve before this task resolves."""
+        return self._after
+
+
+    def getFetchStatus(self) -> TaskStatus :
+        """Returns the state of this task's fetch."""
+        return self._fetchStatus
+
+
+    def setFetchStatus(self, status:TaskStatus) :
+        """Sets the state of this task's fetch."""
+        self._fetchStatus = status
+
+
+    def getResolveStatus(self) -> TaskStatus :
+        """Returns the state of this task's resolve."""
+        return self._resolveStatus
+
+
+    def setResolveStatus(self, status:TaskStatus) :
+        """Sets the state of this task's resolve."""
+        self._resolveStatus = status
+
+
+    def getError(self) -> Optional[str] :
+        """Returns the reason this task failed or was skipped, if it did."""
+        return self._error
+
+
+    def setError(self, error:str) :
+        """Records the reason this task failed or was skipped."""
+        self._error = error
+
+
+    def hasFailed(self) -> bool :
+        """Returns True if any part of this task failed or was skipped."""
+        return self._fetchStatus in (TaskStatus.FAILED, TaskStatus.SKIPPED) or self._resolveStatus in (TaskStatus.FAILED, TaskStatus.SKIPPED)
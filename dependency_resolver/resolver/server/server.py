@@ -0,0 +1,118 @@
+import json
+import logging
+import os
+import socket
+import socketserver
+import stat
+from typing import Any, Callable, Optional
+from ..errors.errors import ServerError
+from ..utilities import file_util
+
+_logger:logging.Logger = logging.getLogger(__name__)
+
+
+# Answers requests sent to a Unix socket, so one long-running process (keeping its parsed projects, cache and connections warm in memory)
+# can do the work of many short-lived command-line calls.
+# A client sends a single line of JSON and gets a single line of JSON back, e.g.
+#   -> {"argv": ["resolve", "-c", "dependencies.json"], "cwd": "/path/to/project"}
+#   <- {"exitCode": 0, "output": "Fetching and resolving 3 dependencies: ..."}
+# Requests are answered one at a time, in the order they arrive.
+class ResolverServer :
+
+    def __init__(self, socketPath:str, answer:Callable[[dict[str, Any]], dict[str, Any]]) :
+        """
+        Parameters:
+            socketPath - the path of the Unix socket to listen on.
+            answer - called with each request, returning the response to send back.
+        """
+        self._socketPath:str = socketPath
+        self._answer:Callable[[dict[str, Any]], dict[str, Any]] = answer
+        self._server:Optional[socketserver.UnixStreamServer] = None
+
+
+    def getSocketPath(self) -> str :
+        """Returns the path of the Unix socket requests are sent to."""
+        return self._socketPath
+
+
+    def start(self) :
+        """
+        Starts listening on the socket. A socket left behind by a server that is no longer running is replaced.
+
+        Raises:
+            ServerError if another server is already listening on the socket, or the socket can't be created.
+        """
+        self._removeStaleSocket()
+        directory:str = file_util.getParentDirectory(self._socketPath)
+        if directory :
+            file_util.mkdir(directory, mode=0o755)
+        umask:int = os.umask(0o177)  # the socket is created only accessible to the user running the server, so no one else can send it requests.
+        try :
+            self._server = socketserver.UnixStreamServer(self._socketPath, self._createHandler())
+        except OSError as error :
+            raise ServerError(f"Unable to listen on {self._socketPath} (Unix socket paths are limited to around 100 characters): {error}") from error
+        finally :
+            os.umask(umask)
+        _logger.info(f"Serving requests on {self._socketPath}")
+
+
+    def serveForever(self) :
+        """Answers requests until shutdown is called (from another thread) or the process is stopped, then stops listening."""
+        if self._server is None :
+            self.start()
+        try :
+            self._server.serve_forever()  # type: ignore - started above
+        finally :
+            self.close()
+
+
+    def shutdown(self) :
+        """Stops serveForever, once it has answered the request it is working on. Must be called from a different thread."""
+        if self._server is not None :
+            self._server.shutdown()
+
+
+    def close(self) :
+        """Stops listening and removes the socket."""
+        if self._server is not None :
+            self._server.server_close()
+            self._server = None
+            if file_util.exists(self._socketPath) :
+                os.unlink(self._socketPath)
+            _logger.info(f"Stopped serving requests on {self._socketPath}")
+
+
+    def _removeStaleSocket(self) :
+        """Removes the socket if it was left behind by a server that is no longer running."""
+        if not file_util.exists(self._socketPath) :
+            return
+        if not stat.S_ISSOCK(os.stat(self._socketPath).st_mode) :
+            raise ServerError(f"Unable to listen on {self._socketPath} - something other than a socket is already there.")
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe :
+            try :
+                probe.connect(self._socketPath)
+            except OSError :
+                _logger.debug(f"Removing the stale socket {self._socketPath}")
+                os.unlink(self._socketPath)
+                return
+        raise ServerError(f"A server is already listening on {self._socketPath}")
+
+
+    def _createHandler(self) -> type :
+        """Returns the socketserver handler class that reads each request, answers it and writes back the response."""
+        answer:Callable[[dict[str, Any]], dict[str, Any]] = self._answer
+
+        class _Handler(socketserver.StreamRequestHandler) :
+            def handle(self) :
+                line:bytes = self.rfile.readline()
+                try :
+                    request:Any = json.loads(line)
+                    response:dict[str, Any] = answer(request) if isinstance(request, dict) else {"exitCode": 2, "output": "The request must be a JSON object.\n"}
+                except json.JSONDecodeError as error :
+                    response = {"exitCode": 2, "output": f"The request is not valid JSON: {error}\n"}
+                try :
+                    self.wfile.write(json.dumps(response).encode() + b"\n")
+                except OSError as error :  # the client gave up waiting.
+                    _logger.warning(f"Unable to send the response: {error}")
+
+        return _Handler
@@ -1,8 +1,11 @@
+import asyncio
 import logging
+import time
 from enum import Enum
+from typing import Optional
 from ..errors.errors import FetchError
 from ..configuration.attributes import ConfigAttributes
-from ..utilities import helpers, file_util, https_util
+from ..utilities import helpers, file_util, https_util, async_https_util, metrics_util, mirror_util, retry_util, throttle_util, trace_util
 
 
 _logger = logging.getLogger(__name__)  # module name
@@ -43,7 +46,7 @@ class SourceProtocol(Enum) :
                 return SourceProtocol.HTTPS  # if its unknown then lets assume https
 
 
-    def fetch(self, source:str, destinationDir:str, destinationName:str) :
+    def fetch(self, source:str, destinationDir:str, destinationName:str, mirrors:Optional[list[str]] = None) :
         """
         Fetch the specified source an put it in the destination, using the appropriate method for this protocol.
 
@@ -51,6 +54,7 @@ class SourceProtocol(Enum) :
             source - the absolute location of the source file
             destinationDir - the absolute directory to put this file.
             destinationName - the filename for the fetched resource
+            mirrors - the absolute locations of the same file on the source's mirrors (https). Optional.
 
         Raises:
             FetchError if fetch fails.
@@ -59,21 +63,94 @@ class SourceProtocol(Enum) :
         helpers.assertSet(_logger, "Cannot fetch - the destination directory was not specified.", destinationDir)
         helpers.assertSet(_logger, "Cannot fetch - the destination file was not specified.", destinationName)
 
+        destination:str = self._prepareDestination(source, destinationDir, destinationName)
+        started:float = time.perf_counter()
+        try :
+            with trace_util.span(f"{self.value} fetch", "fetch", source=source) :
+                match self :
+                    case SourceProtocol.HTTPS :
+                        self._fetchHttps(source, destination, mirrors)
+                    case SourceProtocol.FILESYSTEM:
+                        self._fetchFileSystem(source, destination)
+        except FetchError :
+            metrics_util.ERRORS.increment(phase="fetch", type=self.value)
+            raise
+        self._recordFetch(source, destination, started)
+
+
+    async def fetchAsync(self, source:str, destinationDir:str, destinationName:str, mirrors:Optional[list[str]] = None) :
+        """
+        Fetch the specified source an put it in the destination, using the appropriate method for this protocol, without blocking the running event loop.
+        Https sources are downloaded using asyncio, other protocols (and any filesystem work) are offloaded to a thread.
+
+        Parameters:
+            source - the absolute location of the source file
+            destinationDir - the absolute directory to put this file.
+            destinationName - the filename for the fetched resource
+            mirrors - the absolute locations of the same file on the source's mirrors (https). Optional.
+
+        Raises:
+            FetchError if fetch fails.
+        """
+        helpers.assertSet(_logger, "Cannot fetch - the source path was not specified.", source)
+        helpers.assertSet(_logger, "Cannot fetch - the destination directory was not specified.", destinationDir)
+        helpers.assertSet(_logger, "Cannot fetch - the destination file was not specified.", destinationName)
+
+        destination:str = await asyncio.to_thread(self._prepareDestination, source, destinationDir, destinationName)
+        started:float = time.perf_counter()
+        try :
+            with trace_util.span(f"{self.value} fetch", "fetch", source=source) :
+                match self :
+                    case SourceProtocol.HTTPS :
+                        await self._fetchHttpsAsync(source, destination, mirrors)
+                    case SourceProtocol.FILESYSTEM:
+                        await asyncio.to_thread(self._fetchFileSystem, source, destination)
+        except FetchError :
+            metrics_util.ERRORS.increment(phase="fetch", type=self.value)
+            raise
+        self._recordFetch(source, destination, started)
+
+
+    def _recordFetch(self, source:str, destination:str, started:float) :
+        """
+        Records the duration and size of a successful fetch in the metrics (if they are enabled).
+
+        Parameters:
+            source - the absolute location of the source file
+            destination - the absolute path the source was fetched to.
+            started - when the fetch started (time.perf_counter).
+        """
+        if metrics_util.isEnabled() :
+            host:str = metrics_util.getHost(source)
+            metrics_util.DOWNLOAD_DURATION.observe(time.perf_counter() - started, protocol=self.value, host=host)
+            metrics_util.DOWNLOAD_BYTES.increment(file_util.getSize(destination), protocol=self.value, host=host)
+
+
+    def _prepareDestination(self, source:str, destinationDir:str, destinationName:str) -> str :
+        """
+        Makes sure the destination directory exists.
+
+        Parameters:
+            source - the absolute location of the source file
+            destinationDir - the absolute directory to put this file.
+            destinationName - the filename for the fetched resource
+
+        Returns:
+            str: the absolute path to fetch the source to.
+
+        Raises:
+            FetchError if the destination exists but is not a directory.
+        """
         file_util.mkdir(destinationDir, mode=0o744)  # Try to make the target destination
         if file_util.ensurePathExists(destinationDir) and file_util.isDir(destinationDir) :  # make sure all is ok with the destination.
-            destination:str = file_util.buildPath(destinationDir, destinationName)
-            match self :
-                case SourceProtocol.HTTPS :
-                    self._fetchHttps(source, destination)
-                case SourceProtocol.FILESYSTEM:
-                    self._fetchFileSystem(source, destination)
+            return file_util.buildPath(destinationDir, destinationName)
         else :
             raise FetchError(f"Unable to fetch {source}, as the specified destination ({destinationDir}) exists but is not a directory")
 
 
     def _fetchFileSystem(self, source:str, destination:str) :
         """
-        Copy the source path to the destination path.
+        Copy the source path to the destination path (throttled to the bandwidth limits, if any).
 
         Parameters:
             source - the absolute location of the source file
@@ -82,22 +159,98 @@ class SourceProtocol(Enum) :
         Throws:
             FetchError if copy fails.
         """
-        if not file_util.copy(source, destination) :
+        throttle = (lambda amount : throttle_util.throttle(metrics_util.getHost(source), amount)) if throttle_util.isEnabled() else None
+        if not file_util.copy(source, destination, throttle=throttle) :
             raise FetchError(f"Failed to fetch {source} -> {destination}.")
 
 
-    def _fetchHttps(self, source:str, destination:str) :
+    def _fetchHttps(self, source:str, destination:str, mirrors:Optional[list[str]] = None) :
         """
         Perform a http(s) get to stream the source to the specified location.
+        With mirrors, the fastest healthy one is used, failing over to the next until one succeeds. Each mirror but the last is only tried once,
+        so a failing mirror doesn't cost the whole retry backoff before the next is tried.
 
         Parameters:
             source - the absolute location of the source file
             destination - the absolute path to put this file. Must include destination file name.
+            mirrors - the absolute locations of the same file on other mirrors. Optional.
 
         Throws:
             FetchError if copy fails.
         """
-        try :
-            https_util.download(source, destination)
-        except https_util.HttpError as http :
-            raise FetchError(f"Failed to fetch {source} -> {destination}.") from http
+        if not mirrors :
+            try :
+                https_util.download(source, destination)
+            except https_util.HttpError as http :
+                raise FetchError(f"Failed to fetch {source} -> {destination}.") from http
+            return
+
+        failure:Optional[https_util.HttpError] = None
+        urls:list[str] = mirror_util.order([source, *mirrors])
+        for url in urls :
+            try :
+                mirror_util.recordSuccess(url, https_util.download(url, destination, policy=self._getMirrorPolicy(url, urls)))
+                return
+            except https_util.HttpError as http :
+                failure = self._failOver(url, urls, http)
+        raise FetchError(f"Failed to fetch {source} (or any of its mirrors) -> {destination}.") from failure
+
+
+    async def _fetchHttpsAsync(self, source:str, destination:str, mirrors:Optional[list[str]] = None) :
+        """
+        Perform a http(s) get using asyncio to stream the source to the specified location.
+        With mirrors, the fastest healthy one is used, failing over to the next until one succeeds. Each mirror but the last is only tried once.
+
+        Parameters:
+            source - the absolute location of the source file
+            destination - the absolute path to put this file. Must include destination file name.
+            mirrors - the absolute locations of the same file on other mirrors. Optional.
+
+        Throws:
+            FetchError if copy fails.
+        """
+        if not mirrors :
+            try :
+                await async_https_util.download(source, destination)
+            except https_util.HttpError as http :
+                raise FetchError(f"Failed to fetch {source} -> {destination}.") from http
+            return
+
+        failure:Optional[https_util.HttpError] = None
+        urls:list[str] = await asyncio.to_thread(mirror_util.order, [source, *mirrors])  # probing blocks
+        for url in urls :
+            try :
+                mirror_util.recordSuccess(url, await async_https_util.download(url, destination, policy=self._getMirrorPolicy(url, urls)))
+                return
+            except https_util.HttpError as http :
+                failure = self._failOver(url, urls, http)
+        raise FetchError(f"Failed to fetch {source} (or any of its mirrors) -> {destination}.") from failure
+
+
+    def _getMirrorPolicy(self, url:str, urls:list[str]) -> Optional[retry_util.RetryPolicy] :
+        """
+        Returns how a fetch from a mirror is retried: not at all while there are other mirrors to fail over to (the next mirror is the retry),
+        and as usual (None) for the last one.
+        """
+        return retry_util.RetryPolicy(retries=0) if url != urls[-1] else None
+
+
+    def _failOver(self, url:str, urls:list[str], http:https_util.HttpError) -> https_util.HttpError :
+        """
+        Records a failed fetch from a mirror, and the fail over to the next mirror (if there is one left to try).
+        Only a mirror that couldn't be reached or had a server error counts against it - one that doesn't have the file is still healthy.
+
+        Parameters:
+            url - the location that failed.
+            urls - every location, in the order they are tried.
+            http - why it failed.
+
+        Returns:
+            https_util.HttpError: the failure.
+        """
+        if http.status is None or http.status >= 500 :  # includes a host whose circuit breaker is open.
+            mirror_util.recordFailure(url)
+        if url != urls[-1] :
+            metrics_util.MIRROR_FAILOVERS.increment(host=metrics_util.getHost(url))
+            _logger.warning(f"Failed to fetch {url} - failing over to the next mirror.")
+        return http
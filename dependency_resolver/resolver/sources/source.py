@@ -11,13 +11,14 @@ _logger = logging.getLogger(__name__)
 
 class Source :
 
-    def __init__(self, name:str, protocol:SourceProtocol, type:Optional[SourceType] = None, base:Optional[str] = None, description:Optional[str] = None):
+    def __init__(self, name:str, protocol:SourceProtocol, type:Optional[SourceType] = None, base:Optional[str] = None, description:Optional[str] = None, mirrors:Optional[list[str]] = None):
         """
         Parameters:
             name - The unique name given to this source.
             protocol - How to get the file - for example is this a https get, REST endpoint, filesystem copy (not all of these are supported at the moment). Optional.
             base - The start of the path for the source file. A dependency can extend this base path with a specific location. Optional.
             description - A textual description of this source. Optional.
+            mirrors - Other bases serving the same files as the base (https). Each fetch goes to the fastest healthy one, failing over to the others. Optional.
         """
         helpers.assertSet(_logger, f"The source {ConfigAttributes.SOURCE_NAME} attribute must be set in the source with description: {description}, base:{base}), protocol{protocol}.", name)
         helpers.assertSet(_logger, f"The source {ConfigAttributes.SOURCE_PROTOCOL} attribute must be set in source {name}.", protocol)
@@ -27,6 +28,7 @@ class Source :
         self._setType(type)
         self._base:str = base if base is not None else ""
         self._description:str = description if description is not None else ""
+        self._mirrors:list[str] = mirrors if mirrors is not None else []
 
 
     def fetch(self, sourcePath:str, targetDir:str, targetName:str) :
@@ -43,8 +45,26 @@ class Source :
             FetchError if the fetch is unsuccessful.
         """
         fullPath:str = self.getAbsoluteSourcePath(sourcePath)
-        _logger.debug(f"Fetching {fullPath} -> {targetDir}/{targetName}.")
-        self._getProtocol().fetch(fullPath, targetDir, targetName)
+        _logger.debug("Fetching %s -> %s/%s.", fullPath, targetDir, targetName)
+        self._getProtocol().fetch(fullPath, targetDir, targetName, mirrors=self._getMirrorPaths(sourcePath))
+
+
+    async def fetchAsync(self, sourcePath:str, targetDir:str, targetName:str) :
+        """
+        Fetches the source (file) and puts it in the specified directory, without blocking the running event loop.
+        How this is fetched depends on the protocol used.
+
+        Parameters:
+            sourcePath - the relative path to this source.
+            targetDir - the absolute path to the directory to put this file.
+            targetName - the file name to give this download.
+
+        Raises:
+            FetchError if the fetch is unsuccessful.
+        """
+        fullPath:str = self.getAbsoluteSourcePath(sourcePath)
+        _logger.debug("Fetching (async) %s -> %s/%s.", fullPath, targetDir, targetName)
+        await self._getProtocol().fetchAsync(fullPath, targetDir, targetName, mirrors=self._getMirrorPaths(sourcePath))
 
 
     def getAbsoluteSourcePath(self, sourcePath:Optional[str]) -> str :
@@ -61,6 +81,18 @@ class Source :
             return self._getBase()
 
 
+    def _getMirrorPaths(self, sourcePath:Optional[str]) -> list[str] :
+        """
+        Determines where the source can also be fetched from, on each of this source's mirrors.
+
+        Parameters:
+            sourcePath - any additional path, relative to the source base. Optional.
+        """
+        if helpers.hasValue(sourcePath) :
+            return [file_util.buildPath(mirror, sourcePath) for mirror in self._mirrors]  # type: ignore - helpers.hasValue checks for None
+        return list(self._mirrors)
+
+
     def _getProtocol(self) -> SourceProtocol :
         """
         Returns the protocol used to fetch this source.
@@ -71,6 +103,16 @@ class Source :
         return self._protocol
 
 
+    def getProtocolName(self) -> str :
+        """
+        Returns the name of the protocol used to fetch this source.
+
+        Returns:
+            str: The name of the protocol (as in the configuration), e.g. https.
+        """
+        return self._protocol.value
+
+
     def getName(self) -> str :
         """
         Returns the name of this source.
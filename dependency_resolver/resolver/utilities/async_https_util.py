@@ -0,0 +1,257 @@
+import asyncio
+import logging
+import ssl
+import time
+import weakref
+from typing import Any, Optional
+from urllib.parse import urljoin, urlsplit, SplitResult
+from . import https_util, metrics_util, retry_util, throttle_util, trace_util
+from .https_util import HttpError
+
+try :
+    import aiohttp  # optional - used when installed, otherwise the standard library asyncio streams are used.
+except ImportError :
+    aiohttp = None
+
+_logger:logging.Logger = logging.getLogger(__name__)
+
+_REDIRECTS:tuple[int, ...] = (301, 302, 303, 307, 308)
+_MAX_REDIRECTS:int = 10
+
+# The maximum number of downloads from the same host at the same time.
+_hostLimit:int = 8
+
+# Per event loop state - asyncio primitives (and aiohttp sessions) belong to the loop they were created in.
+_hostSemaphores:weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+_sessions:weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+# Creating an SSL context loads the trusted certificates, so one is shared by all connections.
+_sslContext:Optional[ssl.SSLContext] = None
+
+
+def setHostLimit(limit:int) :
+    """
+    Sets the maximum number of downloads from the same host at the same time.
+
+    Args:
+        limit (int): the maximum number of concurrent downloads per host (at least 1).
+    """
+    global _hostLimit
+    _hostLimit = max(1, limit)
+
+
+async def download(source:str, target:str, chunks:int = 1024 * 64, policy:Optional[retry_util.RetryPolicy] = None) -> float :
+    """
+    Streams the specified source url into a target file, without blocking the running event loop.
+    Writes to the target file are offloaded to a thread. Uses aiohttp if it is installed, otherwise asyncio streams.
+    Failures are retried, and hosts that keep failing are failed fast, just as https_util.download does. The timeouts are https_util's.
+
+    Parameters:
+        source - Full absolute URL to the source
+        target - Full absolute path to the destination file (note existing file will be truncated if it exists)
+        chunks - Response is streamed in chunks of at most this number of bytes, so memory per download stays small. 64KB by default.
+        policy - How failures are retried. Defaults to the policy set with retry_util.setPolicy.
+
+    Returns:
+        float: the seconds taken to connect and receive the response headers (the latency of the server).
+
+    Raises:
+        HttpError if it fails to download.
+    """
+    _logger.debug("Downloading (async) %s to %s", source, target)
+    host:str = urlsplit(source).netloc
+    breaker:retry_util.CircuitBreaker = retry_util.getBreaker(host)
+    policy = policy if policy is not None else retry_util.getPolicy()
+    connectTimeout, readTimeout = https_util.getTimeouts()
+    for retry in range(policy.retries + 1) :
+        if not breaker.allow() :
+            metrics_util.FAST_FAILURES.increment(host=host)
+            raise HttpError(f"Failed to fetch {source}. {host} has been failing, so its circuit breaker is open.")
+        try :
+            with breaker.releasing(HttpError) :
+                async with _getHostSemaphore(host) :
+                    if aiohttp is not None :
+                        latency:float = await _downloadWithAiohttp(source, target, chunks, connectTimeout, readTimeout)
+                    else :
+                        latency = await _downloadWithStreams(source, target, chunks, connectTimeout, readTimeout)
+        except HttpError as http :
+            https_util.recordAnswer(breaker, http.status)
+            if retry == policy.retries or not policy.isRetriable(http.status) :
+                raise
+            delay:float = policy.getDelay(retry)
+            _logger.warning(f"Retrying {source} in {delay:.1f}s (retry {retry + 1} of {policy.retries}).")
+            metrics_util.RETRIES.increment(host=host)
+            await asyncio.sleep(delay)  # outside the host semaphore, so other downloads from the host can go ahead.
+            continue
+        breaker.recordSuccess()
+        return latency
+    raise HttpError(f"Failed to fetch {source}.")  # not reached - the last attempt returns or raises.
+
+
+async def close() :
+    """Releases any connections held for the running event loop. Call before the event loop is closed."""
+    session = _sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None :
+        await session.close()
+
+
+def _getHostSemaphore(host:str) -> asyncio.Semaphore :
+    """Returns the semaphore limiting the number of downloads from the given host, in the running event loop."""
+    semaphores:dict[str, asyncio.Semaphore] = _hostSemaphores.setdefault(asyncio.get_running_loop(), {})
+    if host not in semaphores :
+        semaphores[host] = asyncio.Semaphore(_hostLimit)
+    return semaphores[host]
+
+
+async def _downloadWithAiohttp(source:str, target:str, chunks:int, connectTimeout:float, readTimeout:float) -> float :
+    """Downloads the source using the (optional) aiohttp library, which pools connections."""
+    loop:asyncio.AbstractEventLoop = asyncio.get_running_loop()
+    if loop not in _sessions :
+        _sessions[loop] = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=None, sock_connect=connectTimeout, sock_read=readTimeout))  # type: ignore - only used when installed
+
+    try :
+        started:float = time.perf_counter()
+        with trace_util.span("connect and first byte", "http", url=source) :  # aiohttp returns once the response headers have arrived.
+            response = await _sessions[loop].get(source, allow_redirects=True)
+        latency:float = time.perf_counter() - started
+        async with response :
+            if response.status >= 400 :
+                raise HttpError(f"Failed to fetch {source}. There was an {response.status} http error.", status=response.status)
+            with trace_util.span("body", "http", url=source) :
+                targetFile = await asyncio.to_thread(open, target, "wb")
+                try :
+                    async for chunk in response.content.iter_chunked(throttle_util.getChunkSize(chunks)) :
+                        await _write(targetFile, chunk, urlsplit(source).netloc)
+                finally :
+                    await asyncio.to_thread(targetFile.close)
+            https_util.recordResponse(target, str(response.url), response.headers.get("ETag"))
+        return latency
+    except HttpError as http :
+        _logger.error(str(http))
+        raise
+    except asyncio.TimeoutError as timedOut :
+        _logger.error(f"Failed to fetch {source}. The request timed out.")
+        raise HttpError(f"Failed to fetch {source}. The request timed out.") from timedOut
+    except aiohttp.ClientError as error :  # type: ignore - only used when installed
+        _logger.error(f"Failed to fetch {source}. There was an issue with the request: {error}")
+        raise HttpError(f"Failed to fetch {source}. There was an issue with the request: {error}") from error
+
+
+async def _downloadWithStreams(source:str, target:str, chunks:int, connectTimeout:float, readTimeout:float) -> float :
+    """Downloads the source with a plain HTTP/1.1 request over asyncio streams, following any redirects. Returns the seconds until the (final) response headers arrived."""
+    url:str = source
+    started:float = time.perf_counter()
+    try :
+        for _ in range(_MAX_REDIRECTS + 1) :
+            parts:SplitResult = urlsplit(url)
+            with trace_util.span("connect", "http", url=url) :
+                reader, writer = await _connect(parts, connectTimeout)
+            try :
+                with trace_util.span("first byte", "http", url=url) :
+                    await _sendRequest(writer, parts)
+                    status, headers = await _readHead(reader, readTimeout)
+                latency:float = time.perf_counter() - started
+                if status in _REDIRECTS and "location" in headers :
+                    url = urljoin(url, headers["location"])
+                    _logger.debug("Redirected to %s", url)
+                    continue
+                if status >= 400 :
+                    raise HttpError(f"Failed to fetch {source}. There was an {status} http error.", status=status)
+                with trace_util.span("body", "http", url=url) :
+                    await _readBody(reader, headers, target, throttle_util.getChunkSize(chunks), readTimeout, parts.netloc)
+                https_util.recordResponse(target, url, headers.get("etag"))
+                return latency
+            finally :
+                writer.close()
+        raise HttpError(f"Failed to fetch {source}. There were more than {_MAX_REDIRECTS} redirects.")
+    except HttpError as http :
+        _logger.error(str(http))
+        raise
+    except asyncio.TimeoutError as timedOut :
+        _logger.error(f"Failed to fetch {source}. The request timed out.")
+        raise HttpError(f"Failed to fetch {source}. The request timed out.") from timedOut
+    except (OSError, ValueError, asyncio.IncompleteReadError, asyncio.LimitOverrunError) as error :
+        _logger.error(f"Failed to fetch {source}. There was an issue with the request: {error}")
+        raise HttpError(f"Failed to fetch {source}. There was an issue with the request: {error}") from error
+
+
+async def _connect(parts:SplitResult, timeout:float) -> tuple[asyncio.StreamReader, asyncio.StreamWriter] :
+    """Opens a connection to the host of the given url."""
+    if parts.scheme not in ("http", "https") or not parts.hostname :
+        raise HttpError(f"Unable to fetch {parts.geturl()} - only http(s) urls are supported.")
+    global _sslContext
+    secure:bool = parts.scheme == "https"
+    if secure and _sslContext is None :
+        _sslContext = ssl.create_default_context()
+    return await asyncio.wait_for(asyncio.open_connection(parts.hostname, parts.port or (443 if secure else 80), ssl=_sslContext if secure else None), timeout)
+
+
+async def _sendRequest(writer:asyncio.StreamWriter, parts:SplitResult) :
+    """Sends a GET request for the given url. The connection is closed by the server once the response is sent."""
+    path:str = parts.path or "/"
+    if parts.query :
+        path = f"{path}?{parts.query}"
+    host:str = parts.netloc.rpartition("@")[2]
+    writer.write((f"GET {path} HTTP/1.1\r\n"
+                  f"Host: {host}\r\n"
+                  "User-Agent: dependency-resolver\r\n"
+                  "Accept: */*\r\n"
+                  "Accept-Encoding: identity\r\n"
+                  "Connection: close\r\n"
+                  "\r\n").encode("latin-1"))
+    await writer.drain()
+
+
+async def _readHead(reader:asyncio.StreamReader, timeout:float) -> tuple[int, dict[str, str]] :
+    """Reads the status line and headers of a response. Header names are lower case."""
+    statusLine:str = (await asyncio.wait_for(reader.readline(), timeout)).decode("latin-1").strip()
+    pieces:list[str] = statusLine.split(" ", 2)
+    if len(pieces) < 2 or not pieces[0].startswith("HTTP/") or not pieces[1].isdigit() :
+        raise HttpError(f"Received an invalid response: {statusLine!r}")
+
+    headers:dict[str, str] = {}
+    while True :
+        line:str = (await asyncio.wait_for(reader.readline(), timeout)).decode("latin-1").strip()
+        if not line :
+            break
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return int(pieces[1]), headers
+
+
+async def _readBody(reader:asyncio.StreamReader, headers:dict[str, str], target:str, chunks:int, timeout:float, host:str) :
+    """Streams the body of a response into the target file (chunked, content-length or read-until-closed), throttled to the host's bandwidth limits."""
+    targetFile:Any = await asyncio.to_thread(open, target, "wb")
+    try :
+        if "chunked" in headers.get("transfer-encoding", "").lower() :
+            while True :
+                size:int = int((await asyncio.wait_for(reader.readline(), timeout)).split(b";")[0].strip(), 16)
+                if size == 0 :
+                    while (await asyncio.wait_for(reader.readline(), timeout)).strip() :  # skip any trailers
+                        pass
+                    break
+                while size > 0 :
+                    data:bytes = await asyncio.wait_for(reader.readexactly(min(size, chunks)), timeout)
+                    await _write(targetFile, data, host)
+                    size -= len(data)
+                await asyncio.wait_for(reader.readline(), timeout)  # the line ending after the chunk
+        elif "content-length" in headers :
+            remaining:int = int(headers["content-length"])
+            while remaining > 0 :
+                data = await asyncio.wait_for(reader.read(min(remaining, chunks)), timeout)
+                if not data :
+                    raise HttpError(f"The connection closed with {remaining} bytes of the response still to receive.")
+                await _write(targetFile, data, host)
+                remaining -= len(data)
+        else :
+            while data := await asyncio.wait_for(reader.read(chunks), timeout) :
+                await _write(targetFile, data, host)
+    finally :
+        await asyncio.to_thread(targetFile.close)
+
+
+async def _write(targetFile:Any, data:bytes, host:str) :
+    """Writes received data to the target file (in a thread), once the bandwidth limits allow it."""
+    await throttle_util.throttleAsync(host, len(data))
+    await asyncio.to_thread(targetFile.write, data)
+
@@ -1,13 +1,25 @@
+import hashlib
 import logging
 import shutil
 import os
 import glob
+import stat
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional, Union
 from . import helpers, time_util, errors_util
 
 _logger:logging.Logger = logging.getLogger(__name__)
 
+# Added to the name of a path that has been renamed aside to be deleted in the background.
+DELETING_SUFFIX:str = ".deleting-"
+
+# Directories can be deleted (and walked) relative to open directory descriptors (not on every platform, e.g. Windows).
+_FD_RELATIVE_DELETE:bool = {os.open, os.unlink, os.rmdir} <= os.supports_dir_fd and os.scandir in os.supports_fd
+_FD_RELATIVE_WALK:bool = {os.open, os.chmod, os.chown} <= os.supports_dir_fd and os.scandir in os.supports_fd and os.chown in os.supports_follow_symlinks
+
 
 def mkdir(dir:str, parents:bool = True, exist_ok:bool = True, mode:int = 511, user:Optional[str] = None, group:Optional[str] = None) :
     """
@@ -69,6 +81,85 @@ def isFile(path:str) -> bool :
     return helpers.hasValue(path) and os.path.isfile(path)
 
 
+def getSize(path:str) -> int :
+    """
+    Get the size of a file, in bytes.
+
+    Args:
+        path (str): The path to the file.
+
+    Returns:
+        int: The size of the file, or 0 if it does not exist (or is not a file).
+    """
+    try :
+        return os.stat(path).st_size if isFile(path) else 0
+    except OSError :
+        return 0
+
+
+def getTreeSize(path:str) -> int :
+    """
+    Get the size of a file, or the total size of the (regular) files in a directory, in bytes.
+
+    Args:
+        path (str): The path to the file or directory.
+
+    Returns:
+        int: The size, or 0 if nothing exists at the path.
+    """
+    if not isDir(path) :
+        return getSize(path)
+    return sum(getSize(os.path.join(directory, name)) for directory, _, names in os.walk(path) for name in names if not os.path.islink(os.path.join(directory, name)))
+
+
+def hashFile(path:str, chunks:int = 1024 * 1024) -> str :
+    """
+    Get the sha256 of a file's content.
+
+    Args:
+        path (str): The path to the file.
+        chunks (int, optional): The number of bytes read at a time. Defaults to 1MB.
+
+    Returns:
+        str: The sha256 of the file, as hex.
+
+    Raises:
+        OSError if the file cannot be read.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file :
+        while piece := file.read(chunks) :
+            digest.update(piece)
+    return digest.hexdigest()
+
+
+def hashTree(path:str, chunks:int = 1024 * 1024) -> str :
+    """
+    Get the sha256 of a file's content, or of a directory's files: their paths (relative to the directory) and the sha256 of their content.
+    Only regular files count - the same files with the same content always give the same sha256.
+
+    Args:
+        path (str): The path to the file or directory.
+        chunks (int, optional): The number of bytes read at a time. Defaults to 1MB.
+
+    Returns:
+        str: The sha256, as hex.
+
+    Raises:
+        OSError if a file cannot be read.
+    """
+    if not isDir(path) :
+        return hashFile(path, chunks)
+    digest = hashlib.sha256()
+    for directory, directories, names in os.walk(path) :
+        directories.sort()
+        for name in sorted(names) :
+            file:str = os.path.join(directory, name)
+            if os.path.isfile(file) and not os.path.islink(file) :
+                digest.update(f"{os.path.relpath(file, path).replace(os.sep, '/')}\0{hashFile(file, chunks)}\n".encode())
+    return digest.hexdigest()
+
+
 def ensurePathExists(path:str) -> bool :
     """
     Ensure the target path exists. Exits if the path doesn't exist.
@@ -137,6 +228,22 @@ def getParentDirectory(fullPath:str) -> str :
     return os.path.dirname(fullPath)
 
 
+def isWithin(path:str, directory:str) -> bool :
+    """
+    Tests whether a path is inside a directory (at any depth). A directory is not within itself.
+
+    Args:
+        path (str): The path to test.
+        directory (str): The directory that may contain it.
+
+    Returns:
+        bool: True if the path is inside the directory.
+    """
+    path = os.path.abspath(path)
+    directory = os.path.abspath(directory)
+    return path != directory and os.path.commonpath([path, directory]) == directory
+
+
 def getUserDirectory() -> str :
     """
     Get the user's home directory.
@@ -147,7 +254,7 @@ def getUserDirectory() -> str :
     return str(Path.home().absolute().resolve())
 
 
-def copy(source:str, dest:str, sourceDirectoryContentsOnly:Optional[bool] = False) -> bool :
+def copy(source:str, dest:str, sourceDirectoryContentsOnly:Optional[bool] = False, throttle:Optional[Callable[[int], None]] = None) -> bool :
     """
     Copy files or directories.
 
@@ -155,6 +262,7 @@ def copy(source:str, dest:str, sourceDirectoryContentsOnly:Optional[bool] = Fals
         source (str): The source file or directory.
         dest (str): The destination path.
         sourceDirectoryContentsOnly (bool, optional): If True, only copy the contents of a source directory (has no effect if source is a file). Defaults to False.
+        throttle (Optional[Callable[[int], None]], optional): Called with the size of each piece of a file before it is copied, and can wait to limit the bandwidth. Defaults to None (copied as fast as possible).
 
     Returns:
         bool: The path to the newly copied file / destination directory. Empty String indicates an error.
@@ -163,12 +271,15 @@ def copy(source:str, dest:str, sourceDirectoryContentsOnly:Optional[bool] = Fals
         if Path(source).exists() :
             if Path(source).is_dir() :
                 if sourceDirectoryContentsOnly :
-                    return copyContents(source, dest)
+                    return copyContents(source, dest, throttle)
                 else :
-                    _logger.debug(f"Copying directory from {source} -> {dest}")
-                    return helpers.hasValue(shutil.copytree(source, dest, dirs_exist_ok=True))
+                    _logger.debug("Copying directory from %s -> %s", source, dest)
+                    copyFunction:Callable = shutil.copy2 if throttle is None else lambda fileSource, fileDest : _copyThrottled(fileSource, fileDest, throttle)
+                    return helpers.hasValue(shutil.copytree(source, dest, dirs_exist_ok=True, copy_function=copyFunction))
             else :
-                _logger.debug("Copying " + source + " -> " + dest)
+                _logger.debug("Copying %s -> %s", source, dest)
+                if throttle is not None :
+                    return helpers.hasValue(_copyThrottled(source, dest, throttle))
                 return helpers.hasValue(shutil.copy2(source, dest))
         else :
             _logger.error(f"Can't copy - {source} does not exist")
@@ -178,13 +289,48 @@ def copy(source:str, dest:str, sourceDirectoryContentsOnly:Optional[bool] = Fals
         return False
 
 
-def copyContents(dir:str, dest:str) -> bool:
+def link(source:str, dest:str) -> bool :
+    """
+    Hard link a file, or every file in a directory, to a new path - so the same content appears in both places without being copied.
+    Files are copied instead where they can't be linked (e.g. the destination is on another filesystem).
+
+    Args:
+        source (str): The source file or directory.
+        dest (str): The destination path. Must not exist.
+
+    Returns:
+        bool: True if the source was linked (or copied), False if there was an error.
+    """
+    try :
+        if Path(source).is_dir() :
+            _logger.debug("Linking directory %s -> %s", source, dest)
+            shutil.copytree(source, dest, copy_function=_linkFile)
+        else :
+            _logger.debug("Linking %s -> %s", source, dest)
+            _linkFile(source, dest)
+        return True
+    except Exception :
+        _logger.error(f"Failed to link {source} -> {dest}", exc_info=True)
+        return False
+
+
+def _linkFile(source:str, dest:str) -> str :
+    """Hard links a file, copying it if it can't be linked."""
+    try :
+        os.link(source, dest)
+    except OSError :
+        shutil.copy2(source, dest)
+    return dest
+
+
+def copyContents(dir:str, dest:str, throttle:Optional[Callable[[int], None]] = None) -> bool:
     """
     Copy the contents of a directory to a destination.
 
     Args:
         dir (str): The source directory.
         dest (str): The destination directory.
+        throttle (Optional[Callable[[int], None]], optional): Called with the size of each piece of a file before it is copied (see copy). Defaults to None.
 
     Returns:
         bool: The destination directory, if successful.
@@ -193,7 +339,7 @@ def copyContents(dir:str, dest:str) -> bool:
         if os.path.exists(dir) and os.path.isdir(dir) :
             _logger.error("Copying contents of %s -> %s", dir, dest)
             for name in os.listdir(dir):
-                copy(os.path.join(dir, name), dest, False)  # copy files and complete directories
+                copy(os.path.join(dir, name), dest, False, throttle)  # copy files and complete directories
             return True
         else :
             _logger.error("Cannot copy contents of %s as it does not exist", dir)
@@ -203,6 +349,26 @@ def copyContents(dir:str, dest:str) -> bool:
         return False
 
 
+def _copyThrottled(source:str, dest:str, throttle:Callable[[int], None], chunks:int = 64 * 1024) -> str :
+    """
+    Copies a file (and its metadata, like shutil.copy2) a piece at a time, calling throttle before each piece.
+
+    Returns:
+        str: the path of the copy.
+    """
+    if os.path.isdir(dest) :
+        dest = os.path.join(dest, os.path.basename(source))
+    with open(source, "rb") as sourceFile, open(dest, "wb") as destFile :
+        while True :
+            data:bytes = sourceFile.read(chunks)
+            if not data :
+                break
+            throttle(len(data))
+            destFile.write(data)
+    shutil.copystat(source, dest)
+    return dest
+
+
 def chown(path:str, user:str, group:str) :
     """
     Change the ownership of a file or directory (but not the contents of the directory).
@@ -216,29 +382,26 @@ def chown(path:str, user:str, group:str) :
     shutil.chown(path, user, group)
 
 
-def chown_recursive(path:str, user:str, group:str) :
+def chown_recursive(path:str, user:Optional[Union[str, int]], group:Optional[Union[str, int]], workers:int = 1, recursive:bool = True) :
     """
-    Change the ownership of a directory and its contents.
+    Change the ownership of a directory and its contents. Symbolic links are changed themselves (what they point to is left alone).
+    Entries that already have the right owner are skipped. Each entry is changed relative to its open parent directory.
 
     Args:
         path (str): A path, or Path-like object.
-        user (str): The user group (name, or uid).
-        group (str): The group (name or group id).
+        user (Optional[Union[str, int]]): The user (name, or uid). None leaves the user unchanged.
+        group (Optional[Union[str, int]]): The group (name or group id). None leaves the group unchanged.
+        workers (int, optional): The number of threads working on the sub directories at the same time. Defaults to 1.
+        recursive (bool, optional): False changes only the path itself, not what a directory holds. Defaults to True.
     """
     _logger.debug("chown -R %s:%s %s...", user, group, path)
+    uid, gid = _lookupOwner(user, group)
 
-    # Change ownership for the top-level folder
-    chown(path, user, group)
-
-    for root, dirs, files in os.walk(path):
-        # chown all sub-directories
-        for dir in dirs:
-            chown(os.path.join(root, dir), user, group)
-
-        # chown all files
-        for file in files:
-            chown(os.path.join(root, file), user, group)
+    def change(dirFd:Optional[int], name:str, status:os.stat_result) :
+        if (uid != -1 and status.st_uid != uid) or (gid != -1 and status.st_gid != gid) :
+            os.chown(name, uid, gid, dir_fd=dirFd, follow_symlinks=False)
 
+    _walkTree(path, change, workers, recursive)
     _logger.debug("...chown %s completed", path)
 
 
@@ -254,62 +417,264 @@ def chmod(path:str, permissions:int) :
     os.chmod(path, permissions)
 
 
-def chmod_recursive(path:str, permissions:int) :
+def chmod_recursive(path:str, permissions:Optional[int], workers:int = 1, dirPermissions:Optional[int] = None, recursive:bool = True) :
     """
-    Change the permissions of a directory and its contents.
+    Change the permissions of a directory and its contents. Symbolic links are skipped (what they point to is left alone).
+    Entries that already have the right permissions are skipped. Each entry is changed relative to its open parent directory.
 
     Args:
         path (str): A path, or Path-like object.
-        permissions (int): An octal string (e.g. 0o750).
+        permissions (Optional[int]): An octal string (e.g. 0o750). None leaves the files (but not the directories) unchanged.
+        workers (int, optional): The number of threads working on the sub directories at the same time. Defaults to 1.
+        dirPermissions (Optional[int], optional): Different permissions for directories (e.g. 0o755 when files are 0o644). Defaults to permissions.
+        recursive (bool, optional): False changes only the path itself, not what a directory holds. Defaults to True.
     """
     _logger.debug("chmod -R %s %s...", permissions, path)
+    directoryPermissions:Optional[int] = permissions if dirPermissions is None else dirPermissions
 
-    # Change permissions for the top-level folder
-    chmod(path, permissions)
+    def change(dirFd:Optional[int], name:str, status:os.stat_result) :
+        if stat.S_ISLNK(status.st_mode) :
+            return
+        wanted:Optional[int] = directoryPermissions if stat.S_ISDIR(status.st_mode) else permissions
+        if wanted is not None and stat.S_IMODE(status.st_mode) != wanted :
+            os.chmod(name, wanted, dir_fd=dirFd)
 
-    for root, dirs, files in os.walk(path):
-        # chmod all sub-directories
-        for dir in dirs:
-            chmod(os.path.join(root, dir), permissions)
+    _walkTree(path, change, workers, recursive)
+    _logger.debug("...chmod %s completed", path)
 
-        # chmod all files
-        for file in files:
-            chmod(os.path.join(root, file), permissions)
 
-    _logger.debug("...chmod %s completed", path)
+def _walkTree(path:str, visit:Callable[[Optional[int], str, os.stat_result], None], workers:int, recursive:bool = True) :
+    """
+    Visits a path and (if it is a directory) everything below it, without following symbolic links.
+    A directory is visited before its contents. Each entry is visited with its open parent directory and its name (the top path with None and the path).
 
+    Args:
+        path (str): The path to walk.
+        visit (Callable[[Optional[int], str, os.stat_result], None]): called with the parent directory descriptor, the name and the (lstat) status of each entry.
+        workers (int): The number of threads walking the sub directories at the same time.
+        recursive (bool): False visits only the path itself.
+    """
+    status:os.stat_result = os.lstat(path)
+    visit(None, path, status)
+    if not recursive or not stat.S_ISDIR(status.st_mode) :
+        return
+    if not _FD_RELATIVE_WALK :  # e.g. Windows
+        for root, dirs, files in os.walk(path) :
+            for name in dirs + files :
+                child:str = os.path.join(root, name)
+                visit(None, child, os.lstat(child))
+        return
+
+    dirFd:int = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    try :
+        subdirectories:list[str] = _visitEntries(dirFd, visit)
+        if workers > 1 and len(subdirectories) > 1 :
+            with ThreadPoolExecutor(min(workers, len(subdirectories)), thread_name_prefix="walk") as pool :
+                for _ in pool.map(lambda name : _visitTree(dirFd, name, visit), subdirectories) :  # raises the first failure
+                    pass
+        else :
+            for name in subdirectories :
+                _visitTree(dirFd, name, visit)
+    finally :
+        os.close(dirFd)
+
+
+def _visitEntries(dirFd:int, visit:Callable[[Optional[int], str, os.stat_result], None]) -> list[str] :
+    """Visits every entry of an open directory, returning the names of its sub directories."""
+    subdirectories:list[str] = []
+    with os.scandir(dirFd) as entries :
+        for entry in entries :
+            visit(dirFd, entry.name, entry.stat(follow_symlinks=False))
+            if entry.is_dir(follow_symlinks=False) :
+                subdirectories.append(entry.name)
+    return subdirectories
+
+
+def _visitTree(parentFd:int, name:str, visit:Callable[[Optional[int], str, os.stat_result], None]) :
+    """Visits everything in a directory (given by its name in an open parent directory)."""
+    dirFd:int = os.open(name, os.O_RDONLY | os.O_DIRECTORY | os.O_NOFOLLOW, dir_fd=parentFd)
+    try :
+        for subdirectory in _visitEntries(dirFd, visit) :
+            _visitTree(dirFd, subdirectory, visit)
+    finally :
+        os.close(dirFd)
 
-def delete(path:str) :
+
+def _lookupOwner(user:Optional[Union[str, int]], group:Optional[Union[str, int]]) -> tuple[int, int] :
+    """
+    Looks up a user and group once, so they aren't looked up for every entry. -1 means unchanged.
+
+    Raises:
+        LookupError if the user or group doesn't exist.
     """
-    Delete the given target path. If the path points to a symbolic link then it is unlinked.
+    import grp, pwd  # not available on Windows
+    uid:int = -1
+    gid:int = -1
+    if user is not None and str(user) != "" :
+        uid = int(user) if str(user).isdigit() else pwd.getpwnam(str(user)).pw_uid
+    if group is not None and str(group) != "" :
+        gid = int(group) if str(group).isdigit() else grp.getgrnam(str(group)).gr_gid
+    return uid, gid
+
+
+def delete(path:str, workers:int = 1) -> int :
+    """
+    Delete the given target path. If the path points to a symbolic link then it is unlinked (what it points to is left alone).
+    Directories are deleted relative to open directory descriptors, so each entry costs a single system call rather than a path lookup and stats.
 
     Args:
         path (str): The path to delete.
+        workers (int, optional): The number of threads deleting the sub directories of a directory at the same time. Defaults to 1.
+
+    Returns:
+        int: the number of files (anything but directories) deleted.
     """
-    toDelete:Path = Path(path)
-    if toDelete.exists() :
-        if toDelete.is_dir() and not toDelete.is_symlink() :
-            _logger.debug("rm -r %s", toDelete.absolute())
-            deleteContents(str(toDelete.absolute()))
-            toDelete.rmdir()
-        else :
-            _logger.debug("rm %s", toDelete.absolute())
-            toDelete.unlink()
-    else :
-        _logger.debug("Not deleting non-existent path %s", toDelete.absolute())
+    try :
+        isDirectory:bool = stat.S_ISDIR(os.lstat(path).st_mode)
+    except FileNotFoundError :
+        _logger.debug("Not deleting non-existent path %s", path)
+        return 0
+
+    if isDirectory :
+        _logger.debug("rm -r %s", path)
+        deleted:int = deleteContents(path, workers)
+        _ignoreMissing(os.rmdir, path)
+        return deleted
+    _logger.debug("rm %s", path)
+    _ignoreMissing(os.unlink, path)
+    return 1
 
 
-def deleteContents(dir:str) :
+def deleteContents(dir:str, workers:int = 1) -> int :
     """
     Delete the contents of a directory (not the directory itself).
 
     Args:
         dir (str): The directory whose contents will be deleted.
+        workers (int, optional): The number of threads deleting the sub directories at the same time. Defaults to 1.
+
+    Returns:
+        int: the number of files (anything but directories) deleted.
+    """
+    if not isDir(dir) :
+        return 0
+    deleted:int = 0
+    if not _FD_RELATIVE_DELETE :  # e.g. Windows
+        for name in os.listdir(dir) :
+            child:str = os.path.join(dir, name)
+            if os.path.isdir(child) and not os.path.islink(child) :
+                deleted += sum(len(files) for _, _, files in os.walk(child))
+                shutil.rmtree(child)
+            else :
+                os.unlink(child)
+                deleted += 1
+        return deleted
+
+    dirFd:int = os.open(dir, os.O_RDONLY | os.O_DIRECTORY)
+    try :
+        subdirectories:list[str]
+        subdirectories, deleted = _deleteFilesIn(dirFd)
+        if workers > 1 and len(subdirectories) > 1 :
+            with ThreadPoolExecutor(min(workers, len(subdirectories)), thread_name_prefix="delete") as pool :
+                deleted += sum(pool.map(lambda name : _deleteTree(dirFd, name), subdirectories))  # raises the first failure
+        else :
+            for name in subdirectories :
+                deleted += _deleteTree(dirFd, name)
+    finally :
+        os.close(dirFd)
+    return deleted
+
+
+def deleteInBackground(path:str, workers:int = 1, onDeleted:Optional[Callable[[int], None]] = None) -> Optional[threading.Thread] :
+    """
+    Deletes a path without waiting for it to be deleted: it is renamed aside (a hidden name in the same directory), then deleted by a background thread.
+    The path is free to be reused as soon as this returns. The process waits for the thread to finish before it exits.
+
+    Args:
+        path (str): The path to delete.
+        workers (int, optional): The number of threads deleting the sub directories at the same time. Defaults to 1.
+        onDeleted (Optional[Callable[[int], None]]): called (in the background thread) with the number of files deleted, once the path is deleted.
+
+    Returns:
+        Optional[threading.Thread]: the thread deleting the path, or None if there was nothing to delete.
     """
-    toDelete:Path = Path(dir)
-    if toDelete.exists() :
-        for name in os.listdir(dir):
-            delete(os.path.join(dir, name))
+    if not os.path.lexists(path) :
+        return None
+    aside:str = os.path.join(os.path.dirname(os.path.abspath(path)), f".{os.path.basename(os.path.abspath(path))}{DELETING_SUFFIX}{uuid.uuid4().hex[:12]}")
+    os.rename(path, aside)
+    _logger.debug("Moved %s aside to %s to delete it in the background", path, aside)
+    return reapInBackground([aside], workers, onDeleted)
+
+
+def reapInBackground(paths:list[str], workers:int = 1, onDeleted:Optional[Callable[[int], None]] = None) -> Optional[threading.Thread] :
+    """
+    Deletes paths in a background thread. The process waits for the thread to finish before it exits.
+
+    Args:
+        paths (list[str]): The paths to delete.
+        workers (int, optional): The number of threads deleting the sub directories at the same time. Defaults to 1.
+        onDeleted (Optional[Callable[[int], None]]): called (in the background thread) with the number of files deleted, once each path is deleted.
+
+    Returns:
+        Optional[threading.Thread]: the thread deleting the paths, or None if there was nothing to delete.
+    """
+    if not paths :
+        return None
+
+    def reap() :
+        for path in paths :
+            try :
+                deleted:int = delete(path, workers)
+                _logger.debug("Deleted %s (%s files) in the background", path, deleted)
+                if onDeleted is not None :
+                    onDeleted(deleted)
+            except OSError :
+                _logger.warning(f"Failed to delete {path} in the background", exc_info=True)
+
+    reaper:threading.Thread = threading.Thread(target=reap, name="reaper")
+    reaper.start()
+    return reaper
+
+
+def _deleteFilesIn(dirFd:int) -> tuple[list[str], int] :
+    """Unlinks every non directory entry of an open directory, returning the names of its sub directories and how many entries were unlinked."""
+    subdirectories:list[str] = []
+    deleted:int = 0
+    with os.scandir(dirFd) as entries :
+        for entry in entries :
+            try :
+                if entry.is_dir(follow_symlinks=False) :
+                    subdirectories.append(entry.name)
+                else :
+                    os.unlink(entry.name, dir_fd=dirFd)
+                    deleted += 1
+            except FileNotFoundError :  # something else deleted it first.
+                pass
+    return subdirectories, deleted
+
+
+def _deleteTree(parentFd:int, name:str) -> int :
+    """Deletes a directory (given by its name in an open parent directory) and everything in it. Returns the number of files deleted."""
+    try :
+        dirFd:int = os.open(name, os.O_RDONLY | os.O_DIRECTORY | os.O_NOFOLLOW, dir_fd=parentFd)
+    except FileNotFoundError :
+        return 0
+    try :
+        subdirectories, deleted = _deleteFilesIn(dirFd)
+        for subdirectory in subdirectories :
+            deleted += _deleteTree(dirFd, subdirectory)
+    finally :
+        os.close(dirFd)
+    _ignoreMissing(os.rmdir, name, dir_fd=parentFd)
+    return deleted
+
+
+def _ignoreMissing(remove, path:str, **kwargs) :
+    """Removes a path, ignoring it not existing (something else deleted it first)."""
+    try :
+        remove(path, **kwargs)
+    except FileNotFoundError :
+        pass
 
 
 def emptyFileContents(filePath:str) :
@@ -459,9 +824,9 @@ def removeFilesOfTypes(dir:str, types:list[str]) :
             search_pattern = os.path.join(dir, '**', pattern)
             for path in glob.iglob(search_pattern, recursive=True):
                 try :
-                    _logger.debug(f"Removing {path}")
+                    _logger.debug("Removing %s", path)
                     delete(path)
-                    _logger.debug(f"Removed {path}")
+                    _logger.debug("Removed %s", path)
                 except Exception as e :
                     raise FileError(f"Failed to remove file {path}: {e}")
 
@@ -0,0 +1,37 @@
+from typing import Optional
+
+
+def findCycle(edges:dict[str, list[str]]) -> Optional[list[str]] :
+    """
+    Finds a cycle in a directed graph.
+
+    Args:
+        edges (dict[str, list[str]]): Maps each node to the nodes it has an edge to. Edges to nodes that are not keys of the dictionary are ignored.
+
+    Returns:
+        Optional[list[str]]: The nodes that make up a cycle (the first node is repeated at the end), or None if the graph has no cycles.
+    """
+    # iterative depth-first search - recursion would be limited by the size of the graph.
+    visiting:int = 1
+    visited:int = 2
+    state:dict[str, int] = {}
+    for start in edges :
+        if state.get(start) is not None :
+            continue
+        path:list[str] = [start]
+        stack:list = [iter(edges[start])]
+        state[start] = visiting
+        while stack :
+            node:Optional[str] = next(stack[-1], None)
+            if node is None :
+                state[path.pop()] = visited
+                stack.pop()
+            elif node in edges :
+                if state.get(node) == visiting :
+                    return path[path.index(node):] + [node]
+                if state.get(node) is None :
+                    state[node] = visiting
+                    path.append(node)
+                    stack.append(iter(edges[node]))
+
+    return None
@@ -102,3 +102,69 @@ def isValidUrl(url:str) -> bool:
         bool: True if the string is a valid URL, otherwise False.
     """
     return hasValue(url) and url.startswith("http")
+
+
+def parseMode(mode:Any) -> Optional[int] :
+    """
+    Parses a file mode given as an octal string (e.g. "644", "0644" or "0o644").
+
+    Args:
+        mode (Any): The mode to parse.
+
+    Returns:
+        Optional[int]: The mode (e.g. 0o644), or None if it isn't an octal string of permission bits.
+    """
+    if not isinstance(mode, str) :
+        return None
+    try :
+        value:int = int(mode.removeprefix("0o"), 8)
+    except ValueError :
+        return None
+    return value if 0 <= value <= 0o7777 else None
+
+
+def parseOwner(owner:Optional[str]) -> tuple[Optional[str], Optional[str]] :
+    """
+    Splits an owner given as "user", "user:group" or ":group".
+
+    Args:
+        owner (Optional[str]): The owner to split.
+
+    Returns:
+        tuple[Optional[str], Optional[str]]: The user and the group - None for either part that isn't given.
+    """
+    if isEmpty(owner) :
+        return None, None
+    user, _, group = owner.partition(":")  # type: ignore - checked above
+    return user or None, group or None
+
+
+def parseSize(size:Any) -> Optional[float] :
+    """
+    Parses a number of bytes, given as a number or a string with an optional K, M or G suffix (powers of 1024) - e.g. 512, "64K", "10MB" or "1.5G".
+
+    Args:
+        size (Any): The size to parse.
+
+    Returns:
+        Optional[float]: The number of bytes, or None if it isn't a size (or isn't positive).
+    """
+    if isinstance(size, bool) :
+        return None
+    if isinstance(size, (int, float)) :
+        return float(size) if size > 0 else None
+    if not isinstance(size, str) :
+        return None
+    text:str = size.strip().upper().removesuffix("B").removesuffix("I")
+    multiplier:int = 1
+    if text[-1:] in _SIZE_MULTIPLIERS :
+        multiplier = _SIZE_MULTIPLIERS[text[-1]]
+        text = text[:-1]
+    try :
+        value:float = float(text) * multiplier
+    except ValueError :
+        return None
+    return value if 0 < value < float("inf") else None
+
+
+_SIZE_MULTIPLIERS:dict[str, int] = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
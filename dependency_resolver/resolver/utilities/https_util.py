@@ -1,28 +1,180 @@
 import logging
+import threading
+import time
 import requests
+import urllib3
+from typing import BinaryIO, Mapping, Optional, Union
+from urllib.parse import urlsplit
+from . import metrics_util, retry_util, throttle_util, trace_util
 from .errors_util import UtilityError
 
 _logger:logging.Logger = logging.getLogger(__name__)
 
+# How long (seconds) requests wait to connect, and for the response (headers, or the next piece of the body).
+_connectTimeout:float = 10
+_readTimeout:float = 10
 
-def download(source:str, target:str, chunks:int = 1024 * 1024 * 50) :
+# The smallest piece of a download read at once. Pieces start at the initial size, double while they fill quickly and halve while they arrive slowly.
+MIN_CHUNK:int = 16 * 1024
+INITIAL_CHUNK:int = 64 * 1024
+
+# Reading a piece faster than this (seconds) means the connection can keep a bigger piece busy - slower than the slow limit, a smaller one.
+_FAST_READ:float = 0.025
+_SLOW_READ:float = 0.25
+
+# Connections are kept open and reused between downloads from the same host (most useful to a long-running serve process).
+POOL_CONNECTIONS:int = 16
+_session:Optional[requests.Session] = None
+_sessionLock:threading.Lock = threading.Lock()
+
+# While they are being recorded (see recordResponses), the url the redirects of each download ended at and the ETag it was served with,
+# by the file it was downloaded to - taken from the response the file was read from, so they describe exactly what was downloaded.
+_responses:Optional[dict[str, tuple[str, Optional[str]]]] = None
+
+
+def setTimeouts(connect:float, read:float) :
+    """
+    Sets how long requests wait for a server.
+
+    Args:
+        connect (float): seconds to wait for a connection to the server.
+        read (float): seconds to wait for the response headers, or for the next piece of the body.
+    """
+    global _connectTimeout, _readTimeout
+    _connectTimeout = connect
+    _readTimeout = read
+
+
+def getTimeouts() -> tuple[float, float] :
+    """
+    Returns:
+        tuple[float, float]: the seconds requests wait to connect, and to read.
+    """
+    return _connectTimeout, _readTimeout
+
+
+def getSession() -> requests.Session :
+    """
+    Returns:
+        requests.Session: the session every request is made with, so connections to a host are pooled and reused.
+    """
+    global _session
+    with _sessionLock :
+        if _session is None :
+            _session = requests.Session()
+            adapter:requests.adapters.HTTPAdapter = requests.adapters.HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_CONNECTIONS)
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+        return _session
+
+
+def recordResponses(record:bool) :
+    """
+    Starts recording the url the redirects of each download ended at and its ETag (see getResponse), or stops and forgets them.
+
+    Args:
+        record (bool): True to record them, False to stop.
+    """
+    global _responses
+    _responses = {} if record else None
+
+
+def getResponse(target:str) -> Optional[tuple[str, Optional[str]]] :
+    """
+    Returns:
+        Optional[tuple[str, Optional[str]]]: the url the redirects of the download to the target file ended at, and the ETag it was served with (if any) -
+        or None if nothing has been downloaded to it since recordResponses was called.
+    """
+    return _responses.get(target) if _responses is not None else None
+
+
+def recordResponse(target:str, url:str, etag:Optional[str]) :
+    """Records what a download was served as (if responses are being recorded - see recordResponses)."""
+    if _responses is not None :
+        _responses[target] = (url, etag)
+
+
+def closeSession() :
+    """Closes any pooled connections. The next request opens new ones."""
+    global _session
+    with _sessionLock :
+        if _session is not None :
+            _session.close()
+            _session = None
+
+
+def download(source:str, target:str, chunks:int = 1024 * 1024, policy:Optional[retry_util.RetryPolicy] = None) -> float :
     """
     Streams the specified source url into a target file.
+    Failures worth trying again (no answer, or an overloaded server) are retried with a jittered backoff (see retry_util.setPolicy).
+    Once the host has failed too many times in a row its circuit breaker opens, and downloads from it fail at once (see retry_util.setBreakers).
     Parameters:
         source - Full absolute URL to the source
         target - Full absolute path to the destination file (note existing file will be truncated if it exists)
-        chunks - Response is streamed in chunks to avoid memory issues (number of bytes). 50MB by default.
+        chunks - The largest piece of the response read at once (number of bytes), which is the buffer each download reuses. 1MB by default.
+        policy - How failures are retried. Defaults to the policy set with retry_util.setPolicy.
+    Returns:
+        float: the seconds taken to connect and receive the response headers (the latency of the server).
     Raises:
-        errors.HTTPError if it fails to download.
+        HttpError if it fails to download.
     """
-    _logger.debug(f"Downloading {source} to {target}")
+    _logger.debug("Downloading %s to %s", source, target)
+    host:str = urlsplit(source).netloc
+    breaker:retry_util.CircuitBreaker = retry_util.getBreaker(host)
+    policy = policy if policy is not None else retry_util.getPolicy()
+    for retry in range(policy.retries + 1) :
+        if not breaker.allow() :
+            metrics_util.FAST_FAILURES.increment(host=host)
+            raise HttpError(f"Failed to fetch {source}. {host} has been failing, so its circuit breaker is open.")
+        try :
+            with breaker.releasing(HttpError) :
+                latency:float = _downloadOnce(source, host, target, chunks)
+        except HttpError as http :
+            recordAnswer(breaker, http.status)
+            if retry == policy.retries or not policy.isRetriable(http.status) :
+                raise
+            delay:float = policy.getDelay(retry)
+            _logger.warning(f"Retrying {source} in {delay:.1f}s (retry {retry + 1} of {policy.retries}).")
+            metrics_util.RETRIES.increment(host=host)
+            time.sleep(delay)
+            continue
+        breaker.recordSuccess()
+        return latency
+    raise HttpError(f"Failed to fetch {source}.")  # not reached - the last attempt returns or raises.
 
+
+def recordAnswer(breaker:retry_util.CircuitBreaker, status:Optional[int]) :
+    """
+    Records a failed request with a host's circuit breaker: only no answer, or a server error, counts against the host.
+    Parameters:
+        breaker - the host's circuit breaker.
+        status - the http status the host answered with, or None if there was no answer.
+    """
+    if status is None or status >= 500 :
+        breaker.recordFailure()
+    else :
+        breaker.recordSuccess()
+
+
+def _downloadOnce(source:str, host:str, target:str, chunks:int) -> float :
+    """Makes a single attempt to download the source (throttled to the bandwidth limits). Returns the seconds until the response headers arrived."""
     try :
-        response:requests.Response = requests.get(source, stream=True, allow_redirects=True, timeout=10)
-        response.raise_for_status()  # check for any http errors
-        with open(target, 'wb') as targetFile :
-            for chunk in response.iter_content(chunks, decode_unicode=False) :
-                targetFile.write(chunk)
+        started:float = time.perf_counter()
+        with trace_util.span("connect and first byte", "http", url=source) :  # requests returns once the response headers have arrived.
+            response:requests.Response = getSession().get(source, stream=True, allow_redirects=True, timeout=(_connectTimeout, _readTimeout))
+        latency:float = time.perf_counter() - started
+        with response :
+            response.raise_for_status()  # check for any http errors
+            with trace_util.span("body", "http", url=source), open(target, 'wb') as targetFile :
+                _readBody(response, host, targetFile, throttle_util.getChunkSize(chunks))
+            recordResponse(target, response.url, response.headers.get("ETag"))
+        return latency
+    except urllib3.exceptions.ReadTimeoutError as timeout :  # reading the body directly, urllib3's errors aren't wrapped by requests
+        _logger.error(f"Failed to fetch {source}. The request timed out: {timeout}.")
+        raise HttpError(f"Failed to fetch {source}. The request timed out: {timeout}.") from timeout
+    except urllib3.exceptions.HTTPError as connection :
+        _logger.error(f"Failed to fetch {source}. There was a connection error: {connection}.")
+        raise HttpError(f"Failed to fetch {source}. There was a connection error: {connection}.") from connection
     except requests.ConnectionError as connection :
         _logger.error(f"Failed to fetch {source}. There was a connection error: {connection}.")
         raise HttpError(f"Failed to fetch {source}. There was a connection error: {connection}.") from connection
@@ -31,11 +183,138 @@ def download(source:str, target:str, chunks:int = 1024 * 1024 * 50) :
         raise HttpError(f"Failed to fetch {source}. The request timed out: {timeout}.") from timeout
     except requests.HTTPError as http :
         _logger.error(f"Failed to fetch {source}. There was an {http.response.status_code} http error: {http}.")
-        raise HttpError(f"Failed to fetch {source}. There was an {http.response.status_code} http error: {http}.") from http
+        raise HttpError(f"Failed to fetch {source}. There was an {http.response.status_code} http error: {http}.", status=http.response.status_code) from http
     except requests.RequestException as error :
         _logger.error(f"Failed to fetch {source}. There was an issue with the request: {error}")
         raise HttpError(f"Failed to fetch {source}. There was an issue with the request: {error}") from error
 
 
+def _readBody(response:requests.Response, host:str, targetFile, chunks:int) :
+    """
+    Reads the body of a response into the target file, through one buffer reused for every piece, so memory stays constant however large the download.
+    The pieces start small (the first write isn't held up) and adapt to how quickly they arrive, up to the size of the buffer.
+    Parameters:
+        response - the streamed response.
+        host - the host the response comes from (for the bandwidth limits).
+        targetFile - the file (opened for binary writing) to write the body to.
+        chunks - the largest piece read at once, and the size of the buffer.
+    """
+    response.raw.decode_content = True  # any content encoding (e.g. gzip) is decoded as it is read, as iter_content would.
+    buffer:memoryview = memoryview(bytearray(max(chunks, MIN_CHUNK)))
+    size:int = min(INITIAL_CHUNK, len(buffer))
+    while True :
+        started:float = time.perf_counter()
+        read:int = response.raw.readinto(buffer[:size])
+        if not read :
+            break
+        elapsed:float = time.perf_counter() - started
+        throttle_util.throttle(host, read)
+        targetFile.write(buffer[:read])
+        if read == size and elapsed < _FAST_READ :
+            size = min(size * 2, len(buffer))
+        elif elapsed > _SLOW_READ :
+            size = max(size // 2, MIN_CHUNK)
+
+
+def getText(source:str, headers:Optional[dict[str, str]] = None) -> str :
+    """
+    Gets a (small) text response in a single attempt, e.g. an index or a checksum.
+    Parameters:
+        source - Full absolute URL to get.
+        headers - any extra headers to send (e.g. Authorization).
+    Returns:
+        str: the body of the response.
+    Raises:
+        HttpError if the request fails - its status is the http status, if the server answered.
+    """
+    try :
+        with trace_util.span("get", "http", url=source) :
+            response:requests.Response = getSession().get(source, headers=headers, allow_redirects=True, timeout=(_connectTimeout, _readTimeout))
+            response.raise_for_status()
+            return response.text
+    except requests.HTTPError as http :
+        raise HttpError(f"Failed to get {source}. There was an {http.response.status_code} http error: {http}.", status=http.response.status_code) from http
+    except requests.RequestException as error :
+        raise HttpError(f"Failed to get {source}: {error}") from error
+
+
+def upload(target:str, body:Union[bytes, BinaryIO], headers:Optional[dict[str, str]] = None) :
+    """
+    Puts a body (streamed, if it is a file) to a url in a single attempt.
+    Parameters:
+        target - Full absolute URL to put the body to.
+        body - the bytes, or a file opened for binary reading, to send. A file is sent in pieces, so it is never all in memory.
+        headers - any extra headers to send (e.g. Authorization).
+    Raises:
+        HttpError if the upload fails - its status is the http status, if the server answered.
+    """
+    try :
+        with trace_util.span("upload", "http", url=target) :
+            response:requests.Response = getSession().put(target, data=body, headers=headers, timeout=(_connectTimeout, _readTimeout))
+            response.raise_for_status()
+    except requests.HTTPError as http :
+        raise HttpError(f"Failed to upload to {target}. There was an {http.response.status_code} http error: {http}.", status=http.response.status_code) from http
+    except requests.RequestException as error :
+        raise HttpError(f"Failed to upload to {target}: {error}") from error
+
+
+def head(source:str) -> tuple[str, Mapping[str, str]] :
+    """
+    Asks a server about a url without downloading it (a HEAD request, following any redirects) in a single attempt.
+    Parameters:
+        source - Full absolute URL to ask about.
+    Returns:
+        tuple[str, Mapping[str, str]]: the url the redirects ended at (the source itself if there were none), and the response headers (e.g. ETag, Content-Length).
+    Raises:
+        HttpError if the request fails - its status is the http status, if the server answered.
+    """
+    try :
+        with trace_util.span("head", "http", url=source) :
+            response:requests.Response = getSession().head(source, allow_redirects=True, timeout=(_connectTimeout, _readTimeout))
+            response.raise_for_status()
+            return response.url, response.headers
+    except requests.HTTPError as http :
+        raise HttpError(f"Failed to ask about {source}. There was an {http.response.status_code} http error: {http}.", status=http.response.status_code) from http
+    except requests.RequestException as error :
+        raise HttpError(f"Failed to ask about {source}: {error}") from error
+
+
+def probe(source:str, timeout:float = 3) -> float :
+    """
+    Measures how quickly a server answers for a url, without downloading it: a HEAD request, or a GET of the first byte if HEAD isn't allowed.
+    Any answer short of a server error counts (a mirror that doesn't have this file yet is still up).
+    Parameters:
+        source - Full absolute URL to probe
+        timeout - Number of seconds to wait to connect, or for the response.
+    Returns:
+        float: the seconds taken to connect and receive the response headers.
+    Raises:
+        HttpError if the server can't be reached or answers with a server (5xx) error.
+    """
+    try :
+        with trace_util.span("probe", "http", url=source) :
+            started:float = time.perf_counter()
+            response:requests.Response = getSession().head(source, allow_redirects=True, timeout=timeout)
+            if response.status_code in (405, 501) :  # HEAD isn't supported - ask for a single byte instead.
+                started = time.perf_counter()
+                with getSession().get(source, headers={"Range": "bytes=0-0"}, stream=True, allow_redirects=True, timeout=timeout) as response :
+                    pass
+            latency:float = time.perf_counter() - started
+    except requests.RequestException as error :
+        raise HttpError(f"Probing {source} failed: {error}") from error
+    if response.status_code >= 500 :
+        raise HttpError(f"Probing {source} failed with an {response.status_code} http error.", status=response.status_code)
+    return latency
+
+
 class HttpError(UtilityError) :
-    """Raised by the zip utility functions to indicate some issue."""
+    """Raised by the https utility functions to indicate some issue."""
+
+    def __init__(self, message:str, status:Optional[int] = None) :
+        """
+        Parameters:
+            message - describes what went wrong.
+            status - the http status the server answered with, or None if there was no answer (e.g. the connection failed or timed out).
+        """
+        super().__init__(message)
+        self.status:Optional[int] = status
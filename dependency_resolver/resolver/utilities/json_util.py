@@ -1,6 +1,7 @@
 import logging
 import json
-from typing import Any
+import re
+from typing import IO, Any, Iterator, Optional
 from . import file_util
 
 _logger:logging.Logger = logging.getLogger(__name__)
@@ -28,3 +29,171 @@ def parseFromFile(path:str) -> Any :
         _logger.error(f"Unable to decode JSON in file at {path} : {e}")
 
     return None
+
+
+def parseHead(path:str, key:str) -> tuple[dict, Optional[int]] :
+    """
+    Parses the object in a JSON file without the (possibly huge) array under one of its keys, streaming the file rather than loading it whole.
+    The elements of the array can then be read one at a time with iterateArray.
+
+    Args:
+        path (str): The path to the JSON file - it must hold an object.
+        key (str): The key of the array to leave out.
+
+    Returns:
+        tuple[dict, Optional[int]]: The object without the key, and where the array starts in the file (None if the key isn't an array).
+
+    Raises:
+        ValueError if the file is not a valid JSON object (or can't be read).
+    """
+    head:dict = {}
+    offset:Optional[int] = None
+    with _open(path) as openFile :
+        reader:_Reader = _Reader(openFile)
+        reader.expect("{")
+        if reader.peek() == "}" :
+            return head, offset
+        while True :
+            name:Any = reader.value()
+            if not isinstance(name, str) :
+                raise ValueError(f"Expected a key at character {reader.offset()} of {path}")
+            reader.expect(":")
+            if name == key and reader.peek() == "[" :
+                offset = reader.offset()
+                for _ in reader.elements() :  # skipped - only one element is held at a time.
+                    pass
+            else :
+                head[name] = reader.value()
+            if reader.peek() == "," :
+                reader.expect(",")
+            else :
+                reader.expect("}")
+                return head, offset
+
+
+def iterateArray(path:str, offset:int) -> Iterator[Any] :
+    """
+    Reads the elements of an array in a JSON file one at a time, so the whole array is never held in memory.
+
+    Args:
+        path (str): The path to the JSON file.
+        offset (int): Where the array starts in the file (see parseHead).
+
+    Raises:
+        ValueError if the array is not valid JSON (or the file can't be read).
+    """
+    with _open(path) as openFile :
+        while offset > 0 :  # offsets count characters, not bytes, so they are skipped by reading.
+            skipped:str = openFile.read(min(offset, _CHUNK))
+            if not skipped :
+                raise ValueError(f"{path} ends before character {offset}")
+            offset -= len(skipped)
+        yield from _Reader(openFile).elements()
+
+
+def iterateLines(path:str) -> Iterator[Any] :
+    """
+    Reads a JSON Lines file (one JSON value per line) one line at a time. Blank lines are ignored.
+
+    Args:
+        path (str): The path to the JSON Lines file.
+
+    Raises:
+        ValueError if a line is not valid JSON (or the file can't be read).
+    """
+    with _open(path) as openFile :
+        for number, line in enumerate(openFile, start=1) :
+            if line.strip() :
+                try :
+                    yield json.loads(line)
+                except ValueError as e :
+                    raise ValueError(f"Line {number} of {path} is not valid JSON: {e}") from e
+
+
+# How many characters are read from a file at a time, when streaming it.
+_CHUNK:int = 1024 * 1024
+
+
+def _open(path:str) -> IO[str] :
+    """Opens a JSON file to stream, raising a ValueError if it can't be."""
+    try :
+        return open(path, encoding="utf-8")
+    except OSError as e :
+        raise ValueError(f"Unable to open {path}: {e}") from e
+
+
+# Reads JSON values from a file a chunk at a time. Only the value being read (and the rest of the current chunk) is held in memory.
+class _Reader :
+    _WHITESPACE:re.Pattern = re.compile(r"[ \t\n\r]*")
+
+
+    def __init__(self, openFile:IO[str]) :
+        self._file:IO[str] = openFile
+        self._decoder:json.JSONDecoder = json.JSONDecoder()
+        self._buffer:str = ""
+        self._position:int = 0
+        self._dropped:int = 0  # the characters read before the buffer.
+        self._ended:bool = False
+
+
+    def offset(self) -> int :
+        """Returns how far into the file the reader is, in characters."""
+        return self._dropped + self._position
+
+
+    def peek(self) -> str :
+        """Returns the next character that isn't whitespace, without reading it ("" at the end of the file)."""
+        while True :
+            self._position = self._WHITESPACE.match(self._buffer, self._position).end()  # type: ignore - always matches
+            if self._position < len(self._buffer) or not self._fill() :
+                return self._buffer[self._position] if self._position < len(self._buffer) else ""
+
+
+    def expect(self, character:str) :
+        """Reads the next character that isn't whitespace, which must be the one given."""
+        if self.peek() != character :
+            raise ValueError(f"Expected '{character}' at character {self.offset()}")
+        self._position += 1
+
+
+    def value(self) -> Any :
+        """Reads the next JSON value."""
+        self.peek()
+        while True :
+            try :
+                value, end = self._decoder.raw_decode(self._buffer, self._position)
+                if end < len(self._buffer) or self._ended or not self._fill() :  # a number at the end of the buffer may continue in the next chunk.
+                    self._position = end
+                    return value
+            except json.JSONDecodeError :
+                if not self._fill() :
+                    raise
+
+
+    def elements(self) -> Iterator[Any] :
+        """Reads the elements of the next JSON array, one at a time."""
+        self.expect("[")
+        if self.peek() == "]" :
+            self._position += 1
+            return
+        while True :
+            yield self.value()
+            if self.peek() == "," :
+                self._position += 1
+            else :
+                self.expect("]")
+                return
+
+
+    def _fill(self) -> bool :
+        """Reads the next chunk of the file into the buffer, dropping what has been read. Returns False at the end of the file."""
+        if self._ended :
+            return False
+        chunk:str = self._file.read(_CHUNK)
+        if not chunk :
+            self._ended = True
+            return False
+        self._dropped += self._position
+        self._buffer = self._buffer[self._position:] + chunk
+        self._position = 0
+        return True
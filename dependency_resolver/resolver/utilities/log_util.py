@@ -1,37 +1,130 @@
+import atexit
+import json
 import logging
 import logging.handlers
+import queue
 import sys
 import os.path
 
+from typing import Any, Optional, Union
+
 
 _logger:logging.Logger = logging.getLogger(__name__)
 
+TEXT:str = "text"
+JSON:str = "json"
+FORMATS:list[str] = [TEXT, JSON]
+
+_TEXT_FORMAT:str = '%(asctime)s : %(levelname)s : %(module)s.%(funcName)s(%(lineno)d) >> %(message)s'
+
+# The handlers setupRootLogging added to the root logger, and the listener writing the log file in the background.
+_handlers:list[logging.Handler] = []
+_listener:Optional[logging.handlers.QueueListener] = None
+
+
+# Formats each record as one JSON object per line - for log shippers, and grepping with jq.
+class JsonFormatter(logging.Formatter) :
+
+    def format(self, record:logging.LogRecord) -> str :
+        entry:dict[str, Any] = {
+            "time" : self.formatTime(record),
+            "level" : record.levelname,
+            "logger" : record.name,
+            "module" : record.module,
+            "function" : record.funcName,
+            "line" : record.lineno,
+            "message" : record.getMessage(),
+        }
+        if record.exc_info :
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry)
+
 
-def setupRootLogging(logToFile:str):
+# Queues each record for the background writer. Only the message is merged with its arguments here (they may change once the call returns) -
+# the rest of the formatting, including any traceback, is left to the writer.
+class _QueueHandler(logging.handlers.QueueHandler) :
+
+    def prepare(self, record:logging.LogRecord) -> logging.LogRecord :
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def setupRootLogging(logToFile:str, level:Union[int, str] = logging.INFO, logFormat:str = TEXT):
     """
     Sets up the root logger to log to both stdout and a file.
     This function creates a directory for the log file if it does not exist,
-    and configures the logger to write debug-level messages to the file and info-level messages to stdout.
+    and configures the logger to write messages at the given level to the file and info-level messages to stdout.
+    The file is written by a background thread, so logging doesn't wait on the disk - call stopLogging() to flush it.
+    Calling it again replaces the handlers it added before.
 
     Args:
         logToFile (str): The path to the log file where debug messages will be written.
+        level (int | str): The level to log at (e.g. logging.DEBUG or "DEBUG"). Can be changed later with setLevel().
+        logFormat (str): The format of the log file - "text", or "json" for one JSON object per line.
     """
+    stopLogging()
     root = logging.getLogger(None)
-    root.setLevel(logging.INFO)
+    setLevel(level)
 
-    formatter = logging.Formatter('%(asctime)s : %(levelname)s : %(module)s.%(funcName)s(%(lineno)d) >> %(message)s')
+    formatter = logging.Formatter(_TEXT_FORMAT)
 
-    stdout_handler = logging.StreamHandler(sys.stdout)
+    stdout_handler = logging.StreamHandler(sys.stdout)  # synchronous, so it stays in order with what is printed.
     stdout_handler.setLevel(logging.INFO)
     stdout_handler.setFormatter(formatter)
-    root.addHandler(stdout_handler)
+    _addHandler(root, stdout_handler)
 
-    _logger.debug(f"Setting up root logging to {logToFile}")
+    _logger.debug("Setting up root logging to %s", logToFile)
     os.makedirs(os.path.dirname(logToFile), 0o755, True)  # make sure the parent directory exists
 
     file_handler = logging.handlers.RotatingFileHandler(logToFile, "a", 10 * 1024 * 1024, 3)
     file_handler.setLevel(logging.DEBUG)
-    file_handler.setFormatter(formatter)
-    root.addHandler(file_handler)
+    file_handler.setFormatter(JsonFormatter() if logFormat == JSON else formatter)
+
+    global _listener
+    records:queue.SimpleQueue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(records, file_handler, respect_handler_level=True)
+    _listener.start()
+    _addHandler(root, _QueueHandler(records))
 
     _logger.debug("Logging set up")
+
+
+def setLevel(level:Union[int, str]) :
+    """
+    Sets the level the root logger logs at - it can be changed at any time, e.g. to debug a serving process.
+
+    Args:
+        level (int | str): The level, as a number (e.g. logging.DEBUG) or a name (e.g. "debug").
+
+    Raises:
+        ValueError if the level is not a known level name.
+    """
+    if isinstance(level, str) :
+        level = level.upper()
+        if not isinstance(logging.getLevelName(level), int) :
+            raise ValueError(f"Unknown log level {level} - expected one of DEBUG, INFO, WARNING, ERROR or CRITICAL.")
+    logging.getLogger(None).setLevel(level)
+
+
+def stopLogging() :
+    """Writes any records still queued for the log file, stops the background writer and removes the handlers setupRootLogging added."""
+    root = logging.getLogger(None)
+    for handler in _handlers :
+        root.removeHandler(handler)
+    _handlers.clear()
+
+    global _listener
+    if _listener is not None :
+        _listener.stop()  # the queued records are written first.
+        for handler in _listener.handlers :
+            handler.close()
+        _listener = None
+
+
+def _addHandler(root:logging.Logger, handler:logging.Handler) :
+    root.addHandler(handler)
+    _handlers.append(handler)
+
+
+atexit.register(stopLogging)
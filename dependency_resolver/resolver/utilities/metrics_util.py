@@ -0,0 +1,246 @@
+import logging
+import math
+import os
+import tempfile
+import threading
+from typing import Optional
+from urllib.parse import urlsplit
+from . import file_util
+
+_logger:logging.Logger = logging.getLogger(__name__)
+
+# Metrics are only recorded once enabled, so the instrumented code costs a single check when nobody is collecting them.
+_enabled:bool = False
+
+# The bucket boundaries (in seconds) of the duration histograms - from small files on a local mirror to large archives.
+DURATION_BUCKETS:tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def enable() :
+    """Starts recording metrics."""
+    global _enabled
+    _enabled = True
+
+
+def disable() :
+    """Stops recording metrics. Anything already recorded is kept."""
+    global _enabled
+    _enabled = False
+
+
+def isEnabled() -> bool :
+    """
+    Returns:
+        bool: True if metrics are being recorded.
+    """
+    return _enabled
+
+
+# A family of metric samples sharing a name, help text and label names - one sample per distinct set of label values.
+class _Metric :
+    type:str = "untyped"
+
+    def __init__(self, name:str, help:str, labels:tuple[str, ...] = ()) :
+        self._name:str = name
+        self._help:str = help
+        self._labels:tuple[str, ...] = labels
+        self._lock:threading.Lock = threading.Lock()
+        self._values:dict[tuple[str, ...], object] = {}
+        _registry.append(self)
+
+
+    def reset(self) :
+        """Forgets every recorded sample."""
+        with self._lock :
+            self._values.clear()
+
+
+    def toText(self) -> str :
+        """Returns the metric in the Prometheus text format (empty if nothing has been recorded)."""
+        with self._lock :
+            if not self._values :
+                return ""
+            lines:list[str] = [f"# HELP {self._name} {_escapeHelp(self._help)}", f"# TYPE {self._name} {self.type}"]
+            for labelValues in sorted(self._values) :
+                lines.extend(self._samples(labelValues, self._values[labelValues]))
+        return "\n".join(lines) + "\n"
+
+
+    def _key(self, labels:dict[str, str]) -> tuple[str, ...] :
+        """Returns the label values in the order the label names were declared."""
+        return tuple(str(labels.get(label, "")) for label in self._labels)
+
+
+    def _samples(self, labelValues:tuple[str, ...], value) -> list[str] :
+        return [f"{self._name}{_formatLabels(self._labels, labelValues)} {_formatValue(value)}"]
+
+
+# A value that only goes up, e.g. the number of bytes downloaded.
+class Counter(_Metric) :
+    type:str = "counter"
+
+    def increment(self, amount:float = 1, **labels:str) :
+        """
+        Adds to the counter for the given label values. Does nothing unless metrics are enabled.
+
+        Args:
+            amount (float, optional): how much to add. Defaults to 1.
+            labels (str): the value of each label of this metric.
+        """
+        if not _enabled :
+            return
+        key:tuple[str, ...] = self._key(labels)
+        with self._lock :
+            self._values[key] = self._values.get(key, 0) + amount  # type: ignore - counters only hold numbers
+
+
+# A value that is set, e.g. when the run finished.
+class Gauge(_Metric) :
+    type:str = "gauge"
+
+    def set(self, value:float, **labels:str) :
+        """
+        Sets the gauge for the given label values. Does nothing unless metrics are enabled.
+
+        Args:
+            value (float): the new value.
+            labels (str): the value of each label of this metric.
+        """
+        if not _enabled :
+            return
+        with self._lock :
+            self._values[self._key(labels)] = value
+
+
+# Counts observations (e.g. durations) into cumulative buckets, with their sum and count.
+class Histogram(_Metric) :
+    type:str = "histogram"
+
+    def __init__(self, name:str, help:str, labels:tuple[str, ...] = (), buckets:tuple[float, ...] = DURATION_BUCKETS) :
+        super().__init__(name, help, labels)
+        self._buckets:tuple[float, ...] = tuple(sorted(buckets)) + (math.inf,)
+
+
+    def observe(self, value:float, **labels:str) :
+        """
+        Records an observation for the given label values. Does nothing unless metrics are enabled.
+
+        Args:
+            value (float): the observed value, e.g. a duration in seconds.
+            labels (str): the value of each label of this metric.
+        """
+        if not _enabled :
+            return
+        key:tuple[str, ...] = self._key(labels)
+        with self._lock :
+            counts, total = self._values.get(key, ([0] * len(self._buckets), 0.0))  # type: ignore - histograms only hold (counts, sum)
+            for index, bound in enumerate(self._buckets) :
+                if value <= bound :
+                    counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+
+    def _samples(self, labelValues:tuple[str, ...], value) -> list[str] :
+        counts, total = value
+        labelNames:tuple[str, ...] = self._labels + ("le",)
+        samples:list[str] = [f"{self._name}_bucket{_formatLabels(labelNames, labelValues + (_formatValue(bound),))} {count}" for bound, count in zip(self._buckets, counts)]
+        samples.append(f"{self._name}_sum{_formatLabels(self._labels, labelValues)} {_formatValue(total)}")
+        samples.append(f"{self._name}_count{_formatLabels(self._labels, labelValues)} {counts[-1]}")
+        return samples
+
+
+_registry:list[_Metric] = []
+
+DOWNLOAD_BYTES:Counter = Counter("dependency_resolver_download_bytes_total", "Bytes fetched into the cache.", ("protocol", "host"))
+DOWNLOAD_DURATION:Histogram = Histogram("dependency_resolver_download_duration_seconds", "Time taken to fetch a source into the cache.", ("protocol", "host"))
+CACHE_HITS:Counter = Counter("dependency_resolver_cache_hits_total", "Fetches skipped because the source was already in the cache.", ("cache",))
+CACHE_MISSES:Counter = Counter("dependency_resolver_cache_misses_total", "Fetches of sources that were not in the cache (or were always fetched).", ("cache",))
+CACHE_EVICTIONS:Counter = Counter("dependency_resolver_cache_evictions_total", "Files removed from the cache, by why they were removed.", ("cache", "reason"))
+RESOLVE_DURATION:Histogram = Histogram("dependency_resolver_resolve_duration_seconds", "Time taken to resolve a dependency from the cache, by resolve action.", ("action",))
+RETRIES:Counter = Counter("dependency_resolver_download_retries_total", "Downloads tried again after a failure worth retrying (no answer, or an overloaded server).", ("host",))
+FAST_FAILURES:Counter = Counter("dependency_resolver_download_fast_failures_total", "Downloads failed at once because the host's circuit breaker was open.", ("host",))
+MIRROR_FAILOVERS:Counter = Counter("dependency_resolver_mirror_failovers_total", "Fetches from a mirror that failed, so the next mirror was tried.", ("host",))
+REMOTE_CACHE_HITS:Counter = Counter("dependency_resolver_remote_cache_hits_total", "Sources missing from the local cache that were downloaded from the remote cache.", ("host",))
+REMOTE_CACHE_MISSES:Counter = Counter("dependency_resolver_remote_cache_misses_total", "Sources missing from both the local and the remote cache.", ("host",))
+REMOTE_CACHE_PUSHES:Counter = Counter("dependency_resolver_remote_cache_pushes_total", "Sources fetched from their origin and pushed to the remote cache.", ("host",))
+ERRORS:Counter = Counter("dependency_resolver_errors_total", "Failed fetches (by protocol) and resolves (by resolve action).", ("phase", "type"))
+RUN_DURATION:Gauge = Gauge("dependency_resolver_run_duration_seconds", "Wall time of the last run of a command.", ("command",))
+RUN_FINISHED:Gauge = Gauge("dependency_resolver_run_finished_timestamp_seconds", "When the last run of a command finished (seconds since the epoch).", ("command",))
+
+
+def reset() :
+    """Forgets everything recorded so far."""
+    for metric in _registry :
+        metric.reset()
+
+
+def toText() -> str :
+    """
+    Returns everything recorded, in the Prometheus text exposition format.
+
+    Returns:
+        str: the metrics text.
+    """
+    return "".join(metric.toText() for metric in _registry)
+
+
+def writeTextfile(path:str) :
+    """
+    Writes everything recorded to a file for node_exporter's textfile collector (which only reads files ending in .prom).
+    The file is written alongside and then renamed into place, so the collector never reads a half written file.
+
+    Args:
+        path (str): the path of the file to write (its directory is created if needed).
+    """
+    directory:str = file_util.getParentDirectory(os.path.abspath(path))
+    file_util.mkdir(directory, mode=0o755)
+    descriptor, temporaryPath = tempfile.mkstemp(dir=directory, prefix=".metrics-", suffix=".tmp")
+    try :
+        with os.fdopen(descriptor, "w") as metricsFile :
+            metricsFile.write(toText())
+        os.chmod(temporaryPath, 0o644)
+        os.replace(temporaryPath, path)
+    except OSError :
+        if file_util.exists(temporaryPath) :
+            os.remove(temporaryPath)
+        raise
+    _logger.debug(f"Wrote metrics to {path}")
+
+
+def getHost(location:str) -> str :
+    """
+    Returns the label used for where a source is fetched from: the host of a url, or 'filesystem' for a path.
+
+    Args:
+        location (str): the url or path of the source.
+
+    Returns:
+        str: the host.
+    """
+    return urlsplit(location).netloc or "filesystem"
+
+
+def _formatLabels(names:tuple[str, ...], values:tuple[str, ...]) -> str :
+    """Formats the labels of a sample, e.g. {protocol="https",host="example.com"}."""
+    if not names :
+        return ""
+    return "{" + ",".join(f'{name}="{_escapeLabel(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _formatValue(value:Optional[float]) -> str :
+    """Formats a sample value - whole numbers without a fraction, infinity as +Inf."""
+    if value is None :
+        return "NaN"
+    if value == math.inf :
+        return "+Inf"
+    if float(value).is_integer() :
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escapeLabel(value:str) -> str :
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _escapeHelp(value:str) -> str :
+    return value.replace("\\", "\\\\").replace("\n", "\\n")
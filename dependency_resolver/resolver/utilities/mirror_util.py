@@ -0,0 +1,226 @@
+import json
+import logging
+import math
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+from urllib.parse import urlsplit
+from . import file_util, https_util
+
+_logger:logging.Logger = logging.getLogger(__name__)
+
+# A mirror that has failed this many times in a row is unhealthy - it is only tried once every healthy mirror has failed.
+FAILURES_BEFORE_UNHEALTHY:int = 2
+
+# How long (seconds) an unhealthy mirror is avoided before it is given another chance.
+UNHEALTHY_SECONDS:float = 300
+
+# How old (seconds) a mirror's latency can be before it is probed again.
+PROBE_AGE:float = 3600
+
+# How long (seconds) a probe waits for a mirror to answer.
+PROBE_TIMEOUT:float = 3
+
+# How much each new latency measurement moves a mirror's score (an exponentially weighted moving average).
+_SMOOTHING:float = 0.3
+
+_lock:threading.Lock = threading.Lock()
+_scoresPath:Optional[str] = None
+_scores:Optional[dict[str, "_Score"]] = None  # loaded when first needed
+_probing:set[str] = set()  # mirrors probed (or being probed) by this process
+_changed:bool = False
+
+
+# How quickly, and how reliably, a mirror has answered.
+class _Score :
+
+    def __init__(self, latency:Optional[float] = None, measured:float = 0, failures:int = 0, lastFailure:float = 0) :
+        self.latency:Optional[float] = latency  # seconds to the response headers
+        self.measured:float = measured  # when the latency was last measured (seconds since the epoch)
+        self.failures:int = failures  # failures in a row
+        self.lastFailure:float = lastFailure
+
+
+    def isHealthy(self, now:float) -> bool :
+        """Returns True unless the mirror keeps failing (and last failed recently)."""
+        return self.failures < FAILURES_BEFORE_UNHEALTHY or now - self.lastFailure > UNHEALTHY_SECONDS
+
+
+    def needsProbe(self, now:float) -> bool :
+        """Returns True if the latency hasn't been measured recently."""
+        return self.latency is None or now - self.measured > PROBE_AGE
+
+
+    def toDict(self) -> dict[str, Any] :
+        return {"latency": self.latency, "measured": self.measured, "failures": self.failures, "lastFailure": self.lastFailure}
+
+
+    @staticmethod
+    def fromDict(score:dict[str, Any]) -> "_Score" :
+        return _Score(score.get("latency"), score.get("measured", 0), score.get("failures", 0), score.get("lastFailure", 0))
+
+
+def setScoresFile(path:Optional[str]) :
+    """
+    Sets the file the mirror scores are kept in between runs. The scores are (re)loaded from it when next needed.
+
+    Args:
+        path (Optional[str]): the path of the JSON scores file. None keeps the scores in memory only.
+    """
+    global _scoresPath, _scores, _changed
+    with _lock :
+        _scoresPath = path
+        _scores = None
+        _probing.clear()
+        _changed = False
+
+
+def order(urls:list[str], probe:bool = True) -> list[str] :
+    """
+    Orders the urls of the same file on different mirrors, best first: healthy mirrors by latency, then unhealthy ones by how long ago they failed.
+    Mirrors with no recent latency are probed first (at the same time), once per run. Mirrors that are equally good keep their configured order.
+
+    Args:
+        urls (list[str]): the url of the file on each mirror, in configured order.
+        probe (bool, optional): probe mirrors whose latency isn't known. Defaults to True.
+
+    Returns:
+        list[str]: the urls in the order to try them.
+    """
+    if len(urls) < 2 :
+        return list(urls)
+    if probe :
+        _probe(urls)
+
+    now:float = time.time()
+    with _lock :
+        scores:dict[str, _Score] = _getScores()
+        def rank(indexed:tuple[int, str]) -> tuple :
+            index, url = indexed
+            score:Optional[_Score] = scores.get(getMirror(url))
+            if score is None :
+                return (0, math.inf, index)
+            if not score.isHealthy(now) :
+                return (1, score.lastFailure, index)
+            return (0, score.latency if score.latency is not None else math.inf, index)
+        return [url for _, url in sorted(enumerate(urls), key=rank)]
+
+
+def recordSuccess(url:str, latency:float) :
+    """
+    Records that a mirror answered, and how quickly.
+
+    Args:
+        url (str): the url fetched from the mirror.
+        latency (float): the seconds taken to connect and receive the response headers.
+    """
+    global _changed
+    with _lock :
+        score:_Score = _getScores().setdefault(getMirror(url), _Score())
+        score.latency = latency if score.latency is None else (1 - _SMOOTHING) * score.latency + _SMOOTHING * latency
+        score.measured = time.time()
+        score.failures = 0
+        _changed = True
+
+
+def recordFailure(url:str) :
+    """
+    Records that a mirror couldn't be reached, or failed to answer.
+
+    Args:
+        url (str): the url fetched from the mirror.
+    """
+    global _changed
+    with _lock :
+        score:_Score = _getScores().setdefault(getMirror(url), _Score())
+        score.failures += 1
+        score.lastFailure = time.time()
+        failures:int = score.failures
+        _changed = True
+    _logger.debug("Mirror %s has failed %s time(s) in a row", getMirror(url), failures)
+
+
+def save() :
+    """Writes the scores to the scores file (if one is set and anything has changed). The file is written alongside and renamed into place."""
+    global _changed
+    with _lock :
+        if _scoresPath is None or _scores is None or not _changed :
+            return
+        scores:dict[str, dict[str, Any]] = {mirror: score.toDict() for mirror, score in _scores.items()}
+        _changed = False
+        path:str = _scoresPath
+    directory:str = file_util.getParentDirectory(os.path.abspath(path))
+    file_util.mkdir(directory, mode=0o755)
+    descriptor, temporaryPath = tempfile.mkstemp(dir=directory, prefix=".mirrors-", suffix=".tmp")
+    try :
+        with os.fdopen(descriptor, "w") as scoresFile :
+            json.dump(scores, scoresFile, indent=2)
+        os.replace(temporaryPath, path)
+    except OSError :
+        if file_util.exists(temporaryPath) :
+            os.remove(temporaryPath)
+        raise
+    _logger.debug(f"Wrote mirror scores to {path}")
+
+
+def getMirror(url:str) -> str :
+    """
+    Returns what a url is scored under: its scheme and host (the same host serving several bases is one mirror).
+
+    Args:
+        url (str): a url on a mirror.
+    """
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def getScores() -> dict[str, dict[str, Any]] :
+    """
+    Returns:
+        dict[str, dict[str, Any]]: a copy of the score of each mirror (latency, when it was measured, failures in a row and when it last failed).
+    """
+    with _lock :
+        return {mirror: score.toDict() for mirror, score in _getScores().items()}
+
+
+def _probe(urls:list[str]) :
+    """Probes (at the same time) the mirrors that haven't been probed by this run and have no recent latency."""
+    now:float = time.time()
+    toProbe:list[str] = []
+    with _lock :
+        scores:dict[str, _Score] = _getScores()
+        for url in urls :
+            mirror:str = getMirror(url)
+            score:Optional[_Score] = scores.get(mirror)
+            if mirror not in _probing and (score is None or (score.needsProbe(now) and score.isHealthy(now))) :
+                _probing.add(mirror)
+                toProbe.append(url)
+    if not toProbe :
+        return
+
+    def probeOne(url:str) :
+        try :
+            recordSuccess(url, https_util.probe(url, PROBE_TIMEOUT))
+        except https_util.HttpError as http :
+            _logger.debug(f"Probe failed: {http}")
+            recordFailure(url)
+
+    with ThreadPoolExecutor(len(toProbe), thread_name_prefix="probe") as pool :
+        list(pool.map(probeOne, toProbe))
+
+
+def _getScores() -> dict[str, _Score] :
+    """Returns the scores, loading them from the scores file the first time. Call holding the lock."""
+    global _scores
+    if _scores is None :
+        _scores = {}
+        if _scoresPath is not None and file_util.isFile(_scoresPath) :
+            try :
+                with open(_scoresPath) as scoresFile :
+                    _scores = {mirror: _Score.fromDict(score) for mirror, score in json.load(scoresFile).items()}
+            except (OSError, ValueError, AttributeError) as error :
+                _logger.warning(f"Ignoring the unreadable mirror scores in {_scoresPath}: {error}")
+    return _scores
@@ -0,0 +1,135 @@
+import cProfile
+import io
+import logging
+import pstats
+import sys
+import threading
+import tracemalloc
+from typing import Any, Callable
+from . import file_util, time_util
+
+_logger:logging.Logger = logging.getLogger(__name__)
+
+CPROFILE:str = "cprofile"
+TRACEMALLOC:str = "tracemalloc"
+PROFILERS:tuple[str, ...] = (CPROFILE, TRACEMALLOC)
+
+# How many functions (cprofile) or allocation sites (tracemalloc) to list in the readable summary.
+TOP:int = 50
+
+# Before python 3.12 a cProfile.Profile only sees the thread that enabled it, so each thread started while profiling gets its own. From 3.12 one
+# profile sees every thread - and enabling a second one while it is active raises ValueError.
+_PROFILE_EACH_THREAD:bool = sys.version_info < (3, 12)
+
+# How many frames tracemalloc keeps for each allocation - enough to see who called into the utilities.
+_TRACEMALLOC_FRAMES:int = 10
+
+
+def run(profiler:str, function:Callable[[], Any], outputDir:str, label:str) -> list[str] :
+    """
+    Runs a function under a profiler, then writes what the profiler found to the output directory.
+    The files are written even if the function fails (or exits), so failing runs can be diagnosed too.
+
+    cprofile: writes <label>.pstats (load with pstats or snakeviz) and <label>.txt (the top functions by cumulative time).
+        Every thread started while profiling (e.g. the fetch and resolve pools) is profiled, and the threads are merged.
+    tracemalloc: writes <label>.snapshot (load with tracemalloc.Snapshot.load) and <label>.txt (the peak, and the top allocation sites still holding memory at the end).
+
+    Args:
+        profiler (str): CPROFILE or TRACEMALLOC.
+        function (Callable[[], Any]): the function to run.
+        outputDir (str): the directory to write the profile to (created if needed).
+        label (str): the start of the file names, e.g. the command and the hash of its configuration. A timestamp is added.
+
+    Returns:
+        list[str]: the paths of the files written.
+    """
+    path:str = file_util.buildPath(outputDir, f"{label}-{time_util.getCurrentDateTimeString('%Y%m%d-%H%M%S')}")
+    match profiler :
+        case "cprofile" :
+            return _runCProfile(function, path)
+        case "tracemalloc" :
+            return _runTracemalloc(function, path)
+        case _ :
+            raise ValueError(f"Unknown profiler {profiler} - expected one of {', '.join(PROFILERS)}.")
+
+
+def _runCProfile(function:Callable[[], Any], path:str) -> list[str] :
+    """Runs the function under cProfile, profiling any threads it starts as well."""
+    threadProfiles:list[cProfile.Profile] = []
+    lock:threading.Lock = threading.Lock()
+
+    def profileThread(frame, event, arg) :
+        # called once in each new thread - replaces itself with a profiler for that thread.
+        profile:cProfile.Profile = cProfile.Profile()
+        with lock :
+            threadProfiles.append(profile)
+        profile.enable()
+
+    mainProfile:cProfile.Profile = cProfile.Profile()
+    if _PROFILE_EACH_THREAD :
+        threading.setprofile(profileThread)
+    mainProfile.enable()
+    try :
+        function()
+    finally :
+        mainProfile.disable()
+        if _PROFILE_EACH_THREAD :
+            threading.setprofile(None)  # type: ignore - None removes the hook
+        stats:pstats.Stats = pstats.Stats(mainProfile)
+        with lock :
+            for profile in threadProfiles :
+                try :
+                    stats.add(profile)
+                except TypeError :  # a thread that never made a call has no stats.
+                    pass
+        written:list[str] = _writeCProfile(stats, path)
+    return written
+
+
+def _writeCProfile(stats:pstats.Stats, path:str) -> list[str] :
+    """Writes the raw stats, and a readable summary of the top functions."""
+    file_util.mkdir(file_util.getParentDirectory(path), mode=0o755)
+    stats.dump_stats(f"{path}.pstats")
+    summary:io.StringIO = io.StringIO()
+    stats.stream = summary  # type: ignore - pstats prints to its stream
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(TOP)
+    with open(f"{path}.txt", "w") as summaryFile :
+        summaryFile.write(summary.getvalue())
+    _logger.debug(f"Wrote cProfile stats to {path}.pstats")
+    return [f"{path}.pstats", f"{path}.txt"]
+
+
+def _runTracemalloc(function:Callable[[], Any], path:str) -> list[str] :
+    """Runs the function while tracing memory allocations."""
+    alreadyTracing:bool = tracemalloc.is_tracing()
+    if not alreadyTracing :
+        tracemalloc.start(_TRACEMALLOC_FRAMES)
+    tracemalloc.reset_peak()
+    try :
+        function()
+    finally :
+        snapshot:tracemalloc.Snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        if not alreadyTracing :
+            tracemalloc.stop()
+        written:list[str] = _writeTracemalloc(snapshot, current, peak, path)
+    return written
+
+
+def _writeTracemalloc(snapshot:tracemalloc.Snapshot, current:int, peak:int, path:str) -> list[str] :
+    """Writes the snapshot, and a readable summary of the top allocation sites."""
+    file_util.mkdir(file_util.getParentDirectory(path), mode=0o755)
+    snapshot = snapshot.filter_traces((tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<frozen importlib._bootstrap*>")))
+    snapshot.dump(f"{path}.snapshot")
+    with open(f"{path}.txt", "w") as summaryFile :
+        summaryFile.write(f"Peak traced memory: {peak / 1024:.1f}KB, still allocated at the end: {current / 1024:.1f}KB\n\n")
+        summaryFile.write(f"Top {TOP} allocation sites still holding memory at the end:\n")
+        for statistic in snapshot.statistics("lineno")[:TOP] :
+            summaryFile.write(f"  {statistic}\n")
+        summaryFile.write(f"\nTop {TOP} allocating call stacks:\n")
+        for statistic in snapshot.statistics("traceback")[:TOP] :
+            summaryFile.write(f"  {statistic.size / 1024:.1f}KB in {statistic.count} blocks\n")
+            for line in statistic.traceback.format(most_recent_first=True) :
+                summaryFile.write(f"    {line}\n")
+    _logger.debug(f"Wrote tracemalloc snapshot to {path}.snapshot")
+    return [f"{path}.snapshot", f"{path}.txt"]
@@ -0,0 +1,180 @@
+import contextlib
+import logging
+import random
+import threading
+import time
+from typing import Iterator, Optional
+
+_logger:logging.Logger = logging.getLogger(__name__)
+
+# Http statuses worth trying again - the server (or something in front of it) is overloaded or briefly unavailable.
+RETRIABLE_STATUSES:frozenset[int] = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+# How many times, and how far apart, a failed request is tried again.
+class RetryPolicy :
+
+    def __init__(self, retries:int = 3, backoff:float = 0.5, maxBackoff:float = 30) :
+        """
+        Parameters:
+            retries - how many times a request is tried again after it first fails (0 never retries).
+            backoff - the most (seconds) to wait before the first retry. Doubles with each retry.
+            maxBackoff - the most (seconds) to wait before any retry.
+        """
+        self.retries:int = max(0, retries)
+        self.backoff:float = max(0, backoff)
+        self.maxBackoff:float = max(0, maxBackoff)
+
+
+    def getDelay(self, retry:int) -> float :
+        """
+        Returns how long to wait before a retry: a random time up to the (exponentially growing) backoff, so clients that failed together don't retry together.
+
+        Parameters:
+            retry - which retry this is (0 for the first).
+        """
+        return random.uniform(0, min(self.maxBackoff, self.backoff * (2 ** retry)))
+
+
+    @staticmethod
+    def isRetriable(status:Optional[int]) -> bool :
+        """
+        Returns True if a failure is worth trying again.
+
+        Parameters:
+            status - the http status the server answered with, or None if there was no answer (the connection failed or timed out).
+        """
+        return status is None or status in RETRIABLE_STATUSES
+
+
+# Stops requests to a host that keeps failing, so they fail at once rather than each waiting for its own timeout.
+# Closed (requests go through) until the threshold of failures in a row, then open (requests fail fast) for the cooldown.
+# After the cooldown a single trial request is let through (half open) - its success closes the breaker, its failure opens it again.
+class CircuitBreaker :
+
+    def __init__(self, host:str, threshold:int, cooldown:float) :
+        """
+        Parameters:
+            host - the host the breaker protects.
+            threshold - failures in a row that open the breaker (0 never opens it).
+            cooldown - seconds the breaker stays open before a trial request is let through.
+        """
+        self._host:str = host
+        self._threshold:int = threshold
+        self._cooldown:float = cooldown
+        self._lock:threading.Lock = threading.Lock()
+        self._failures:int = 0
+        self._openedAt:Optional[float] = None
+        self._trialInFlight:bool = False
+
+
+    def allow(self) -> bool :
+        """
+        Returns True if a request to the host can go ahead. A request let through must be followed by recordSuccess or recordFailure.
+        """
+        with self._lock :
+            if self._openedAt is None :
+                return True
+            if self._trialInFlight or time.monotonic() - self._openedAt < self._cooldown :
+                return False
+            self._trialInFlight = True  # half open - let one request through to see if the host is back.
+            return True
+
+
+    @contextlib.contextmanager
+    def releasing(self, *handled:type[BaseException]) -> Iterator[None] :
+        """
+        Wraps a request let through by allow(), recording a failure if it raises anything other than the exceptions its caller records itself -
+        e.g. writing what it downloads fails, or it is cancelled - so a trial request is never left in flight, keeping the breaker open.
+
+        Parameters:
+            handled - the exceptions the caller records an outcome for (e.g. HttpError).
+        """
+        try :
+            yield
+        except handled :
+            raise
+        except BaseException :
+            self.recordFailure()
+            raise
+
+
+    def recordSuccess(self) :
+        """Records a request the host answered (successfully, or with a client error)."""
+        with self._lock :
+            if self._openedAt is not None :
+                _logger.info(f"{self._host} is answering again - closing its circuit breaker.")
+            self._failures = 0
+            self._openedAt = None
+            self._trialInFlight = False
+
+
+    def recordFailure(self) :
+        """Records a request the host couldn't answer (unreachable, timed out or a server error)."""
+        with self._lock :
+            self._failures += 1
+            self._trialInFlight = False
+            if self._threshold > 0 and self._failures >= self._threshold :
+                if self._openedAt is None :
+                    _logger.warning(f"{self._host} has failed {self._failures} times in a row - failing requests to it for the next {self._cooldown}s.")
+                self._openedAt = time.monotonic()
+
+
+    def isOpen(self) -> bool :
+        """Returns True if requests to the host are currently being failed fast."""
+        with self._lock :
+            return self._openedAt is not None
+
+
+_policy:RetryPolicy = RetryPolicy()
+_breakerThreshold:int = 5
+_breakerCooldown:float = 30
+_breakers:dict[str, CircuitBreaker] = {}
+_breakersLock:threading.Lock = threading.Lock()
+
+
+def setPolicy(policy:RetryPolicy) :
+    """
+    Sets how failed requests are retried.
+
+    Args:
+        policy (RetryPolicy): the retry policy used by every request.
+    """
+    global _policy
+    _policy = policy
+
+
+def getPolicy() -> RetryPolicy :
+    """
+    Returns:
+        RetryPolicy: how failed requests are retried.
+    """
+    return _policy
+
+
+def setBreakers(threshold:int, cooldown:float) :
+    """
+    Sets when the per host circuit breakers open, and for how long. Forgets the state of any existing breakers.
+
+    Args:
+        threshold (int): failures in a row that open a host's breaker (0 turns the breakers off).
+        cooldown (float): seconds a breaker stays open before a trial request is let through.
+    """
+    global _breakerThreshold, _breakerCooldown
+    with _breakersLock :
+        _breakerThreshold = max(0, threshold)
+        _breakerCooldown = max(0, cooldown)
+        _breakers.clear()
+
+
+def getBreaker(host:str) -> CircuitBreaker :
+    """
+    Returns the circuit breaker for a host, creating it if needed.
+
+    Args:
+        host (str): the host (e.g. the netloc of a url).
+    """
+    with _breakersLock :
+        if host not in _breakers :
+            _breakers[host] = CircuitBreaker(host, _breakerThreshold, _breakerCooldown)
+        return _breakers[host]
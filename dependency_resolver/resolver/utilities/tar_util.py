@@ -19,7 +19,7 @@ def untar(tarPath:str, targetDir:str) :
     Raises:
         TarError if an error is encountered.
     """
-    _logger.debug(f"Untarring {tarPath} -> {targetDir}")
+    _logger.debug("Untarring %s -> %s", tarPath, targetDir)
     _validateTarPath(tarPath)
     _validateTargetDirectory(targetDir)
     file_util.mkdir(targetDir, mode=0o744)  # make target directory in case it doesn't exist.
@@ -31,6 +31,28 @@ def untar(tarPath:str, targetDir:str) :
         raise TarError(f"Unable to extract tar file at {tarPath}") from exc
 
 
+def listMembers(tarPath:str) -> list[str] :
+    """
+    Lists the paths of the members of the specified tar file - what untarring it puts in place, relative to the target directory.
+
+    Parameters:
+        tarPath - the path to the tar file.
+
+    Returns:
+        list[str]: the path of each member, directories ending with a /.
+
+    Raises:
+        TarError if the tar file can't be read.
+    """
+    _validateTarPath(tarPath)
+    try :
+        with _createTarFile(tarPath) as tar :
+            return [f"{member.name}/" if member.isdir() else member.name for member in tar.getmembers()]
+    except Exception as exc :
+        _logger.error(f"Unable to read tar file at {tarPath}", exc_info=True)
+        raise TarError(f"Unable to read tar file at {tarPath}") from exc
+
+
 def isValidTarPath(tarPath:str) -> bool :
     """
     Returns true if the file at the specified path is a tar file.
@@ -0,0 +1,142 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Optional
+
+_logger:logging.Logger = logging.getLogger(__name__)
+
+# How many seconds of transfer a bucket can save up - kept short, so throughput stays smooth rather than arriving in bursts.
+BURST_SECONDS:float = 0.1
+
+# The most bytes moved between checks of the buckets while throttled (downloads and copies use smaller pieces when throttled).
+CHUNK:int = 64 * 1024
+
+
+# Limits the rate bytes are moved at. Tokens (bytes) refill at the rate, up to a small burst.
+# Taking more tokens than are available leaves the bucket in debt, and the taker waits until the debt would be repaid,
+# so concurrent takers are served in the order they arrive and the combined rate never exceeds the limit.
+class TokenBucket :
+
+    def __init__(self, rate:float, burst:Optional[float] = None) :
+        """
+        Parameters:
+            rate - the bytes per second the bucket refills at.
+            burst - the most bytes the bucket can hold. Defaults to BURST_SECONDS of the rate.
+        """
+        self._rate:float = rate
+        self._burst:float = burst if burst is not None else max(1.0, rate * BURST_SECONDS)
+        self._tokens:float = self._burst
+        self._updated:float = time.monotonic()
+        self._lock:threading.Lock = threading.Lock()
+
+
+    def reserve(self, amount:int) -> float :
+        """
+        Takes tokens from the bucket.
+
+        Parameters:
+            amount - the number of bytes about to be moved.
+
+        Returns:
+            float: the seconds to wait before moving them (0 if the bucket had enough).
+        """
+        with self._lock :
+            now:float = time.monotonic()
+            self._tokens = min(self._burst, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+            self._tokens -= amount
+            return 0 if self._tokens >= 0 else -self._tokens / self._rate
+
+
+    def getRate(self) -> float :
+        """Returns the bytes per second the bucket allows."""
+        return self._rate
+
+
+_global:Optional[TokenBucket] = None
+_hostRate:Optional[float] = None
+_hosts:dict[str, TokenBucket] = {}
+_hostsLock:threading.Lock = threading.Lock()
+
+
+def setLimits(globalRate:Optional[float] = None, hostRate:Optional[float] = None) :
+    """
+    Sets the bandwidth shared by every download and copy, and the bandwidth allowed to each host.
+
+    Args:
+        globalRate (Optional[float]): the most bytes per second moved in total. None is unlimited.
+        hostRate (Optional[float]): the most bytes per second moved from any one host. None is unlimited.
+    """
+    global _global, _hostRate
+    _global = TokenBucket(globalRate) if globalRate else None
+    _hostRate = hostRate if hostRate else None
+    with _hostsLock :
+        _hosts.clear()
+    if isEnabled() :
+        _logger.debug(f"Throttling to {globalRate} bytes/s in total and {hostRate} bytes/s per host")
+
+
+def isEnabled() -> bool :
+    """
+    Returns:
+        bool: True if any bandwidth limit is set.
+    """
+    return _global is not None or _hostRate is not None
+
+
+def throttle(host:str, amount:int) :
+    """
+    Waits until the given number of bytes can be moved from a host without going over the limits.
+
+    Args:
+        host (str): where the bytes come from (e.g. the netloc of a url, or 'filesystem').
+        amount (int): the number of bytes about to be moved.
+    """
+    if isEnabled() :
+        delay:float = _reserve(host, amount)
+        if delay > 0 :
+            time.sleep(delay)
+
+
+async def throttleAsync(host:str, amount:int) :
+    """
+    Waits (without blocking the running event loop) until the given number of bytes can be moved from a host without going over the limits.
+
+    Args:
+        host (str): where the bytes come from (e.g. the netloc of a url).
+        amount (int): the number of bytes about to be moved.
+    """
+    if isEnabled() :
+        delay:float = _reserve(host, amount)
+        if delay > 0 :
+            await asyncio.sleep(delay)
+
+
+def getChunkSize(chunks:int) -> int :
+    """
+    Returns the size of the pieces to move data in: small enough to keep throttled transfers smooth.
+
+    Args:
+        chunks (int): the size that would be used if nothing was throttled.
+    """
+    return min(chunks, CHUNK) if isEnabled() else chunks
+
+
+def _reserve(host:str, amount:int) -> float :
+    """Takes the bytes from the global bucket and the host's bucket, returning how long to wait for the slower of the two."""
+    delay:float = 0
+    globalBucket:Optional[TokenBucket] = _global
+    if globalBucket is not None :
+        delay = globalBucket.reserve(amount)
+    if _hostRate is not None :
+        delay = max(delay, _getHostBucket(host).reserve(amount))
+    return delay
+
+
+def _getHostBucket(host:str) -> TokenBucket :
+    """Returns the bucket for a host, creating it if needed."""
+    with _hostsLock :
+        if host not in _hosts :
+            _hosts[host] = TokenBucket(_hostRate)  # type: ignore - only called when a host rate is set
+        return _hosts[host]
@@ -0,0 +1,140 @@
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+from typing import Any, Optional
+from . import file_util
+
+_logger:logging.Logger = logging.getLogger(__name__)
+
+
+# Records spans as Chrome trace events ("X" complete events), which can be opened in Perfetto (ui.perfetto.dev) or chrome://tracing.
+# Spans on the same track nest by time, so each thread (and each asyncio task) gets its own track.
+class _Recorder :
+
+    def __init__(self) :
+        self._started:int = time.perf_counter_ns()
+        self._lock:threading.Lock = threading.Lock()
+        self._events:list[dict[str, Any]] = [{"name" : "process_name", "ph" : "M", "pid" : os.getpid(), "tid" : 0, "args" : {"name" : "dependency-resolver"}}]
+        self._tracks:weakref.WeakKeyDictionary[Any, int] = weakref.WeakKeyDictionary()  # weak, so finished threads and tasks aren't kept for the whole run.
+        self._lastTrack:int = 0
+
+
+    def now(self) -> int :
+        """Returns the microseconds since recording started."""
+        return (time.perf_counter_ns() - self._started) // 1000
+
+
+    def add(self, name:str, category:str, start:int, end:int, args:dict[str, Any]) :
+        """Adds a complete span to the trace, on the track of the current thread or asyncio task."""
+        event:dict[str, Any] = {"name" : name, "cat" : category, "ph" : "X", "ts" : start, "dur" : max(0, end - start), "pid" : os.getpid(), "tid" : self._track()}
+        if args :
+            event["args"] = args
+        with self._lock :
+            self._events.append(event)
+
+
+    def getEvents(self) -> list[dict[str, Any]] :
+        with self._lock :
+            return list(self._events)
+
+
+    def _track(self) -> int :
+        """Returns the track of the current asyncio task (coroutines share a thread, but their spans overlap), or else the current thread."""
+        try :
+            task:Optional[asyncio.Task] = asyncio.current_task()
+        except RuntimeError :  # no running event loop
+            task = None
+        owner:Any = task if task is not None else threading.current_thread()
+        with self._lock :
+            if owner not in self._tracks :
+                self._lastTrack += 1
+                self._tracks[owner] = self._lastTrack
+                name:str = f"{threading.current_thread().name} {task.get_name()}" if task is not None else threading.current_thread().name
+                self._events.append({"name" : "thread_name", "ph" : "M", "pid" : os.getpid(), "tid" : self._tracks[owner], "args" : {"name" : name}})
+            return self._tracks[owner]
+
+
+# A span of the trace - records how long its with block took.
+class _Span :
+
+    def __init__(self, recorder:_Recorder, name:str, category:str, args:dict[str, Any]) :
+        self._recorder:_Recorder = recorder
+        self._name:str = name
+        self._category:str = category
+        self._args:dict[str, Any] = args
+        self._start:int = 0
+
+
+    def __enter__(self) :
+        self._start = self._recorder.now()
+        return self
+
+
+    def __exit__(self, exceptionType, exception, tb) :
+        if exceptionType is not None :
+            self._args["error"] = str(exception) or exceptionType.__name__
+        self._recorder.add(self._name, self._category, self._start, self._recorder.now(), self._args)
+        return False
+
+
+# Shared by every span while nothing is being recorded, so a disabled span costs a function call and a check.
+_NOT_RECORDING:contextlib.nullcontext = contextlib.nullcontext()
+
+_recorder:Optional[_Recorder] = None
+
+
+def start() :
+    """Starts recording spans (discarding anything recorded before)."""
+    global _recorder
+    _recorder = _Recorder()
+
+
+def stop() :
+    """Stops recording spans and discards them."""
+    global _recorder
+    _recorder = None
+
+
+def isEnabled() -> bool :
+    """
+    Returns:
+        bool: True if spans are being recorded.
+    """
+    return _recorder is not None
+
+
+def span(name:str, category:str, **args:Any) :
+    """
+    Returns a context manager that records its with block as a span of the trace, if a trace is being recorded.
+
+    Args:
+        name (str): the name of the span (e.g. the dependency being fetched).
+        category (str): the kind of work (e.g. fetch, resolve, cache).
+        args (Any): any details to show with the span.
+
+    Returns:
+        the context manager.
+    """
+    recorder:Optional[_Recorder] = _recorder
+    if recorder is None :
+        return _NOT_RECORDING
+    return _Span(recorder, name, category, args)
+
+
+def writeJson(path:str) :
+    """
+    Writes the spans recorded so far to a Chrome trace-event JSON file.
+
+    Args:
+        path (str): the path of the file to write (its directory is created if needed).
+    """
+    events:list[dict[str, Any]] = _recorder.getEvents() if _recorder is not None else []
+    file_util.mkdir(file_util.getParentDirectory(os.path.abspath(path)), mode=0o755)
+    with open(path, "w") as traceFile :
+        json.dump({"traceEvents" : events, "displayTimeUnit" : "ms"}, traceFile)
+    _logger.debug(f"Wrote {len(events)} trace events to {path}")
@@ -0,0 +1,162 @@
+import ctypes
+import logging
+import os
+import select
+import time
+from typing import Optional
+
+_logger:logging.Logger = logging.getLogger(__name__)
+
+# The inotify events (see inotify(7)) that mean a file in the watched directory was written, replaced or created.
+_IN_MODIFY:int = 0x002
+_IN_ATTRIB:int = 0x004
+_IN_CLOSE_WRITE:int = 0x008
+_IN_MOVED_TO:int = 0x080
+_IN_CREATE:int = 0x100
+_EVENTS:int = _IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+
+# How long (seconds) a changed file must stay unchanged before the change is reported - editors can save in several writes.
+SETTLE_SECONDS:float = 0.2
+
+
+# Waits for any of a set of files to change. Uses inotify where it is available (Linux) and otherwise polls each file's modified time, size and inode.
+# The directories holding the files are watched rather than the files themselves, so editors that save by replacing a file are followed.
+class FileWatcher :
+
+    def __init__(self, paths:list[str], interval:float = 1.0) :
+        """
+        Parameters:
+            paths - the files to watch.
+            interval - seconds between checks of the files when polling (inotify isn't available).
+        """
+        self._interval:float = max(0.05, interval)
+        self._signatures:dict[str, Optional[tuple[int, int, int]]] = {}
+        self._libc:Optional[ctypes.CDLL] = None
+        self._watches:dict[str, int] = {}  # the inotify watch of each directory holding a file, by directory.
+        self._inotify:Optional[int] = self._openInotify()
+        self.setPaths(paths)
+
+
+    def setPaths(self, paths:list[str]) :
+        """
+        Sets the files watched (e.g. once a configuration has been loaded again, and includes other files). Files already watched keep the state
+        they were last seen in; the others are seen as they are now.
+
+        Parameters:
+            paths - the files to watch.
+        """
+        self._signatures = {path : self._signatures[path] if path in self._signatures else self._getSignature(path) for path in sorted({os.path.abspath(path) for path in paths})}
+        if self._inotify is not None :
+            self._watchDirectories()
+
+
+    def isNotified(self) -> bool :
+        """Returns True if changes are notified by inotify, False if the files are polled."""
+        return self._inotify is not None
+
+
+    def wait(self, timeout:Optional[float] = None) -> bool :
+        """
+        Waits until one of the files changes (and has settled).
+
+        Parameters:
+            timeout - the most seconds to wait. None waits for as long as it takes.
+
+        Returns:
+            bool: True if a file changed, False if the timeout passed first.
+        """
+        deadline:Optional[float] = None if timeout is None else time.monotonic() + timeout
+        while True :
+            remaining:Optional[float] = None if deadline is None else max(0, deadline - time.monotonic())
+            if self._inotify is not None :
+                self._waitForEvents(remaining)
+            else :
+                time.sleep(self._interval if remaining is None else min(self._interval, remaining))
+            if self._hasChanged() :
+                self._settle()
+                return True
+            if deadline is not None and time.monotonic() >= deadline :
+                return False
+
+
+    def close(self) :
+        """Stops watching."""
+        if self._inotify is not None :
+            os.close(self._inotify)
+            self._inotify = None
+            self._watches = {}
+
+
+    def _hasChanged(self) -> bool :
+        """Returns True (and remembers the new state) if any file differs from when it was last seen. A missing file (e.g. half way through being replaced) isn't a change."""
+        changed:bool = False
+        for path, seen in self._signatures.items() :
+            signature:Optional[tuple[int, int, int]] = self._getSignature(path)
+            if signature is not None and signature != seen :
+                self._signatures[path] = signature
+                changed = True
+        return changed
+
+
+    def _settle(self) :
+        """Waits until the files have stopped changing."""
+        while True :
+            time.sleep(SETTLE_SECONDS)
+            if self._inotify is not None :
+                self._drain()
+            if not self._hasChanged() :
+                return
+
+
+    def _getSignature(self, path:str) -> Optional[tuple[int, int, int]] :
+        """Returns what identifies the current content of a file (its modified time, size and inode), or None if it doesn't exist."""
+        try :
+            status:os.stat_result = os.stat(path)
+        except OSError :
+            return None
+        return status.st_mtime_ns, status.st_size, status.st_ino
+
+
+    def _openInotify(self) -> Optional[int] :
+        """Returns an inotify descriptor (watching nothing yet - see _watchDirectories), or None if inotify isn't available."""
+        try :
+            self._libc = ctypes.CDLL(None, use_errno=True)
+            descriptor:int = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError) :  # not Linux
+            _logger.debug(f"inotify isn't available - polling every {self._interval}s")
+            return None
+        if descriptor < 0 :
+            _logger.debug(f"inotify couldn't be started (errno {ctypes.get_errno()}) - polling every {self._interval}s")
+            return None
+        return descriptor
+
+
+    def _watchDirectories(self) :
+        """Watches the directory of each file with inotify (and stops watching directories no longer holding one). Falls back to polling if one can't be watched."""
+        directories:set[str] = {os.path.dirname(path) for path in self._signatures}
+        for directory in set(self._watches) - directories :
+            self._libc.inotify_rm_watch(self._inotify, self._watches.pop(directory))  # type: ignore - only called with inotify
+        for directory in sorted(directories - set(self._watches)) :
+            watch:int = self._libc.inotify_add_watch(self._inotify, os.fsencode(directory), _EVENTS)  # type: ignore - only called with inotify
+            if watch < 0 :
+                _logger.debug(f"inotify couldn't watch {directory} (errno {ctypes.get_errno()}) - polling instead")
+                self.close()
+                return
+            self._watches[directory] = watch
+
+
+    def _waitForEvents(self, timeout:Optional[float]) :
+        """Waits for inotify to report something happened in the directory, then reads (and discards) the events - the file itself is checked afterwards."""
+        readable, _, _ = select.select([self._inotify], [], [], timeout)
+        if readable :
+            self._drain()
+
+
+    def _drain(self) :
+        """Reads every pending inotify event."""
+        while True :
+            try :
+                if not os.read(self._inotify, 64 * 1024) :  # type: ignore - only called with inotify
+                    return
+            except BlockingIOError :
+                return
@@ -65,7 +65,7 @@ def unzip(zipPath:str, targetDir:str) :
     Raises:
         ZipError if an error is encountered.
     """
-    _logger.debug(f"Unzipping {zipPath} -> {targetDir}")
+    _logger.debug("Unzipping %s -> %s", zipPath, targetDir)
 
     # Validate the zip file and target directory
     _validateZipPath(zipPath)
@@ -80,7 +80,29 @@ def unzip(zipPath:str, targetDir:str) :
         _logger.error(f"Unable to extract zip file at {zipPath}", exc_info=True)
         raise ZipError(f"Unable to extract zip file at {zipPath}") from exc
 
-    _logger.debug(f"Unzipped {zipPath} -> {targetDir}")
+    _logger.debug("Unzipped %s -> %s", zipPath, targetDir)
+
+
+def listMembers(zipPath:str) -> list[str] :
+    """
+    Lists the paths of the entries in the specified zip file - what unzipping it puts in place, relative to the target directory.
+
+    Parameters:
+        zipPath - the path to the zip file.
+
+    Returns:
+        list[str]: the path of each entry, directories ending with a /.
+
+    Raises:
+        ZipError if the zip file can't be read.
+    """
+    _validateZipPath(zipPath)
+    try :
+        with _createZipFileForRead(zipPath) as zip :
+            return zip.namelist()
+    except Exception as exc :
+        _logger.error(f"Unable to read zip file at {zipPath}", exc_info=True)
+        raise ZipError(f"Unable to read zip file at {zipPath}") from exc
 
 
 def isValidZipPath(zipPath:str) -> bool :
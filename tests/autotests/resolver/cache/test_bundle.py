@@ -0,0 +1,105 @@
+"""
+Tests exporting the cached sources of a configuration to a bundle, and importing it into another cache.
+"""
+import io
+import json
+import tarfile
+import pytest
+from dependency_resolver.resolver.cache import bundle
+from dependency_resolver.resolver.cache.cache import Cache
+from dependency_resolver.resolver.configuration.configuration import Configuration
+from dependency_resolver.resolver.errors.errors import BundleError
+from dependency_resolver.resolver.project.project import Project
+
+
+@pytest.fixture
+def project_dir(tmp_path):
+    (tmp_path / "source" / "docs").mkdir(parents=True)
+    (tmp_path / "source" / "tool.bin").write_bytes(b"tool" * 1000)
+    (tmp_path / "source" / "docs" / "readme.txt").write_text("read me")
+    (tmp_path / "source" / "docs" / "guide.txt").write_text("guide")
+    config = {
+        "project": "Bundled",
+        "dependencies": [
+            {"name": "tool", "target_dir": "deps", "source": "origin", "source_path": "tool.bin"},
+            {"name": "docs", "target_dir": "docs", "source": "origin", "source_path": "docs"},
+        ],
+        "sources": [{"name": "origin", "protocol": "filesystem", "base": str(tmp_path / "source")}],
+    }
+    (tmp_path / "project").mkdir()
+    (tmp_path / "project" / "dependencies.json").write_text(json.dumps(config))
+    return tmp_path
+
+
+def create_project(project_dir, cacheRoot):
+    project = Project(Configuration(str(project_dir / "project" / "dependencies.json")))
+    project.setCache(Cache(cacheRoot=str(project_dir / cacheRoot), cacheName=project.getProjectName()))
+    return project
+
+
+@pytest.mark.parametrize("name", ["bundle.tar", "bundle.tar.gz"])
+def test_export_then_import_seeds_a_new_cache(project_dir, name):
+    create_project(project_dir, "agent1").fetchDependencies()
+    create_project(project_dir, "agent1").exportCache(str(project_dir / name))
+
+    for path in (project_dir / "source").rglob("*.*"):
+        path.unlink()  # the origin is gone - only the bundle has the sources.
+    create_project(project_dir, "agent2").importCache(str(project_dir / name))
+    create_project(project_dir, "agent2").resolveFetchedDependencies()
+    assert (project_dir / "project" / "deps" / "tool.bin").read_bytes() == b"tool" * 1000
+    assert (project_dir / "project" / "docs" / "readme.txt").read_text() == "read me"
+
+
+def test_manifest_comes_first(project_dir):
+    create_project(project_dir, "agent1").fetchDependencies()
+    project = create_project(project_dir, "agent1")
+    project.selectDependencies(only=["tool"])
+    project.exportCache(str(project_dir / "bundle.tar"))
+
+    with tarfile.open(project_dir / "bundle.tar") as archive:
+        assert archive.getnames() == [bundle.MANIFEST, "cache/origin/tool.bin/tool.bin"]
+        manifest = json.load(archive.extractfile(bundle.MANIFEST))
+    assert manifest["cache"] == "Bundled"
+    assert manifest["files"][0]["size"] == 4000
+    assert manifest["files"][0]["dependencies"] == ["tool"]
+
+
+def test_import_without_a_configuration_uses_the_bundle_cache_name(project_dir):
+    create_project(project_dir, "agent1").fetchDependencies()
+    create_project(project_dir, "agent1").exportCache(str(project_dir / "bundle.tar"))
+    cachePath, files, size = bundle.importBundle(str(project_dir / "bundle.tar"), str(project_dir / "agent2"))
+    assert cachePath == str(project_dir / "agent2" / "Bundled")
+    assert files == 3 and size == 4000 + len("read me") + len("guide")
+
+
+def test_damaged_file_is_not_imported(project_dir):
+    create_project(project_dir, "agent1").fetchDependencies()
+    create_project(project_dir, "agent1").exportCache(str(project_dir / "bundle.tar"))
+    data = (project_dir / "bundle.tar").read_bytes().replace(b"tooltool", b"toolTOOL", 1)
+    (project_dir / "bundle.tar").write_bytes(data)
+
+    with pytest.raises(BundleError, match="sha256"):
+        create_project(project_dir, "agent2").importCache(str(project_dir / "bundle.tar"))
+    assert not (project_dir / "agent2" / "Bundled" / "origin" / "tool.bin" / "tool.bin").exists()
+    assert list((project_dir / "agent2" / "Bundled" / "origin" / "tool.bin").iterdir()) == []  # no temporary file left behind.
+
+
+def test_files_outside_the_cache_are_rejected(tmp_path):
+    manifest = json.dumps({"format": bundle.FORMAT, "cache": "Bundled", "files": [{"path": "../escape", "size": 1, "sha256": "0" * 64}]}).encode()
+    with tarfile.open(tmp_path / "evil.tar", "w") as archive:
+        info = tarfile.TarInfo(bundle.MANIFEST)
+        info.size = len(manifest)
+        archive.addfile(info, io.BytesIO(manifest))
+    with pytest.raises(BundleError, match="invalid file"):
+        bundle.importBundle(str(tmp_path / "evil.tar"), str(tmp_path / "cache"))
+    assert not (tmp_path / "escape").exists()
+
+
+def test_incomplete_bundle_is_reported(project_dir):
+    create_project(project_dir, "agent1").fetchDependencies()
+    create_project(project_dir, "agent1").exportCache(str(project_dir / "bundle.tar"))
+    with tarfile.open(project_dir / "bundle.tar") as archive, tarfile.open(project_dir / "short.tar", "w") as short:
+        for member in archive.getmembers()[:2]:
+            short.addfile(member, archive.extractfile(member))
+    with pytest.raises(BundleError, match="incomplete"):
+        bundle.importBundle(str(project_dir / "short.tar"), str(project_dir / "agent2"))
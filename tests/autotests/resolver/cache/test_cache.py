@@ -0,0 +1,37 @@
+"""
+Unit tests for cleaning the Cache.
+"""
+import os
+import threading
+import pytest
+from dependency_resolver.resolver.cache.cache import Cache
+
+
+def wait_for_reapers():
+    for thread in threading.enumerate():
+        if thread.name == "reaper":
+            thread.join()
+
+
+@pytest.fixture
+def cache_root(tmp_path):
+    (tmp_path / "project" / "source" / "path").mkdir(parents=True)
+    (tmp_path / "project" / "source" / "path" / "file.zip").write_text("cached")
+    (tmp_path / "other").mkdir()
+    return tmp_path
+
+
+@pytest.mark.parametrize("instant", [False, True])
+def test_clean(cache_root, instant):
+    Cache(cacheRoot=str(cache_root), cacheName="project").clean(instant=instant)
+    wait_for_reapers()
+    assert os.listdir(cache_root / "project") == []
+    assert sorted(os.listdir(cache_root)) == ["other", "project"]
+
+
+def test_leftover_cleans_are_reaped(cache_root):
+    (cache_root / "project").rename(cache_root / ".project.deleting-0123456789ab")
+    (cache_root / ".other.deleting-0123456789ab").mkdir()
+    Cache(cacheRoot=str(cache_root), cacheName="project")
+    wait_for_reapers()
+    assert sorted(os.listdir(cache_root)) == [".other.deleting-0123456789ab", "other", "project"]
@@ -0,0 +1,177 @@
+"""
+Tests locking the fetched sources of a configuration, and fetching/resolving against the lockfile.
+"""
+import hashlib
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from dependency_resolver.resolver.cache.cache import Cache
+from dependency_resolver.resolver.cache.lock import Lock
+from dependency_resolver.resolver.configuration.configuration import Configuration
+from dependency_resolver.resolver.errors.errors import LockError
+from dependency_resolver.resolver.project.project import Project
+from dependency_resolver.resolver.report.report import Report
+from dependency_resolver.resolver.utilities import file_util
+
+BODY = b"release" * 1000
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    heads = 0
+
+    def do_HEAD(self):
+        Handler.heads += 1
+        self.do_GET(body=False)
+
+    def do_GET(self, body=True):
+        if self.path == "/latest":
+            self.send_response(302)
+            self.send_header("Location", "/v2")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        elif self.path == "/v2":
+            self.send_response(200)
+            self.send_header("ETag", '"v2"')
+            self.send_header("Content-Length", str(len(BODY)))
+            self.end_headers()
+            if body:
+                self.wfile.write(BODY)
+        else:
+            self.send_error(404)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def project_dir(tmp_path):
+    (tmp_path / "source").mkdir()
+    (tmp_path / "source" / "nightly.bin").write_bytes(b"nightly 1")
+    write_config(tmp_path, "nightly.bin")
+    return tmp_path
+
+
+def write_config(project_dir, sourcePath):
+    config = {
+        "project": "Locked",
+        "dependencies": [{"name": "nightly", "target_dir": "deps", "source": "origin", "source_path": sourcePath, "always_update": True}],
+        "sources": [{"name": "origin", "protocol": "filesystem", "base": str(project_dir / "source")}],
+    }
+    (project_dir / "project").mkdir(exist_ok=True)
+    (project_dir / "project" / "dependencies.json").write_text(json.dumps(config))
+
+
+def create_project(project_dir, lock=None):
+    project = Project(Configuration(str(project_dir / "project" / "dependencies.json")))
+    project.setCache(Cache(cacheRoot=str(project_dir / "cache"), cacheName=project.getProjectName()))
+    project.setLock(lock)
+    return project
+
+
+def lock_path(project_dir):
+    return str(project_dir / "project" / "dependencies.lock.json")
+
+
+def test_lock_records_what_was_fetched(project_dir):
+    create_project(project_dir).lockDependencies(Lock(lock_path(project_dir)))
+    assert Lock.getDefaultPath(str(project_dir / "project" / "dependencies.json")) == lock_path(project_dir)
+    entry = json.loads((project_dir / "project" / "dependencies.lock.json").read_text())["dependencies"]["nightly"]
+    assert entry == {"url": str(project_dir / "source" / "nightly.bin"), "protocol": "filesystem", "size": 9, "sha256": hashlib.sha256(b"nightly 1").hexdigest()}
+
+
+def test_locked_uses_the_matching_cached_source_without_asking_the_origin(project_dir):
+    create_project(project_dir).lockDependencies(Lock(lock_path(project_dir)))
+    (project_dir / "source" / "nightly.bin").unlink()  # always updated, so an unlocked fetch would go to the origin (and fail).
+    create_project(project_dir, Lock.load(lock_path(project_dir))).resolveDependencies()
+    assert (project_dir / "project" / "deps" / "nightly.bin").read_bytes() == b"nightly 1"
+
+
+def test_locked_fails_when_the_origin_has_changed(project_dir):
+    create_project(project_dir).lockDependencies(Lock(lock_path(project_dir)))
+    (project_dir / "source" / "nightly.bin").write_bytes(b"nightly 2")
+    create_project(project_dir).fetchDependencies()  # an unlocked fetch takes the new nightly...
+
+    [error] = fetch_errors(create_project(project_dir, Lock.load(lock_path(project_dir))))
+    assert "has changed since it was locked" in error  # ...which doesn't match the lock.
+
+    create_project(project_dir).lockDependencies(Lock.load(lock_path(project_dir)))  # accept the change.
+    assert fetch_errors(create_project(project_dir, Lock.load(lock_path(project_dir)))) == [None]
+
+
+def fetch_errors(project):
+    report = Report()
+    project.setReport(report)
+    project.fetchDependencies()
+    return [measurement["error"] for measurement in report.getMeasurements(Report.FETCH)]
+
+
+def test_locked_fails_when_the_configuration_has_changed(project_dir):
+    create_project(project_dir).lockDependencies(Lock(lock_path(project_dir)))
+    (project_dir / "source" / "other.bin").write_bytes(b"other")
+    write_config(project_dir, "other.bin")
+    with pytest.raises(LockError, match="out of date"):
+        create_project(project_dir, Lock.load(lock_path(project_dir)))
+    with pytest.raises(LockError, match="Unable to read the lockfile"):
+        Lock.load(str(project_dir / "missing.lock.json"))
+
+
+def test_lock_records_the_etag_and_final_url(server, project_dir):
+    config = {
+        "project": "Locked",
+        "dependencies": [{"name": "release", "target_dir": "deps", "target_name": "release.bin", "source": "web", "source_path": "latest"}],
+        "sources": [{"name": "web", "protocol": "https", "base": server}],
+    }
+    (project_dir / "project" / "dependencies.json").write_text(json.dumps(config))
+    heads = Handler.heads
+    create_project(project_dir).lockDependencies(Lock(lock_path(project_dir)))
+    entry = json.loads((project_dir / "project" / "dependencies.lock.json").read_text())["dependencies"]["release"]
+    assert entry["url"] == f"{server}/latest"
+    assert entry["final_url"] == f"{server}/v2"
+    assert entry["etag"] == '"v2"'
+    assert entry["sha256"] == hashlib.sha256(BODY).hexdigest()
+    assert Handler.heads == heads  # taken from the download, not asked for again.
+
+    create_project(project_dir).lockDependencies(Lock.load(lock_path(project_dir)))  # already cached, so kept as they were locked.
+    assert json.loads((project_dir / "project" / "dependencies.lock.json").read_text())["dependencies"]["release"] == entry
+
+
+def test_locked_only_hashes_a_cached_source_again_once_it_changes(project_dir, monkeypatch):
+    create_project(project_dir).lockDependencies(Lock(lock_path(project_dir)))
+    hashes = []
+    hashFile = file_util.hashFile
+    monkeypatch.setattr(file_util, "hashFile", lambda path, *args: hashes.append(path) or hashFile(path, *args))
+    for _ in range(3):
+        create_project(project_dir, Lock.load(lock_path(project_dir))).fetchDependencies()
+    assert hashes == []
+
+    cached = project_dir / "cache" / "Locked" / "origin" / "nightly.bin" / "nightly.bin"
+    cached.write_bytes(b"nightly 2")
+    assert fetch_errors(create_project(project_dir, Lock.load(lock_path(project_dir)))) == [None]
+    assert cached.read_bytes() == b"nightly 1"  # no longer matched the lock, so fetched again.
+    assert hashes
+
+
+def test_lockfile_is_written_with_the_usual_permissions(project_dir):
+    umask = os.umask(0o022)
+    try:
+        create_project(project_dir).lockDependencies(Lock(lock_path(project_dir)))
+        assert os.stat(lock_path(project_dir)).st_mode & 0o777 == 0o644
+        os.chmod(lock_path(project_dir), 0o664)
+        create_project(project_dir).lockDependencies(Lock.load(lock_path(project_dir)))
+        assert os.stat(lock_path(project_dir)).st_mode & 0o777 == 0o664  # keeps the permissions it was given.
+    finally:
+        os.umask(umask)
+    assert [path.name for path in (project_dir / "project").iterdir() if path.name.startswith(".lock-")] == []
@@ -0,0 +1,108 @@
+"""
+Tests the remote (second level) cache, against the reference cache server.
+"""
+import hashlib
+import json
+import os
+import threading
+import pytest
+import dependency_resolver.resolver.utilities.https_util as https_util
+import dependency_resolver.resolver.utilities.retry_util as retry_util
+from dependency_resolver.resolver.cache.cache import Cache
+from dependency_resolver.resolver.cache.remote import RemoteCache
+from dependency_resolver.resolver.cache.remoteServer import RemoteCacheServer
+from dependency_resolver.resolver.configuration.configuration import Configuration
+from dependency_resolver.resolver.project.project import Project
+
+TOKEN = "secret"
+
+
+@pytest.fixture(autouse=True)
+def policy():
+    retry_util.setPolicy(retry_util.RetryPolicy(retries=0))
+    retry_util.setBreakers(threshold=0, cooldown=0)
+    yield
+    retry_util.setPolicy(retry_util.RetryPolicy())
+    retry_util.setBreakers(threshold=5, cooldown=30)
+
+
+@pytest.fixture
+def server(tmp_path):
+    server = RemoteCacheServer(str(tmp_path / "remote"), token=TOKEN)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def project_dir(tmp_path):
+    (tmp_path / "source").mkdir()
+    (tmp_path / "source" / "tool.bin").write_bytes(b"tool" * 1000)
+    config = {
+        "project": "Remote",
+        "dependencies": [{"name": "tool", "target_dir": "deps", "source": "origin", "source_path": "tool.bin"}],
+        "sources": [{"name": "origin", "protocol": "filesystem", "base": str(tmp_path / "source")}],
+    }
+    (tmp_path / "project").mkdir()
+    (tmp_path / "project" / "dependencies.json").write_text(json.dumps(config))
+    return tmp_path
+
+
+def create_project(project_dir, cacheRoot, remote):
+    project = Project(Configuration(str(project_dir / "project" / "dependencies.json")))
+    project.setCache(Cache(cacheRoot=str(project_dir / cacheRoot), cacheName=project.getProjectName()))
+    project.setRemoteCache(remote)
+    return project
+
+
+def test_second_machine_fetches_from_the_remote_cache(server, project_dir):
+    create_project(project_dir, "agent1", RemoteCache(server.getUrl(), token=TOKEN)).fetchDependencies()
+    digest = hashlib.sha256(b"tool" * 1000).hexdigest()
+    assert os.path.exists(server.getPath("objects", digest))
+
+    os.unlink(project_dir / "source" / "tool.bin")  # the origin is gone - only the remote cache has it.
+    create_project(project_dir, "agent2", RemoteCache(server.getUrl(), token=TOKEN)).resolveDependencies()
+    assert (project_dir / "project" / "deps" / "tool.bin").read_bytes() == b"tool" * 1000
+
+
+def test_damaged_remote_copy_is_not_used(server, project_dir):
+    create_project(project_dir, "agent1", RemoteCache(server.getUrl(), token=TOKEN)).fetchDependencies()
+    digest = hashlib.sha256(b"tool" * 1000).hexdigest()
+    with open(server.getPath("objects", digest), "wb") as damaged:
+        damaged.write(b"damaged")
+    create_project(project_dir, "agent2", RemoteCache(server.getUrl(), token=TOKEN)).resolveDependencies()
+    assert (project_dir / "project" / "deps" / "tool.bin").read_bytes() == b"tool" * 1000  # fetched from the origin instead.
+
+
+def test_push_needs_the_token(server, project_dir):
+    create_project(project_dir, "agent1", RemoteCache(server.getUrl(), token="wrong")).resolveDependencies()
+    assert (project_dir / "project" / "deps" / "tool.bin").exists()  # the fetch still works.
+    assert os.listdir(os.path.join(server.root, "objects")) == []
+
+
+def test_read_only_does_not_push(server, project_dir):
+    create_project(project_dir, "agent1", RemoteCache(server.getUrl(), token=TOKEN, push=False)).fetchDependencies()
+    assert os.listdir(os.path.join(server.root, "objects")) == []
+
+
+def test_unreachable_remote_falls_back_to_the_origin(project_dir):
+    create_project(project_dir, "agent1", RemoteCache("http://127.0.0.1:1")).resolveDependencies()
+    assert (project_dir / "project" / "deps" / "tool.bin").exists()
+
+
+def test_server_checks_what_is_pushed(server):
+    headers = {"Authorization": f"Bearer {TOKEN}"}
+    with pytest.raises(https_util.HttpError) as raised:
+        https_util.upload(f"{server.getUrl()}/objects/{'0' * 64}", b"not that", headers=headers)
+    assert raised.value.status == 400
+    with pytest.raises(https_util.HttpError) as raised:
+        https_util.upload(f"{server.getUrl()}/keys/{'1' * 64}", ("2" * 64).encode(), headers=headers)
+    assert raised.value.status == 409  # no such object.
+    with pytest.raises(https_util.HttpError) as raised:
+        https_util.upload(f"{server.getUrl()}/keys/{'1' * 64}", b"2" * 1024, headers=headers)
+    assert raised.value.status == 413
+    with pytest.raises(https_util.HttpError) as raised:
+        https_util.getText(f"{server.getUrl()}/objects/../../etc/passwd")
+    assert raised.value.status == 404
@@ -105,3 +105,30 @@ def test_validateConfiguration_handles_missing_file(tmp_path):
     missing_path = tmp_path / "does_not_exist.json"
     with pytest.raises(SystemExit):
         Configuration(str(missing_path)).validateConfiguration()
+
+
+def test_validate_after_cycle_and_unknown_name(capsys):
+    """
+    Test that validateConfiguration reports 'after' attributes that form a cycle or name a missing dependency.
+    """
+    invalid_path = os.path.join(EXAMPLES_DIR, "after_cycle.json")
+    config = Configuration(invalid_path)
+    config.validateConfiguration()
+    captured = capsys.readouterr()
+    assert "Invalid" in captured.out
+    assert "cycle" in captured.out
+    assert "Missing" in captured.out
+    assert config.numberOfErrors() == 2
+
+
+def test_validate_target_mode_and_owner(capsys):
+    """
+    Test that validateConfiguration reports target modes that aren't octal and owners that aren't user:group.
+    """
+    invalid_path = os.path.join(EXAMPLES_DIR, "invalid_target_permissions.json")
+    config = Configuration(invalid_path)
+    config.validateConfiguration()
+    captured = capsys.readouterr()
+    assert "target_mode" in captured.out
+    assert "target_owner" in captured.out
+    assert config.numberOfErrors() == 2
@@ -0,0 +1,106 @@
+"""
+Tests expanding a configuration: includes, the dependency defaults of sources and ${name} variables.
+"""
+import json
+import pytest
+from dependency_resolver.resolver.configuration import expander
+from dependency_resolver.resolver.configuration.configuration import Configuration
+from dependency_resolver.resolver.project.project import Project
+
+
+@pytest.fixture
+def config_dir(tmp_path):
+    """Creates a configuration that includes a shared file of sources (with defaults) and variables."""
+    common = {
+        "variables": {"version": "1.0", "mirror": "https://releases.example.com/${version}"},
+        "sources": [{"name": "releases", "protocol": "https", "base": "${mirror}", "defaults": {"target_dir": "libs/${name}", "source_path": "${name}-${version}.zip", "resolve_action": "unzip"}}],
+    }
+    config = {
+        "project": "Expanded",
+        "include": ["shared/common.json"],
+        "variables": {"version": "2.0"},
+        "dependencies": [
+            {"name": "alpha", "source": "releases"},
+            {"name": "beta", "source": "releases", "variables": {"version": "3.1"}, "resolve_action": "copy"},
+            {"name": "literal", "source": "releases", "target_name": "$${version}.zip"},
+        ],
+    }
+    (tmp_path / "shared").mkdir()
+    (tmp_path / "shared" / "common.json").write_text(json.dumps(common))
+    (tmp_path / "dependencies.json").write_text(json.dumps(config))
+    return tmp_path
+
+
+def test_expands_includes_defaults_and_variables(config_dir):
+    config = Configuration(str(config_dir / "dependencies.json"))
+    assert config.numberOfErrors() == 0
+    expanded = config.getConfiguration()
+    assert expanded["sources"] == [{"name": "releases", "protocol": "https", "base": "https://releases.example.com/2.0"}]  # the including file's version wins.
+    alpha, beta, literal = expanded["dependencies"]
+    assert alpha == {"name": "alpha", "source": "releases", "target_dir": "libs/alpha", "source_path": "alpha-2.0.zip", "resolve_action": "unzip"}
+    assert (beta["source_path"], beta["resolve_action"]) == ("beta-3.1.zip", "copy")
+    assert literal["target_name"] == "${version}.zip"
+    assert "variables" not in expanded and "include" not in expanded
+
+
+def test_reports_expansion_errors(config_dir):
+    (config_dir / "loop.json").write_text(json.dumps({"include": ["dependencies.json"]}))
+    config = json.loads((config_dir / "dependencies.json").read_text())
+    config["include"] += ["missing.json", "loop.json"]
+    config["dependencies"].append({"name": "unknown", "source": "releases", "target_dir": "${nowhere}"})
+    (config_dir / "dependencies.json").write_text(json.dumps(config))
+
+    errors = Configuration(str(config_dir / "dependencies.json"))._findAnyConfigErrors()
+    assert len(errors) == 3
+    assert any("missing.json included by" in error for error in errors)
+    assert any("includes itself" in error for error in errors)
+    assert any("Unknown variable ${nowhere} in dependency unknown" in error for error in errors)
+
+
+def test_expansion_is_reused_until_a_file_changes(config_dir):
+    expander.setKeep(True)
+    try:
+        first = Configuration(str(config_dir / "dependencies.json")).getConfiguration()
+        assert Configuration(str(config_dir / "dependencies.json")).getConfiguration() is first
+
+        common = json.loads((config_dir / "shared" / "common.json").read_text())
+        common["variables"]["mirror"] = "https://mirror.example.com/${version}"
+        (config_dir / "shared" / "common.json").write_text(json.dumps(common))
+        assert Configuration(str(config_dir / "dependencies.json")).getConfiguration()["sources"][0]["base"] == "https://mirror.example.com/2.0"
+    finally:
+        expander.setKeep(False)
+
+
+def test_dependencies_are_released_once_built(config_dir):
+    config = Configuration(str(config_dir / "dependencies.json"))
+    assert str(config_dir / "dependencies.json") not in expander._parsed and not expander._expanded  # not kept outside serve.
+    project = Project(config)
+    assert "dependencies" not in config.getConfiguration()
+    assert "dependencies" not in config._expansion.getConfiguration()  # not held by the expansion either.
+    assert [dependency.getName() for dependency in project._getDependencies().getDependencies()] == ["alpha", "beta", "literal"]
+    assert set(config.getDependencyFingerprints()) == {"alpha", "beta", "literal"}
+    assert [dependency["name"] for dependency in config.iterateDependencies()] == ["alpha", "beta", "literal"]  # read again.
+
+
+def test_file_included_twice_is_merged_once(config_dir):
+    (config_dir / "left.json").write_text(json.dumps({"include": ["shared/common.json"], "dependencies": [{"name": "left", "source": "releases"}]}))
+    (config_dir / "right.json").write_text(json.dumps({"include": ["shared/common.json"], "dependencies": [{"name": "right", "source": "releases"}]}))
+    config = json.loads((config_dir / "dependencies.json").read_text())
+    config["include"] = ["left.json", "right.json"]
+    (config_dir / "dependencies.json").write_text(json.dumps(config))
+
+    config = Configuration(str(config_dir / "dependencies.json"))
+    assert config.numberOfErrors() == 0
+    assert [source["name"] for source in config.getConfiguration()["sources"]] == ["releases"]
+    assert [dependency["name"] for dependency in config.getConfiguration()["dependencies"]] == ["left", "right", "alpha", "beta", "literal"]
+
+
+def test_reports_duplicate_names(config_dir):
+    config = json.loads((config_dir / "dependencies.json").read_text())
+    config["dependencies"].append({"name": "alpha", "source": "releases"})
+    config["sources"] = [{"name": "releases", "protocol": "filesystem", "base": "/tmp"}]
+    (config_dir / "dependencies.json").write_text(json.dumps(config))
+
+    errors = Configuration(str(config_dir / "dependencies.json"))._findAnyConfigErrors()
+    assert "Each of the dependencies must have a different name - more than one is called alpha." in errors
+    assert "Each of the sources must have a different name - more than one is called releases." in errors
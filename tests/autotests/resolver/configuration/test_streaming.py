@@ -0,0 +1,81 @@
+"""
+Tests streaming large configurations, and dependencies kept in a JSON Lines file, rather than holding every dependency in memory.
+"""
+import json
+import pytest
+from dependency_resolver.resolver.cache.cache import Cache
+from dependency_resolver.resolver.configuration import configuration
+from dependency_resolver.resolver.configuration.configuration import Configuration
+from dependency_resolver.resolver.project.project import Project
+from dependency_resolver.resolver.utilities import json_util
+
+
+@pytest.fixture
+def streamed():
+    """Streams every configuration, however small."""
+    configuration.setStreamSize(0)
+    yield
+    configuration.setStreamSize(32 * 1024 * 1024)
+
+
+def write_config(tmp_path, dependencies, **attributes):
+    (tmp_path / "source").mkdir(exist_ok=True)
+    config = {
+        "project": "Streamed",
+        "dependencies": dependencies,  # before the sources, whose defaults they need.
+        "sources": [{"name": "local", "protocol": "filesystem", "base": str(tmp_path / "source"), "defaults": {"target_dir": "deps", "source_path": "${name}.txt"}}],
+        **attributes,
+    }
+    (tmp_path / "dependencies.json").write_text(json.dumps(config))
+    return str(tmp_path / "dependencies.json")
+
+
+def test_streams_the_dependencies_of_a_large_configuration(tmp_path, streamed):
+    config = Configuration(write_config(tmp_path, [{"name": f"dep{number}", "source": "local"} for number in range(100)]))
+    assert config.isStreamed()
+    assert "dependencies" not in config.getConfiguration()  # only read when needed...
+    assert config.numberOfErrors() == 0
+    dependencies = list(config.iterateDependencies())
+    assert len(dependencies) == 100
+    assert dependencies[7] == {"name": "dep7", "source": "local", "target_dir": "deps", "source_path": "dep7.txt"}  # ...and expanded.
+
+
+def test_resolves_dependencies_from_a_jsonl_file(tmp_path):
+    path = write_config(tmp_path, [{"name": "inline", "source": "local"}], dependencies_file="more/dependencies.jsonl")
+    (tmp_path / "more").mkdir()
+    (tmp_path / "more" / "dependencies.jsonl").write_text('{"name": "first", "source": "local"}\n\n{"name": "second", "source": "local", "after": ["first"]}\n')
+    for name in ("inline", "first", "second"):
+        (tmp_path / "source" / f"{name}.txt").write_text(name)
+
+    project = Project(Configuration(path))
+    project.setCache(Cache(cacheRoot=str(tmp_path / "cache"), cacheName=project.getProjectName()))
+    project.resolveDependencies()
+    assert [(tmp_path / "deps" / f"{name}.txt").read_text() for name in ("inline", "first", "second")] == ["inline", "first", "second"]
+
+
+def test_reports_errors_in_streamed_dependencies(tmp_path, streamed):
+    path = write_config(tmp_path, [{"name": "good", "source": "local"}, {"name": "unnamed-source"}], dependencies_file="dependencies.jsonl")
+    (tmp_path / "dependencies.jsonl").write_text('{"name": "late", "source": "local", "after": ["missing"]}\n{"name": broken}\n')
+    errors = Configuration(path)._findAnyConfigErrors()
+    assert any("Required attribute source" in error for error in errors)
+    assert any("no dependency with that name" in error for error in errors)
+    assert any("Line 2 of" in error for error in errors)
+
+
+def test_fingerprints_match_however_the_configuration_is_loaded(tmp_path):
+    path = write_config(tmp_path, [{"name": "one", "source": "local"}, {"name": "two", "source": "local"}])
+    loaded = Configuration(path).getDependencyFingerprints()
+    configuration.setStreamSize(0)
+    try:
+        assert Configuration(path).getDependencyFingerprints() == loaded
+    finally:
+        configuration.setStreamSize(32 * 1024 * 1024)
+
+
+def test_stream_reads_values_split_across_chunks(tmp_path, monkeypatch):
+    document = {"a": 12345, "dependencies": [{"name": f"é{number}", "values": [1.5, True, None, "x\"y"]} for number in range(20)], "z": "end"}
+    (tmp_path / "document.json").write_text(json.dumps(document, ensure_ascii=False, indent=1), encoding="utf-8")
+    monkeypatch.setattr(json_util, "_CHUNK", 3)
+    head, offset = json_util.parseHead(str(tmp_path / "document.json"), "dependencies")
+    assert head == {"a": 12345, "z": "end"}
+    assert list(json_util.iterateArray(str(tmp_path / "document.json"), offset)) == document["dependencies"]
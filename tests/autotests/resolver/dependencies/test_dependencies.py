@@ -0,0 +1,91 @@
+"""
+Unit tests for selecting a subset of dependencies by name, tag or glob.
+"""
+import zipfile
+from dependency_resolver.resolver.dependencies.dependencies import Dependencies
+from dependency_resolver.resolver.dependencies.dependency import Dependency
+from dependency_resolver.resolver.dependencies.resolveAction import ResolveAction
+from dependency_resolver.resolver.sources.source import Source
+from dependency_resolver.resolver.sources.protocol import SourceProtocol
+
+
+def create_dependency(name, tags=None):
+    source = Source("files", SourceProtocol.HTTPS, base="https://example.com")
+    return Dependency(name=name, targetDir="target", targetName=None, targetRelativeRoot=False, source=source, sourcePath=f"{name}.zip", # type: ignore - no target name is valid
+                      resolveAction=ResolveAction.COPY, description="", alwaysUpdate=False, tags=tags)
+
+
+def create_dependencies():
+    dependencies = Dependencies()
+    dependencies.addDependency(create_dependency("ui-core", ["ui", "nightly"]))
+    dependencies.addDependency(create_dependency("ui-extras", ["ui"]))
+    dependencies.addDependency(create_dependency("compiler"))
+    dependencies.addDependency(create_dependency("runtime", ["nightly"]))
+    return dependencies
+
+
+def names(dependencies):
+    return [dependency.getName() for dependency in dependencies.getDependencies()]
+
+
+def test_matches_name_tag_and_glob():
+    dependency = create_dependency("ui-core", ["ui"])
+    assert dependency.matches("ui-core")
+    assert dependency.matches("ui-*")
+    assert dependency.matches("ui")
+    assert not dependency.matches("compiler")
+
+
+def test_select_nothing_keeps_everything():
+    assert names(create_dependencies().select()) == ["ui-core", "ui-extras", "compiler", "runtime"]
+
+
+def test_select_only_by_name_and_tag():
+    assert names(create_dependencies().select(only=["compiler", "nightly"])) == ["ui-core", "compiler", "runtime"]
+
+
+def test_select_only_by_glob():
+    assert names(create_dependencies().select(only=["ui-*"])) == ["ui-core", "ui-extras"]
+
+
+def test_select_exclude_applied_after_only():
+    assert names(create_dependencies().select(only=["ui"], exclude=["nightly"])) == ["ui-extras"]
+
+
+def test_select_unknown_pattern_logs_warning(caplog):
+    assert names(create_dependencies().select(only=["missing"])) == []
+    assert "does not match" in caplog.text
+
+
+def test_resolve_sets_target_mode(tmp_path):
+    source = tmp_path / "source"
+    (source / "bin" / "lib").mkdir(parents=True)
+    (source / "bin" / "lib" / "tool").write_text("x")
+    dependency = Dependency(name="tools", targetDir="tools", targetName=None, targetRelativeRoot=False, source=Source("files", SourceProtocol.FILESYSTEM), sourcePath="source", # type: ignore - no target name is valid
+                            resolveAction=ResolveAction.COPY, description="", alwaysUpdate=False, mode=0o640)
+    dependency.resolve(str(source / "bin"), str(tmp_path / "home"))
+    target = tmp_path / "home" / "tools"
+    assert (target / "lib" / "tool").stat().st_mode & 0o7777 == 0o640
+    assert (target / "lib").stat().st_mode & 0o7777 == 0o750  # searchable where readable
+
+
+def test_resolve_only_changes_the_mode_of_what_it_put_in_place(tmp_path):
+    (tmp_path / "fetched").mkdir()
+    with zipfile.ZipFile(tmp_path / "fetched" / "docs.zip", "w") as archive:
+        archive.writestr("docs/guide.txt", "guide")
+    (tmp_path / "fetched" / "tool").write_text("x")
+    target = tmp_path / "home" / "shared"
+    (target / "docs").mkdir(parents=True)
+    (target / "docs" / "notes.txt").write_text("someone else's")
+    (target / "docs" / "notes.txt").chmod(0o600)
+
+    def create(name, resolveAction, mode):
+        return Dependency(name=name, targetDir="shared", targetName=None, targetRelativeRoot=False, source=Source("files", SourceProtocol.FILESYSTEM), sourcePath=name, # type: ignore - no target name is valid
+                          resolveAction=resolveAction, description="", alwaysUpdate=False, mode=mode)
+    create("tool", ResolveAction.COPY, 0o700).resolve(str(tmp_path / "fetched" / "tool"), str(tmp_path / "home"))
+    create("docs", ResolveAction.UNZIP, 0o644).resolve(str(tmp_path / "fetched" / "docs.zip"), str(tmp_path / "home"))
+
+    assert (target / "tool").stat().st_mode & 0o7777 == 0o700
+    assert (target / "docs" / "guide.txt").stat().st_mode & 0o7777 == 0o644
+    assert (target / "docs").stat().st_mode & 0o7777 == 0o755
+    assert (target / "docs" / "notes.txt").stat().st_mode & 0o7777 == 0o600  # not extracted by either.
@@ -0,0 +1,145 @@
+"""
+Tests fetching and resolving a project end-to-end, using a source on the local filesystem.
+"""
+import json
+import os
+import zipfile
+import pytest
+from dependency_resolver.resolver.cache.cache import Cache
+from dependency_resolver.resolver.configuration.configuration import Configuration
+from dependency_resolver.resolver.project.project import Project
+from dependency_resolver.resolver.report.report import Report
+from dependency_resolver.resolver.scheduler.engine import FetchEngine
+
+
+@pytest.fixture
+def project_dir(tmp_path):
+    """Creates a source directory with a file and a zip, and a configuration that uses them."""
+    source = tmp_path / "source"
+    source.mkdir()
+    (source / "readme.txt").write_text("read me")
+    with zipfile.ZipFile(source / "bundle.zip", "w") as bundle:
+        bundle.writestr("lib/code.txt", "code")
+
+    config = {
+        "project": "TestProject",
+        "dependencies": [
+            {"name": "unzipped", "target_dir": "deps/lib", "source": "local", "source_path": "bundle.zip", "resolve_action": "unzip", "tags": ["libs"]},
+            {"name": "copied", "target_dir": "deps/lib/docs", "source": "local", "source_path": "readme.txt", "after": ["unzipped"]},
+        ],
+        "sources": [{"name": "local", "protocol": "filesystem", "base": str(source)}],
+    }
+    (tmp_path / "project").mkdir()
+    (tmp_path / "project" / "dependencies.json").write_text(json.dumps(config))
+    return tmp_path
+
+
+def create_project(project_dir, only=None, engine=FetchEngine.THREADS):
+    project = Project(Configuration(str(project_dir / "project" / "dependencies.json")))
+    project.setCache(Cache(cacheRoot=str(project_dir / "cache"), cacheName=project.getProjectName()))
+    project.setJobs(fetchJobs=2, resolveJobs=2)
+    project.setFetchEngine(engine)
+    project.selectDependencies(only=only)
+    return project
+
+
+@pytest.mark.parametrize("engine", list(FetchEngine))
+def test_resolve_dependencies(project_dir, capsys, engine):
+    create_project(project_dir, engine=engine).resolveDependencies()
+    assert (project_dir / "project" / "deps" / "lib" / "lib" / "code.txt").read_text() == "code"
+    assert (project_dir / "project" / "deps" / "lib" / "docs" / "readme.txt").read_text() == "read me"
+    output = capsys.readouterr().out
+    assert "Failed" not in output
+
+
+def test_fetch_then_resolve_from_cache(project_dir, capsys):
+    create_project(project_dir).fetchDependencies()
+    assert os.path.exists(project_dir / "cache" / "TestProject" / "local" / "bundle.zip" / "bundle.zip")
+    create_project(project_dir).resolveFetchedDependencies()
+    assert (project_dir / "project" / "deps" / "lib" / "docs" / "readme.txt").exists()
+    assert "Failed" not in capsys.readouterr().out
+
+
+def test_resolve_from_empty_cache_fails(project_dir, capsys):
+    create_project(project_dir).resolveFetchedDependencies()
+    output = capsys.readouterr().out
+    assert "1-unzipped : Failed" in output
+    assert "2-copied : Skipped" in output
+
+
+def test_resolve_selected_dependencies(project_dir):
+    create_project(project_dir, only=["libs"]).resolveDependencies()
+    assert (project_dir / "project" / "deps" / "lib" / "lib" / "code.txt").exists()
+    assert not (project_dir / "project" / "deps" / "lib" / "docs").exists()
+
+
+def test_report(project_dir, capsys):
+    project = create_project(project_dir)
+    project.setReport(report := Report())
+    project.resolveDependencies()
+    fetches = {measurement["dependency"]: measurement for measurement in report.getMeasurements(Report.FETCH)}
+    assert fetches["unzipped"]["cacheHit"] is False
+    assert fetches["unzipped"]["location"] == "filesystem"
+    assert fetches["copied"]["bytes"] == len("read me")
+    resolves = {measurement["dependency"]: measurement for measurement in report.getMeasurements(Report.RESOLVE)}
+    assert resolves["unzipped"]["action"] == "unzip"
+    assert resolves["copied"]["action"] == "copy"
+
+    project = create_project(project_dir)
+    project.setReport(report := Report())
+    project.fetchDependencies()
+    assert all(measurement["cacheHit"] for measurement in report.getMeasurements(Report.FETCH))
+
+
+def test_resolve_changes(project_dir, capsys):
+    previous = create_project(project_dir)
+    previous.resolveDependencies()
+    configPath = project_dir / "project" / "dependencies.json"
+    config = json.loads(configPath.read_text())
+    config["dependencies"] = [config["dependencies"][0], {"name": "added", "target_dir": "deps/other", "source": "local", "source_path": "readme.txt"}]
+    configPath.write_text(json.dumps(config))
+    capsys.readouterr()
+
+    changes = create_project(project_dir).resolveChanges(previous)
+    assert (changes.getAdded(), changes.getRemoved(), changes.getChanged()) == (["added"], ["copied"], [])
+    assert not (project_dir / "project" / "deps" / "lib" / "docs" / "readme.txt").exists()
+    assert (project_dir / "project" / "deps" / "other" / "readme.txt").exists()
+    assert (project_dir / "project" / "deps" / "lib" / "lib" / "code.txt").exists()
+    output = capsys.readouterr().out
+    assert "1 added, 1 removed, 0 changed" in output
+    assert "unzipped" not in output  # unchanged, so not fetched or resolved again.
+
+
+def test_resolve_changed_source_refetches(project_dir):
+    previous = create_project(project_dir)
+    previous.resolveDependencies()
+    (project_dir / "newsource").mkdir()
+    (project_dir / "newsource" / "readme.txt").write_text("new")
+    configPath = project_dir / "project" / "dependencies.json"
+    config = json.loads(configPath.read_text())
+    config["sources"][0]["base"] = str(project_dir / "newsource")
+    config["dependencies"] = [{"name": "copied", "target_dir": "deps/lib/docs", "source": "local", "source_path": "readme.txt"}]  # the bundle isn't in the new source.
+    configPath.write_text(json.dumps(config))
+
+    changes = create_project(project_dir).resolveChanges(previous)
+    assert changes.getRefetched() == ["copied"]
+    assert (project_dir / "project" / "deps" / "lib" / "docs" / "readme.txt").read_text() == "new"
+    assert not (project_dir / "project" / "deps" / "lib" / "lib").exists()  # what the removed unzip extracted is deleted...
+    assert (project_dir / "project" / "deps" / "lib" / "docs").exists()  # ...but not the directory it was extracted into, which holds copied's target.
+
+
+def test_resolve_changes_only_removes_what_an_archive_extracted(project_dir):
+    previous = create_project(project_dir)
+    previous.resolveDependencies()
+    (project_dir / "project" / "deps" / "lib" / "lib" / "local.txt").write_text("written by hand")
+    (project_dir / "project" / "deps" / "lib" / "notes.txt").write_text("written by hand")
+    configPath = project_dir / "project" / "dependencies.json"
+    config = json.loads(configPath.read_text())
+    config["dependencies"] = [{"name": "copied", "target_dir": "deps/other", "source": "local", "source_path": "readme.txt"}]
+    configPath.write_text(json.dumps(config))
+
+    create_project(project_dir).resolveChanges(previous)
+    assert not (project_dir / "project" / "deps" / "lib" / "lib" / "code.txt").exists()
+    assert (project_dir / "project" / "deps" / "lib" / "lib" / "local.txt").exists()
+    assert (project_dir / "project" / "deps" / "lib" / "notes.txt").exists()
+    assert not (project_dir / "project" / "deps" / "lib" / "docs" / "readme.txt").exists()
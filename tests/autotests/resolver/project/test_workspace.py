@@ -0,0 +1,108 @@
+"""
+Tests fetching and resolving many projects in one run as a workspace, sharing the sources they have in common.
+"""
+import json
+import os
+import pytest
+import dependency_resolver.resolve as resolve
+from dependency_resolver.resolver.cache.cache import Cache
+from dependency_resolver.resolver.configuration.configuration import Configuration
+from dependency_resolver.resolver.project.project import Project
+from dependency_resolver.resolver.project.workspace import Workspace
+from dependency_resolver.resolver.report.report import Report
+from dependency_resolver.resolver.scheduler.engine import FetchEngine
+from dependency_resolver.resolver.utilities import throttle_util
+from dependency_resolver.resolver.utilities.errors_util import ProjectError
+
+
+@pytest.fixture
+def workspace_dir(tmp_path):
+    """Creates a source directory, and two projects that both need its shared.txt."""
+    source = tmp_path / "source"
+    source.mkdir()
+    for name in ("shared.txt", "front.txt", "back.txt"):
+        (source / name).write_text(name)
+    write_config(tmp_path, "Front", [("shared", "shared.txt"), ("front", "front.txt")])
+    write_config(tmp_path, "Back", [("common", "shared.txt"), ("back", "back.txt")])
+    return tmp_path
+
+
+def write_config(workspace_dir, name, dependencies):
+    config = {
+        "project": name,
+        "dependencies": [{"name": dependency, "target_dir": "deps", "source": "local", "source_path": path} for dependency, path in dependencies],
+        "sources": [{"name": "local", "protocol": "filesystem", "base": str(workspace_dir / "source")}],
+    }
+    (workspace_dir / name).mkdir(exist_ok=True)
+    (workspace_dir / name / "dependencies.json").write_text(json.dumps(config))
+
+
+def create_workspace(workspace_dir, names=("Front", "Back"), engine=FetchEngine.THREADS):
+    projects = []
+    for name in names:
+        project = Project(Configuration(str(workspace_dir / name / "dependencies.json")))
+        project.setCache(Cache(cacheRoot=str(workspace_dir / "cache"), cacheName=project.getProjectName()))
+        projects.append(project)
+    workspace = Workspace(projects)
+    workspace.setJobs(fetchJobs=2, resolveJobs=2)
+    workspace.setFetchEngine(engine)
+    return workspace
+
+
+@pytest.mark.parametrize("engine", [FetchEngine.THREADS, FetchEngine.ASYNCIO])
+def test_shared_source_is_fetched_once(workspace_dir, engine):
+    workspace = create_workspace(workspace_dir, engine=engine)
+    workspace.resolveDependencies()
+
+    for name, target in (("Front", "shared.txt"), ("Front", "front.txt"), ("Back", "shared.txt"), ("Back", "back.txt")):
+        assert (workspace_dir / name / "deps" / target).read_text() == target
+
+    reports = workspace.getReports()
+    assert [measurement["dependency"] for measurement in reports["Front"].getMeasurements(Report.FETCH)] in (["shared", "front"], ["front", "shared"])
+    assert [measurement["dependency"] for measurement in reports["Back"].getMeasurements(Report.FETCH)] == ["back"]  # common was fetched by Front...
+    assert len(reports["Back"].getMeasurements(Report.RESOLVE)) == 2
+    assert workspace.toDict()["Back"]["sharedFetches"] == 1
+    front, back = (workspace_dir / "cache" / name / "local" / "shared.txt" / "shared.txt" for name in ("Front", "Back"))
+    assert os.path.samefile(front, back)  # ...and linked into Back's cache.
+
+
+def test_summary_and_report(workspace_dir, capsys, tmp_path):
+    workspace = create_workspace(workspace_dir)
+    workspace.resolveDependencies()
+    workspace.printSummary()
+    output = capsys.readouterr().out
+    assert "Summary of 2 projects:" in output
+    assert "Front" in output and "Back" in output and "Total" in output
+
+    workspace.writeJson(str(tmp_path / "report.json"))
+    report = json.loads((tmp_path / "report.json").read_text())
+    assert set(report) == {"Front", "Back"}
+    assert report["Front"]["phases"]["fetch"]["count"] == 2 and report["Front"]["failedDependencies"] == 0
+
+
+def test_failed_shared_fetch_fails_every_project(workspace_dir):
+    (workspace_dir / "source" / "shared.txt").unlink()
+    workspace = create_workspace(workspace_dir)
+    workspace.resolveDependencies()
+    assert workspace.toDict()["Front"]["failedDependencies"] == 1
+    assert workspace.toDict()["Back"]["failedDependencies"] == 1
+    assert (workspace_dir / "Back" / "deps" / "back.txt").exists()
+
+
+def test_project_names_must_be_unique(workspace_dir):
+    with pytest.raises(ProjectError, match="more than one is called Front"):
+        create_workspace(workspace_dir, names=("Front", "Front"))
+
+
+def test_most_restrictive_bandwidth_limits_apply_to_the_workspace(workspace_dir, monkeypatch):
+    for name, limits in (("Front", {"bandwidth_limit": "20M", "host_bandwidth_limit": "1M"}), ("Back", {"bandwidth_limit": "10M"})):
+        configPath = workspace_dir / name / "dependencies.json"
+        configPath.write_text(json.dumps({**json.loads(configPath.read_text()), **limits}))
+    monkeypatch.setattr(resolve.mirror_util, "save", lambda: None)
+    try:
+        args = resolve._createParser().parse_args(["resolve_workspace", "-c", str(workspace_dir / "*" / "dependencies.json"), "-R", str(workspace_dir / "cache")])
+        resolve._resolveWorkspaceCommand(args)
+        assert throttle_util._global.getRate() == 10 * 1024 * 1024  # Back's, though Front is loaded after it.
+        assert throttle_util._hostRate == 1024 * 1024
+    finally:
+        throttle_util.setLimits()
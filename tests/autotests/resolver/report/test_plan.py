@@ -0,0 +1,73 @@
+"""
+Tests the dry run Plan: the work a fetch/resolve run would do, worked out without doing any of it.
+"""
+import json
+from dependency_resolver.resolver.cache.cache import Cache
+from dependency_resolver.resolver.configuration.configuration import Configuration
+from dependency_resolver.resolver.project.project import Project
+from dependency_resolver.resolver.report.plan import Plan
+
+
+def create_project(tmp_path):
+    (tmp_path / "source").mkdir()
+    for name, size in (("cached.bin", 10), ("missing.bin", 20), ("nightly.bin", 30)):
+        (tmp_path / "source" / name).write_bytes(b"x" * size)
+    config = {
+        "project": "Planned",
+        "dependencies": [
+            {"name": "cached", "target_dir": "deps", "source": "origin", "source_path": "cached.bin"},
+            {"name": "missing", "target_dir": "deps", "source": "origin", "source_path": "missing.bin"},
+            {"name": "missing-again", "target_dir": "more", "source": "origin", "source_path": "missing.bin"},
+            {"name": "nightly", "target_dir": "deps", "source": "origin", "source_path": "nightly.bin", "always_update": True},
+            {"name": "web", "target_dir": "deps", "source": "web", "source_path": "web.bin"},
+        ],
+        "sources": [
+            {"name": "origin", "protocol": "filesystem", "base": str(tmp_path / "source")},
+            {"name": "web", "protocol": "https", "base": "http://127.0.0.1:1"},
+        ],
+    }
+    (tmp_path / "project").mkdir()
+    (tmp_path / "project" / "dependencies.json").write_text(json.dumps(config))
+    project = Project(Configuration(str(tmp_path / "project" / "dependencies.json")))
+    project.setCache(Cache(cacheRoot=str(tmp_path / "cache"), cacheName=project.getProjectName()))
+    project.selectDependencies(only=["cached", "nightly"])
+    project.resolveDependencies()  # cached and nightly are fetched and resolved - nightly is always updated.
+    project.selectDependencies()
+    return project
+
+
+def test_plan_resolve(tmp_path):
+    plan = create_project(tmp_path).planDependencies(fetch=True, resolve=True)
+    entries = {entry["dependency"]: entry for entry in plan.getEntries()}
+    assert (entries["cached"]["fetch"], entries["cached"]["reason"], entries["cached"]["resolve"]) == (Plan.HIT, None, Plan.REDO)
+    assert (entries["missing"]["fetch"], entries["missing"]["reason"], entries["missing"]["fetchBytes"]) == (Plan.FETCH, Cache.FETCH_MISSING, 20)
+    assert (entries["missing-again"]["fetch"], entries["missing-again"]["reason"], entries["missing-again"]["resolve"]) == (Plan.SHARED, "with missing", Plan.NEW)
+    assert (entries["nightly"]["fetch"], entries["nightly"]["reason"]) == (Plan.FETCH, Cache.FETCH_ALWAYS_UPDATE)
+    assert (entries["web"]["fetch"], entries["web"]["fetchBytes"], entries["web"]["location"]) == (Plan.FETCH, None, "127.0.0.1:1")  # not probed.
+
+    totals = plan.toDict()
+    assert totals["fetch"] == {"count": 3, "cacheHits": 1, "bytes": 50, "unknownSizes": 1}
+    assert totals["resolve"]["new"] == 3 and totals["resolve"]["redo"] == 2
+    assert not (tmp_path / "cache" / "Planned" / "origin" / "missing.bin").exists()  # nothing was fetched...
+    assert not (tmp_path / "project" / "more").exists()  # ...or resolved.
+
+
+def test_plan_forced_fetch(tmp_path):
+    plan = create_project(tmp_path).planDependencies(fetch=True, resolve=False, alwaysFetch=True)
+    assert {entry["reason"] for entry in plan.getEntries() if entry["fetch"] == Plan.FETCH} == {Cache.FETCH_FORCED}
+    assert all(entry["resolve"] is None for entry in plan.getEntries())
+
+
+def test_plan_resolve_from_cache(tmp_path):
+    plan = create_project(tmp_path).planDependencies(fetch=False, resolve=True)
+    entries = {entry["dependency"]: entry for entry in plan.getEntries()}
+    assert entries["cached"]["resolve"] == Plan.REDO
+    assert entries["missing"]["resolve"] == Plan.UNAVAILABLE
+    assert entries["cached"]["fetch"] is None
+
+
+def test_print_table(tmp_path, capsys):
+    create_project(tmp_path).planDependencies(fetch=True, resolve=True).printTable()
+    output = capsys.readouterr().out
+    assert "Would fetch 3 sources (50B, 1 of unknown size) - 1 cache hits." in output
+    assert "Would resolve 5 dependencies" in output
@@ -0,0 +1,57 @@
+"""
+Unit tests for the Report, which totals the timings of the fetches and resolves of a run.
+"""
+import json
+from dependency_resolver.resolver.report.report import Report
+
+
+def create_report():
+    report = Report()
+    report.record("slow", Report.FETCH, 2.0, 1000, source="mirror", location="slow.example.com", cacheHit=False)
+    report.record("fast", Report.FETCH, 0.5, 1000, source="mirror", location="fast.example.com", cacheHit=False)
+    report.record("cached", Report.FETCH, 0.01, 0, source="mirror", location="fast.example.com", cacheHit=True)
+    report.record("broken", Report.FETCH, 0.1, 0, source="mirror", location="fast.example.com", cacheHit=False, error="404")
+    report.record("slow", Report.RESOLVE, 1.0, 1000, source="mirror", location="slow.example.com", action="unzip")
+    report.finish()
+    return report
+
+
+def test_phase_totals():
+    phases = create_report().toDict()["phases"]
+    assert phases["fetch"]["count"] == 4
+    assert phases["fetch"]["cacheHits"] == 1
+    assert phases["fetch"]["failed"] == 1
+    assert phases["fetch"]["bytes"] == 2000
+    assert phases["fetch"]["bytesPerSecond"] == 800  # cache hits and failures don't count towards the throughput.
+    assert phases["resolve"]["count"] == 1
+    assert phases["resolve"]["bytesPerSecond"] == 1000
+
+
+def test_location_totals():
+    locations = create_report().toDict()["locations"]
+    assert locations["slow.example.com"]["bytesPerSecond"] == 500
+    assert locations["fast.example.com"]["bytesPerSecond"] == 2000
+    assert locations["fast.example.com"]["count"] == 3
+
+
+def test_measurements():
+    report = create_report()
+    assert [measurement["dependency"] for measurement in report.getMeasurements(Report.RESOLVE)] == ["slow"]
+    broken = report.getMeasurements(Report.FETCH)[3]
+    assert broken["status"] == "failed"
+    assert broken["error"] == "404"
+    assert broken["bytesPerSecond"] is None
+
+
+def test_print_summary(capsys):
+    create_report().printSummary()
+    output = capsys.readouterr().out
+    assert "Fetches by location:" in output
+    assert output.index("slow.example.com") < output.index("fast.example.com")  # slowest location first.
+    assert "Slowest resolve times:" in output
+
+
+def test_write_json(tmp_path):
+    path = tmp_path / "reports" / "report.json"
+    create_report().writeJson(str(path))
+    assert json.loads(path.read_text())["phases"]["fetch"]["count"] == 4
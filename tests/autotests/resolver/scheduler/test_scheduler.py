@@ -0,0 +1,87 @@
+"""
+Unit tests for the Scheduler, which runs the fetches and resolves of tasks as a single graph.
+"""
+import threading
+import pytest
+from dependency_resolver.resolver.errors.errors import FetchError, OrderError
+from dependency_resolver.resolver.scheduler.scheduler import Scheduler
+from dependency_resolver.resolver.scheduler.task import Task, TaskStatus
+
+
+class Recorder:
+    """Records the order things happen in."""
+    def __init__(self):
+        self.events = []
+        self.lock = threading.Lock()
+
+    def record(self, event):
+        def run():
+            with self.lock:
+                self.events.append(event)
+        return run
+
+    def fail(self, event):
+        def run():
+            with self.lock:
+                self.events.append(event)
+            raise FetchError(f"{event} failed")
+        return run
+
+
+def test_resolve_waits_for_own_fetch_and_after(capsys):
+    recorder = Recorder()
+    tasks = [Task("b", fetch=recorder.record("fetch-b"), resolve=recorder.record("resolve-b"), after=["a"]),
+             Task("a", fetch=recorder.record("fetch-a"), resolve=recorder.record("resolve-a"))]
+    Scheduler(fetchJobs=2, resolveJobs=2).run(tasks)
+    events = recorder.events
+    assert events.index("fetch-a") < events.index("resolve-a") < events.index("resolve-b")
+    assert events.index("fetch-b") < events.index("resolve-b")
+    assert all(task.getResolveStatus() == TaskStatus.DONE for task in tasks)
+    assert "1-b : Resolved." in capsys.readouterr().out
+
+
+def test_shared_fetch_key_fetches_once():
+    recorder = Recorder()
+    tasks = [Task("a", fetch=recorder.record("fetch"), fetchKey="same", resolve=recorder.record("resolve-a")),
+             Task("b", fetch=recorder.record("fetch"), fetchKey="same", resolve=recorder.record("resolve-b"))]
+    Scheduler().run(tasks)
+    assert recorder.events.count("fetch") == 1
+    assert tasks[0].getFetchStatus() == TaskStatus.DONE
+    assert tasks[1].getFetchStatus() == TaskStatus.SHARED
+    assert tasks[1].getResolveStatus() == TaskStatus.DONE
+
+
+def test_failed_fetch_skips_resolve_and_dependents():
+    recorder = Recorder()
+    tasks = [Task("a", fetch=recorder.fail("fetch-a"), resolve=recorder.record("resolve-a")),
+             Task("b", fetch=recorder.record("fetch-b"), resolve=recorder.record("resolve-b"), after=["a"]),
+             Task("c", fetch=recorder.record("fetch-c"), resolve=recorder.record("resolve-c"))]
+    Scheduler().run(tasks)
+    assert tasks[0].getFetchStatus() == TaskStatus.FAILED
+    assert tasks[0].getResolveStatus() == TaskStatus.SKIPPED
+    assert tasks[1].getResolveStatus() == TaskStatus.SKIPPED
+    assert tasks[2].getResolveStatus() == TaskStatus.DONE
+    assert "resolve-a" not in recorder.events
+    assert "resolve-b" not in recorder.events
+
+
+def test_resolve_only_honours_after():
+    recorder = Recorder()
+    tasks = [Task("c", resolve=recorder.record("c"), after=["b"]),
+             Task("b", resolve=recorder.record("b"), after=["a", "not-scheduled"]),
+             Task("a", resolve=recorder.record("a"))]
+    Scheduler(resolveJobs=3).run(tasks)
+    assert recorder.events == ["a", "b", "c"]
+
+
+def test_cycle_raises():
+    tasks = [Task("a", resolve=lambda: None, after=["b"]), Task("b", resolve=lambda: None, after=["a"])]
+    with pytest.raises(OrderError):
+        Scheduler().run(tasks)
+
+
+def test_unexpected_error_is_raised():
+    def explode():
+        raise RuntimeError("boom")
+    with pytest.raises(RuntimeError):
+        Scheduler().run([Task("a", fetch=explode)])
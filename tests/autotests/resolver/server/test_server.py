@@ -0,0 +1,133 @@
+"""
+Tests serving commands over a Unix socket from a long-running process, with the thin client.
+"""
+import json
+import os
+import socket
+import threading
+import pytest
+import dependency_resolver.resolve as resolve
+from dependency_resolver import client
+from dependency_resolver.resolver.errors.errors import ServerError
+from dependency_resolver.resolver.server.server import ResolverServer
+
+
+@pytest.fixture
+def project_dir(tmp_path):
+    """Creates a source directory with a file, and a configuration that copies it."""
+    (tmp_path / "source").mkdir()
+    (tmp_path / "source" / "readme.txt").write_text("read me")
+    config = {
+        "project": "ServedProject",
+        "dependencies": [{"name": "copied", "target_dir": "deps", "source": "local", "source_path": "readme.txt"}],
+        "sources": [{"name": "local", "protocol": "filesystem", "base": str(tmp_path / "source")}],
+    }
+    (tmp_path / "project").mkdir()
+    (tmp_path / "project" / "dependencies.json").write_text(json.dumps(config))
+    return tmp_path
+
+
+@pytest.fixture
+def served(tmp_path, monkeypatch):
+    """Serves resolve.py's commands on a socket in a background thread, keeping projects warm as the serve command does."""
+    monkeypatch.setattr(resolve, "_warmProjects", {})
+    server = ResolverServer(str(tmp_path / "resolver.sock"), resolve._answerRequest)
+    server.start()
+    thread = threading.Thread(target=server.serveForever, daemon=True)
+    thread.start()
+    yield server.getSocketPath()
+    server.shutdown()
+    thread.join()
+
+
+def test_resolve_then_print_target_reuse_the_project(served, project_dir):
+    argv = ["-c", "project/dependencies.json", "-R", str(project_dir / "cache")]
+    response = client.request(["resolve"] + argv, served, cwd=str(project_dir))
+    assert response["exitCode"] == 0, response["output"]
+    assert "Fetching and resolving 1 dependencies" in response["output"]
+    assert (project_dir / "project" / "deps" / "readme.txt").read_text() == "read me"
+
+    response = client.request(["print_dependency_target", "-n", "copied"] + argv, served, cwd=str(project_dir))
+    assert response == {"exitCode": 0, "output": f"{project_dir / 'project' / 'deps'}\n"}
+    assert len(resolve._warmProjects) == 1
+
+
+def test_changed_configuration_is_parsed_again(served, project_dir):
+    argv = ["print_dependency_target", "-n", "copied", "-c", str(project_dir / "project" / "dependencies.json"), "-R", str(project_dir / "cache")]
+    client.request(argv, served)
+    first = next(iter(resolve._warmProjects.values()))[1]
+    configPath = project_dir / "project" / "dependencies.json"
+    config = json.loads(configPath.read_text())
+    config["dependencies"][0]["target_dir"] = "moved"
+    configPath.write_text(json.dumps(config))
+    os.utime(configPath, (0, 0))  # make sure the modified time changes, however coarse the filesystem's clock.
+
+    response = client.request(argv, served)
+    assert response["output"] == f"{project_dir / 'project' / 'moved'}\n"
+    assert next(iter(resolve._warmProjects.values()))[1] is not first
+
+
+def test_bad_arguments_only_fail_the_request(served):
+    response = client.request(["resolve", "--nope"], served)
+    assert response["exitCode"] == 2
+    assert "unrecognized arguments" in response["output"] or "required" in response["output"]
+    assert client.request(["serve"], served)["exitCode"] == 2
+
+
+def test_invalid_request(served):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(served)
+        connection.sendall(b"not json\n")
+        response = json.loads(connection.makefile("rb").readline())
+    assert response["exitCode"] == 2
+
+
+def test_second_server_is_refused(served):
+    with pytest.raises(ServerError):
+        ResolverServer(served, resolve._answerRequest).start()
+
+
+def test_stale_socket_is_replaced(tmp_path):
+    path = str(tmp_path / "stale.sock")
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(path)
+    stale.close()  # leaves the socket file behind, with nothing listening.
+    server = ResolverServer(path, lambda request: {"exitCode": 0, "output": "pong"})
+    server.start()
+    thread = threading.Thread(target=server.serveForever, daemon=True)
+    thread.start()
+    try:
+        assert client.request([], path) == {"exitCode": 0, "output": "pong"}
+    finally:
+        server.shutdown()
+        thread.join()
+    assert not os.path.exists(path)
+
+
+def test_socket_is_only_accessible_to_its_user(served):
+    assert os.stat(served).st_mode & 0o777 == 0o600
+
+
+def test_project_is_parsed_again_when_an_included_file_changes(served, project_dir):
+    configPath = project_dir / "project" / "dependencies.json"
+    config = json.loads(configPath.read_text())
+    config["include"] = ["targets.json"]
+    config["dependencies_file"] = "more.jsonl"
+    configPath.write_text(json.dumps(config))
+    (project_dir / "project" / "targets.json").write_text(json.dumps({"variables": {"deps": "deps"}}))
+    (project_dir / "project" / "more.jsonl").write_text("")
+    argv = ["print_dependency_target", "-n", "copied", "-c", str(configPath), "-R", str(project_dir / "cache")]
+    client.request(argv, served)
+    first = next(iter(resolve._warmProjects.values()))[1]
+    assert client.request(argv, served)["exitCode"] == 0
+    assert next(iter(resolve._warmProjects.values()))[1] is first
+
+    (project_dir / "project" / "targets.json").write_text(json.dumps({"variables": {"deps": "elsewhere"}}))
+    client.request(argv, served)
+    second = next(iter(resolve._warmProjects.values()))[1]
+    assert second is not first
+
+    (project_dir / "project" / "more.jsonl").write_text(json.dumps({"name": "extra", "target_dir": "deps", "source": "local", "source_path": "readme.txt"}) + "\n")
+    response = client.request(["print_dependency_target", "-n", "extra", "-c", str(configPath), "-R", str(project_dir / "cache")], served)
+    assert response == {"exitCode": 0, "output": f"{project_dir / 'project' / 'deps'}\n"}
+    assert next(iter(resolve._warmProjects.values()))[1] is not second
@@ -0,0 +1,82 @@
+"""
+Tests for the asyncio download utility, against a local http server.
+"""
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import dependency_resolver.resolver.utilities.async_https_util as async_https_util
+import dependency_resolver.resolver.utilities.retry_util as retry_util
+
+BODY = b"0123456789" * 10000
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path == "/file":
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(BODY)))
+            self.end_headers()
+            self.wfile.write(BODY)
+        elif self.path == "/chunked":
+            self.send_response(200)
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for start in range(0, len(BODY), 30000):
+                piece = BODY[start:start + 30000]
+                self.wfile.write(f"{len(piece):x}\r\n".encode() + piece + b"\r\n")
+            self.wfile.write(b"0\r\n\r\n")
+        elif self.path == "/until-closed":
+            self.send_response(200)
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.wfile.write(BODY)
+            self.close_connection = True
+        elif self.path == "/redirect":
+            self.send_response(302)
+            self.send_header("Location", "/file")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        else:
+            self.send_error(404)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.mark.parametrize("path", ["/file", "/chunked", "/until-closed", "/redirect"])
+def test_download(server, tmp_path, path):
+    target = tmp_path / "download"
+    asyncio.run(async_https_util.download(f"{server}{path}", str(target), chunks=4096))
+    assert target.read_bytes() == BODY
+
+
+def test_download_http_error(server, tmp_path):
+    with pytest.raises(async_https_util.HttpError):
+        asyncio.run(async_https_util.download(f"{server}/missing", str(tmp_path / "download")))
+
+
+def test_download_connection_error(tmp_path, monkeypatch):
+    monkeypatch.setattr(retry_util, "_policy", retry_util.RetryPolicy(retries=0))
+    with pytest.raises(async_https_util.HttpError):
+        asyncio.run(async_https_util.download("http://127.0.0.1:1/file", str(tmp_path / "download")))
+
+
+def test_download_many_at_once(server, tmp_path):
+    async def downloadAll():
+        await asyncio.gather(*(async_https_util.download(f"{server}/file", str(tmp_path / f"download{number}")) for number in range(20)))
+    async_https_util.setHostLimit(4)
+    asyncio.run(downloadAll())
+    assert all((tmp_path / f"download{number}").read_bytes() == BODY for number in range(20))
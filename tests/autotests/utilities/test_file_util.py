@@ -89,6 +89,23 @@ def test_returnLastPartOfPath_and_getParentDirectory():
     assert file_util.returnLastPartOfPath(path) == "bar.txt"
     assert file_util.getParentDirectory(path) == "/tmp/foo"
 
+def test_isWithin():
+    """Test isWithin only matches paths inside the directory."""
+    assert file_util.isWithin("/tmp/foo/bar.txt", "/tmp")
+    assert file_util.isWithin("/tmp/foo/../foo/bar", "/tmp/foo")
+    assert not file_util.isWithin("/tmp/foo", "/tmp/foo")
+    assert not file_util.isWithin("/tmp/foobar", "/tmp/foo")
+
+def test_hashTree(tmp_path):
+    """Test hashTree hashes a file's content, and a directory's file names and content."""
+    (tmp_path / "tree" / "sub").mkdir(parents=True)
+    (tmp_path / "tree" / "sub" / "a.txt").write_text("a")
+    assert file_util.hashTree(str(tmp_path / "tree" / "sub" / "a.txt")) == file_util.hashFile(str(tmp_path / "tree" / "sub" / "a.txt"))
+    before = file_util.hashTree(str(tmp_path / "tree"))
+    assert before == file_util.hashTree(str(tmp_path / "tree"))
+    (tmp_path / "tree" / "sub" / "a.txt").rename(tmp_path / "tree" / "sub" / "b.txt")
+    assert file_util.hashTree(str(tmp_path / "tree")) != before
+
 def test_getUserDirectory():
     """Test getUserDirectory returns the user's home directory."""
     assert os.path.expanduser("~") in file_util.getUserDirectory()
@@ -127,7 +144,7 @@ def test_copyContents(temp_dir):
         f.write("hi")
     with mock.patch("dependency_resolver.resolver.utilities.file_util.copy") as mock_copy:
         file_util.copyContents(src, dest)
-        mock_copy.assert_called_with(file1, dest, False)
+        mock_copy.assert_called_with(file1, dest, False, None)
 
 def test_chown_and_chown_recursive(temp_dir):
     """Test chown and chown_recursive functions."""
@@ -140,9 +157,15 @@ def test_chown_and_chown_recursive(temp_dir):
     file = os.path.join(subdir, "file.txt")
     with open(file, "w") as f:
         f.write("x")
-    with mock.patch("dependency_resolver.resolver.utilities.file_util.chown") as mock_chown:
-        file_util.chown_recursive(temp_dir, "user", "group")
-        assert mock_chown.call_count >= 2
+    os.symlink(file, os.path.join(temp_dir, "link"))
+    uid, gid = os.getuid(), os.getgid()
+    with mock.patch("os.chown") as mock_chown:
+        file_util.chown_recursive(temp_dir, str(uid), gid + 1)
+        assert mock_chown.call_count == 4  # temp_dir, subdir, file and the link itself
+        assert all(call.args[1:] == (uid, gid + 1) and call.kwargs["follow_symlinks"] is False for call in mock_chown.call_args_list)
+    with mock.patch("os.chown") as mock_chown:
+        file_util.chown_recursive(temp_dir, uid, None)
+        mock_chown.assert_not_called()  # already owned by the user
 
 def test_chmod_and_chmod_recursive(temp_dir):
     """Test chmod and chmod_recursive functions."""
@@ -152,9 +175,30 @@ def test_chmod_and_chmod_recursive(temp_dir):
     file_util.chmod(file, 0o600)
     assert stat.S_IMODE(os.stat(file).st_mode) == 0o600
     # chmod_recursive
-    with mock.patch("dependency_resolver.resolver.utilities.file_util.chmod") as mock_chmod:
+    file_util.chmod_recursive(temp_dir, 0o700)
+    assert stat.S_IMODE(os.stat(file).st_mode) == 0o700
+    assert stat.S_IMODE(os.stat(temp_dir).st_mode) == 0o700
+    with mock.patch("os.chmod") as mock_chmod:
         file_util.chmod_recursive(temp_dir, 0o700)
-        assert mock_chmod.call_count >= 1
+        mock_chmod.assert_not_called()  # already has the permissions
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_chmod_recursive_tree(temp_dir, workers):
+    """Test chmod_recursive gives files and directories their own permissions, and leaves what links point to alone."""
+    tree = os.path.join(temp_dir, "tree")
+    make_tree(tree)
+    outside = os.path.join(temp_dir, "outside.txt")
+    with open(outside, "w") as f:
+        f.write("x")
+    os.chmod(outside, 0o600)
+    os.symlink(outside, os.path.join(tree, "dir0", "link"))
+    file_util.chmod_recursive(tree, 0o644, workers=workers, dirPermissions=0o755)
+    for root, dirs, files in os.walk(tree):
+        assert stat.S_IMODE(os.stat(root).st_mode) == 0o755
+        for name in files:
+            if name != "link":
+                assert stat.S_IMODE(os.stat(os.path.join(root, name)).st_mode) == 0o644
+    assert stat.S_IMODE(os.stat(outside).st_mode) == 0o600
 
 def test_delete_and_deleteContents(temp_dir):
     """Test delete removes files and deleteContents removes directory contents."""
@@ -173,6 +217,53 @@ def test_delete_and_deleteContents(temp_dir):
     assert not os.path.exists(file2)
     assert os.path.exists(subdir)
 
+def make_tree(root, depth=3, width=3, files=4):
+    """Creates a tree of directories and files under root."""
+    os.makedirs(root, exist_ok=True)
+    for number in range(files):
+        with open(os.path.join(root, f"file{number}.txt"), "w") as f:
+            f.write("x")
+    if depth > 0:
+        for number in range(width):
+            make_tree(os.path.join(root, f"dir{number}"), depth - 1, width, files)
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_delete_tree(temp_dir, workers):
+    """Test delete removes a whole tree, with and without parallel workers."""
+    tree = os.path.join(temp_dir, "tree")
+    make_tree(tree)
+    expected = sum(len(files) for _, _, files in os.walk(tree))
+    assert file_util.delete(tree, workers=workers) == expected
+    assert not os.path.exists(tree)
+    assert os.listdir(temp_dir) == []
+
+def test_delete_does_not_follow_symlinks(temp_dir):
+    """Test deleting a tree containing a symbolic link to a directory leaves what it points to alone."""
+    outside = os.path.join(temp_dir, "outside")
+    make_tree(outside, depth=1)
+    tree = os.path.join(temp_dir, "tree")
+    make_tree(tree, depth=1)
+    os.symlink(outside, os.path.join(tree, "link"))
+    os.symlink(os.path.join(temp_dir, "missing"), os.path.join(temp_dir, "broken"))
+    file_util.delete(tree, workers=2)
+    file_util.delete(os.path.join(temp_dir, "broken"))
+    assert not os.path.exists(tree)
+    assert not os.path.lexists(os.path.join(temp_dir, "broken"))
+    assert os.path.exists(os.path.join(outside, "dir0", "file0.txt"))
+
+def test_deleteInBackground(temp_dir):
+    """Test deleteInBackground frees the path straight away and deletes it in the background."""
+    tree = os.path.join(temp_dir, "tree")
+    make_tree(tree)
+    expected = sum(len(files) for _, _, files in os.walk(tree))
+    deleted = []
+    reaper = file_util.deleteInBackground(tree, workers=2, onDeleted=deleted.append)
+    assert not os.path.exists(tree)
+    reaper.join()
+    assert os.listdir(temp_dir) == []
+    assert deleted == [expected]
+    assert file_util.deleteInBackground(tree) is None
+
 def test_emptyFileContents(temp_file):
     """Test emptyFileContents truncates the file."""
     with open(temp_file, "w") as f:
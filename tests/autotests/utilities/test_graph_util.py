@@ -0,0 +1,16 @@
+import dependency_resolver.resolver.utilities.graph_util as graph_util
+
+def test_findCycle_none():
+    assert graph_util.findCycle({'a': ['b'], 'b': ['c'], 'c': []}) is None
+
+def test_findCycle_ignores_unknown_nodes():
+    assert graph_util.findCycle({'a': ['missing']}) is None
+
+def test_findCycle_self():
+    assert graph_util.findCycle({'a': ['a']}) == ['a', 'a']
+
+def test_findCycle_loop():
+    cycle = graph_util.findCycle({'a': ['b'], 'b': ['c'], 'c': ['a'], 'd': []})
+    assert cycle is not None
+    assert cycle[0] == cycle[-1]
+    assert set(cycle) == {'a', 'b', 'c'}
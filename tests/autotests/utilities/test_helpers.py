@@ -42,4 +42,24 @@ def test_addIfNotNone():
 def test_getKey():
     d = {'a': 1}
     assert helpers.getKey(d, 'a') == 1
-    assert helpers.getKey(d, 'b') is None 
\ No newline at end of file
+    assert helpers.getKey(d, 'b') is None 
+def test_parseMode():
+    assert helpers.parseMode('644') == 0o644
+    assert helpers.parseMode('0o2755') == 0o2755
+    assert helpers.parseMode('rw-r--r--') is None
+    assert helpers.parseMode('17777') is None
+    assert helpers.parseMode(644) is None
+
+def test_parseOwner():
+    assert helpers.parseOwner('builder:staff') == ('builder', 'staff')
+    assert helpers.parseOwner('builder') == ('builder', None)
+    assert helpers.parseOwner(':staff') == (None, 'staff')
+    assert helpers.parseOwner(None) == (None, None)
+
+def test_parseSize():
+    assert helpers.parseSize(512) == 512
+    assert helpers.parseSize('64K') == 64 * 1024
+    assert helpers.parseSize('10MB') == 10 * 1024 * 1024
+    assert helpers.parseSize('1.5g') == 1.5 * 1024 ** 3
+    assert helpers.parseSize('fast') is None
+    assert helpers.parseSize(0) is None
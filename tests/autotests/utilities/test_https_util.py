@@ -0,0 +1,76 @@
+"""
+Tests for the streaming download utility, against a local http server.
+"""
+import gzip
+import threading
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import dependency_resolver.resolver.utilities.https_util as https_util
+
+BODY = bytes(range(256)) * 4096 * 16  # 16MB
+SMALL = b"compressed " * 10000
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path == "/large":
+            self._send(BODY)
+        elif self.path == "/gzip":
+            self._send(gzip.compress(SMALL), {"Content-Encoding": "gzip"})
+        elif self.path == "/chunked":
+            self.send_response(200)
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for start in range(0, len(SMALL), 30000):
+                piece = SMALL[start:start + 30000]
+                self.wfile.write(f"{len(piece):x}\r\n".encode() + piece + b"\r\n")
+            self.wfile.write(b"0\r\n\r\n")
+        else:
+            self.send_error(404)
+
+    def _send(self, body, headers={}):
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.mark.parametrize("path", ["/large", "/gzip", "/chunked"])
+def test_download(server, tmp_path, path):
+    target = tmp_path / "download"
+    https_util.download(f"{server}{path}", str(target))
+    assert target.read_bytes() == (BODY if path == "/large" else SMALL)
+
+
+def test_download_memory_is_constant(server, tmp_path):
+    tracemalloc.start()
+    try:
+        https_util.download(f"{server}/large", str(tmp_path / "download"), chunks=256 * 1024)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert peak < 2 * 1024 * 1024  # the 256KB buffer and a piece in flight - not the 16MB body
+
+
+def test_download_http_error(server, tmp_path):
+    with pytest.raises(https_util.HttpError) as raised:
+        https_util.download(f"{server}/missing", str(tmp_path / "download"))
+    assert raised.value.status == 404
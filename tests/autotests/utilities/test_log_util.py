@@ -1,6 +1,7 @@
 import pytest
 import tempfile
 import os
+import json
 import logging
 import dependency_resolver.resolver.utilities.log_util as log_util
 
@@ -10,4 +11,45 @@ def test_setupRootLogging_adds_handlers():
         log_util.setupRootLogging(logfile)
         root = logging.getLogger(None)
         # Should have at least two handlers (stdout and file)
-        assert len(root.handlers) >= 2 
\ No newline at end of file
+        assert len(root.handlers) >= 2
+        log_util.stopLogging()
+
+def test_log_file_is_written_in_the_background():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        logfile = os.path.join(tmpdir, 'test.log')
+        log_util.setupRootLogging(logfile, level="debug")
+        logging.getLogger("test").debug("Removing %s", "some/path")
+        log_util.stopLogging()  # writes the queued records
+        with open(logfile) as file:
+            assert "Removing some/path" in file.read()
+        assert not any(isinstance(handler, logging.handlers.QueueHandler) for handler in logging.getLogger(None).handlers)
+
+def test_json_format():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        logfile = os.path.join(tmpdir, 'test.log')
+        log_util.setupRootLogging(logfile, logFormat=log_util.JSON)
+        try:
+            raise ValueError("broken")
+        except ValueError:
+            logging.getLogger("test").exception("Failed %d times", 3)
+        log_util.stopLogging()
+        with open(logfile) as file:
+            entries = [json.loads(line) for line in file]
+        failed = [entry for entry in entries if entry["logger"] == "test"]
+        assert failed[0]["message"] == "Failed 3 times" and failed[0]["level"] == "ERROR"
+        assert "ValueError: broken" in failed[0]["exception"]
+
+def test_setLevel():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        logfile = os.path.join(tmpdir, 'test.log')
+        log_util.setupRootLogging(logfile)
+        logging.getLogger("test").debug("hidden")
+        log_util.setLevel("DEBUG")
+        logging.getLogger("test").debug("shown")
+        with pytest.raises(ValueError):
+            log_util.setLevel("chatty")
+        log_util.stopLogging()
+        with open(logfile) as file:
+            contents = file.read()
+        assert "shown" in contents and "hidden" not in contents
+        log_util.setLevel(logging.WARNING)
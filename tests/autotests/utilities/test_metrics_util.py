@@ -0,0 +1,74 @@
+"""
+Tests for the metrics utility, and the metrics recorded while fetching and resolving.
+"""
+import zipfile
+import pytest
+import dependency_resolver.resolver.utilities.metrics_util as metrics_util
+from dependency_resolver.resolver.dependencies.resolveAction import ResolveAction
+from dependency_resolver.resolver.errors.errors import FetchError, ResolveError
+from dependency_resolver.resolver.sources.protocol import SourceProtocol
+
+
+@pytest.fixture
+def metrics():
+    metrics_util.reset()
+    metrics_util.enable()
+    yield metrics_util
+    metrics_util.disable()
+    metrics_util.reset()
+
+
+def test_nothing_recorded_when_disabled():
+    metrics_util.reset()
+    metrics_util.ERRORS.increment(phase="fetch", type="https")
+    metrics_util.RESOLVE_DURATION.observe(1.0, action="copy")
+    assert metrics_util.toText() == ""
+
+
+def test_counter(metrics):
+    metrics.CACHE_HITS.increment(cache="one")
+    metrics.CACHE_HITS.increment(2, cache="one")
+    metrics.CACHE_HITS.increment(cache='say "hi"')
+    text = metrics.toText()
+    assert "# TYPE dependency_resolver_cache_hits_total counter" in text
+    assert 'dependency_resolver_cache_hits_total{cache="one"} 3\n' in text
+    assert 'dependency_resolver_cache_hits_total{cache="say \\"hi\\""} 1\n' in text
+
+
+def test_histogram(metrics):
+    metrics.RESOLVE_DURATION.observe(0.2, action="unzip")
+    metrics.RESOLVE_DURATION.observe(3, action="unzip")
+    text = metrics.toText()
+    assert 'dependency_resolver_resolve_duration_seconds_bucket{action="unzip",le="0.1"} 0\n' in text
+    assert 'dependency_resolver_resolve_duration_seconds_bucket{action="unzip",le="0.25"} 1\n' in text
+    assert 'dependency_resolver_resolve_duration_seconds_bucket{action="unzip",le="5"} 2\n' in text
+    assert 'dependency_resolver_resolve_duration_seconds_bucket{action="unzip",le="+Inf"} 2\n' in text
+    assert 'dependency_resolver_resolve_duration_seconds_sum{action="unzip"} 3.2\n' in text
+    assert 'dependency_resolver_resolve_duration_seconds_count{action="unzip"} 2\n' in text
+
+
+def test_fetch_and_resolve_recorded(metrics, tmp_path):
+    source = tmp_path / "bundle.zip"
+    with zipfile.ZipFile(source, "w") as bundle:
+        bundle.writestr("code.txt", "code")
+    SourceProtocol.FILESYSTEM.fetch(str(source), str(tmp_path / "cache"), "bundle.zip")
+    ResolveAction.UNZIP.resolve(str(tmp_path / "cache" / "bundle.zip"), str(tmp_path / "target"))
+    with pytest.raises(FetchError):
+        SourceProtocol.FILESYSTEM.fetch(str(tmp_path / "missing.zip"), str(tmp_path / "cache"), "missing.zip")
+    with pytest.raises(ResolveError):
+        ResolveAction.UNZIP.resolve(str(tmp_path / "missing.zip"), str(tmp_path / "target"))
+
+    text = metrics.toText()
+    assert f'dependency_resolver_download_bytes_total{{protocol="filesystem",host="filesystem"}} {source.stat().st_size}\n' in text
+    assert 'dependency_resolver_download_duration_seconds_count{protocol="filesystem",host="filesystem"} 1\n' in text
+    assert 'dependency_resolver_resolve_duration_seconds_count{action="unzip"} 1\n' in text
+    assert 'dependency_resolver_errors_total{phase="fetch",type="filesystem"} 1\n' in text
+    assert 'dependency_resolver_errors_total{phase="resolve",type="unzip"} 1\n' in text
+
+
+def test_write_textfile(metrics, tmp_path):
+    metrics.ERRORS.increment(phase="fetch", type="https")
+    path = tmp_path / "textfile" / "resolver.prom"
+    metrics.writeTextfile(str(path))
+    assert path.read_text() == metrics.toText()
+    assert [file.name for file in path.parent.iterdir()] == ["resolver.prom"]
@@ -0,0 +1,144 @@
+"""
+Tests for ordering source mirrors by latency and health, keeping their scores between runs, and failing over between them.
+"""
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import dependency_resolver.resolver.utilities.async_https_util as async_https_util
+import dependency_resolver.resolver.utilities.metrics_util as metrics_util
+import dependency_resolver.resolver.utilities.mirror_util as mirror_util
+import dependency_resolver.resolver.utilities.retry_util as retry_util
+from dependency_resolver.resolver.sources.protocol import SourceProtocol
+from dependency_resolver.resolver.errors.errors import FetchError
+
+BODY = b"mirrored" * 1000
+DEAD = "http://127.0.0.1:1"
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests = {}  # path -> how many GET requests were made
+
+    def do_HEAD(self):
+        self.do_GET(body=False)
+
+    def do_GET(self, body=True):
+        if body:
+            Handler.requests[self.path] = Handler.requests.get(self.path, 0) + 1
+        if self.path.startswith("/unavailable"):
+            self.send_error(503)
+        elif self.path.endswith("/file"):
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(BODY)))
+            self.end_headers()
+            if body:
+                self.wfile.write(BODY)
+        else:
+            self.send_error(404)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture(autouse=True)
+def scores(tmp_path):
+    path = tmp_path / "mirrors.json"
+    mirror_util.setScoresFile(str(path))
+    retry_util.setPolicy(retry_util.RetryPolicy(retries=0))  # fail over at once
+    retry_util.setBreakers(threshold=0, cooldown=0)
+    yield path
+    mirror_util.setScoresFile(None)
+    retry_util.setPolicy(retry_util.RetryPolicy())
+    retry_util.setBreakers(threshold=5, cooldown=30)
+
+
+def test_order_by_latency_then_health():
+    mirror_util.recordSuccess("http://slow/a", 0.5)
+    mirror_util.recordSuccess("http://fast/a", 0.05)
+    for _ in range(mirror_util.FAILURES_BEFORE_UNHEALTHY):
+        mirror_util.recordFailure("http://down/a")
+    urls = ["http://down/a", "http://slow/a", "http://fast/a", "http://unknown/a"]
+    assert mirror_util.order(urls, probe=False) == ["http://fast/a", "http://slow/a", "http://unknown/a", "http://down/a"]
+
+
+def test_single_failure_keeps_mirror_healthy():
+    mirror_util.recordSuccess("http://first/a", 0.1)
+    mirror_util.recordSuccess("http://second/a", 0.2)
+    mirror_util.recordFailure("http://first/a")
+    assert mirror_util.order(["http://second/a", "http://first/a"], probe=False) == ["http://first/a", "http://second/a"]
+
+
+def test_scores_are_saved_and_loaded(scores):
+    mirror_util.recordSuccess("http://fast/a", 0.05)
+    mirror_util.recordFailure("http://down/a")
+    mirror_util.save()
+    saved = json.loads(scores.read_text())
+    assert saved["http://fast"]["latency"] == 0.05
+    assert saved["http://down"]["failures"] == 1
+
+    mirror_util.setScoresFile(str(scores))
+    assert mirror_util.getScores() == saved
+
+
+def test_probe_scores_unknown_mirrors(server):
+    ordered = mirror_util.order([f"{DEAD}/file", f"{server}/file"])
+    assert ordered == [f"{server}/file", f"{DEAD}/file"]
+    scores = mirror_util.getScores()
+    assert scores[server]["latency"] is not None
+    assert scores[DEAD]["failures"] == 1
+
+
+def test_fetch_fails_over_to_a_working_mirror(server, tmp_path):
+    SourceProtocol.HTTPS.fetch(f"{DEAD}/file", str(tmp_path), "download", mirrors=[f"{server}/missing", f"{server}/file"])
+    assert (tmp_path / "download").read_bytes() == BODY
+    assert mirror_util.getScores()[server]["failures"] == 0  # not having a file doesn't count against a mirror
+
+
+def test_fetch_fails_over_without_retrying_a_mirror(server, tmp_path):
+    retry_util.setPolicy(retry_util.RetryPolicy(retries=3, backoff=5))
+    started = time.monotonic()
+    SourceProtocol.HTTPS.fetch(f"{server}/unavailable/file", str(tmp_path), "download", mirrors=[f"{server}/file"])
+    assert time.monotonic() - started < 2  # no backoff before failing over
+    assert Handler.requests["/unavailable/file"] == 1
+    assert (tmp_path / "download").read_bytes() == BODY
+
+
+def test_fetch_fails_when_every_mirror_fails(server, tmp_path):
+    with pytest.raises(FetchError):
+        SourceProtocol.HTTPS.fetch(f"{DEAD}/file", str(tmp_path), "download", mirrors=[f"{server}/missing"])
+
+
+def test_only_a_fail_over_to_another_mirror_is_counted(server, tmp_path, caplog):
+    metrics_util.reset()
+    metrics_util.enable()
+    try:
+        with pytest.raises(FetchError):
+            SourceProtocol.HTTPS.fetch(f"{DEAD}/file", str(tmp_path), "download", mirrors=[f"{server}/missing"])
+        assert sum(metrics_util.MIRROR_FAILOVERS._values.values()) == 1  # the last mirror has nothing to fail over to.
+    finally:
+        metrics_util.disable()
+        metrics_util.reset()
+    assert caplog.text.count("failing over to the next mirror") == 1
+
+
+def test_fetch_async_fails_over_to_a_working_mirror(server, tmp_path):
+    async def fetch():
+        try:
+            await SourceProtocol.HTTPS.fetchAsync(f"{DEAD}/file", str(tmp_path), "download", mirrors=[f"{server}/file"])
+        finally:
+            await async_https_util.close()
+    asyncio.run(fetch())
+    assert (tmp_path / "download").read_bytes() == BODY
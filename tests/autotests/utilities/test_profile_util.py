@@ -0,0 +1,46 @@
+"""
+Tests for the profile utility.
+"""
+import pstats
+import threading
+import tracemalloc
+import pytest
+import dependency_resolver.resolver.utilities.profile_util as profile_util
+
+
+def busy_in_thread():
+    def busy():
+        sum(number * number for number in range(10000))
+    thread = threading.Thread(target=busy)
+    thread.start()
+    thread.join()
+
+
+def test_cprofile_includes_threads(tmp_path):
+    written = profile_util.run(profile_util.CPROFILE, busy_in_thread, str(tmp_path / "profiles"), "test")
+    assert [path.rsplit(".", 1)[1] for path in written] == ["pstats", "txt"]
+    functions = {function for _, _, function in pstats.Stats(written[0]).stats}
+    assert "busy" in functions
+    assert "busy_in_thread" in functions
+
+
+def test_tracemalloc(tmp_path):
+    allocated = []
+    written = profile_util.run(profile_util.TRACEMALLOC, lambda: allocated.append(bytearray(1024 * 1024)), str(tmp_path), "test")
+    assert [path.rsplit(".", 1)[1] for path in written] == ["snapshot", "txt"]
+    assert tracemalloc.Snapshot.load(written[0]).statistics("lineno")
+    assert "test_profile_util.py" in open(written[1]).read()
+    assert not tracemalloc.is_tracing()
+
+
+def test_profile_written_when_function_fails(tmp_path):
+    def fail():
+        raise RuntimeError("failed")
+    with pytest.raises(RuntimeError):
+        profile_util.run(profile_util.CPROFILE, fail, str(tmp_path), "test")
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_unknown_profiler(tmp_path):
+    with pytest.raises(ValueError):
+        profile_util.run("unknown", lambda: None, str(tmp_path), "test")
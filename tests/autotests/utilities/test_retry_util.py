@@ -0,0 +1,127 @@
+"""
+Tests for retrying downloads with a jittered backoff, and failing fast with per host circuit breakers.
+"""
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import dependency_resolver.resolver.utilities.async_https_util as async_https_util
+import dependency_resolver.resolver.utilities.https_util as https_util
+import dependency_resolver.resolver.utilities.retry_util as retry_util
+from dependency_resolver.resolver.utilities.retry_util import CircuitBreaker, RetryPolicy
+
+BODY = b"retried" * 1000
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    failuresLeft = {}  # path -> how many more times to answer 503
+    requests = {}  # path -> how many requests were made
+
+    def do_GET(self):
+        Handler.requests[self.path] = Handler.requests.get(self.path, 0) + 1
+        if Handler.failuresLeft.get(self.path, 0) > 0:
+            Handler.failuresLeft[self.path] -= 1
+            self.send_error(503)
+        elif self.path.startswith("/file"):
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(BODY)))
+            self.end_headers()
+            self.wfile.write(BODY)
+        else:
+            self.send_error(404)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture(autouse=True)
+def policy():
+    retry_util.setPolicy(RetryPolicy(retries=2, backoff=0.01))
+    retry_util.setBreakers(threshold=3, cooldown=60)
+    yield
+    retry_util.setPolicy(RetryPolicy())
+    retry_util.setBreakers(threshold=5, cooldown=30)
+
+
+def test_delay_is_jittered_and_capped():
+    policy = RetryPolicy(retries=10, backoff=1, maxBackoff=5)
+    for retry in range(10):
+        assert 0 <= policy.getDelay(retry) <= min(5, 2 ** retry)
+
+
+def test_retriable_statuses():
+    assert RetryPolicy.isRetriable(None)
+    assert RetryPolicy.isRetriable(503)
+    assert RetryPolicy.isRetriable(429)
+    assert not RetryPolicy.isRetriable(404)
+
+
+def test_breaker_opens_then_lets_one_trial_through(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(retry_util.time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker("host", threshold=2, cooldown=10)
+    breaker.recordFailure()
+    assert breaker.allow()
+    breaker.recordFailure()
+    assert breaker.isOpen() and not breaker.allow()
+    now[0] += 11
+    assert breaker.allow()  # the trial
+    assert not breaker.allow()  # only one trial at a time
+    breaker.recordSuccess()
+    assert not breaker.isOpen() and breaker.allow()
+
+
+def test_trial_that_raises_is_released(monkeypatch, server, tmp_path):
+    now = [100.0]
+    monkeypatch.setattr(retry_util.time, "monotonic", lambda: now[0])
+    breaker = retry_util.getBreaker(server.split("//")[1])
+    for _ in range(3):
+        breaker.recordFailure()
+    now[0] += 61
+    with pytest.raises(OSError):
+        https_util.download(f"{server}/file", str(tmp_path / "missing" / "download"))  # the trial can't write its target.
+    assert breaker.isOpen()
+    now[0] += 61
+    https_util.download(f"{server}/file", str(tmp_path / "download"))  # a new trial is let through, and closes the breaker.
+    assert not breaker.isOpen()
+
+
+def test_download_retries_a_503(server, tmp_path):
+    Handler.failuresLeft["/file-flaky"] = 2
+    https_util.download(f"{server}/file-flaky", str(tmp_path / "download"))
+    assert (tmp_path / "download").read_bytes() == BODY
+    assert Handler.requests["/file-flaky"] == 3
+
+
+def test_download_does_not_retry_a_404(server, tmp_path):
+    with pytest.raises(https_util.HttpError) as raised:
+        https_util.download(f"{server}/missing", str(tmp_path / "download"))
+    assert raised.value.status == 404
+    assert Handler.requests["/missing"] == 1
+
+
+def test_download_fails_fast_once_the_breaker_opens(tmp_path):
+    with pytest.raises(https_util.HttpError):
+        https_util.download("http://127.0.0.1:1/file", str(tmp_path / "download"))  # fails three times, opening the breaker
+    assert retry_util.getBreaker("127.0.0.1:1").isOpen()
+    with pytest.raises(https_util.HttpError) as raised:
+        https_util.download("http://127.0.0.1:1/other", str(tmp_path / "download"))
+    assert "circuit breaker is open" in str(raised.value)
+
+
+def test_async_download_retries_a_503(server, tmp_path):
+    Handler.failuresLeft["/file-flaky-async"] = 1
+    asyncio.run(async_https_util.download(f"{server}/file-flaky-async", str(tmp_path / "download")))
+    assert (tmp_path / "download").read_bytes() == BODY
+    assert Handler.requests["/file-flaky-async"] == 2
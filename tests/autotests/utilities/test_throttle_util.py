@@ -0,0 +1,61 @@
+"""
+Tests for the token buckets that limit the bandwidth of downloads and copies.
+"""
+import time
+import pytest
+import dependency_resolver.resolver.utilities.file_util as file_util
+import dependency_resolver.resolver.utilities.throttle_util as throttle_util
+from dependency_resolver.resolver.utilities.throttle_util import TokenBucket
+
+
+@pytest.fixture(autouse=True)
+def unlimited():
+    yield
+    throttle_util.setLimits()
+
+
+def test_bucket_allows_a_burst_then_charges_debt(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(throttle_util.time, "monotonic", lambda: now[0])
+    bucket = TokenBucket(rate=1000)  # bursts of 100 bytes
+    assert bucket.reserve(100) == 0
+    assert bucket.reserve(500) == pytest.approx(0.5)
+    assert bucket.reserve(500) == pytest.approx(1.0)  # queued behind the previous reservation
+    now[0] = 10.0
+    assert bucket.reserve(100) == 0  # refilled, but only up to the burst
+    assert bucket.reserve(1) > 0
+
+
+def test_off_by_default():
+    assert not throttle_util.isEnabled()
+    assert throttle_util.getChunkSize(50 * 1024 * 1024) == 50 * 1024 * 1024
+
+
+def test_host_limit_is_per_host(monkeypatch):
+    delays = []
+    monkeypatch.setattr(throttle_util.time, "sleep", delays.append)
+    throttle_util.setLimits(hostRate=64 * 1024)
+    assert throttle_util.getChunkSize(50 * 1024 * 1024) == throttle_util.CHUNK
+    throttle_util.throttle("slow.example.com", 64 * 1024)
+    assert delays == [pytest.approx(0.9, abs=0.05)]
+    throttle_util.throttle("other.example.com", 4 * 1024)
+    assert len(delays) == 1  # another host has its own bucket
+
+
+def test_global_limit_is_shared(monkeypatch):
+    delays = []
+    monkeypatch.setattr(throttle_util.time, "sleep", delays.append)
+    throttle_util.setLimits(globalRate=64 * 1024)
+    throttle_util.throttle("slow.example.com", 64 * 1024)
+    throttle_util.throttle("other.example.com", 4 * 1024)
+    assert delays[-1] == pytest.approx(0.96, abs=0.05)  # waits behind the first host
+
+
+def test_throttled_copy_is_paced(tmp_path):
+    source = tmp_path / "source.bin"
+    source.write_bytes(b"x" * 300 * 1024)
+    throttle_util.setLimits(globalRate=1024 * 1024)
+    started = time.perf_counter()
+    assert file_util.copy(str(source), str(tmp_path / "copy.bin"), throttle=lambda amount: throttle_util.throttle("filesystem", amount))
+    assert time.perf_counter() - started >= 0.15  # 300KB at 1MB/s, less the burst
+    assert (tmp_path / "copy.bin").read_bytes() == source.read_bytes()
@@ -0,0 +1,80 @@
+"""
+Tests for the trace utility, which records spans as Chrome trace events.
+"""
+import asyncio
+import json
+import threading
+import pytest
+import dependency_resolver.resolver.utilities.trace_util as trace_util
+
+
+@pytest.fixture
+def tracing():
+    trace_util.start()
+    yield trace_util
+    trace_util.stop()
+
+
+def spans(path):
+    return [event for event in json.loads(path.read_text())["traceEvents"] if event["ph"] == "X"]
+
+
+def test_disabled_spans_are_shared():
+    trace_util.stop()
+    assert not trace_util.isEnabled()
+    assert trace_util.span("one", "test") is trace_util.span("two", "test")
+    with trace_util.span("one", "test"):
+        pass
+
+
+def test_nested_spans(tracing, tmp_path):
+    with trace_util.span("outer", "test", detail="value"):
+        with trace_util.span("inner", "test"):
+            pass
+    trace_util.writeJson(str(tmp_path / "trace.json"))
+    inner, outer = spans(tmp_path / "trace.json")
+    assert outer["name"] == "outer" and outer["args"] == {"detail": "value"}
+    assert outer["tid"] == inner["tid"]
+    assert outer["ts"] <= inner["ts"] and inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+
+
+def test_failed_span(tracing, tmp_path):
+    with pytest.raises(ValueError):
+        with trace_util.span("broken", "test"):
+            raise ValueError("bad value")
+    trace_util.writeJson(str(tmp_path / "trace.json"))
+    assert spans(tmp_path / "trace.json")[0]["args"]["error"] == "bad value"
+
+
+def test_threads_and_tasks_get_their_own_tracks(tracing, tmp_path):
+    def work():
+        with trace_util.span("thread", "test"):
+            pass
+
+    async def task():
+        with trace_util.span("task", "test"):
+            await asyncio.sleep(0)
+
+    async def tasks():
+        await asyncio.gather(task(), task())
+
+    thread = threading.Thread(target=work)
+    thread.start()
+    thread.join()
+    asyncio.run(tasks())
+    trace_util.writeJson(str(tmp_path / "trace.json"))
+    assert len({span["tid"] for span in spans(tmp_path / "trace.json")}) == 3
+
+
+def test_finished_tasks_are_not_kept(tracing, tmp_path):
+    async def task():
+        with trace_util.span("task", "test"):
+            await asyncio.sleep(0)
+
+    async def tasks():
+        await asyncio.gather(*(task() for _ in range(100)))
+
+    asyncio.run(tasks())
+    assert len(trace_util._recorder._tracks) == 0
+    trace_util.writeJson(str(tmp_path / "trace.json"))
+    assert len({span["tid"] for span in spans(tmp_path / "trace.json")}) == 100
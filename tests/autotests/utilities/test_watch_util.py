@@ -0,0 +1,56 @@
+"""
+Tests waiting for a file to change, with inotify and by polling.
+"""
+import threading
+import time
+import pytest
+import dependency_resolver.resolver.utilities.watch_util as watch_util
+from dependency_resolver.resolver.utilities.watch_util import FileWatcher
+
+
+@pytest.fixture(params=["inotify", "polling"])
+def watcher(request, tmp_path, monkeypatch):
+    monkeypatch.setattr(watch_util, "SETTLE_SECONDS", 0.05)
+    if request.param == "polling":
+        monkeypatch.setattr(FileWatcher, "_openInotify", lambda self: None)
+    path = tmp_path / "config.json"
+    path.write_text("{}")
+    watcher = FileWatcher([str(path)], interval=0.05)
+    yield watcher, path
+    watcher.close()
+
+
+def test_timeout_without_change(watcher):
+    fileWatcher, _ = watcher
+    started = time.monotonic()
+    assert not fileWatcher.wait(timeout=0.2)
+    assert time.monotonic() - started >= 0.2
+
+
+def test_change_is_seen(watcher):
+    fileWatcher, path = watcher
+    threading.Timer(0.1, lambda: path.write_text('{"project": "changed"}')).start()
+    assert fileWatcher.wait(timeout=5)
+    assert not fileWatcher.wait(timeout=0.1)  # the change is only reported once.
+
+
+def test_replaced_file_is_seen(watcher):
+    fileWatcher, path = watcher
+    replacement = path.parent / "config.json.tmp"
+    replacement.write_text('{"project": "replaced"}')
+    threading.Timer(0.1, lambda: replacement.replace(path)).start()
+    assert fileWatcher.wait(timeout=5)
+
+
+def test_every_file_watched_is_seen(watcher):
+    fileWatcher, path = watcher
+    included = path.parent / "includes" / "common.json"
+    included.parent.mkdir()
+    included.write_text("{}")
+    fileWatcher.setPaths([str(path), str(included)])
+    threading.Timer(0.1, lambda: included.write_text('{"variables": {}}')).start()
+    assert fileWatcher.wait(timeout=5)
+
+    fileWatcher.setPaths([str(path)])  # no longer included.
+    included.write_text('{"variables": {"changed": "yes"}}')
+    assert not fileWatcher.wait(timeout=0.2)